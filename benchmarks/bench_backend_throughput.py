@@ -0,0 +1,104 @@
+"""
+Benchmark da vazão da classificação por backend, concorrência e tamanho de lote.
+
+Sobe o servidor local de src/stub_server.py (mesma rota e formato do
+endpoint generateContent do Gemini, com latência configurável) e
+classifica as mesmas descrições pelo backend "http" (GeminiBackend com um
+HttpModel), variando config.AI_MAX_CONCURRENCY e o tamanho do lote. Para
+comparação, mede também o backend offline ("ngram"), se houver histórico
+para treiná-lo. Não precisa de rede nem de chave de API.
+
+Informa, por combinação, as chamadas ao servidor, o tempo e os itens/s.
+
+Uso:
+    python benchmarks/bench_backend_throughput.py
+    python benchmarks/bench_backend_throughput.py --items 500 --latency 0.5
+    python benchmarks/bench_backend_throughput.py --concurrency 1 4 16 --batch-sizes 1 25
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+import config
+import src.ai_classifier as ai_classifier
+from src.category_engine import get_category_index
+from src.classification_driver import StubModel
+from src.classifier_backend import ClassifierBackend, NgramBackend
+from src.ngram_classifier import get_ngram_classifier
+from src.http_model import HttpModel
+from src.stub_server import StubServer
+
+sys.path.insert(0, str(Path(__file__).parent))
+from bench_rag_context import DESCRICOES_EXEMPLO
+
+
+def medir(backend: ClassifierBackend, descricoes: list[str]) -> tuple[int, float]:
+    """
+    Classifica as descrições com o backend.
+
+    Returns:
+        Tupla (chamadas ao modelo, segundos).
+    """
+    inicio = time.perf_counter()
+    backend.classify_batch(descricoes)
+    return backend.calls, time.perf_counter() - inicio
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=200, help="Descrições classificadas")
+    parser.add_argument("--latency", type=float, default=0.2, help="Latência do servidor (s)")
+    parser.add_argument("--latency-per-1k", type=float, default=0.1,
+                        help="Latência do servidor por mil tokens do prompt (s)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 10, config.AI_BATCH_SIZE])
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    # Descrições distintas (o lote não se beneficia de repetições)
+    descricoes = [
+        f"{DESCRICOES_EXEMPLO[i % len(DESCRICOES_EXEMPLO)]} #{i}" for i in range(args.items)
+    ]
+    indice = get_category_index()
+    contexto_rag = ai_classifier.formatar_contexto_rag(indice.hierarchy)
+    config.AI_REQUESTS_PER_MINUTE = 0  # O servidor local não tem cota
+
+    print(f"{len(descricoes)} descrições, latência {args.latency}s + {args.latency_per_1k}s/1k tokens")
+    print(f"{'Backend':<8} {'Concorrência':>12} {'Lote':>5} {'Chamadas':>9} {'Tempo (s)':>10} {'Itens/s':>9}")
+    print("-" * 58)
+
+    stub = StubModel(latency=args.latency, latency_per_1k_tokens=args.latency_per_1k, seed=0)
+    with StubServer(stub) as server:
+        for concorrencia in args.concurrency:
+            config.AI_MAX_CONCURRENCY = concorrencia
+            for batch_size in args.batch_sizes:
+                ai_classifier._driver = None  # Driver novo com a concorrência atual
+                backend = ai_classifier.GeminiBackend(
+                    indice, contexto_rag, batch_size=batch_size,
+                    model=HttpModel(server.url), name="http",
+                )
+                chamadas, segundos = medir(backend, descricoes)
+                print(
+                    f"{'http':<8} {concorrencia:>12} {batch_size:>5} {chamadas:>9} "
+                    f"{segundos:>10.2f} {len(descricoes) / segundos:>9.1f}"
+                )
+
+    modelo = get_ngram_classifier()
+    if modelo is not None:
+        chamadas, segundos = medir(NgramBackend(modelo, indice), descricoes)
+        print(f"{'ngram':<8} {'-':>12} {'-':>5} {chamadas:>9} {segundos:>10.2f} {len(descricoes) / segundos:>9.1f}")
+    else:
+        print("ngram: sem modelo offline nem histórico para treiná-lo")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+Benchmark dos motores de leitura de CSV DRE (pandas x pyarrow).
+
+Compara load_dre_csv() com config.CSV_ENGINE = "pandas" e "pyarrow" no
+arquivo DRE_BI(BaseDRE).csv versionado e em uma ampliação sintética do
+mesmo arquivo (linhas de dados repetidas N vezes).
+
+Para uma comparação justa, o caminho pandas inclui a conversão de moeda
+(apply_currency_conversion), que o motor pyarrow já faz na leitura.
+
+Uso:
+    python benchmarks/bench_csv_engines.py
+    python benchmarks/bench_csv_engines.py --factor 100 --repeat 3
+"""
+
+import argparse
+import logging
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+import config
+from src.data_cleaner import apply_currency_conversion, load_dre_csv
+
+
+def build_blowup(source: Path, target: Path, factor: int) -> int:
+    """
+    Gera um CSV com o preâmbulo original e as linhas de dados repetidas.
+
+    Args:
+        source: CSV DRE original.
+        target: Caminho do CSV ampliado.
+        factor: Quantas vezes repetir as linhas de dados.
+
+    Returns:
+        int: Número de linhas de dados do arquivo gerado.
+    """
+    lines = source.read_bytes().splitlines(keepends=True)
+    preamble = lines[: config.CSV_HEADER_ROW + 1]
+    data = lines[config.CSV_HEADER_ROW + 1:]
+
+    with open(target, "wb") as f:
+        f.writelines(preamble)
+        for _ in range(factor):
+            f.writelines(data)
+
+    return len(data) * factor
+
+
+def load_with_engine(path: Path, engine: str):
+    """Carrega o CSV e entrega Realizado numérico com o motor informado."""
+    df = load_dre_csv(path, engine=engine)
+    return apply_currency_conversion(df, config.COLUMN_REALIZADO)
+
+
+def bench(path: Path, engine: str, repeat: int) -> tuple[float, float]:
+    """
+    Mede o tempo mediano de carga e a memória do DataFrame resultante.
+
+    Returns:
+        Tupla (segundos, megabytes).
+    """
+    timings = []
+    df = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df = load_with_engine(path, engine)
+        timings.append(time.perf_counter() - start)
+
+    memory_mb = df.memory_usage(deep=True).sum() / 1024**2
+    return statistics.median(timings), memory_mb
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--input", type=Path, default=config.INPUT_FILE_PATH)
+    parser.add_argument("--factor", type=int, default=100, help="Fator de ampliação sintética")
+    parser.add_argument("--repeat", type=int, default=3, help="Execuções por medição")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        blowup = Path(tmp) / f"dre_x{args.factor}.csv"
+        rows = build_blowup(args.input, blowup, args.factor)
+
+        cases = [(args.input.name, args.input), (f"{blowup.name} ({rows:,} linhas)", blowup)]
+
+        print(f"{'Arquivo':<40} {'Motor':<8} {'Tempo (s)':>10} {'Memória (MB)':>13}")
+        print("-" * 74)
+        for label, path in cases:
+            for engine in ("pandas", "pyarrow"):
+                seconds, memory_mb = bench(path, engine, args.repeat)
+                print(f"{label:<40} {engine:<8} {seconds:>10.3f} {memory_mb:>13.1f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+Benchmark do pico de memória (RSS) do pipeline em memória do main.py.
+
+Executa as etapas do main.py (carga, moeda, mês, categorias e narrativas)
+em um processo separado para cada modo e informa o pico de RSS
+(resource.getrusage) acumulado ao fim de cada etapa:
+
+    - copy: pd.options.mode.copy_on_write = False. Cada apply_* e o
+      generate_narratives copiam o DataFrame inteiro (comportamento antigo
+      com df.copy()).
+    - cow: pd.options.mode.copy_on_write = True (config.PANDAS_COPY_ON_WRITE).
+      Cada etapa só materializa a coluna que altera.
+
+Cada modo roda em um processo novo porque o pico de RSS nunca diminui.
+
+Uso:
+    python benchmarks/bench_peak_memory.py
+    python benchmarks/bench_peak_memory.py --factor 20
+"""
+
+import argparse
+import json
+import logging
+import resource
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+import config
+from benchmarks.bench_csv_engines import build_blowup
+
+
+def peak_rss_mb() -> float:
+    """Pico de RSS do processo atual em MB (ru_maxrss é em KB no Linux)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_pipeline(path: Path, copy_on_write: bool) -> None:
+    """Executa as etapas em memória do main.py e imprime o pico de RSS de cada uma."""
+    import pandas as pd
+
+    from src.category_engine import CategoryManager
+    from src.data_cleaner import apply_currency_conversion, apply_month_conversion, load_dre_file
+    from src.narrative_generator import generate_narratives
+
+    pd.set_option("mode.copy_on_write", copy_on_write)
+    peaks = {"inicio": peak_rss_mb()}
+
+    df = load_dre_file(path)
+    peaks["carga"] = peak_rss_mb()
+    df = apply_currency_conversion(df, config.COLUMN_REALIZADO)
+    peaks["moeda"] = peak_rss_mb()
+    df = apply_month_conversion(df, config.COLUMN_MES, config.REFERENCE_YEAR)
+    peaks["mes"] = peak_rss_mb()
+    CategoryManager().extract_category_hierarchy(df)
+    peaks["categorias"] = peak_rss_mb()
+    generate_narratives(df)
+    peaks["narrativas"] = peak_rss_mb()
+
+    print(json.dumps(peaks))
+
+
+def measure(path: Path, mode: str) -> dict[str, float]:
+    """Roda o pipeline em um processo novo e retorna o pico de RSS por etapa."""
+    result = subprocess.run(
+        [sys.executable, __file__, "--child", mode, "--input", str(path)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--input", type=Path, default=config.INPUT_FILE_PATH)
+    parser.add_argument("--factor", type=int, default=10, help="Fator de ampliação sintética")
+    parser.add_argument("--child", choices=["copy", "cow"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.child:
+        run_pipeline(args.input, copy_on_write=args.child == "cow")
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.input
+        if args.factor > 1:
+            path = Path(tmp) / f"dre_x{args.factor}.csv"
+            build_blowup(args.input, path, args.factor)
+
+        results = {mode: measure(path, mode) for mode in ("copy", "cow")}
+
+    print(f"Pico de RSS acumulado por etapa (MB) - {path.name}")
+    print(f"{'Etapa':<12} {'copy':>10} {'cow':>10}")
+    print("-" * 34)
+    for stage in results["copy"]:
+        print(f"{stage:<12} {results['copy'][stage]:>10.1f} {results['cow'][stage]:>10.1f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+"""
+Benchmark do contexto RAG dos prompts de classificação (completo x reduzido).
+
+Classifica as mesmas descrições com processar_classificacao() duas vezes:
+
+    - completo: config.RAG_TOP_K = 0, a hierarquia inteira do
+      categories.json em cada prompt (comportamento antigo);
+    - reduzido: só as categorias candidatas de cada lote
+      (src/rag_retriever.py, config.RAG_TOP_K por gasto).
+
+Informa os prompts enviados, a média de tokens por prompt
+(estimate_tokens()) e o tempo total. Por padrão usa o StubModel, com
+latência proporcional ao tamanho do prompt; com --live usa o Gemini
+(GEMINI_API_KEY) e informa também a concordância entre as duas execuções
+e, com rótulos, os acertos de cada uma.
+O cache e o pré-classificador ficam desligados, para que todas as
+descrições cheguem ao modelo.
+
+Antes dos tempos, mede a recall da poda (ContextRetriever.recall()): a
+fração dos gastos rotulados cujo cc_nome correto continua no prompt
+reduzido, para vários top-k, com um gasto por prompt e com lotes. Os
+rótulos vêm da coluna cc_nome de --input ou, sem --input, dos exemplos
+abaixo. Só ligue config.RAG_TOP_K com uma recall próxima de 100%.
+
+Uso:
+    python benchmarks/bench_rag_context.py
+    python benchmarks/bench_rag_context.py --batch-size 1 --top-k 5
+    python benchmarks/bench_rag_context.py --input rotulados.csv --live
+"""
+
+import argparse
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+import config
+import src.ai_classifier as ai_classifier
+from src.category_engine import get_category_index
+from src.classification_driver import StubModel, estimate_tokens
+from src.csv_dialect import read_csv_sniffed
+from src.rag_retriever import get_context_retriever
+
+# Lançamentos típicos de um restaurante e o cc_nome correto (categories.json)
+EXEMPLOS_ROTULADOS: list[tuple[str, str]] = [
+    ("Compra picanha frigorifico", "BOVINOS"), ("Fraldinha bovina kg", "BOVINOS"),
+    ("Coxa de frango congelada", "AVES"), ("Cerveja long neck caixa", "CERVEJAS"),
+    ("Chopp barril 50L", "CHOPPS"), ("Refrigerante lata 350ml", "REFRIGERANTES"),
+    ("Agua mineral sem gas", "AGUAS"), ("Vinho tinto chileno", "VINHOS"),
+    ("Gelo em cubos", "GELO"), ("Carvao vegetal 10kg", "ITENS PARA CHURRASCO"),
+    ("Conta de energia eletrica", "ENERGIA"), ("Conta de agua e esgoto", "AGUA E ESGOTO"),
+    ("Internet fibra mensalidade", "SERVICOS DE TELEFONIA FIXA/INERNET/TV"),
+    ("Aluguel loja centro", "ALUGUEL DE IMOVEIS"), ("Condominio mensal", "CONDOMINIO"),
+    ("Manutencao ar condicionado", "AR CONDICIONADO"), ("Salario garcom", "SALARIOS E ORDENADOS"),
+    ("Vale transporte funcionarios", "VALE TRANSPORTE"), ("FGTS competencia", "FGTS"),
+    ("Ferias cozinheiro", "FÉRIAS"), ("Taxa maquininha cartao credito", "TX ADM CARTO CREDITO"),
+    ("Tarifa bancaria pacote", "TAXAS BANCARIAS"), ("Juros boleto em atraso", "JUROS/MULTAS"),
+    ("Honorarios contabilidade", "HONORARIOS CONTABEIS"),
+    ("Sistema PDV licenca", "SISTEMAS E SOFTWARES"),
+    ("Consultoria financeira mensal", "CONSULTORIA FINANCEIRA"),
+    ("Impulsionamento Instagram", "MIDIAS"), ("Panfletos grafica", "IMPRESSOS E SERVIOS GRAFICOS"),
+    ("Simples Nacional DAS", "SIMPLES NACIONAL"),
+    ("Detergente e desinfetante", "MATERIAIS DE LIMPEZA / HIGIENE"),
+    ("Embalagens para delivery", "EMBALAGENS"), ("Taxa iFood pedidos", "TX ADM IFOOD"),
+    ("Uniforme cozinha avental", "UNIFORME E EPI"), ("Botijao gas cozinha P45", "GAS/COZINHA"),
+    ("Queijo mussarela fatiado", "QUEIJOS"), ("Farinha de trigo saco", "FARINACEOS/CAFE/ACUCAR"),
+    ("Oleo de soja caixa", "OLEO / AZEITE / VINAGRE"), ("Sorvete pote 2L", "PICOLES E SORVETES"),
+    ("Limao tahiti caixa", "HORTFRUTIGRANJEIROS"), ("Frete entrega mercadoria", "FRETES E ESTACIONAMENTO"),
+    ("Picanha", "BOVINOS"), ("Coca-Cola 2L", "REFRIGERANTES"),
+]
+
+# Valores de top-k da tabela de recall
+TOP_K_RECALL: tuple[int, ...] = (8, 16, 32, 64)
+
+
+class ModeloMedido:
+    """Repassa as chamadas ao modelo e registra o tamanho de cada prompt."""
+
+    def __init__(self, model) -> None:
+        self.model = model
+        self.tokens: list[int] = []
+
+    def generate_content(self, prompt: str):
+        self.tokens.append(estimate_tokens(prompt))
+        return self.model.generate_content(prompt)
+
+
+def classificar(
+    df_mestre: pd.DataFrame,
+    descricoes: list[str],
+    contexto_rag: str,
+    model,
+    top_k: int,
+    batch_size: int,
+) -> tuple[list[str], list[int], float]:
+    """
+    Classifica as descrições com o RAG_TOP_K informado.
+
+    Returns:
+        Tupla (categorias, tokens de cada prompt, segundos).
+    """
+    config.RAG_TOP_K = top_k
+    medido = ModeloMedido(model)
+    ai_classifier._model = medido
+    ai_classifier._driver = None
+
+    inicio = time.perf_counter()
+    resultado = ai_classifier.processar_classificacao(
+        df_mestre, pd.DataFrame({"Descricao": descricoes}), contexto_rag, batch_size=batch_size
+    )
+    return resultado["cc_nome"].tolist(), medido.tokens, time.perf_counter() - inicio
+
+
+def imprimir_recall(descricoes: list[str], labels: list[str], top_ks: list[int], batch_size: int) -> None:
+    """Tabela da recall da poda por top-k, com um gasto por prompt e com lotes."""
+    seletor = get_context_retriever(get_category_index())
+    tamanhos = sorted({1, batch_size})
+    print(f"Recall da poda ({len(labels)} gastos rotulados): cc_nome correto no prompt reduzido")
+    print(f"{'top-k':>6} " + " ".join(f"{f'lote {n}':>9}" for n in tamanhos))
+    for top_k in top_ks:
+        config.RAG_TOP_K = top_k
+        valores = [seletor.recall(descricoes, labels, batch_size=n) for n in tamanhos]
+        print(f"{top_k:>6} " + " ".join(f"{valor:>9.1%}" for valor in valores))
+    print()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--input", type=Path, default=None,
+                        help="CSV com a coluna Descricao e, para a recall, cc_nome "
+                             "(padrão: exemplos rotulados)")
+    parser.add_argument("--top-k", type=int, default=config.RAG_TOP_K or 8,
+                        help="Categorias por gasto no contexto reduzido")
+    parser.add_argument("--batch-size", type=int, default=config.AI_BATCH_SIZE)
+    parser.add_argument("--latency", type=float, default=0.3, help="Latência fixa do stub (s)")
+    parser.add_argument("--latency-per-1k", type=float, default=0.15,
+                        help="Latência do stub por mil tokens do prompt (s)")
+    parser.add_argument("--live", action="store_true", help="Usa o Gemini em vez do stub")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.input:
+        entrada = read_csv_sniffed(args.input).dropna(subset=["Descricao"])
+        descricoes = entrada["Descricao"].astype(str).tolist()
+        labels = entrada["cc_nome"].astype(str).tolist() if "cc_nome" in entrada.columns else None
+    else:
+        descricoes = [descricao for descricao, _ in EXEMPLOS_ROTULADOS]
+        labels = [label for _, label in EXEMPLOS_ROTULADOS]
+
+    if args.live:
+        model = ai_classifier.get_model()
+        if model is None:
+            print("GEMINI_API_KEY não configurada (ou google-generativeai ausente)")
+            return 1
+    else:
+        model = StubModel(latency=args.latency, latency_per_1k_tokens=args.latency_per_1k, seed=0)
+
+    config.AI_BACKEND = "gemini"
+    config.AI_CACHE_ENABLED = False
+    config.PRE_CLASSIFIER_ENABLED = False
+    if not args.live:
+        config.AI_REQUESTS_PER_MINUTE = 0  # O stub não tem cota
+
+    contexto_rag = ai_classifier.formatar_contexto_rag(ai_classifier.carregar_categorias_rag())
+    df_mestre = pd.DataFrame({"cc_nome": get_category_index().names})
+
+    if labels:
+        top_ks = sorted(set(TOP_K_RECALL) | {args.top_k})
+        imprimir_recall(descricoes, labels, top_ks, args.batch_size)
+    else:
+        print("Sem a coluna cc_nome em --input: recall da poda não medida\n")
+
+    print(f"{len(descricoes)} descrições, lotes de {args.batch_size}, RAG_TOP_K={args.top_k}")
+    print(f"{'Contexto':<10} {'Prompts':>8} {'Tokens/prompt':>14} {'Tokens total':>13} {'Tempo (s)':>10}")
+    print("-" * 59)
+    respostas = {}
+    medidas = {}
+    for nome, top_k in (("completo", 0), ("reduzido", args.top_k)):
+        categorias, tokens, segundos = classificar(
+            df_mestre, descricoes, contexto_rag, model, top_k, args.batch_size
+        )
+        respostas[nome] = categorias
+        medidas[nome] = statistics.mean(tokens) if tokens else 0.0
+        print(f"{nome:<10} {len(tokens):>8} {medidas[nome]:>14.0f} {sum(tokens):>13} {segundos:>10.2f}")
+
+    if medidas["completo"]:
+        print(f"\nRedução média de tokens por prompt: {1 - medidas['reduzido'] / medidas['completo']:.1%}")
+    if args.live:
+        iguais = sum(a == b for a, b in zip(respostas["completo"], respostas["reduzido"]))
+        print(f"Mesma categoria nas duas execuções: {iguais}/{len(descricoes)}")
+        if labels:
+            for nome, categorias in respostas.items():
+                acertos = sum(a == b for a, b in zip(categorias, labels))
+                print(f"Acertos ({nome}): {acertos}/{len(labels)}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
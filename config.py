@@ -7,6 +7,7 @@ incluindo caminhos de arquivos, ano de referência e outras configurações.
 Suporta arquivos de entrada nos formatos Excel (.xlsx) e CSV (.csv).
 """
 
+import os
 from pathlib import Path
 
 # =============================================================================
@@ -26,7 +27,27 @@ INPUT_FILE_PATH: Path = BASE_DIR / INPUT_FILE_NAME
 OUTPUT_DIR: Path = BASE_DIR / "output"
 PROCESSED_PARQUET_PATH: Path = OUTPUT_DIR / "processed_dre.parquet"
 CATEGORIES_JSON_PATH: Path = OUTPUT_DIR / "categories.json"
+# Metadados da hierarquia (versão, meses já incorporados e primeiro mês de cada cc_nome)
+CATEGORIES_META_PATH: Path = OUTPUT_DIR / "categories_meta.json"
+# Árvore completa do plano de contas (todos os níveis de ACCOUNT_TREE_LEVELS)
+ACCOUNT_TREE_PATH: Path = OUTPUT_DIR / "account_tree.npz"
 NARRATIVE_CSV_PATH: Path = OUTPUT_DIR / "relatorio_narrativo_ia.csv"
+# Relatório mestre em Parquet particionado por mês (src/master_store.py)
+# A classificação só acrescenta arquivos novos; com NARRATIVE_EXPORT_CSV, o
+# NARRATIVE_CSV_PATH (lido pelo Excel, dashboard e classificador offline)
+# recebe as mesmas linhas ao fim de cada classificação
+NARRATIVE_DATASET_DIR: Path = OUTPUT_DIR / "relatorio_narrativo"
+NARRATIVE_PARTITION_COLUMN: str = "particao_mes"
+# Meses com ao menos este número de arquivos são juntados em um só ao fim
+# de cada classificação (MasterStore.compact)
+NARRATIVE_COMPACT_MIN_FILES: int = 8
+NARRATIVE_EXPORT_CSV: bool = True
+FINETUNE_JSONL_PATH: Path = OUTPUT_DIR / "finetune_dataset.jsonl"
+
+# Manifesto de execução incremental do main.py
+# Guarda, por etapa, os hashes de entradas, configuração e código; etapas
+# inalteradas são puladas e seus artefatos reutilizados (use --force para ignorar)
+RUN_MANIFEST_PATH: Path = OUTPUT_DIR / "run_manifest.json"
 
 # =============================================================================
 # Configuração de Processamento de Dados
@@ -37,14 +58,53 @@ NARRATIVE_CSV_PATH: Path = OUTPUT_DIR / "relatorio_narrativo_ia.csv"
 EXCEL_HEADER_ROW: int = 4  # Índice 0, cabeçalho real está na linha 5
 EXCEL_SHEET_NAME: str | int = 0  # Nome ou índice da planilha (0 = primeira)
 
+# Cache Parquet das planilhas Excel
+# A primeira leitura converte a planilha para Parquet; as seguintes leem a cópia.
+# A chave inclui o hash do conteúdo do arquivo, a planilha e a linha de cabeçalho.
+EXCEL_CACHE_ENABLED: bool = True
+EXCEL_CACHE_DIR: Path = OUTPUT_DIR / "cache" / "excel"
+EXCEL_CACHE_BATCH_ROWS: int = 10_000  # Linhas por lote na conversão inicial
+
 # Configurações para arquivos CSV (mantidas para compatibilidade)
 CSV_SEPARATOR: str = ";"
 CSV_ENCODING: str = "latin-1"  # Também conhecido como ISO-8859-1 ou Windows-1252
 CSV_HEADER_ROW: int = 4  # Índice 0, cabeçalho real está na linha 5
 
+# Detecção de encoding e separador (relatório narrativo e entrada do classificador)
+# Apenas os primeiros bytes do arquivo são inspecionados, uma vez por versão do arquivo
+CSV_SNIFF_BYTES: int = 16_384
+
+# Motor de leitura de CSV: "pandas" (padrão) ou "pyarrow"
+# O motor pyarrow lê com múltiplas threads, entrega colunas de texto como
+# categóricas e a coluna Realizado já convertida para float
+CSV_ENGINE: str = "pandas"
+
+# Processamento em blocos (streaming) de CSVs grandes
+# Com CSV_STREAMING ativo, o main.py converte o CSV bloco a bloco e grava
+# direto no Parquet, mantendo o pico de memória constante
+CSV_STREAMING: bool = False
+CSV_CHUNK_SIZE: int = 50_000  # Linhas por bloco
+
+# Modo copy-on-write do pandas (pd.options.mode.copy_on_write)
+# Ativado pelo main.py e pelo dashboard: as funções apply_* e
+# generate_narratives devolvem DataFrames que compartilham as colunas não
+# alteradas com a entrada, em vez de cópias completas
+PANDAS_COPY_ON_WRITE: bool = True
+
 # Reference year for date conversion
+# Usado apenas quando o export não traz a linha "Ano Txt" no preâmbulo
 REFERENCE_YEAR: int = 2025
 
+# Ingestão de múltiplos exports (um por ano e por grupo de empresas)
+# O main.py aceita arquivos, diretórios ou padrões glob; cada export é
+# carregado e limpo em um pool de processos e gravado em um dataset Parquet
+# particionado por Ano e GrupoEmpresa (valores lidos do preâmbulo do arquivo)
+INPUT_FILE_PATTERNS: list[str] = ["*.csv", "*.xlsx", "*.xls"]  # Usados em diretórios
+INGEST_MAX_WORKERS: int | None = None  # None = número de CPUs
+PARTITIONED_DATASET_DIR: Path = OUTPUT_DIR / "dre_dataset"
+COLUMN_ANO: str = "Ano"
+COLUMN_GRUPO_EMPRESA: str = "GrupoEmpresa"
+
 # =============================================================================
 # Column Names Configuration
 # =============================================================================
@@ -63,6 +123,39 @@ REQUIRED_COLUMNS: list[str] = [
     COLUMN_REALIZADO,
 ]
 
+# Colunas de dimensão convertidas para categóricas (pd.Categorical) na carga
+# A ordem das categorias segue o categories.json (grupos e cc_nome); valores
+# fora dele e as demais colunas entram em ordem alfabética
+DIMENSION_COLUMNS: list[str] = [
+    "Loja",
+    "_key_centro_custo",
+    "cc_parent_nome",
+    COLUMN_NOME_GRUPO,
+    COLUMN_CC_NOME,
+    "Camada03",
+]
+
+# Níveis da árvore do plano de contas, da raiz para as folhas
+# (CategoryManager.build_account_tree); _key_centro_custo define todos os
+# níveis acima dele, e Camada03 é a descrição de cada centro de custo
+ACCOUNT_TREE_LEVELS: list[str] = [
+    COLUMN_NOME_GRUPO,
+    "cc_parent_nome",
+    COLUMN_CC_NOME,
+    "_key_centro_custo",
+    "Camada03",
+]
+
+# Regras de qualidade de dados (src/data_quality.py)
+# Linhas reprovadas (moeda inválida, mês desconhecido, dimensão obrigatória
+# vazia ou chave repetida) vão para a quarentena e o restante segue no pipeline.
+# Nome Grupo não é obrigatório: o export traz linhas legítimas sem grupo.
+# A chave usa _key_centro_custo (e não cc_nome), que se repete entre
+# centros de custo diferentes da mesma loja
+QUALITY_REQUIRED_DIMENSIONS: list[str] = ["Loja", "_key_centro_custo", COLUMN_CC_NOME]
+QUALITY_DUPLICATE_KEY: list[str] = ["Loja", "_key_centro_custo", COLUMN_MES]
+QUARANTINE_PARQUET_PATH: Path = OUTPUT_DIR / "quarantine.parquet"
+
 # =============================================================================
 # Portuguese Month Mapping
 # =============================================================================
@@ -120,6 +213,125 @@ TEXT_REPLACEMENTS: dict[str, str] = {
     "ï¿½": "",
 }
 
+# =============================================================================
+# Classificação por IA (src/ai_classifier.py)
+# =============================================================================
+
+# Gastos enviados em um mesmo prompt (itens numerados, resposta em JSON)
+# Itens com resposta ausente ou fora das categorias válidas são perguntados
+# de novo, um a um. Use 1 para desativar os lotes
+AI_BATCH_SIZE: int = 25
+
+# Chamadas concorrentes (src/classification_driver.py)
+# O balde de fichas segue a cota da API Gemini (requisições por minuto);
+# respostas 429 e 5xx são tentadas de novo com espera exponencial e jitter
+AI_MAX_CONCURRENCY: int = 4
+AI_REQUESTS_PER_MINUTE: int = 15  # 0 desativa o limite
+AI_RATE_BURST: int = 4  # Requisições liberadas de uma vez
+AI_MAX_RETRIES: int = 5
+AI_BACKOFF_BASE_SECONDS: float = 2.0
+AI_BACKOFF_MAX_SECONDS: float = 60.0
+
+# Cache persistente de classificações (src/classification_cache.py)
+# Chave: descrição normalizada + hash do contexto de categorias do prompt.
+# Com AI_CACHE_STRICT_CONTEXT, respostas só são reutilizadas se o conjunto
+# de categorias não mudou
+AI_CACHE_ENABLED: bool = True
+AI_CACHE_PATH: Path = OUTPUT_DIR / "cache" / "classificacoes.sqlite"
+AI_CACHE_TTL_DAYS: float = 90  # 0 = sem expiração
+AI_CACHE_MAX_ENTRIES: int = 50_000  # Acima disso, remove as menos usadas (LRU)
+AI_CACHE_STRICT_CONTEXT: bool = True
+
+# Checkpoint da classificação (src/classification_checkpoint.py)
+# As linhas da entrada são classificadas em micro-lotes de AI_CHECKPOINT_ROWS,
+# cada um gravado no checkpoint (JSONL por hash da linha) assim que termina;
+# uma execução interrompida retoma das linhas que faltam
+AI_CHECKPOINT_PATH: Path = OUTPUT_DIR / "cache" / "classificacao_checkpoint.jsonl"
+AI_CHECKPOINT_ROWS: int = 100
+# Linhas sem categoria válida (ERRO_IA ou resposta fora do índice) ficam fora
+# do checkpoint e são tentadas de novo; depois de AI_CHECKPOINT_MAX_ATTEMPTS
+# execuções sem sucesso, a linha é gravada como OUTROS (e listada no log) para
+# não bloquear o mestre. 0 = tenta sempre
+AI_CHECKPOINT_MAX_ATTEMPTS: int = 3
+
+# Contexto RAG reduzido (src/rag_retriever.py)
+# Com RAG_TOP_K > 0, em vez da hierarquia inteira do categories.json, cada
+# prompt leva só as RAG_TOP_K categorias mais parecidas com cada gasto
+# (similaridade de n-gramas de caracteres) e as de RAG_FALLBACK_CATEGORIES.
+# Desligado (0, hierarquia completa) por padrão: a similaridade lexical perde
+# a categoria certa de gastos como "Picanha" (BOVINOS) e "Coca-Cola 2L"
+# (REFRIGERANTES). Meça a recall com dados rotulados antes de ligar
+# (benchmarks/bench_rag_context.py --labels)
+RAG_TOP_K: int = 0
+RAG_FALLBACK_CATEGORIES: list[str] = [
+    "MATERIAIS DE USO E CONSUMO",
+    "MATERIA PRIMA",
+    "BENS DE PEQUENO VALOR",
+    "SERVICOS TERCEIROS PF/PJ",
+    "TAXAS BANCARIAS",
+    "OUTROS GASTOS COM PESSOAL",
+]
+
+# Cache de contexto no provedor (context caching do Gemini)
+# A parte estática dos prompts (papel e hierarquia completa) é enviada uma
+# vez por sessão e os prompts levam só a tarefa. Só é tentado com prefixos
+# de pelo menos AI_PROVIDER_CACHE_MIN_TOKENS (mínimo aceito pelo modelo);
+# se o provedor recusar, os prompts seguem com o contexto (reduzido)
+AI_PROVIDER_CONTEXT_CACHE: bool = True
+AI_PROVIDER_CACHE_MIN_TOKENS: int = 4096
+AI_PROVIDER_CACHE_TTL_MINUTES: int = 60
+
+# Backend de classificação (src/classifier_backend.py): "gemini", "ngram"
+# (offline, sem chave de API), "http" (endpoint generateContent em
+# AI_HTTP_URL, ex: o servidor local de src/stub_server.py) ou "auto"
+# (Gemini se houver modelo disponível, senão o offline). O offline só é
+# usado quando pedido: treinado com o histórico, ele reconhece os nomes das
+# categorias, não descrições livres; com "gemini", falta de chave é erro
+AI_BACKEND: str = os.getenv("AI_BACKEND", "gemini")
+AI_HTTP_URL: str = os.getenv("AI_HTTP_URL", "http://127.0.0.1:8765")
+AI_HTTP_TIMEOUT_SECONDS: float = 60.0
+
+# Classificador offline (src/ngram_classifier.py)
+# TF-IDF de n-gramas de caracteres treinado no histórico rotulado; respostas
+# com confiança abaixo de NGRAM_MIN_CONFIDENCE ficam como "OUTROS"
+NGRAM_MODEL_PATH: Path = OUTPUT_DIR / "ngram_classifier.npz"
+NGRAM_RANGE: tuple[int, int] = (2, 4)
+NGRAM_TOP_K: int = 5
+NGRAM_MIN_CONFIDENCE: float = 0.5
+
+# Pré-classificador local (src/pre_classifier.py)
+# Resolve sem a IA as descrições que casam com uma categoria existente
+# (nome exato, histórico, fornecedor conhecido ou sobreposição de palavras).
+# Só as resoluções com confiança >= PRE_CLASSIFIER_MIN_CONFIDENCE são aceitas
+PRE_CLASSIFIER_ENABLED: bool = True
+PRE_CLASSIFIER_MIN_CONFIDENCE: float = 0.75
+# Na sobreposição de palavras, o nome da categoria tem de explicar ao menos esta
+# fração do peso (IDF) das palavras da descrição; palavras que não estão em
+# nenhuma categoria pesam como as mais raras
+PRE_CLASSIFIER_MIN_QUERY_COVERAGE: float = 0.75
+
+# Fornecedores conhecidos: palavra-chave (ignorando acentos e maiúsculas) -> cc_nome
+# Regras cuja categoria não existe no conjunto atual são ignoradas
+PRE_CLASSIFIER_KEYWORD_RULES: dict[str, str] = {
+    "AWS": "SISTEMAS E SOFTWARES",
+    "AMAZON WEB SERVICES": "SISTEMAS E SOFTWARES",
+    "GOOGLE WORKSPACE": "SISTEMAS E SOFTWARES",
+    "SABESP": "AGUA E ESGOTO",
+    "ENEL": "ENERGIA",
+    "CEMIG": "ENERGIA",
+    "CPFL": "ENERGIA",
+    "NEOENERGIA": "ENERGIA",
+    "VIVO": "SERVICOS DE TELEFONIA FIXA/INERNET/TV",
+    "CLARO": "SERVICOS DE TELEFONIA FIXA/INERNET/TV",
+    "INDRIVER": "DESPESAS COM UBER/POP/INDRIVER",
+    "99 POP": "DESPESAS COM UBER/POP/INDRIVER",
+    "AMBEV": "CERVEJAS",
+    "HEINEKEN": "CERVEJAS",
+    "COCA COLA": "REFRIGERANTES",
+    "GOOGLE ADS": "MIDIAS",
+    "META ADS": "MIDIAS",
+}
+
 # =============================================================================
 # Logging Configuration
 # =============================================================================
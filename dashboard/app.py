@@ -19,6 +19,7 @@ warnings.filterwarnings("ignore", category=FutureWarning)
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 warnings.filterwarnings("ignore", message=".*cmdstan.*")
 
+import pandas as pd
 import streamlit as st
 
 # Adiciona raiz do projeto ao path
@@ -26,6 +27,10 @@ ROOT_DIR = Path(__file__).parent.parent
 sys.path.insert(0, str(ROOT_DIR))
 
 import config
+
+# Copy-on-write: filtros e transformacoes compartilham colunas em vez de copiar
+pd.set_option("mode.copy_on_write", config.PANDAS_COPY_ON_WRITE)
+
 from dashboard.components.data_loader import load_processed_data, load_categories
 from dashboard.components.styles import (
     apply_styles,
@@ -446,7 +446,7 @@ def create_hierarchical_dre_table(
         return pd.DataFrame()
 
     # Agregar dados por grupo e loja
-    pivot_data = df.groupby([group_column, store_column])[value_column].sum().reset_index()
+    pivot_data = df.groupby([group_column, store_column], observed=True)[value_column].sum().reset_index()
 
     # Criar tabela pivotada
     pivot_table = pivot_data.pivot_table(
@@ -454,7 +454,8 @@ def create_hierarchical_dre_table(
         columns=store_column,
         values=value_column,
         aggfunc='sum',
-        fill_value=0
+        fill_value=0,
+        observed=True,
     )
 
     # Limitar número de lojas
@@ -517,7 +518,7 @@ def create_styled_dre_html_table(
         return
 
     # Agregar dados por grupo e loja
-    pivot_data = df.groupby([group_column, store_column])[value_column].sum().reset_index()
+    pivot_data = df.groupby([group_column, store_column], observed=True)[value_column].sum().reset_index()
 
     # Criar tabela pivotada
     pivot_table = pivot_data.pivot_table(
@@ -525,7 +526,8 @@ def create_styled_dre_html_table(
         columns=store_column,
         values=value_column,
         aggfunc='sum',
-        fill_value=0
+        fill_value=0,
+        observed=True,
     )
 
     # Limitar número de lojas
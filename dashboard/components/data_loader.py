@@ -17,6 +17,10 @@ ROOT_DIR = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(ROOT_DIR))
 
 import config
+from src.category_engine import AccountTree
+from src.csv_dialect import read_csv_sniffed
+from src.data_cleaner import apply_dimension_categoricals
+from src.text_repair import get_text_repairer
 
 
 def clean_text(text: str) -> str:
@@ -35,11 +39,7 @@ def clean_text(text: str) -> str:
     if not isinstance(text, str):
         return str(text) if text is not None else ""
 
-    result = text
-    for old, new in config.TEXT_REPLACEMENTS.items():
-        result = result.replace(old, new)
-
-    return result
+    return get_text_repairer(strip=False).repair(text)
 
 
 def clean_dataframe_text(df: pd.DataFrame, columns: list[str] | None = None) -> pd.DataFrame:
@@ -59,11 +59,13 @@ def clean_dataframe_text(df: pd.DataFrame, columns: list[str] | None = None) ->
         # Identificar colunas de texto automaticamente
         columns = df_clean.select_dtypes(include=['object']).columns.tolist()
 
+    # Corrige cada valor distinto uma vez (ou só as categorias, em colunas
+    # categóricas) e mapeia de volta para as linhas
+    repairer = get_text_repairer(strip=False)
     for col in columns:
-        if col in df_clean.columns:
-            df_clean[col] = df_clean[col].apply(
-                lambda x: clean_text(x) if isinstance(x, str) else x
-            )
+        if col not in df_clean.columns:
+            continue
+        df_clean[col] = repairer.repair_series(df_clean[col])
 
     return df_clean
 
@@ -88,6 +90,9 @@ def load_processed_data() -> pd.DataFrame:
         )
     
     df = pd.read_parquet(parquet_path)
+
+    # Colunas de dimensão como categóricas (Parquets antigos trazem texto)
+    df = apply_dimension_categoricals(df)
     
     # Garantir tipos corretos
     if config.COLUMN_REALIZADO in df.columns:
@@ -115,6 +120,22 @@ def load_categories() -> dict[str, list[str]]:
         return json.load(f)
 
 
+@st.cache_resource(ttl=300)
+def load_account_tree() -> AccountTree | None:
+    """
+    Carrega a árvore completa do plano de contas (account_tree.npz).
+
+    Returns:
+        AccountTree, ou None se o arquivo não existir.
+    """
+    tree_path = config.ACCOUNT_TREE_PATH
+
+    if not tree_path.exists():
+        return None
+
+    return AccountTree.load(tree_path)
+
+
 @st.cache_data(ttl=300)
 def load_narratives() -> pd.DataFrame:
     """
@@ -128,17 +149,13 @@ def load_narratives() -> pd.DataFrame:
     if not csv_path.exists():
         return pd.DataFrame()
     
-    # Tenta diferentes encodings
-    for encoding in ['utf-8-sig', 'utf-8', 'latin-1']:
-        for sep in [';', ',']:
-            try:
-                df = pd.read_csv(csv_path, encoding=encoding, sep=sep)
-                if len(df.columns) > 1:
-                    return df
-            except Exception:
-                continue
-    
-    return pd.DataFrame()
+    # Encoding e separador detectados uma vez, a partir do início do arquivo
+    try:
+        df = read_csv_sniffed(csv_path)
+    except (UnicodeDecodeError, pd.errors.ParserError):
+        return pd.DataFrame()
+
+    return df if len(df.columns) > 1 else pd.DataFrame()
 
 
 def get_summary_stats(df: pd.DataFrame) -> dict:
@@ -187,7 +204,8 @@ def filter_dataframe(
     Returns:
         DataFrame filtrado.
     """
-    filtered = df.copy()
+    # Filtros booleanos já devolvem um novo DataFrame; sem cópia inicial
+    filtered = df
 
     col_grupo = config.COLUMN_NOME_GRUPO
     col_mes = config.COLUMN_MES
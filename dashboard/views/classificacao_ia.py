@@ -64,30 +64,41 @@ def render_classificacao_ia(df: pd.DataFrame, categories: dict) -> None:
         if st.button("🔍 Classificar", type="primary", use_container_width=True):
             if descricao:
                 try:
-                    from src.ai_classifier import classificar_gasto, carregar_categorias_rag, formatar_contexto_rag
+                    from src.ai_classifier import (
+                        classificar_gasto,
+                        get_contexto_rag,
+                        get_driver,
+                        get_model_com_contexto,
+                    )
 
-                    categorias_dict = carregar_categorias_rag()
-                    contexto = formatar_contexto_rag(categorias_dict)
-
-                    # Extrair todas as categorias (não apenas os grupos)
-                    todas_categorias = []
-                    for cats in categorias_dict.values():
-                        todas_categorias.extend(cats)
+                    # Contexto e índice compartilhados, carregados uma vez por versão do categories.json
+                    contexto = get_contexto_rag()
+                    indice = contexto.indice
 
                     with st.spinner("Classificando com IA..."):
                         resultado = classificar_gasto(
                             descricao,
-                            categorias_validas=todas_categorias,
-                            contexto_rag=contexto,
+                            contexto_rag=contexto.texto,
+                            indice=indice,
                         )
+                    grupo = indice.lookup(resultado)
 
                     st.markdown(f"""
                         <div style="background: #D4EDDA; border-left: 4px solid #27AE60; padding: 1rem; border-radius: 8px; margin-top: 1rem;">
                             <p style="color: #155724; font-size: 0.85rem; margin: 0;">Categoria Sugerida</p>
                             <p style="color: #155724; font-size: 1.25rem; font-weight: 700; margin: 0.25rem 0 0 0;">{resultado}</p>
+                            <p style="color: #155724; font-size: 0.85rem; margin: 0.25rem 0 0 0;">{grupo or "Grupo não encontrado"}</p>
                         </div>
                     """, unsafe_allow_html=True)
 
+                    # Mesmo driver do pipeline: cota da API e novas tentativas em 429/5xx
+                    driver = get_driver(get_model_com_contexto(contexto.prefixo))
+                    if driver is not None:
+                        st.caption(
+                            f"Chamadas à IA nesta sessão: {driver.stats['calls']} "
+                            f"(novas tentativas: {driver.stats['retries']})"
+                        )
+
                 except ImportError as import_err:
                     st.warning(f"Modulo de IA nao disponivel ({import_err}). Usando simulacao.")
                     if "carne" in descricao.lower() or "picanha" in descricao.lower():
@@ -15,6 +15,7 @@ sys.path.insert(0, str(ROOT_DIR))
 
 import config
 from dashboard.components.charts import create_pie_chart, create_treemap
+from dashboard.components.data_loader import load_account_tree
 from dashboard.components.styles import render_section_header, format_currency, format_percentage
 
 
@@ -61,7 +62,7 @@ def render_composicao(df: pd.DataFrame, categories: dict) -> None:
         receitas = df_filtered[df_filtered[col_valor] > 0].copy()
 
         if len(receitas) > 0 and col_cat in receitas.columns:
-            receitas_agg = receitas.groupby(col_cat)[col_valor].sum().reset_index()
+            receitas_agg = receitas.groupby(col_cat, observed=True)[col_valor].sum().reset_index()
             receitas_agg.columns = ["Categoria", "Valor"]
             receitas_agg = receitas_agg.sort_values("Valor", ascending=False).head(10)
 
@@ -94,7 +95,7 @@ def render_composicao(df: pd.DataFrame, categories: dict) -> None:
         custos[col_valor] = custos[col_valor].abs()
 
         if len(custos) > 0 and col_cat in custos.columns:
-            custos_agg = custos.groupby(col_cat)[col_valor].sum().reset_index()
+            custos_agg = custos.groupby(col_cat, observed=True)[col_valor].sum().reset_index()
             custos_agg.columns = ["Categoria", "Valor"]
             custos_agg = custos_agg.sort_values("Valor", ascending=False).head(10)
 
@@ -128,14 +129,23 @@ def render_composicao(df: pd.DataFrame, categories: dict) -> None:
             treemap_data = treemap_data[treemap_data["Valor_Abs"] > 0]
 
             if len(treemap_data) > 0:
-                treemap_agg = treemap_data.groupby(
-                    [col_grupo, col_cat]
-                )["Valor_Abs"].sum().reset_index()
-                treemap_agg.columns = ["Grupo", "Categoria", "Valor"]
+                tree = load_account_tree()
+                if tree is not None and set(tree.levels).issubset(treemap_data.columns):
+                    # Subtotais Grupo > Subgrupo > Categoria numa única passada pela árvore
+                    treemap_agg = tree.subtotals(treemap_data, col_cat, value_column="Valor_Abs")
+                    treemap_agg = treemap_agg[treemap_agg["Valor_Abs"] > 0]
+                    treemap_agg.columns = ["Grupo", "Subgrupo", "Categoria", "Valor"]
+                    path = ["Grupo", "Subgrupo", "Categoria"]
+                else:
+                    treemap_agg = treemap_data.groupby(
+                        [col_grupo, col_cat], observed=True
+                    )["Valor_Abs"].sum().reset_index()
+                    treemap_agg.columns = ["Grupo", "Categoria", "Valor"]
+                    path = ["Grupo", "Categoria"]
 
                 fig = create_treemap(
                     treemap_agg,
-                    path=["Grupo", "Categoria"],
+                    path=path,
                     values="Valor",
                     title="",
                 )
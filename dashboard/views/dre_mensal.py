@@ -52,7 +52,7 @@ def render_dre_mensal(df: pd.DataFrame, categories: dict) -> None:
         )
 
     with col2:
-        grupos_disponiveis = sorted([g for g in df[col_grupo].unique().tolist() if g is not None]) if col_grupo in df.columns else []
+        grupos_disponiveis = sorted(df[col_grupo].dropna().unique().tolist()) if col_grupo in df.columns else []
         grupos_selecionados = st.multiselect(
             "Grupos DRE",
             options=grupos_disponiveis,
@@ -73,7 +73,7 @@ def render_dre_mensal(df: pd.DataFrame, categories: dict) -> None:
 
     # Calcular totais primeiro para os KPIs
     if col_grupo in df_filtered.columns and col_valor in df_filtered.columns:
-        dre_table = df_filtered.groupby(col_grupo)[col_valor].sum().reset_index()
+        dre_table = df_filtered.groupby(col_grupo, observed=True)[col_valor].sum().reset_index()
         dre_table.columns = ["Grupo", "Valor"]
         dre_table = dre_table.sort_values("Grupo")
 
@@ -130,7 +130,7 @@ def render_dre_mensal(df: pd.DataFrame, categories: dict) -> None:
     render_section_header("Visualizacao por Grupo", "📊")
 
     if col_grupo in df_filtered.columns and col_valor in df_filtered.columns:
-        grupo_chart = df_filtered.groupby(col_grupo)[col_valor].sum().reset_index()
+        grupo_chart = df_filtered.groupby(col_grupo, observed=True)[col_valor].sum().reset_index()
         grupo_chart.columns = ["Grupo", "Valor"]
         grupo_chart = grupo_chart.sort_values("Valor", ascending=True)
 
@@ -152,7 +152,7 @@ def render_dre_mensal(df: pd.DataFrame, categories: dict) -> None:
     with st.expander("📋 Detalhamento por Categoria"):
         col_cat = config.COLUMN_CC_NOME
         if col_cat in df_filtered.columns:
-            detail = df_filtered.groupby([col_grupo, col_cat])[col_valor].sum().reset_index()
+            detail = df_filtered.groupby([col_grupo, col_cat], observed=True)[col_valor].sum().reset_index()
             detail.columns = ["Grupo", "Categoria", "Valor"]
             detail = detail.sort_values(["Grupo", "Valor"], ascending=[True, False])
             detail["Valor Formatado"] = detail["Valor"].apply(format_currency)
@@ -40,7 +40,7 @@ def render_evolucao(df: pd.DataFrame, categories: dict) -> None:
     col1, col2 = st.columns(2)
 
     with col1:
-        grupos_disponiveis = sorted([g for g in df[col_grupo].unique().tolist() if g is not None]) if col_grupo in df.columns else []
+        grupos_disponiveis = sorted(df[col_grupo].dropna().unique().tolist()) if col_grupo in df.columns else []
         grupos_selecionados = st.multiselect(
             "Grupos DRE",
             options=grupos_disponiveis,
@@ -65,7 +65,7 @@ def render_evolucao(df: pd.DataFrame, categories: dict) -> None:
             df_filtered = df_filtered[df_filtered[col_grupo].isin(grupos_selecionados)]
 
         # Agregar por mes e grupo
-        evolucao = df_filtered.groupby([col_mes, col_grupo])[col_valor].sum().reset_index()
+        evolucao = df_filtered.groupby([col_mes, col_grupo], observed=True)[col_valor].sum().reset_index()
         evolucao.columns = ["Mes", "Grupo", "Valor"]
 
         # Ordenar meses
@@ -104,7 +104,7 @@ def render_evolucao(df: pd.DataFrame, categories: dict) -> None:
         st.markdown("<div style='height: 1.5rem;'></div>", unsafe_allow_html=True)
         render_section_header("Resultado Total Consolidado", "📊")
 
-        total_mensal = df.groupby(col_mes)[col_valor].sum().reset_index()
+        total_mensal = df.groupby(col_mes, observed=True)[col_valor].sum().reset_index()
         total_mensal.columns = ["Mes", "Resultado"]
         total_mensal["Mes"] = pd.Categorical(
             total_mensal["Mes"],
@@ -15,26 +15,107 @@ Etapas executadas:
     6. Salvar dados processados como arquivo Parquet
     7. Gerar narrativas para treinamento de IA
     8. Imprimir estatísticas resumidas
+
+Entrada: um ou mais arquivos, diretórios ou padrões glob de exports DRE
+(padrão: config.INPUT_FILE_PATH). Cada export é carregado e limpo em um pool
+de processos, com o ano lido da linha "Ano Txt" do próprio arquivo, e
+gravado no dataset particionado output/dre_dataset/Ano=.../GrupoEmpresa=...
+Os dados combinados continuam em output/processed_dre.parquet.
+
+Linhas que falham nas regras de qualidade (src/data_quality.py: moeda
+inválida, mês desconhecido, dimensão obrigatória vazia, chave duplicada) não
+interrompem o pipeline: vão para output/quarantine.parquet com o código do
+motivo, e as demais linhas seguem normalmente.
+
+    python main.py
+    python main.py exports/
+    python main.py "exports/DRE_*_2024.csv" exports/DRE_2025.xlsx
+
+Com config.CSV_STREAMING ativo, cada CSV é convertido bloco a bloco
+(stream_dre_csv_to_parquet) direto para a sua partição do dataset, e o
+output/processed_dre.parquet é copiado do dataset um row group por vez; os
+dados só são carregados se uma etapa seguinte precisar executar.
+
+Execução incremental: o manifesto output/run_manifest.json guarda os hashes
+de entradas, configuração e código de cada etapa (processamento, categorias,
+narrativas e classificador offline). Etapas inalteradas são puladas e seus artefatos reutilizados.
+Use `python main.py --force` para executar tudo novamente.
 """
 
+import argparse
 import logging
 import sys
 from pathlib import Path
 
 import pandas as pd
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
 
 import config
-from src.data_cleaner import (
-    apply_currency_conversion,
-    apply_month_conversion,
-    load_dre_file,
+from src.category_engine import AccountTree, CategoryManager
+from src.multi_file_loader import (
+    ingest_dre_exports,
+    resolve_input_paths,
+    write_dataset_parquet,
 )
-from src.category_engine import CategoryManager
 from src.narrative_generator import (
     generate_narratives,
     save_narrative_report,
+    save_narrative_dataset,
     get_narrative_summary,
 )
+from src.ngram_classifier import NgramClassifier
+from src.run_manifest import RunManifest
+
+
+# Parâmetros do config.py e arquivos de código de cada etapa.
+# Ambos entram na fingerprint registrada no manifesto de execução.
+STAGE_CONFIG_KEYS: dict[str, list[str]] = {
+    "processed": [
+        "CSV_SEPARATOR",
+        "CSV_ENCODING",
+        "CSV_HEADER_ROW",
+        "CSV_ENGINE",
+        "EXCEL_HEADER_ROW",
+        "EXCEL_SHEET_NAME",
+        "REFERENCE_YEAR",
+        "INPUT_FILE_PATTERNS",
+        "COLUMN_ANO",
+        "COLUMN_GRUPO_EMPRESA",
+        "REQUIRED_COLUMNS",
+        "DIMENSION_COLUMNS",
+        "CSV_STREAMING",
+        "MONTH_MAPPING",
+        "QUALITY_REQUIRED_DIMENSIONS",
+        "QUALITY_DUPLICATE_KEY",
+    ],
+    "categories": ["COLUMN_NOME_GRUPO", "COLUMN_CC_NOME", "ACCOUNT_TREE_LEVELS"],
+    "narratives": ["REQUIRED_COLUMNS", "TEXT_REPLACEMENTS", "NARRATIVE_PARTITION_COLUMN"],
+    "ngram_model": ["NGRAM_RANGE", "TEXT_REPLACEMENTS"],
+}
+
+STAGE_CODE_FILES: dict[str, list[Path]] = {
+    "processed": [
+        config.BASE_DIR / "src" / "data_cleaner.py",
+        config.BASE_DIR / "src" / "multi_file_loader.py",
+        config.BASE_DIR / "src" / "data_quality.py",
+        config.BASE_DIR / "src" / "category_engine.py",
+        config.BASE_DIR / "src" / "text_repair.py",
+    ],
+    "categories": [
+        config.BASE_DIR / "src" / "category_engine.py",
+        config.BASE_DIR / "src" / "text_repair.py",
+    ],
+    "narratives": [
+        config.BASE_DIR / "src" / "narrative_generator.py",
+        config.BASE_DIR / "src" / "master_store.py",
+        config.BASE_DIR / "src" / "text_repair.py",
+    ],
+    "ngram_model": [
+        config.BASE_DIR / "src" / "ngram_classifier.py",
+        config.BASE_DIR / "src" / "text_repair.py",
+    ],
+}
 
 
 def setup_logging() -> None:
@@ -49,6 +130,11 @@ def setup_logging() -> None:
     )
 
 
+def setup_pandas() -> None:
+    """Configure pandas options for the pipeline (copy-on-write mode)."""
+    pd.set_option("mode.copy_on_write", config.PANDAS_COPY_ON_WRITE)
+
+
 def ensure_output_directory() -> None:
     """Create output directory if it doesn't exist."""
     config.OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
@@ -78,8 +164,44 @@ def display_dataframe_info(df: pd.DataFrame, stage: str = "") -> None:
     print(df.head())
 
 
+def load_processed_data(df: pd.DataFrame | None) -> pd.DataFrame:
+    """Return df, reading config.PROCESSED_PARQUET_PATH if it was not loaded yet."""
+    if df is None:
+        df = pd.read_parquet(config.PROCESSED_PARQUET_PATH)
+    return df
+
+
+def load_unmerged_rows(category_manager: CategoryManager) -> pd.DataFrame:
+    """
+    Read only the processed rows of months not merged into categories.json yet.
+
+    The month column is read first; the months to scan are pushed into the
+    Parquet read as a filter (rows without a month are always read).
+    """
+    logger = logging.getLogger(__name__)
+    column = category_manager.month_column
+    months = pd.read_parquet(config.PROCESSED_PARQUET_PATH, columns=[column])[column]
+    pending = category_manager.unmerged_months(
+        months, config.CATEGORIES_JSON_PATH, config.CATEGORIES_META_PATH
+    )
+    logger.info(f"Reading {len(pending)} of {months.nunique()} months for the category update")
+    field = ds.field(column)
+    table = ds.dataset(config.PROCESSED_PARQUET_PATH).to_table(
+        filter=field.isin(pending) | field.is_null()
+    )
+    return table.to_pandas()
+
+
+def load_account_tree(path: Path) -> AccountTree | None:
+    """Saved account tree, or None if it is missing or has other levels than config."""
+    if not path.exists():
+        return None
+    tree = AccountTree.load(path)
+    return tree if tree.levels == list(config.ACCOUNT_TREE_LEVELS) else None
+
+
 def print_summary(
-    df: pd.DataFrame,
+    df: pd.DataFrame | None,
     categories: dict,
     category_manager: CategoryManager,
     narrative_summary: dict | None = None,
@@ -88,17 +210,34 @@ def print_summary(
     Print processing summary statistics.
 
     Args:
-        df: Processed DataFrame.
+        df: Processed DataFrame. If None, only the columns used here are
+            read from config.PROCESSED_PARQUET_PATH.
         categories: Extracted category hierarchy.
         category_manager: CategoryManager instance for summary generation.
         narrative_summary: Optional summary from narrative generator.
     """
+    if df is None:
+        available = pq.read_schema(config.PROCESSED_PARQUET_PATH).names
+        df = pd.read_parquet(
+            config.PROCESSED_PARQUET_PATH,
+            columns=[
+                col for col in (config.COLUMN_ANO, config.COLUMN_REALIZADO) if col in available
+            ],
+        )
+
     print(f"\n{'='*60}")
     print("RESUMO DO PROCESSAMENTO")
     print(f"{'='*60}")
 
     print(f"\n[*] Registros Processados: {len(df):,}")
-    print(f"[*] Ano de Referencia: {config.REFERENCE_YEAR}")
+    if config.COLUMN_ANO in df.columns:
+        anos = ", ".join(str(ano) for ano in sorted(df[config.COLUMN_ANO].unique()))
+        print(f"[*] Anos: {anos}")
+    else:
+        print(f"[*] Ano de Referencia: {config.REFERENCE_YEAR}")
+    if config.QUARANTINE_PARQUET_PATH.exists():
+        quarantined = pq.read_metadata(config.QUARANTINE_PARQUET_PATH).num_rows
+        print(f"[*] Registros em Quarentena: {quarantined:,} ({config.QUARANTINE_PARQUET_PATH.name})")
 
     # Category summary
     summary = category_manager.get_category_summary(categories)
@@ -131,18 +270,94 @@ def print_summary(
     print(f"\n[*] Arquivos de Saida:")
     print(f"   - Parquet: {config.PROCESSED_PARQUET_PATH}")
     print(f"   - Categorias JSON: {config.CATEGORIES_JSON_PATH}")
+    print(f"   - Arvore de Contas: {config.ACCOUNT_TREE_PATH}")
     print(f"   - Narrativas CSV: {config.NARRATIVE_CSV_PATH}")
+    print(f"   - Narrativas (Parquet por mes): {config.NARRATIVE_DATASET_DIR}")
+    print(f"   - Classificador Offline: {config.NGRAM_MODEL_PATH}")
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="DRE processing pipeline")
+    parser.add_argument(
+        "inputs",
+        nargs="*",
+        help=(
+            "DRE export files, directories or glob patterns "
+            "(default: config.INPUT_FILE_PATH)"
+        ),
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Ignore the run manifest and execute every stage",
+    )
+    return parser.parse_args(argv)
 
 
-def main() -> int:
+def run_processing_stage(input_paths: list[Path]) -> pd.DataFrame | None:
+    """
+    Load, convert and save the DRE exports (steps 1-3 and 5).
+
+    Each export is loaded, validated and converted in a process pool, using
+    the year from its own preamble, and written to the partitioned dataset
+    (config.PARTITIONED_DATASET_DIR). Rows that fail the data-quality rules
+    go to config.QUARANTINE_PARQUET_PATH. The combined data is also saved as
+    the single processed Parquet file.
+
+    With config.CSV_STREAMING the data is never loaded here: the processed
+    Parquet is copied from the dataset one row group at a time.
+
+    Args:
+        input_paths: DRE export files (see resolve_input_paths).
+
+    Returns:
+        pd.DataFrame: Processed DataFrame with all exports, or None with
+            config.CSV_STREAMING (see load_processed_data).
+    """
+    logger = logging.getLogger(__name__)
+
+    # Steps 1-3: Load the DRE exports and apply currency and month conversion
+    logger.info(f"Steps 1-3: Loading and converting {len(input_paths)} DRE export(s)")
+    if config.CSV_STREAMING:
+        ingest_dre_exports(input_paths, load=False)
+        logger.info(f"Step 5: Copying the dataset to {config.PROCESSED_PARQUET_PATH}")
+        write_dataset_parquet(config.PROCESSED_PARQUET_PATH)
+        return None
+
+    df = ingest_dre_exports(input_paths)
+
+    # Step 5: Save processed DataFrame as Parquet
+    logger.info(f"Step 5: Saving processed data to {config.PROCESSED_PARQUET_PATH}")
+    df.to_parquet(config.PROCESSED_PARQUET_PATH, engine="pyarrow", index=False)
+    logger.info(f"Parquet file saved: {config.PROCESSED_PARQUET_PATH}")
+
+    display_dataframe_info(df, "After Data Transformations")
+    return df
+
+
+def print_stage_report(manifest: RunManifest) -> None:
+    """Print which pipeline stages ran and which were reused."""
+    print(f"\n[*] Etapas do Pipeline:")
+    print(f"   - Executadas: {', '.join(manifest.executed) or 'nenhuma'}")
+    print(f"   - Reutilizadas: {', '.join(manifest.reused) or 'nenhuma'}")
+
+
+def main(argv: list[str] | None = None) -> int:
     """
     Main entry point for the DRE processing pipeline.
 
+    Args:
+        argv: Command line arguments (defaults to sys.argv[1:]).
+
     Returns:
         int: Exit code (0 for success, 1 for failure).
     """
+    args = parse_args(argv)
+
     # Setup
     setup_logging()
+    setup_pandas()
     logger = logging.getLogger(__name__)
     
     logger.info("Starting DRE Financial Automation Pipeline")
@@ -151,46 +366,123 @@ def main() -> int:
     print(f"{'='*60}")
     
     try:
-        # Step 1: Ensure output directory exists
         ensure_output_directory()
-
-        # Step 2: Load the DRE file (Excel or CSV - auto-detected)
-        logger.info(f"Step 1: Loading DRE file from {config.INPUT_FILE_PATH}")
-        df = load_dre_file(config.INPUT_FILE_PATH)
-        display_dataframe_info(df, "After Loading File")
-        
-        # Step 3: Apply currency conversion
-        logger.info("Step 2: Applying currency conversion to Realizado column")
-        df = apply_currency_conversion(df, config.COLUMN_REALIZADO)
-        
-        # Step 4: Apply month conversion
-        logger.info("Step 3: Applying month conversion to Mês column")
-        df = apply_month_conversion(df, config.COLUMN_MES, config.REFERENCE_YEAR)
-        
-        display_dataframe_info(df, "After Data Transformations")
-        
-        # Step 5: Extract category hierarchy
-        logger.info("Step 4: Extracting category hierarchy")
+        manifest = RunManifest(config.RUN_MANIFEST_PATH, force=args.force)
+
+        # Steps 1-3 + 5: Load, convert and save Parquet
+        input_paths = resolve_input_paths(args.inputs or [config.INPUT_FILE_PATH])
+        parquet_path = config.PROCESSED_PARQUET_PATH
+        processed_artifacts = [
+            parquet_path,
+            config.PARTITIONED_DATASET_DIR,
+            config.QUARANTINE_PARQUET_PATH,
+        ]
+        # categories.json define a ordem das colunas categóricas
+        processed_inputs = list(input_paths)
+        if config.CATEGORIES_JSON_PATH.exists():
+            processed_inputs.append(config.CATEGORIES_JSON_PATH)
+        fingerprint = manifest.fingerprint(
+            "processed",
+            inputs=processed_inputs,
+            config_keys=STAGE_CONFIG_KEYS["processed"],
+            code_files=STAGE_CODE_FILES["processed"],
+        )
+        # Loaded on demand (load_processed_data) by the stages that run
+        df = None
+        if not manifest.is_current("processed", fingerprint, processed_artifacts):
+            df = run_processing_stage(input_paths)
+            manifest.record("processed", fingerprint, processed_artifacts)
+
+        # Steps 4 + 6: Extract category hierarchy and save as JSON
         category_manager = CategoryManager()
-        categories = category_manager.extract_category_hierarchy(df)
-
-        # Step 6: Save processed DataFrame as Parquet
-        logger.info(f"Step 5: Saving processed data to {config.PROCESSED_PARQUET_PATH}")
-        df.to_parquet(config.PROCESSED_PARQUET_PATH, engine="pyarrow", index=False)
-        logger.info(f"Parquet file saved: {config.PROCESSED_PARQUET_PATH}")
-
-        # Step 7: Save category hierarchy as JSON
-        logger.info(f"Step 6: Saving categories to {config.CATEGORIES_JSON_PATH}")
-        category_manager.save_categories_json(categories, config.CATEGORIES_JSON_PATH)
-
-        # Step 8: Generate AI narratives
-        logger.info("Step 7: Generating AI narratives")
-        df = generate_narratives(df)
-        save_narrative_report(df)
-        narrative_summary = get_narrative_summary(df)
-
-        # Step 9: Print summary
+        fingerprint = manifest.fingerprint(
+            "categories",
+            inputs=[parquet_path],
+            config_keys=STAGE_CONFIG_KEYS["categories"],
+            code_files=STAGE_CODE_FILES["categories"],
+        )
+        categories_artifacts = [
+            config.CATEGORIES_JSON_PATH,
+            config.CATEGORIES_META_PATH,
+            config.ACCOUNT_TREE_PATH,
+        ]
+        if manifest.is_current("categories", fingerprint, categories_artifacts):
+            categories = category_manager.load_categories_json(config.CATEGORIES_JSON_PATH)
+        else:
+            # Only rows of months that are new or whose row count changed since
+            # categories_meta.json are read, and of those only the (group, detail)
+            # pairs not in the hierarchy are merged; their paths are added to the
+            # saved account tree. Data already in memory, a missing tree or --force
+            # use every row (--force also rebuilds the hierarchy)
+            logger.info(f"Steps 4 + 6: Updating categories in {config.CATEGORIES_JSON_PATH}")
+            base_tree = None if args.force else load_account_tree(config.ACCOUNT_TREE_PATH)
+            if df is None and base_tree is not None:
+                rows = load_unmerged_rows(category_manager)
+            else:
+                df = rows = load_processed_data(df)
+                base_tree = None
+            categories = category_manager.update_categories_json(
+                rows,
+                config.CATEGORIES_JSON_PATH,
+                config.CATEGORIES_META_PATH,
+                rebuild=args.force,
+            )
+            # Full account tree (all levels), from the distinct paths
+            category_manager.build_account_tree(rows, base=base_tree).save(
+                config.ACCOUNT_TREE_PATH
+            )
+            manifest.record("categories", fingerprint, categories_artifacts)
+
+        # Step 7: Generate AI narratives
+        fingerprint = manifest.fingerprint(
+            "narratives",
+            inputs=[parquet_path],
+            config_keys=STAGE_CONFIG_KEYS["narratives"],
+            code_files=STAGE_CODE_FILES["narratives"],
+        )
+        narrative_artifacts = [config.NARRATIVE_CSV_PATH, config.NARRATIVE_DATASET_DIR]
+        if manifest.is_current("narratives", fingerprint, narrative_artifacts):
+            narrative_summary = manifest.summary("narratives")
+        else:
+            logger.info("Step 7: Generating AI narratives")
+            df = load_processed_data(df)
+            narratives_df = generate_narratives(df)
+            save_narrative_report(narratives_df)
+            # Month-partitioned master, appended to by the classifier
+            save_narrative_dataset(narratives_df)
+            narrative_summary = {
+                key: value.item() if hasattr(value, "item") else value
+                for key, value in get_narrative_summary(narratives_df).items()
+            }
+            manifest.record(
+                "narratives",
+                fingerprint,
+                narrative_artifacts,
+                summary=narrative_summary,
+            )
+
+        # Step 7b: Train the offline classifier on the labelled history
+        ngram_inputs = [
+            path
+            for path in (config.NARRATIVE_CSV_PATH, config.FINETUNE_JSONL_PATH)
+            if path.exists()
+        ]
+        fingerprint = manifest.fingerprint(
+            "ngram_model",
+            inputs=ngram_inputs,
+            config_keys=STAGE_CONFIG_KEYS["ngram_model"],
+            code_files=STAGE_CODE_FILES["ngram_model"],
+        )
+        if not manifest.is_current("ngram_model", fingerprint, [config.NGRAM_MODEL_PATH]):
+            logger.info("Step 7b: Training offline classifier")
+            NgramClassifier.from_history().save(config.NGRAM_MODEL_PATH)
+            manifest.record("ngram_model", fingerprint, [config.NGRAM_MODEL_PATH])
+
+        manifest.save()
+
+        # Step 8: Print summary
         print_summary(df, categories, category_manager, narrative_summary)
+        print_stage_report(manifest)
 
         logger.info("DRE Processing Pipeline completed successfully!")
         print(f"\n{'='*60}")
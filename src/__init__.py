@@ -12,25 +12,67 @@ from src.data_cleaner import (
     load_dre_file,
     load_dre_excel,
     load_dre_csv,
+    read_excel_sheet_cached,
+    stream_dre_csv_to_parquet,
+    read_dre_preamble,
+    apply_dimension_categoricals,
     convert_brazilian_currency,
+    convert_brazilian_currency_series,
     convert_month_to_date,
+    convert_month_series,
+)
+from src.category_engine import (
+    AccountTree,
+    CategoryIndex,
+    CategoryManager,
+    CategoryMatch,
+    get_category_index,
+    normalize_category,
+    clean_encoding,
 )
-from src.category_engine import CategoryManager
 from src.narrative_generator import (
     generate_narratives,
     save_narrative_report,
+    save_narrative_dataset,
     get_narrative_summary,
     clean_text,
     create_narrative,
 )
+from src.multi_file_loader import (
+    ingest_dre_exports,
+    read_partitioned_dataset,
+    resolve_input_paths,
+    write_dataset_parquet,
+)
+from src.classification_cache import ClassificationCache
+from src.classification_checkpoint import ClassificationCheckpoint, row_hashes
+from src.classification_driver import ClassificationDriver, StubModel, TokenBucket
+from src.pre_classifier import LocalMatch, PreClassifier
+from src.ngram_classifier import NgramClassifier, NgramMatch, get_ngram_classifier
+from src.rag_retriever import ContextRetriever, get_context_retriever
+from src.classifier_backend import ClassifierBackend, NgramBackend
+from src.http_model import HttpModel
+from src.stub_server import StubServer
+from src.csv_dialect import CsvDialect, read_csv_sniffed, sniff_csv_dialect
+from src.data_quality import QualityRule, apply_quality_rules, default_quality_rules
+from src.master_store import MasterStore, month_partitions
+from src.run_manifest import RunManifest
+from src.text_repair import TextRepairer, get_text_repairer
 
 # Importações condicionais para módulos de IA (requerem google-generativeai)
 try:
     from src.ai_classifier import (
         classificar_gasto,
+        classificar_lote,
+        get_driver,
         carregar_categorias_rag,
         formatar_contexto_rag,
+        get_contexto_rag,
+        ContextoRAG,
+        GeminiBackend,
+        get_backend,
         processar_classificacao,
+        processar_com_checkpoint,
     )
     from src.data_processor_ia import (
         trava_seguranca_duplicidade,
@@ -49,22 +91,89 @@ __all__ = [
     "load_dre_file",      # Detecta formato automaticamente (recomendado)
     "load_dre_excel",     # Carrega arquivos Excel (.xlsx)
     "load_dre_csv",       # Carrega arquivos CSV (legado)
+    "read_excel_sheet_cached",  # Lê planilha via cópia Parquet em cache
+    "stream_dre_csv_to_parquet",  # Processa CSVs grandes em blocos
+    "read_dre_preamble",  # Metadados do export (Ano Txt, GrupoEmpresa)
+    "apply_dimension_categoricals",  # Colunas de dimensão como categóricas
     # Data cleaner - Funções de conversão
     "convert_brazilian_currency",
+    "convert_brazilian_currency_series",
     "convert_month_to_date",
+    "convert_month_series",
     # Category engine
     "CategoryManager",
+    "AccountTree",  # Árvore completa do plano de contas em arrays NumPy
+    "CategoryIndex",  # Busca exata, por prefixo e aproximada de cc_nome
+    "CategoryMatch",
+    "get_category_index",
+    "normalize_category",  # Chave de busca de nomes e descrições
+    "clean_encoding",  # Correção de mojibake nos nomes de categorias
     # Narrative generator
     "generate_narratives",
     "save_narrative_report",
+    "save_narrative_dataset",  # Mestre em Parquet particionado por mês
     "get_narrative_summary",
     "clean_text",
     "create_narrative",
+    # Multi file loader - Vários exports em paralelo
+    "resolve_input_paths",
+    "ingest_dre_exports",
+    "read_partitioned_dataset",
+    "write_dataset_parquet",  # Cópia do dataset em blocos
+    # Text repair - Correção de encoding compartilhada
+    "TextRepairer",
+    "get_text_repairer",
+    # CSV dialect - Encoding e separador detectados uma vez por arquivo
+    "CsvDialect",
+    "sniff_csv_dialect",
+    "read_csv_sniffed",
+    # Data quality - Regras de validação e quarentena
+    "QualityRule",
+    "default_quality_rules",
+    "apply_quality_rules",
+    # Classification driver - Chamadas concorrentes à IA com limite de taxa
+    "ClassificationDriver",
+    "TokenBucket",
+    "StubModel",  # Modelo simulado para testes de carga offline
+    # Classification cache - Classificações já obtidas (SQLite)
+    "ClassificationCache",
+    # Classification checkpoint - Retomada de classificações interrompidas
+    "ClassificationCheckpoint",
+    "row_hashes",
+    # Pre classifier - Resolução local antes da IA
+    "PreClassifier",
+    "LocalMatch",
+    # Ngram classifier - Classificação offline (TF-IDF de n-gramas)
+    "NgramClassifier",
+    "NgramMatch",
+    "get_ngram_classifier",
+    # RAG retriever - Contexto reduzido às categorias candidatas
+    "ContextRetriever",
+    "get_context_retriever",
+    # Classifier backend - Interface comum (classify_batch) dos classificadores
+    "ClassifierBackend",
+    "NgramBackend",
+    # Stub server - Endpoint generateContent local para benchmarks sem rede
+    "StubServer",
+    # HTTP model - Cliente do endpoint generateContent (backend "http")
+    "HttpModel",
+    # Master store - Relatório mestre particionado por mês (acréscimos O(delta))
+    "MasterStore",
+    "month_partitions",
+    # Run manifest (execução incremental do main.py)
+    "RunManifest",
     # AI Classifier (requer google-generativeai)
     "classificar_gasto",
+    "classificar_lote",  # Vários gastos por chamada à IA
+    "get_driver",
     "carregar_categorias_rag",
     "formatar_contexto_rag",
+    "get_contexto_rag",  # Contexto RAG carregado uma vez por versão do categories.json
+    "ContextoRAG",
+    "GeminiBackend",  # Backend da IA (também o "http" com um HttpModel)
+    "get_backend",  # Backend conforme config.AI_BACKEND
     "processar_classificacao",
+    "processar_com_checkpoint",  # Micro-lotes gravados no checkpoint
     # Data Processor IA
     "trava_seguranca_duplicidade",
     "processar_com_validacao",
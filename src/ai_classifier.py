@@ -9,10 +9,17 @@ Refatorado para seguir a estrutura do projeto (src/).
 Author: Projeto DRE - Manda Picanha
 """
 
+import hashlib
 import json
 import logging
+import math
 import os
+import re
 import sys
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
@@ -32,6 +39,18 @@ except ImportError:
     sys.path.insert(0, str(Path(__file__).parent.parent))
     import config
 
+from src.category_engine import CategoryIndex, get_category_index
+from src.classification_cache import ClassificationCache, context_hash, normalize_description
+from src.classification_checkpoint import ClassificationCheckpoint, row_hashes
+from src.classification_driver import ClassificationDriver, TokenBucket, estimate_tokens
+from src.classifier_backend import ClassifierBackend, NgramBackend
+from src.csv_dialect import read_csv_sniffed
+from src.master_store import MasterStore, month_partitions
+from src.ngram_classifier import get_ngram_classifier
+from src.pre_classifier import PreClassifier
+from src.rag_retriever import get_context_retriever
+from src.http_model import HttpModel
+
 
 logger = logging.getLogger(__name__)
 
@@ -42,9 +61,19 @@ ARQUIVO_INPUT = Path("entrada.csv")
 CATEGORIES_JSON = config.CATEGORIES_JSON_PATH if hasattr(config, 'CATEGORIES_JSON_PATH') else Path("output/categories.json")
 
 API_KEY = os.getenv("GEMINI_API_KEY")
+# Versão fixa: exigida pelo cache de contexto do Gemini
+MODELO_GEMINI = "gemini-2.0-flash-001"
 
 # Modelo da IA (inicialização lazy)
 _model = None
+# Driver de chamadas concorrentes do modelo atual
+_driver = None
+# Baldes de fichas por (API, requisições por minuto, rajada): a cota é da API,
+# então trocar de modelo (ex: o com contexto em cache no provedor) não a zera
+_baldes: dict[tuple[str, int, int], TokenBucket] = {}
+# Modelos com a parte estática dos prompts em cache no provedor:
+# hash do prefixo -> (modelo ou None se indisponível, validade em time.monotonic())
+_modelos_com_contexto: dict[str, tuple[Any, float]] = {}
 
 
 def get_model():
@@ -52,10 +81,65 @@ def get_model():
     global _model
     if _model is None and API_KEY and GENAI_AVAILABLE:
         genai.configure(api_key=API_KEY)
-        _model = genai.GenerativeModel('gemini-2.0-flash')
+        _model = genai.GenerativeModel(MODELO_GEMINI)
     return _model
 
 
+def _balde_da_cota(api: str) -> TokenBucket | None:
+    """Balde de fichas compartilhado da cota da API (None sem limite de taxa)."""
+    rpm = config.AI_REQUESTS_PER_MINUTE
+    if not rpm:
+        return None
+    chave = (api, rpm, config.AI_RATE_BURST)
+    if chave not in _baldes:
+        _baldes[chave] = TokenBucket(rpm / 60.0, config.AI_RATE_BURST)
+    return _baldes[chave]
+
+
+def get_driver(model=None, api: str = "gemini") -> ClassificationDriver | None:
+    """
+    Retorna o driver compartilhado de chamadas à IA (concorrência, cota e
+    novas tentativas; ver src/classification_driver.py).
+
+    O driver é recriado quando o modelo muda, mas o balde de fichas é o da
+    API: drivers de modelos diferentes da mesma API dividem a cota.
+
+    Args:
+        model: Modelo a usar. Se None, usa get_model().
+        api: API do modelo, que define a cota (ex: "gemini", "http").
+
+    Returns:
+        ClassificationDriver do modelo, ou None se não houver modelo disponível.
+    """
+    global _driver
+    model = model if model is not None else get_model()
+    if model is None:
+        return None
+    if _driver is None or _driver.model is not model:
+        _driver = ClassificationDriver(model, bucket=_balde_da_cota(api))
+    return _driver
+
+
+def usar_classificador_offline() -> bool:
+    """
+    Se a classificação usa o classificador offline (src/ngram_classifier.py)
+    em vez do Gemini, conforme config.AI_BACKEND.
+
+    Raises:
+        ValueError: Se config.AI_BACKEND não for "gemini", "ngram", "http" ou "auto".
+    """
+    backend = config.AI_BACKEND.strip().lower()
+    if backend not in ("gemini", "ngram", "http", "auto"):
+        raise ValueError(f"AI_BACKEND inválido: {config.AI_BACKEND!r}")
+    return backend == "ngram" or (backend == "auto" and get_model() is None)
+
+
+@lru_cache(maxsize=4)
+def _get_http_model(url: str) -> HttpModel:
+    """Cliente do endpoint generateContent em url (um por URL, para o driver ser reaproveitado)."""
+    return HttpModel(url, MODELO_GEMINI)
+
+
 def carregar_categorias_rag(categories_path: Path = None) -> dict:
     """
     Carrega categorias do arquivo JSON para contexto RAG.
@@ -95,12 +179,123 @@ def formatar_contexto_rag(categorias_dict: dict) -> str:
     return "\n".join(contexto_partes)
 
 
+@dataclass(frozen=True)
+class ContextoRAG:
+    """
+    Contexto RAG de uma versão do categories.json, pronto para os prompts.
+
+    Attributes:
+        categorias: Hierarquia {grupo: [categorias]}.
+        texto: Hierarquia formatada (formatar_contexto_rag()); vazio se o
+            arquivo não existe.
+        indice: Índice das categorias (get_category_index()).
+        prefixo: Parte estática dos prompts (papel e hierarquia completa).
+        hash: SHA-256 do conteúdo do arquivo.
+    """
+
+    categorias: dict
+    texto: str
+    indice: CategoryIndex
+    prefixo: str
+    hash: str
+
+
+@lru_cache(maxsize=4)
+def _contexto_rag_em_cache(path: str, mtime_ns: int, size: int) -> ContextoRAG:
+    conteudo = Path(path).read_bytes()
+    categorias = json.loads(conteudo)
+    texto = formatar_contexto_rag(categorias)
+    indice = get_category_index(path)
+    logger.info(f"Contexto RAG carregado de {path} ({len(categorias)} grupos)")
+    return ContextoRAG(
+        categorias=categorias,
+        texto=texto,
+        indice=indice,
+        prefixo=_prefixo_prompt(_montar_contexto([], texto, indice)),
+        hash=hashlib.sha256(conteudo).hexdigest(),
+    )
+
+
+def get_contexto_rag(categories_path: Path = None) -> ContextoRAG:
+    """
+    Contexto RAG compartilhado pelo processo.
+
+    O categories.json é lido e formatado uma vez por versão do arquivo
+    (caminho, data de modificação e tamanho); chamadas seguintes, como
+    cada clique da página classificacao_ia do dashboard, reutilizam o
+    mesmo objeto.
+
+    Args:
+        categories_path: Caminho para o arquivo categories.json.
+
+    Returns:
+        ContextoRAG; sem categorias (texto vazio) se o arquivo não existir.
+    """
+    path = Path(categories_path or CATEGORIES_JSON).resolve()
+    if not path.exists():
+        logger.warning(f"Arquivo {path} não encontrado")
+        return ContextoRAG({}, "", CategoryIndex({}), "", "")
+    stat = path.stat()
+    return _contexto_rag_em_cache(str(path), stat.st_mtime_ns, stat.st_size)
+
+
+def get_model_com_contexto(prefixo: str):
+    """
+    Modelo Gemini com a parte estática dos prompts em cache no provedor.
+
+    O prefixo (papel e hierarquia completa) é enviado uma vez por sessão
+    como instrução de sistema de um CachedContent; os prompts passam a
+    levar só a tarefa. O cache é recriado ao fim da validade
+    (config.AI_PROVIDER_CACHE_TTL_MINUTES).
+
+    Args:
+        prefixo: Parte estática dos prompts (ContextoRAG.prefixo).
+
+    Returns:
+        Modelo ligado ao cache, ou None se config.AI_PROVIDER_CONTEXT_CACHE
+        estiver desligado, não houver modelo, o prefixo for menor que
+        config.AI_PROVIDER_CACHE_MIN_TOKENS ou o provedor recusar o cache.
+    """
+    if not config.AI_PROVIDER_CONTEXT_CACHE or not prefixo or get_model() is None:
+        return None
+    if estimate_tokens(prefixo) < config.AI_PROVIDER_CACHE_MIN_TOKENS:
+        return None
+
+    chave = hashlib.sha256(prefixo.encode("utf-8")).hexdigest()
+    modelo, validade = _modelos_com_contexto.get(chave, (None, 0.0))
+    if time.monotonic() < validade:
+        return modelo
+
+    ttl = timedelta(minutes=config.AI_PROVIDER_CACHE_TTL_MINUTES)
+    try:
+        from google.generativeai import caching
+
+        conteudo = caching.CachedContent.create(
+            model=f"models/{MODELO_GEMINI}",
+            display_name=f"dre-rag-{chave[:12]}",
+            system_instruction=prefixo,
+            ttl=ttl,
+        )
+        modelo = genai.GenerativeModel.from_cached_content(cached_content=conteudo)
+        logger.info(f"Contexto estático em cache no provedor ({conteudo.name})")
+    except Exception as e:
+        # Não tenta de novo até o fim da validade: segue com o prefixo em cada prompt
+        logger.warning(f"Cache de contexto no provedor indisponível: {e}")
+        modelo = None
+    # Margem de 10% para não usar um cache prestes a expirar
+    _modelos_com_contexto[chave] = (modelo, time.monotonic() + 0.9 * ttl.total_seconds())
+    return modelo
+
+
 def carregar_dados(mestre_path: Path = None, input_path: Path = None) -> tuple[pd.DataFrame, pd.DataFrame]:
     """
     Carrega dados do arquivo mestre e entrada.
 
+    Sem mestre_path, o mestre vem do dataset particionado por mês
+    (src/master_store.py), criado a partir do CSV na primeira execução.
+
     Args:
-        mestre_path: Caminho para o arquivo mestre.
+        mestre_path: Caminho para um CSV mestre (em vez do dataset).
         input_path: Caminho para o arquivo de entrada.
 
     Returns:
@@ -109,25 +304,27 @@ def carregar_dados(mestre_path: Path = None, input_path: Path = None) -> tuple[p
     Raises:
         SystemExit: Se arquivos não existirem.
     """
-    mestre = mestre_path or ARQUIVO_MESTRE
     entrada = input_path or ARQUIVO_INPUT
 
     # Carrega o Mestre
-    if mestre.exists():
-        try:
-            df_mestre = pd.read_csv(mestre, sep=';', encoding='utf-8')
-        except Exception:
-            df_mestre = pd.read_csv(mestre, sep=',', encoding='utf-8')
+    if mestre_path is not None:
+        if not mestre_path.exists():
+            logger.error(f"Arquivo mestre '{mestre_path}' não encontrado.")
+            sys.exit(1)
+        df_mestre = read_csv_sniffed(mestre_path)
     else:
-        logger.error(f"Arquivo mestre '{mestre}' não encontrado.")
-        sys.exit(1)
+        store = MasterStore()
+        if not store.exists() and Path(ARQUIVO_MESTRE).exists():
+            logger.info(f"Criando o mestre particionado {store.dataset_dir} a partir de {ARQUIVO_MESTRE}")
+            store.import_csv(ARQUIVO_MESTRE)
+        if not store.exists():
+            logger.error(f"Arquivo mestre '{ARQUIVO_MESTRE}' não encontrado.")
+            sys.exit(1)
+        df_mestre = store.read()
 
     # Carrega a Entrada
     if entrada.exists():
-        try:
-            df_novo = pd.read_csv(entrada, sep=';', encoding='utf-8')
-        except Exception:
-            df_novo = pd.read_csv(entrada, sep=',', encoding='utf-8')
+        df_novo = read_csv_sniffed(entrada)
     else:
         logger.info("Arquivo de entrada não encontrado. Nada a processar.")
         sys.exit(0)
@@ -135,89 +332,696 @@ def carregar_dados(mestre_path: Path = None, input_path: Path = None) -> tuple[p
     return df_mestre, df_novo
 
 
-def classificar_gasto(descricao: str, categorias_validas: list = None, contexto_rag: str = "") -> str:
+def _montar_contexto(
+    categorias_validas: list,
+    contexto_rag: str,
+    indice: CategoryIndex,
+) -> str:
+    """Bloco de categorias do prompt: hierarquia RAG, índice ou lista simples."""
+    if contexto_rag:
+        return f"""
+HIERARQUIA DE CATEGORIAS FINANCEIRAS (DRE):
+{contexto_rag}
+"""
+    if indice is not None:
+        return f"Categorias disponíveis: {indice.prompt_text}"
+    return f"Categorias disponíveis: {', '.join(categorias_validas or [])}"
+
+
+_PAPEL = "Você é um especialista em classificação financeira para restaurantes."
+
+
+@lru_cache(maxsize=64)
+def _prefixo_prompt(contexto: str) -> str:
+    """Parte estática dos prompts (papel e bloco de categorias), montada uma vez por contexto."""
+    return f"""
+{_PAPEL}
+
+{contexto}
+"""
+
+
+def _prefixo(
+    categorias_validas: list,
+    contexto_rag: str,
+    indice: CategoryIndex,
+    descricoes: list[str],
+    no_provedor: bool = False,
+) -> str:
+    """
+    Início do prompt, antes da tarefa; vazio se a parte estática já está em
+    cache no provedor.
+
+    Com config.RAG_TOP_K > 0, a parte estática é só o papel (igual em todos
+    os prompts, então o cache de prefixo continua valendo) e as categorias
+    candidatas dos gastos (src/rag_retriever.py) vêm depois dela, na parte
+    variável do prompt.
+    """
+    if no_provedor:
+        return ""
+    if contexto_rag and descricoes and indice is not None and config.RAG_TOP_K > 0:
+        candidatas = get_context_retriever(indice).select(descricoes)
+        if candidatas:
+            return _prefixo_prompt("") + f"""
+CATEGORIAS CANDIDATAS (DRE):
+{formatar_contexto_rag(candidatas)}
+"""
+    return _prefixo_prompt(_montar_contexto(categorias_validas, contexto_rag, indice))
+
+
+def _driver_para(contexto_rag: str, indice: CategoryIndex) -> tuple[ClassificationDriver | None, bool]:
+    """
+    Driver da IA e se a hierarquia completa já está em cache no provedor
+    (get_model_com_contexto()); nesse caso os prompts levam só a tarefa.
+    """
+    if contexto_rag and indice is not None:
+        prefixo = _prefixo_prompt(_montar_contexto([], contexto_rag, indice))
+        modelo = get_model_com_contexto(prefixo)
+        if modelo is not None:
+            return get_driver(modelo), True
+    return get_driver(), False
+
+
+def _prompt_gasto(descricao: str, prefixo: str) -> str:
+    return prefixo + f"""
+TAREFA: Classifique o gasto abaixo em UMA categoria específica (cc_nome).
+GASTO: "{descricao}"
+
+REGRAS:
+1. Responda APENAS com o nome exato da categoria (ex: BOVINOS, REFRIGERANTES)
+2. NÃO inclua o grupo (ex: "( - ) CUSTOS VARIÁVEIS")
+3. Se não encontrar categoria adequada, responda "OUTROS"
+"""
+
+
+def _resposta_gasto(resposta: str | Exception, indice: CategoryIndex = None) -> str:
+    """
+    Categoria de uma resposta individual: "ERRO_IA" se a chamada falhou ou
+    se a resposta não é uma categoria do índice (o texto livre da IA nunca
+    vai para o cc_nome).
+    """
+    if isinstance(resposta, Exception):
+        logger.error(f"Erro na classificação IA: {resposta}")
+        return "ERRO_IA"
+    resposta = resposta.strip()
+    if indice is None:
+        return resposta
+    categoria = _validar_categoria(resposta, indice)
+    if categoria is None:
+        logger.warning(f"Resposta da IA fora das categorias válidas: {resposta[:80]!r}")
+        return "ERRO_IA"
+    return categoria
+
+
+def classificar_gasto(
+    descricao: str,
+    categorias_validas: list = None,
+    contexto_rag: str = "",
+    indice: CategoryIndex = None,
+) -> str:
     """
     Classifica um gasto usando IA com contexto RAG.
 
+    A chamada passa pelo driver compartilhado (get_driver()), que respeita
+    a cota da API e tenta de novo em erros 429/5xx.
+
     Args:
         descricao: Descrição do gasto a classificar.
         categorias_validas: Lista de categorias válidas (fallback).
         contexto_rag: Contexto formatado do categories.json.
+        indice: Índice de categorias (get_category_index() ou
+            CategoryIndex.from_names()). Se informado, substitui
+            categorias_validas na lista do prompt e a resposta da IA é
+            normalizada para o nome exato da categoria (ex: "bovinos" -> "BOVINOS").
 
     Returns:
-        Categoria classificada ou "ERRO_IA"/"OUTROS".
+        Categoria classificada ou "ERRO_IA"/"OUTROS"; "ERRO_IA" também
+        quando a resposta não é uma das categorias válidas.
     """
-    model = get_model()
-    if model is None:
+    driver, no_provedor = _driver_para(contexto_rag, indice)
+    if driver is None:
         return "ERRO_IA"
 
-    categorias_validas = categorias_validas or []
-
     # Usa contexto RAG se disponível, senão usa lista simples
-    if contexto_rag:
-        contexto = f"""
-HIERARQUIA DE CATEGORIAS FINANCEIRAS (DRE):
-{contexto_rag}
-"""
-    else:
-        contexto = f"Categorias disponíveis: {', '.join(categorias_validas)}"
+    prefixo = _prefixo(categorias_validas, contexto_rag, indice, [descricao], no_provedor)
+    resposta = driver.run([_prompt_gasto(descricao, prefixo)])[0]
+    if indice is None and categorias_validas:
+        indice = CategoryIndex.from_names(categorias_validas)
+    return _resposta_gasto(resposta, indice)
 
-    prompt = f"""
-Você é um especialista em classificação financeira para restaurantes.
 
-{contexto}
+# Linha "3. BOVINOS", "3) BOVINOS" ou "3 - BOVINOS" (resposta fora do formato JSON)
+_LINHA_NUMERADA = re.compile(r"^\s*(\d+)\s*[.):\-]\s*(.+?)\s*$", re.MULTILINE)
 
-TAREFA: Classifique o gasto abaixo em UMA categoria específica (cc_nome).
-GASTO: "{descricao}"
+
+def _extrair_respostas_lote(texto: str) -> dict[int, str]:
+    """
+    Lê a resposta de um lote: objeto JSON {"1": "CATEGORIA", ...} (também
+    dentro de um bloco ```json) ou, como alternativa, linhas numeradas.
+    """
+    inicio, fim = texto.find("{"), texto.rfind("}")
+    if inicio != -1 and fim > inicio:
+        try:
+            dados = json.loads(texto[inicio:fim + 1])
+        except json.JSONDecodeError:
+            dados = None
+        if isinstance(dados, dict):
+            return {
+                int(chave): str(valor).strip().strip('"')
+                for chave, valor in dados.items()
+                if str(chave).strip().isdigit() and isinstance(valor, str)
+            }
+
+    return {int(num): valor.strip('"') for num, valor in _LINHA_NUMERADA.findall(texto)}
+
+
+def _validar_categoria(resposta: str | None, indice: CategoryIndex) -> str | None:
+    """Nome exato da categoria, "OUTROS", ou None se a resposta não for válida."""
+    if not resposta:
+        return None
+    if resposta.strip().upper() == "OUTROS":
+        return "OUTROS"
+    return indice.canonical_name(resposta)
+
+
+def _prompt_lote(descricoes: list[str], prefixo: str) -> str:
+    itens = "\n".join(f'{i}. "{descricao}"' for i, descricao in enumerate(descricoes, start=1))
+    return prefixo + f"""
+TAREFA: Classifique CADA gasto numerado abaixo em UMA categoria específica (cc_nome).
+GASTOS:
+{itens}
 
 REGRAS:
-1. Responda APENAS com o nome exato da categoria (ex: BOVINOS, REFRIGERANTES)
-2. NÃO inclua o grupo (ex: "( - ) CUSTOS VARIÁVEIS")
-3. Se não encontrar categoria adequada, responda "OUTROS"
+1. Responda APENAS com um objeto JSON, uma chave por gasto: {{"1": "CATEGORIA", "2": "CATEGORIA"}}
+2. Use o nome exato da categoria (ex: BOVINOS, REFRIGERANTES), sem o grupo
+3. Se não encontrar categoria adequada para um gasto, use "OUTROS"
 """
-    try:
-        response = model.generate_content(prompt)
-        return response.text.strip()
-    except Exception as e:
-        logger.error(f"Erro na classificação IA: {e}")
-        return "ERRO_IA"
+
+
+def _resposta_lote(resposta: str | Exception, n_itens: int, indice: CategoryIndex) -> list[str | None]:
+    """Categorias validadas de uma resposta em lote (None nos itens inválidos)."""
+    if isinstance(resposta, Exception):
+        logger.error(f"Erro na classificação IA em lote: {resposta}")
+        return [None] * n_itens
+    respostas = _extrair_respostas_lote(resposta)
+    return [_validar_categoria(respostas.get(i), indice) for i in range(1, n_itens + 1)]
+
+
+def classificar_lote(
+    descricoes: list[str],
+    indice: CategoryIndex,
+    contexto_rag: str = "",
+) -> list[str | None]:
+    """
+    Classifica vários gastos em uma única chamada à IA.
+
+    Os gastos vão numerados no prompt, que envia as categorias uma vez
+    para o lote todo, e a IA responde um objeto JSON {"1": "CATEGORIA", ...}.
+    Cada resposta é validada contra as categorias do índice.
+
+    Args:
+        descricoes: Descrições dos gastos do lote.
+        indice: Índice com as categorias válidas (lista do prompt, sem
+            contexto RAG, e validação das respostas).
+        contexto_rag: Contexto formatado do categories.json.
+
+    Returns:
+        Lista alinhada a descricoes com o nome exato da categoria ou
+        "OUTROS"; None nos itens sem resposta válida (inclusive quando o
+        modelo não está disponível ou a chamada falha).
+
+    Exemplo:
+        >>> classificar_lote(["Picanha", "Coca-Cola 2L"], indice)
+        ['BOVINOS', 'REFRIGERANTES']
+    """
+    driver, no_provedor = _driver_para(contexto_rag, indice)
+    if driver is None or not descricoes:
+        return [None] * len(descricoes)
+
+    prefixo = _prefixo([], contexto_rag, indice, descricoes, no_provedor)
+    resposta = driver.run([_prompt_lote(descricoes, prefixo)])[0]
+    return _resposta_lote(resposta, len(descricoes), indice)
+
+
+def _classificar_descricoes(
+    driver: ClassificationDriver,
+    descricoes: list[str],
+    indice: CategoryIndex,
+    contexto_rag: str,
+    categorias_fallback: list,
+    batch_size: int,
+    no_provedor: bool = False,
+) -> list[str]:
+    """
+    Classifica descrições pela IA: lotes concorrentes e, para os itens sem
+    resposta válida no lote, perguntas individuais; os itens de um lote cuja
+    chamada falhou ficam como "ERRO_IA". Com no_provedor, a
+    parte estática dos prompts já está em cache no provedor.
+    """
+    resultados: list[str | None] = [None] * len(descricoes)
+
+    # Lotes enviados de forma concorrente pelo driver
+    if batch_size > 1:
+        lotes = [
+            range(pos, min(pos + batch_size, len(descricoes)))
+            for pos in range(0, len(descricoes), batch_size)
+        ]
+        prompts = []
+        for lote in lotes:
+            itens = [descricoes[i] for i in lote]
+            # Contexto reduzido às categorias candidatas dos gastos do lote
+            prompts.append(_prompt_lote(itens, _prefixo([], contexto_rag, indice, itens, no_provedor)))
+        respostas = driver.run(prompts)
+        for lote, resposta in zip(lotes, respostas):
+            if isinstance(resposta, Exception):
+                # O driver já tentou de novo (429/5xx): perguntar item a item
+                # só multiplicaria as chamadas a uma API que está falhando
+                logger.error(f"Erro na classificação IA em lote: {resposta}")
+                for i in lote:
+                    resultados[i] = "ERRO_IA"
+                continue
+            for i, categoria in zip(lote, _resposta_lote(resposta, len(lote), indice)):
+                resultados[i] = categoria
+
+    # Itens com resposta ilegível ou inválida no lote (ou todos, sem lotes)
+    # são perguntados um a um
+    pendentes = [i for i, cat in enumerate(resultados) if cat is None]
+    if batch_size > 1 and pendentes:
+        logger.info(f"{len(pendentes)} itens sem resposta válida no lote; classificando um a um")
+    respostas = driver.run([
+        _prompt_gasto(
+            descricoes[i],
+            _prefixo(categorias_fallback, contexto_rag, indice, [descricoes[i]], no_provedor),
+        )
+        for i in pendentes
+    ])
+    for i, resposta in zip(pendentes, respostas):
+        resultados[i] = _resposta_gasto(resposta, indice)
+
+    return resultados
+
+
+class GeminiBackend:
+    """
+    Backend da IA (src/classifier_backend.py): lotes concorrentes pelo
+    driver compartilhado e, para os itens sem resposta válida no lote,
+    perguntas individuais (como em processar_classificacao()).
+
+    Com model=HttpModel(...) as mesmas chamadas vão para um endpoint
+    generateContent por HTTP (backend "http", ex: src/stub_server.py).
+
+    Exemplo:
+        >>> backend = GeminiBackend(indice, contexto_rag)
+        >>> backend.classify_batch(["Picanha", "Coca-Cola 2L"])
+        (['BOVINOS', 'REFRIGERANTES'], [1.0, 1.0])
+    """
+
+    cacheable: bool = True
+
+    def __init__(
+        self,
+        indice: CategoryIndex,
+        contexto_rag: str = "",
+        categorias_fallback: list = None,
+        batch_size: int = None,
+        model=None,
+        name: str = "gemini",
+    ) -> None:
+        """
+        Args:
+            indice: Categorias válidas (prompt e validação das respostas).
+            contexto_rag: Contexto formatado do categories.json.
+            categorias_fallback: Categorias do prompt individual sem contexto RAG.
+            batch_size: Gastos por chamada. Se None, usa config.AI_BATCH_SIZE.
+            model: Modelo com generate_content(). Se None, o Gemini
+                (get_model() ou get_model_com_contexto()).
+            name: Nome do backend no resumo da classificação.
+        """
+        self.name = name
+        self.indice = indice
+        self.contexto_rag = contexto_rag
+        self.categorias_fallback = categorias_fallback or []
+        self.batch_size = max(1, batch_size or config.AI_BATCH_SIZE)
+        if model is None:
+            self.driver, self.no_provedor = _driver_para(contexto_rag, indice)
+        else:
+            self.driver, self.no_provedor = get_driver(model, api=name), False
+        self._chamadas_inicio = self.driver.stats["calls"] if self.driver else 0
+
+    @property
+    def available(self) -> bool:
+        """Se há modelo para classificar."""
+        return self.driver is not None
+
+    @property
+    def calls(self) -> int:
+        """Chamadas ao modelo feitas por este backend (o driver é compartilhado)."""
+        return self.driver.stats["calls"] - self._chamadas_inicio if self.driver else 0
+
+    def classify_batch(self, descriptions: list[str]) -> tuple[list[str], list[float]]:
+        """Categorias ("ERRO_IA" sem modelo) e confiança 1.0 nas respostas válidas."""
+        if self.driver is None:
+            return ["ERRO_IA"] * len(descriptions), [0.0] * len(descriptions)
+        labels = _classificar_descricoes(
+            self.driver,
+            descriptions,
+            self.indice,
+            self.contexto_rag,
+            self.categorias_fallback,
+            self.batch_size,
+            self.no_provedor,
+        )
+        scores = [1.0 if _validar_categoria(label, self.indice) is not None else 0.0 for label in labels]
+        return labels, scores
+
+
+def get_backend(
+    indice: CategoryIndex,
+    contexto_rag: str = "",
+    categorias_fallback: list = None,
+    batch_size: int = None,
+) -> ClassifierBackend | None:
+    """
+    Backend de classificação conforme config.AI_BACKEND.
+
+    Args:
+        indice: Categorias válidas.
+        contexto_rag: Contexto formatado do categories.json.
+        categorias_fallback: Categorias do prompt individual sem contexto RAG.
+        batch_size: Gastos por chamada. Se None, usa config.AI_BATCH_SIZE.
+
+    Returns:
+        GeminiBackend ("gemini" ou "http") ou NgramBackend ("ngram"); None
+        se o backend escolhido não estiver disponível (sem modelo Gemini,
+        ou sem modelo offline nem histórico para treiná-lo).
+
+    Raises:
+        ValueError: Se config.AI_BACKEND for inválido.
+    """
+    if usar_classificador_offline():
+        modelo = get_ngram_classifier()
+        return NgramBackend(modelo, indice) if modelo is not None else None
+    if config.AI_BACKEND.strip().lower() == "http":
+        return GeminiBackend(
+            indice, contexto_rag, categorias_fallback, batch_size,
+            model=_get_http_model(config.AI_HTTP_URL), name="http",
+        )
+    backend = GeminiBackend(indice, contexto_rag, categorias_fallback, batch_size)
+    return backend if backend.available else None
+
+
+def colunas_do_mestre(df_mestre: pd.DataFrame, df_novo: pd.DataFrame) -> list[str]:
+    """
+    Colunas gravadas no mestre para os itens novos: as do mestre e, se a
+    entrada tiver, a Descricao, que é o histórico de rótulos do
+    pré-classificador (PreClassifier.from_master()) e do classificador offline.
+    """
+    colunas = list(df_mestre.columns)
+    if 'Descricao' in df_novo.columns and 'Descricao' not in colunas:
+        colunas.append('Descricao')
+    return colunas
+
+
+def _categorias_do_mestre(df_mestre: pd.DataFrame) -> tuple[str, list, CategoryIndex]:
+    """Coluna de categoria do mestre, categorias do histórico e índice das categorias válidas."""
+    col_cat = 'cc_nome'
+    if col_cat not in df_mestre.columns:
+        col_cat = df_mestre.columns[2] if len(df_mestre.columns) > 2 else df_mestre.columns[0]
+
+    categorias_fallback = df_mestre[col_cat].dropna().unique().tolist()
+    # Índice compartilhado do categories.json (lista do prompt e validação das respostas);
+    # as categorias do histórico só são usadas se o arquivo não existir
+    indice = get_category_index()
+    if not indice:
+        indice = CategoryIndex.from_names(categorias_fallback)
+    return col_cat, categorias_fallback, indice
 
 
 def processar_classificacao(
     df_mestre: pd.DataFrame,
     df_novo: pd.DataFrame,
-    contexto_rag: str = ""
+    contexto_rag: str = "",
+    batch_size: int = None,
+    cache: ClassificationCache = None,
+    pre_classifier: PreClassifier = None,
 ) -> pd.DataFrame:
     """
     Processa classificação de novos dados.
 
+    Descrições repetidas na entrada (após normalização) são classificadas
+    uma vez, e as já presentes no cache persistente não vão para a IA.
+    Das restantes, as que o pré-classificador local resolve com confiança
+    (nome exato, histórico, fornecedor conhecido ou palavras da categoria)
+    também não vão. As demais vão para o backend de config.AI_BACKEND
+    (get_backend()): na IA, em lotes (como em classificar_lote) enviados
+    de forma concorrente pelo driver compartilhado (get_driver()), e
+    apenas os itens sem resposta válida no lote são perguntados de novo,
+    um a um; no classificador offline, localmente pelo modelo de n-gramas,
+    sem chave de API nem rede.
+
+    A vazão (itens/s), os acertos do cache, a taxa de resolução local e as
+    chamadas à IA evitadas são registrados no log e em
+    df_novo.attrs["classificacao"].
+
     Args:
         df_mestre: DataFrame com dados históricos.
         df_novo: DataFrame com novos dados.
         contexto_rag: Contexto RAG formatado.
+        batch_size: Gastos por chamada. Se None, usa config.AI_BATCH_SIZE;
+            1 classifica um a um.
+        cache: Cache de classificações. Se None, abre o de
+            config.AI_CACHE_PATH (quando config.AI_CACHE_ENABLED).
+        pre_classifier: Pré-classificador local. Se None, constrói um com
+            as categorias válidas e o histórico de df_mestre (quando
+            config.PRE_CLASSIFIER_ENABLED).
 
     Returns:
         DataFrame novo com classificações.
     """
-    col_cat = 'cc_nome'
-    if col_cat not in df_mestre.columns:
-        col_cat = df_mestre.columns[2] if len(df_mestre.columns) > 2 else df_mestre.columns[0]
-
-    categorias_fallback = df_mestre[col_cat].dropna().unique().tolist()
+    col_cat, categorias_fallback, indice = _categorias_do_mestre(df_mestre)
 
     # Garante que a coluna de categoria existe no novo
     if col_cat not in df_novo.columns:
         df_novo[col_cat] = ""
 
-    for i, row in df_novo.iterrows():
-        desc = str(row.get('Descricao', 'Sem descrição'))
-        cat_ia = classificar_gasto(desc, categorias_fallback, contexto_rag)
-        df_novo.at[i, col_cat] = cat_ia
+    batch_size = max(1, batch_size or config.AI_BATCH_SIZE)
+    descricoes = df_novo.get('Descricao', pd.Series('Sem descrição', index=df_novo.index))
+    descricoes = descricoes.fillna('Sem descrição').astype(str).tolist()
+
+    # Uma classificação por descrição normalizada (a primeira ocorrência representa as demais)
+    chaves = [normalize_description(desc) for desc in descricoes]
+    representantes: dict[str, str] = {}
+    for chave, desc in zip(chaves, descricoes):
+        representantes.setdefault(chave, desc)
+
+    fechar_cache = cache is None and config.AI_CACHE_ENABLED
+    if fechar_cache:
+        cache = ClassificationCache()
+    contexto_hash = context_hash(_montar_contexto(categorias_fallback, contexto_rag, indice))
+
+    inicio = time.perf_counter()
+    try:
+        categorias: dict[str, str] = {}
+        if cache is not None:
+            categorias = cache.get_many(
+                list(representantes),
+                contexto_hash,
+                is_valid=lambda cat: _validar_categoria(cat, indice) is not None,
+            )
+        faltantes = [chave for chave in representantes if chave not in categorias]
+        pendentes_locais = len(faltantes)
+
+        # Pré-classificação local: só as descrições não resolvidas vão para a IA
+        if pre_classifier is None and config.PRE_CLASSIFIER_ENABLED:
+            pre_classifier = PreClassifier.from_master(df_mestre, indice, col_cat=col_cat)
+        if pre_classifier is not None and faltantes:
+            locais = pre_classifier.resolve([representantes[chave] for chave in faltantes])
+            categorias.update(
+                (chave, cat) for chave, cat in zip(faltantes, locais) if cat is not None
+            )
+            faltantes = [chave for chave, cat in zip(faltantes, locais) if cat is None]
+
+        backend = (
+            get_backend(indice, contexto_rag, categorias_fallback, batch_size) if faltantes else None
+        )
+        chamadas_ia = 0
+        if faltantes and backend is None:
+            logger.warning("Backend de classificação indisponível; itens marcados como ERRO_IA")
+            categorias.update(dict.fromkeys(faltantes, "ERRO_IA"))
+        elif faltantes:
+            previstas, _ = backend.classify_batch([representantes[chave] for chave in faltantes])
+            novas = dict(zip(faltantes, previstas))
+            categorias.update(novas)
+            chamadas_ia = backend.calls
+            logger.info(
+                f"{len(faltantes)} descrições classificadas pelo backend {backend.name} "
+                f"({chamadas_ia} chamadas à IA)"
+            )
+            # Só respostas válidas da IA (categoria existente ou OUTROS) vão para o cache;
+            # as do classificador offline são recalculadas a cada execução
+            if cache is not None and backend.cacheable:
+                cache.put_many(
+                    {chave: cat for chave, cat in novas.items()
+                     if _validar_categoria(cat, indice) is not None},
+                    contexto_hash,
+                )
+    finally:
+        if fechar_cache:
+            cache.close()
+
+    resultados = [categorias[chave] for chave in chaves]
+    for desc, cat_ia in zip(descricoes, resultados):
         logger.info(f"Classificado: {desc[:30]}... -> {cat_ia}")
+    df_novo[col_cat] = resultados
+
+    decorrido = time.perf_counter() - inicio
+    resolvidas_localmente = pendentes_locais - len(faltantes)
+    resumo = {
+        "backend": backend.name if backend is not None else None,
+        "itens": len(descricoes),
+        "descricoes_distintas": len(representantes),
+        "cache": len(representantes) - pendentes_locais,
+        "locais": resolvidas_localmente,
+        "ia": len(faltantes),
+        "taxa_local": resolvidas_localmente / pendentes_locais if pendentes_locais else 0.0,
+        "chamadas_ia": chamadas_ia,
+        # Chamadas (lotes) que as descrições resolvidas localmente teriam custado
+        "chamadas_evitadas": (
+            math.ceil(pendentes_locais / batch_size) - math.ceil(len(faltantes) / batch_size)
+        ),
+    }
+    df_novo.attrs["classificacao"] = resumo
+    if descricoes:
+        logger.info(
+            f"{len(descricoes)} itens classificados em {decorrido:.1f}s "
+            f"({len(descricoes) / max(decorrido, 1e-9):.1f} itens/s; "
+            f"{len(representantes)} descrições distintas, {resumo['cache']} do cache)"
+        )
+        if pendentes_locais:
+            logger.info(
+                f"Pré-classificação local: {resolvidas_localmente}/{pendentes_locais} "
+                f"descrições ({resumo['taxa_local']:.0%}); "
+                f"~{resumo['chamadas_evitadas']} chamadas à IA evitadas"
+            )
 
     return df_novo
 
 
+def processar_com_checkpoint(
+    df_mestre: pd.DataFrame,
+    df_novo: pd.DataFrame,
+    contexto_rag: str = "",
+    checkpoint: ClassificationCheckpoint = None,
+    rows_per_checkpoint: int = None,
+    batch_size: int = None,
+) -> pd.DataFrame:
+    """
+    Classifica df_novo em micro-lotes de linhas, gravando cada micro-lote
+    no checkpoint (src/classification_checkpoint.py) assim que termina.
+
+    Linhas cujo hash já está no checkpoint (de uma execução interrompida)
+    não são classificadas de novo. Cada micro-lote passa por
+    processar_classificacao() com o mesmo cache e o mesmo pré-classificador;
+    só categorias válidas (nome exato do índice ou "OUTROS") vão para o
+    checkpoint: itens "ERRO_IA" e respostas fora do índice são tentados de
+    novo na próxima execução. Cada tentativa frustrada é contada no
+    checkpoint; na config.AI_CHECKPOINT_MAX_ATTEMPTS-ésima, a linha é
+    gravada como "OUTROS" e listada no log, para não bloquear o mestre.
+
+    Args:
+        df_mestre: DataFrame com dados históricos.
+        df_novo: DataFrame com novos dados.
+        contexto_rag: Contexto RAG formatado.
+        checkpoint: Checkpoint. Se None, abre o de config.AI_CHECKPOINT_PATH.
+        rows_per_checkpoint: Linhas por micro-lote. Se None, usa
+            config.AI_CHECKPOINT_ROWS.
+        batch_size: Gastos por chamada à IA (ver processar_classificacao()).
+
+    Returns:
+        DataFrame novo com classificações. df_novo.attrs["classificacao"]
+        soma os resumos dos micro-lotes e informa as linhas retomadas do
+        checkpoint ("retomadas"), as que ficaram fora dele ("nao_gravadas")
+        e as gravadas como "OUTROS" por excesso de tentativas ("desistidas").
+    """
+    if checkpoint is None:
+        checkpoint = ClassificationCheckpoint()
+    # Identificador da execução (chave do acréscimo ao mestre), fixo até o clear()
+    run = checkpoint.run_id()
+    rows_per_checkpoint = max(1, rows_per_checkpoint or config.AI_CHECKPOINT_ROWS)
+    max_tentativas = config.AI_CHECKPOINT_MAX_ATTEMPTS
+    col_cat, _, indice = _categorias_do_mestre(df_mestre)
+
+    hashes = row_hashes(df_novo, exclude=[col_cat])
+    feitas = checkpoint.load()
+    resultados = [feitas.get(h) for h in hashes]
+    pendentes = [i for i, cat in enumerate(resultados) if cat is None]
+    if len(pendentes) < len(hashes):
+        logger.info(
+            f"Checkpoint: {len(hashes) - len(pendentes)} linhas já classificadas; "
+            f"retomando a execução {run}"
+        )
+
+    resumo = {"backend": None, "itens": 0, "descricoes_distintas": 0, "cache": 0, "locais": 0,
+              "ia": 0, "chamadas_ia": 0, "chamadas_evitadas": 0}
+    nao_gravadas = 0
+    desistidas = 0
+    # Cache e pré-classificador compartilhados pelos micro-lotes
+    cache = ClassificationCache() if config.AI_CACHE_ENABLED and pendentes else None
+    pre_classifier = None
+    if config.PRE_CLASSIFIER_ENABLED and pendentes:
+        pre_classifier = PreClassifier.from_master(df_mestre, indice, col_cat=col_cat)
+    try:
+        for inicio in range(0, len(pendentes), rows_per_checkpoint):
+            linhas = pendentes[inicio:inicio + rows_per_checkpoint]
+            parte = processar_classificacao(
+                df_mestre, df_novo.iloc[linhas].copy(), contexto_rag,
+                batch_size=batch_size, cache=cache, pre_classifier=pre_classifier,
+            )
+            validas: dict[str, str] = {}
+            invalidas: list[int] = []
+            for i, cat in zip(linhas, parte[col_cat].tolist()):
+                canonica = _validar_categoria(cat, indice)
+                resultados[i] = canonica or cat
+                if canonica is not None:
+                    validas[hashes[i]] = canonica
+                else:
+                    invalidas.append(i)
+            # Tentativas frustradas: no limite, a linha é encerrada como OUTROS
+            tentativas = checkpoint.record_attempts(hashes[i] for i in invalidas)
+            encerradas = [
+                i for i in invalidas if max_tentativas and tentativas[hashes[i]] >= max_tentativas
+            ]
+            for i in encerradas:
+                descricao = df_novo['Descricao'].iat[i] if 'Descricao' in df_novo.columns else i
+                logger.warning(
+                    f"Checkpoint: linha {descricao!r} sem categoria válida ({resultados[i]}) "
+                    f"após {tentativas[hashes[i]]} tentativas; gravada como OUTROS"
+                )
+                resultados[i] = "OUTROS"
+                validas[hashes[i]] = "OUTROS"
+            checkpoint.append(validas)
+            nao_gravadas += len(invalidas) - len(encerradas)
+            desistidas += len(encerradas)
+            for chave, valor in parte.attrs["classificacao"].items():
+                if chave == "backend":
+                    resumo[chave] = valor or resumo[chave]
+                elif chave in resumo:
+                    resumo[chave] += valor
+            logger.info(f"Checkpoint: {inicio + len(linhas)}/{len(pendentes)} linhas pendentes gravadas")
+    finally:
+        if cache is not None:
+            cache.close()
+
+    df_novo[col_cat] = resultados
+    pendentes_locais = resumo["locais"] + resumo["ia"]
+    resumo["taxa_local"] = resumo["locais"] / pendentes_locais if pendentes_locais else 0.0
+    resumo["retomadas"] = len(hashes) - len(pendentes)
+    resumo["nao_gravadas"] = nao_gravadas
+    resumo["desistidas"] = desistidas
+    df_novo.attrs["classificacao"] = resumo
+    return df_novo
+
+
 # =============================================================================
 # Standalone Execution
 # =============================================================================
@@ -228,7 +1032,11 @@ if __name__ == "__main__":
         format="%(asctime)s - %(levelname)s - %(message)s",
     )
 
-    if not API_KEY:
+    if usar_classificador_offline():
+        print("[INFO] Usando o classificador offline (AI_BACKEND=ngram, ou auto sem GEMINI_API_KEY)")
+    elif config.AI_BACKEND.strip().lower() == "http":
+        print(f"[INFO] Usando o endpoint generateContent em {config.AI_HTTP_URL}")
+    elif not API_KEY:
         print("Erro: GEMINI_API_KEY não configurada.")
         sys.exit(1)
 
@@ -237,12 +1045,12 @@ if __name__ == "__main__":
     # Carregar dados
     df_mestre, df_novo = carregar_dados()
 
-    # Carregar contexto RAG
-    categorias_dict = carregar_categorias_rag()
-    contexto_rag = formatar_contexto_rag(categorias_dict)
+    # Carregar contexto RAG (compartilhado pelo processo)
+    contexto = get_contexto_rag()
+    contexto_rag = contexto.texto
 
-    if categorias_dict:
-        print(f"[OK] RAG carregado: {len(categorias_dict)} grupos")
+    if contexto.categorias:
+        print(f"[OK] RAG carregado: {len(contexto.categorias)} grupos")
     else:
         print("[WARN] Usando categorias do CSV como fallback")
 
@@ -250,12 +1058,52 @@ if __name__ == "__main__":
         print("Entrada vazia. Nada a processar.")
         sys.exit(0)
 
-    # Processar
-    df_resultado = processar_classificacao(df_mestre, df_novo, contexto_rag)
+    # Processar em micro-lotes gravados no checkpoint (retoma uma execução interrompida)
+    checkpoint = ClassificationCheckpoint()
+    df_resultado = processar_com_checkpoint(df_mestre, df_novo, contexto_rag, checkpoint)
+    resumo = df_resultado.attrs["classificacao"]
+    if resumo["retomadas"]:
+        print(f"[OK] Checkpoint: {resumo['retomadas']} linhas retomadas de uma execução anterior")
+    print(
+        f"[OK] Pré-classificação local: {resumo['locais']} descrições "
+        f"({resumo['taxa_local']:.0%}), ~{resumo['chamadas_evitadas']} chamadas à IA evitadas"
+    )
+
+    if resumo["desistidas"]:
+        print(
+            f"[WARN] {resumo['desistidas']} linhas sem categoria válida após "
+            f"{config.AI_CHECKPOINT_MAX_ATTEMPTS} tentativas gravadas como OUTROS (ver log)"
+        )
 
-    # Salvar
-    df_resultado = df_resultado.reindex(columns=df_mestre.columns, fill_value='')
-    df_final = pd.concat([df_mestre, df_resultado], ignore_index=True)
-    df_final.to_csv(ARQUIVO_MESTRE, sep=';', index=False, encoding='utf-8')
+    # Com linhas sem categoria válida (ERRO_IA) ainda abaixo do limite de
+    # tentativas, o mestre não é alterado e o checkpoint é mantido: a próxima
+    # execução tenta de novo só essas linhas
+    if resumo["nao_gravadas"]:
+        print(
+            f"[ERRO] {resumo['nao_gravadas']} linhas sem categoria válida (ERRO_IA); "
+            f"mestre não alterado, checkpoint mantido para a próxima execução"
+        )
+        sys.exit(1)
+
+    # Salvar só com todas as linhas classificadas: os itens novos são acrescentados
+    # ao mestre particionado (e ao CSV exportado), sem regravar o histórico; então
+    # o checkpoint é descartado. A chave (identificador da execução, guardado no
+    # checkpoint) torna o acréscimo idempotente: repetir uma execução que parou
+    # antes do checkpoint.clear() não duplica linhas no mestre nem no CSV, e uma
+    # entrada idêntica reenviada depois é uma nova execução, gravada de novo
+    store = MasterStore()
+    meses = month_partitions(df_resultado)
+    df_resultado = df_resultado.reindex(columns=colunas_do_mestre(df_mestre, df_novo), fill_value='')
+    escritos = store.append(df_resultado, meses, key=checkpoint.run_id())
+    if config.NARRATIVE_EXPORT_CSV:
+        store.export_csv(ARQUIVO_MESTRE, new_rows=df_resultado)
+    checkpoint.clear()
+    store.compact()
 
-    print(f"[OK] SUCESSO: {len(df_resultado)} itens classificados e salvos.")
+    if escritos:
+        print(f"[OK] SUCESSO: {len(df_resultado)} itens classificados e salvos.")
+    else:
+        print(
+            f"[WARN] Itens desta execução já estavam no mestre (retomada após a "
+            f"gravação): 0 de {len(df_resultado)} itens salvos."
+        )
@@ -5,24 +5,95 @@ This module provides a CategoryManager class for extracting and managing
 the hierarchy of financial categories from DRE data. The extracted hierarchy
 can be used as context for future LLM-based classification.
 
+The complete chart of accounts (every level of config.ACCOUNT_TREE_LEVELS)
+is kept by AccountTree in flat NumPy arrays, persisted as account_tree.npz
+next to categories.json, with vectorized subtotals at any level.
+
+Hierarchies can also be updated incrementally: update_categories_json()
+keeps a metadata sidecar (categories_meta.json) with the months merged and
+their row counts, a version number and the first month in which each
+cc_nome appeared. Only the rows of new or changed months are scanned, and
+of those only the ones whose (Nome Grupo, cc_nome) pair is not in the
+hierarchy yet are merged; unmerged_months() lets the caller read just those
+months from disk.
+
 Classes:
     CategoryManager: Manages extraction and persistence of category hierarchies.
+    AccountTree: Complete account tree in parent/child-offset arrays.
+    CategoryIndex: Exact, prefix and fuzzy search over a category hierarchy.
+
+Functions:
+    get_category_index: Shared CategoryIndex per categories.json version.
+    normalize_category: Search key of a category name or description.
+    clean_encoding: Repairs mojibake in category names.
 """
 
 import json
 import logging
+import os
+import re
+import unicodedata
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Union
 
+import numpy as np
 import pandas as pd
 
 import config
+from src.text_repair import TextRepairer
 
 # Configure module logger
 logger = logging.getLogger(__name__)
 
 
-def _clean_encoding(text: str) -> str:
+# Correções específicas para categorias DRE conhecidas (aplicadas após a
+# remoção dos caracteres corrompidos)
+_CATEGORY_FIXES: Dict[str, str] = {
+    "CUSTOS VARIVEIS": "CUSTOS VARIÁVEIS",
+    "CUSTOS VARI VEIS": "CUSTOS VARIÁVEIS",
+    "DEDUES SOBRE RECEITA": "DEDUÇÕES SOBRE RECEITA",
+    "DEDU ES SOBRE RECEITA": "DEDUÇÕES SOBRE RECEITA",
+    "SERVIOS DE TERCEIROS": "SERVIÇOS DE TERCEIROS",
+    "SERVI OS DE TERCEIROS": "SERVIÇOS DE TERCEIROS",
+    "UTILIDADES E SERVIOS": "UTILIDADES E SERVIÇOS",
+    "UTILIDADES E SERVI OS": "UTILIDADES E SERVIÇOS",
+    "FLUXO DE CAIXA LIVRE PARA SCIOS": "FLUXO DE CAIXA LIVRE PARA SÓCIOS",
+    "FLUXO DE CAIXA LIVRE PARA S CIOS": "FLUXO DE CAIXA LIVRE PARA SÓCIOS",
+    "CACHAA": "CACHAÇA",
+    "CACHA A": "CACHAÇA",
+    "CONSERVAO": "CONSERVAÇÃO",
+    "CONSERVA O": "CONSERVAÇÃO",
+    "ALIMENTAO": "ALIMENTAÇÃO",
+    "ALIMENTA O": "ALIMENTAÇÃO",
+    "NEGCIOS": "NEGÓCIOS",
+    "NEG CIOS": "NEGÓCIOS",
+    "APLICES": "APÓLICES",
+    "AP LICES": "APÓLICES",
+    "CRDITO": "CRÉDITO",
+    "CR DITO": "CRÉDITO",
+    "DBITO": "DÉBITO",
+    "D BITO": "DÉBITO",
+    "FRIAS": "FÉRIAS",
+    "F RIAS": "FÉRIAS",
+    "SALRIO": "SALÁRIO",
+    "SAL RIO": "SALÁRIO",
+    "RESCISES": "RESCISÕES",
+    "RESCIS ES": "RESCISÕES",
+    "ALCOLICAS": "ALCOÓLICAS",
+    "ALCOLI CAS": "ALCOÓLICAS",
+}
+
+# Remove caracteres de replacement character (U+FFFD) e mojibake comum
+# O padrão "ï¿½" é a representação UTF-8 de caracteres inválidos
+_CATEGORY_REPAIRER = TextRepairer(
+    _CATEGORY_FIXES, remove_chars="ï¿½∩┐╜\ufffd", collapse_whitespace=True
+)
+
+
+def clean_encoding(text: str) -> str:
     """
     Limpa problemas de encoding em textos.
 
@@ -38,55 +109,250 @@ def _clean_encoding(text: str) -> str:
     if not isinstance(text, str):
         return str(text)
 
-    import re
-
-    # Remove caracteres de replacement character (U+FFFD) e mojibake comum
-    # O padrão "ï¿½" é a representação UTF-8 de caracteres inválidos
-    result = re.sub(r'[ï¿½∩┐╜\ufffd]+', '', text)
-
-    # Correções específicas para categorias DRE conhecidas (após remoção de caracteres ruins)
-    specific_fixes = {
-        "CUSTOS VARIVEIS": "CUSTOS VARIÁVEIS",
-        "CUSTOS VARI VEIS": "CUSTOS VARIÁVEIS",
-        "DEDUES SOBRE RECEITA": "DEDUÇÕES SOBRE RECEITA",
-        "DEDU ES SOBRE RECEITA": "DEDUÇÕES SOBRE RECEITA",
-        "SERVIOS DE TERCEIROS": "SERVIÇOS DE TERCEIROS",
-        "SERVI OS DE TERCEIROS": "SERVIÇOS DE TERCEIROS",
-        "UTILIDADES E SERVIOS": "UTILIDADES E SERVIÇOS",
-        "UTILIDADES E SERVI OS": "UTILIDADES E SERVIÇOS",
-        "FLUXO DE CAIXA LIVRE PARA SCIOS": "FLUXO DE CAIXA LIVRE PARA SÓCIOS",
-        "FLUXO DE CAIXA LIVRE PARA S CIOS": "FLUXO DE CAIXA LIVRE PARA SÓCIOS",
-        "CACHAA": "CACHAÇA",
-        "CACHA A": "CACHAÇA",
-        "CONSERVAO": "CONSERVAÇÃO",
-        "CONSERVA O": "CONSERVAÇÃO",
-        "ALIMENTAO": "ALIMENTAÇÃO",
-        "ALIMENTA O": "ALIMENTAÇÃO",
-        "NEGCIOS": "NEGÓCIOS",
-        "NEG CIOS": "NEGÓCIOS",
-        "APLICES": "APÓLICES",
-        "AP LICES": "APÓLICES",
-        "CRDITO": "CRÉDITO",
-        "CR DITO": "CRÉDITO",
-        "DBITO": "DÉBITO",
-        "D BITO": "DÉBITO",
-        "FRIAS": "FÉRIAS",
-        "F RIAS": "FÉRIAS",
-        "SALRIO": "SALÁRIO",
-        "SAL RIO": "SALÁRIO",
-        "RESCISES": "RESCISÕES",
-        "RESCIS ES": "RESCISÕES",
-        "ALCOLICAS": "ALCOÓLICAS",
-        "ALCOLI CAS": "ALCOÓLICAS",
-    }
-
-    for wrong, correct in specific_fixes.items():
-        result = result.replace(wrong, correct)
-
-    # Limpar espaços duplos
-    result = re.sub(r'\s+', ' ', result).strip()
-
-    return result
+    return _CATEGORY_REPAIRER.repair(text)
+
+
+def _write_json_atomic(data: Any, output_path: Path) -> None:
+    """Write JSON to a temporary file and rename it over output_path."""
+    temp_path = output_path.with_name(output_path.name + ".tmp")
+    try:
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(temp_path, output_path)
+    except OSError:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+
+def _month_label(value: Any) -> str:
+    """Month key used in the metadata sidecar ("2025-08" for timestamps)."""
+    if isinstance(value, (pd.Timestamp, datetime)):
+        return value.strftime("%Y-%m")
+    return str(value)
+
+
+def _tree_labels(frame: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    Encoding-repaired labels of each column as unicode arrays.
+
+    Each distinct value is repaired once; missing values become "" so their
+    rows still add up under their ancestors.
+    """
+    labels = {}
+    for col in frame.columns:
+        codes, uniques = pd.factorize(frame[col])
+        cleaned = np.array([clean_encoding(value) for value in uniques] + [""], dtype=str)
+        labels[col] = cleaned[codes]  # código -1 (ausente) aponta para o ""
+    return labels
+
+
+class AccountTree:
+    """
+    Complete chart-of-accounts tree stored in flat NumPy arrays.
+
+    Nodes have integer ids in breadth-first order: all nodes of a level come
+    before the nodes of the next level, and within a level they are sorted
+    by parent and then by label. The children of a node are therefore a
+    contiguous id range, described by child_offsets like a CSR matrix:
+
+        children of i = range(child_offsets[i], child_offsets[i + 1])
+
+    Subtotals at every level are computed bottom-up with one np.add.reduceat
+    call per level (see rollup()), instead of one groupby per level.
+
+    Attributes:
+        levels: Source columns from the root level to the leaf level.
+        labels: Label of each node (unicode array).
+        depth: Level index of each node (0 = root level).
+        parent: Parent id of each node (-1 for root nodes).
+        child_offsets: First child id of each node, plus a final sentinel.
+        level_offsets: First node id of each level, plus a final sentinel.
+
+    Example:
+        >>> tree = manager.build_account_tree(df)
+        >>> totals = tree.rollup(df[config.COLUMN_REALIZADO], tree.leaf_ids(df))
+        >>> tree.subtotals(df, "cc_parent_nome").head()
+    """
+
+    def __init__(
+        self,
+        levels: List[str],
+        labels: np.ndarray,
+        depth: np.ndarray,
+        parent: np.ndarray,
+    ) -> None:
+        """
+        Create the tree from node arrays in breadth-first order.
+
+        Args:
+            levels: Source columns from the root level to the leaf level.
+            labels: Label of each node.
+            depth: Level index of each node.
+            parent: Parent id of each node (-1 for root nodes).
+        """
+        self.levels: List[str] = list(levels)
+        self.labels = np.asarray(labels, dtype=str)
+        self.depth = np.asarray(depth, dtype=np.int8)
+        self.parent = np.asarray(parent, dtype=np.int32)
+
+        n_nodes = len(self.labels)
+        self.level_offsets = np.searchsorted(
+            self.depth, np.arange(len(self.levels) + 1)
+        ).astype(np.int32)
+        n_children = np.bincount(self.parent[self.parent >= 0], minlength=n_nodes)
+        n_roots = self.level_offsets[1] if len(self.levels) else 0
+        self.child_offsets = np.concatenate(
+            ([n_roots], n_roots + np.cumsum(n_children))
+        ).astype(np.int32)
+        self._leaf_index: pd.MultiIndex | None = None
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def level_ids(self, level: Union[int, str]) -> np.ndarray:
+        """Node ids of a level, given by index or by column name."""
+        depth = self.levels.index(level) if isinstance(level, str) else level
+        return np.arange(self.level_offsets[depth], self.level_offsets[depth + 1])
+
+    def children(self, node: int) -> np.ndarray:
+        """Child ids of a node."""
+        return np.arange(self.child_offsets[node], self.child_offsets[node + 1])
+
+    def ancestors(self, nodes: np.ndarray, depth: int) -> np.ndarray:
+        """Ancestor at the given depth of each node (the node itself at its own depth)."""
+        nodes = np.asarray(nodes, dtype=np.int32)
+        for _ in range(int(self.depth[nodes].max(initial=depth)) - depth):
+            nodes = np.where(self.depth[nodes] > depth, self.parent[nodes], nodes)
+        return nodes
+
+    def path(self, node: int) -> List[str]:
+        """Labels from the root level down to the node."""
+        labels = []
+        while node >= 0:
+            labels.append(str(self.labels[node]))
+            node = int(self.parent[node])
+        return labels[::-1]
+
+    def leaf_ids(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Leaf node id of each row of df (-1 for paths not in the tree).
+
+        Each distinct path is looked up once; rows are mapped back through
+        the factorized path codes.
+
+        Raises:
+            ValueError: If a level column is missing from df.
+        """
+        missing = [col for col in self.levels if col not in df.columns]
+        if missing:
+            raise ValueError(f"Missing account tree columns: {missing}")
+
+        if self._leaf_index is None:
+            leaves = self.level_ids(len(self.levels) - 1)
+            self._leaf_index = pd.MultiIndex.from_arrays(
+                [self.labels[self.ancestors(leaves, d)] for d in range(len(self.levels))]
+            )
+
+        codes, uniques = pd.MultiIndex.from_frame(df[self.levels]).factorize()
+        labels = _tree_labels(uniques.set_names(self.levels).to_frame(index=False))
+        found = self._leaf_index.get_indexer(
+            pd.MultiIndex.from_arrays([labels[col] for col in self.levels])
+        )
+        offset = self.level_offsets[len(self.levels) - 1]
+        leaf_of_path = np.where(found >= 0, found + offset, -1).astype(np.int32)
+        return leaf_of_path[codes]
+
+    def rollup(self, values: Any, leaf_ids: np.ndarray) -> np.ndarray:
+        """
+        Totals of values for every node of the tree.
+
+        Values are summed into their leaves with np.bincount and then
+        propagated up one level at a time: the children of consecutive
+        parents are contiguous, so each level is a single np.add.reduceat.
+
+        Args:
+            values: One value per row (e.g., the Realizado column).
+            leaf_ids: Leaf id of each row (see leaf_ids()); rows with -1 are ignored.
+
+        Returns:
+            np.ndarray: Total per node id (float64).
+        """
+        values = np.asarray(values, dtype=np.float64)
+        leaf_ids = np.asarray(leaf_ids)
+        known = leaf_ids >= 0
+        if not known.all():
+            logger.warning(f"{int((~known).sum())} rows outside the account tree were ignored")
+
+        totals = np.bincount(leaf_ids[known], weights=values[known], minlength=len(self))
+        for depth in range(len(self.levels) - 2, -1, -1):
+            nodes = self.level_ids(depth)
+            if len(nodes) == 0:
+                continue
+            first_child = self.level_offsets[depth + 1]
+            block = totals[first_child:self.level_offsets[depth + 2]]
+            totals[nodes] = np.add.reduceat(block, self.child_offsets[nodes] - first_child)
+        return totals
+
+    def subtotals(
+        self,
+        df: pd.DataFrame,
+        level: Union[int, str],
+        value_column: str = config.COLUMN_REALIZADO,
+    ) -> pd.DataFrame:
+        """
+        Subtotals of value_column for every node of a level.
+
+        Args:
+            df: DataFrame with the level columns and value_column.
+            level: Level index or column name (e.g., "cc_parent_nome").
+            value_column: Column to sum.
+
+        Returns:
+            pd.DataFrame: One row per node of the level, with the path columns
+                from the root level down to the level and value_column.
+        """
+        totals = self.rollup(df[value_column], self.leaf_ids(df))
+        nodes = self.level_ids(level)
+        depth = int(self.depth[nodes[0]]) if len(nodes) else 0
+        columns = {
+            self.levels[d]: self.labels[self.ancestors(nodes, d)] for d in range(depth + 1)
+        }
+        columns[value_column] = totals[nodes]
+        return pd.DataFrame(columns)
+
+    def save(self, output_path: Union[str, Path]) -> None:
+        """Write the node arrays to a compressed .npz file (temporary file + rename)."""
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = output_path.with_name(output_path.name + ".tmp")
+        try:
+            with open(temp_path, "wb") as f:
+                np.savez_compressed(
+                    f,
+                    levels=np.array(self.levels, dtype=str),
+                    labels=self.labels,
+                    depth=self.depth,
+                    parent=self.parent,
+                )
+            os.replace(temp_path, output_path)
+        except OSError:
+            temp_path.unlink(missing_ok=True)
+            raise
+        logger.info(f"Saved account tree with {len(self)} nodes to {output_path}")
+
+    @classmethod
+    def load(cls, input_path: Union[str, Path]) -> "AccountTree":
+        """
+        Read a tree written by save().
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+        """
+        input_path = Path(input_path)
+        if not input_path.exists():
+            raise FileNotFoundError(f"Account tree file not found: {input_path}")
+        with np.load(input_path, allow_pickle=False) as data:
+            return cls(data["levels"].tolist(), data["labels"], data["depth"], data["parent"])
 
 
 class CategoryManager:
@@ -99,6 +365,7 @@ class CategoryManager:
     Attributes:
         group_column: Name of the column containing macro categories (Nome Grupo).
         detail_column: Name of the column containing detailed categories (cc_nome).
+        month_column: Name of the month column (Mês).
 
     Example:
         >>> manager = CategoryManager()
@@ -111,6 +378,7 @@ class CategoryManager:
         self,
         group_column: str = config.COLUMN_NOME_GRUPO,
         detail_column: str = config.COLUMN_CC_NOME,
+        month_column: str = config.COLUMN_MES,
     ) -> None:
         """
         Initialize the CategoryManager.
@@ -120,9 +388,12 @@ class CategoryManager:
                          Defaults to config.COLUMN_NOME_GRUPO.
             detail_column: Name of the column containing detailed categories.
                           Defaults to config.COLUMN_CC_NOME.
+            month_column: Name of the month column, used by the incremental
+                          update. Defaults to config.COLUMN_MES.
         """
         self.group_column = group_column
         self.detail_column = detail_column
+        self.month_column = month_column
         logger.info(
             f"CategoryManager initialized with group_column='{group_column}', "
             f"detail_column='{detail_column}'"
@@ -183,15 +454,15 @@ class CategoryManager:
         hierarchy: Dict[str, List[str]] = {}
 
         # Group by macro category and get unique detailed categories
-        grouped = df.groupby(self.group_column)[self.detail_column].unique()
+        grouped = df.groupby(self.group_column, observed=True)[self.detail_column].unique()
 
         for group_name, detail_values in grouped.items():
             # Convert numpy array to sorted list, clean encoding, and ensure all values are strings
             unique_details = sorted([
-                _clean_encoding(str(val)) for val in detail_values if pd.notna(val)
+                clean_encoding(str(val)) for val in detail_values if pd.notna(val)
             ])
             # Clean encoding in group name as well
-            clean_group_name = _clean_encoding(str(group_name))
+            clean_group_name = clean_encoding(str(group_name))
             hierarchy[clean_group_name] = unique_details
 
         # Sort by group name for consistent output
@@ -214,6 +485,8 @@ class CategoryManager:
 
         This method saves the extracted category hierarchy as a formatted JSON
         file, which can be used as context for future LLM classification.
+        The file is written to a temporary file first and then renamed, so
+        readers never see a partially written hierarchy.
 
         Args:
             categories: Dictionary mapping macro categories to detail lists.
@@ -241,14 +514,7 @@ class CategoryManager:
         logger.info(f"Saving categories to: {output_path}")
 
         try:
-            with open(output_path, "w", encoding="utf-8") as f:
-                json.dump(
-                    categories,
-                    f,
-                    ensure_ascii=False,
-                    indent=2,
-                    sort_keys=True,
-                )
+            _write_json_atomic(categories, output_path)
         except IOError as e:
             logger.error(f"Failed to write categories file: {e}")
             raise IOError(f"Could not write categories to {output_path}: {e}") from e
@@ -257,6 +523,293 @@ class CategoryManager:
             f"Successfully saved {len(categories)} categories to {output_path}"
         )
 
+    def build_account_tree(
+        self,
+        df: pd.DataFrame,
+        levels: List[str] | None = None,
+        base: AccountTree | None = None,
+    ) -> AccountTree:
+        """
+        Build the complete chart-of-accounts tree from a DRE DataFrame.
+
+        Unlike categories.json, which keeps only Nome Grupo and cc_nome, the
+        tree keeps every level of config.ACCOUNT_TREE_LEVELS. A node is
+        identified by its full path, so a cc_nome under two parents becomes
+        two nodes. Only the distinct paths are processed.
+
+        With base (the tree saved by a previous run), df only needs the new
+        rows: the leaf paths of base are kept and the paths of df are added.
+
+        Args:
+            df: DataFrame containing DRE data with the level columns.
+            levels: Columns from the root level to the leaf level.
+                Defaults to config.ACCOUNT_TREE_LEVELS.
+            base: Existing tree whose paths are kept. Must have the same levels.
+
+        Returns:
+            AccountTree: Tree with integer node ids in breadth-first order.
+
+        Raises:
+            ValueError: If level columns are missing from the DataFrame, or
+                if base has different levels.
+            TypeError: If df is not a pandas DataFrame.
+
+        Example:
+            >>> tree = manager.build_account_tree(df)
+            >>> tree.save(config.ACCOUNT_TREE_PATH)
+        """
+        if not isinstance(df, pd.DataFrame):
+            raise TypeError(
+                f"Expected pandas DataFrame, got {type(df).__name__}"
+            )
+
+        levels = list(levels if levels is not None else config.ACCOUNT_TREE_LEVELS)
+        missing_columns = [col for col in levels if col not in df.columns]
+        if missing_columns:
+            raise ValueError(
+                f"Missing required columns: {missing_columns}. "
+                f"Available columns: {df.columns.tolist()}"
+            )
+
+        paths = df[levels].drop_duplicates()
+        if base is not None:
+            if base.levels != levels:
+                raise ValueError(f"Base tree levels {base.levels} differ from {levels}")
+            leaves = base.level_ids(len(levels) - 1)
+            base_paths = pd.DataFrame(
+                {col: base.labels[base.ancestors(leaves, d)] for d, col in enumerate(levels)}
+            )
+            paths = pd.concat([base_paths, paths.astype(object)], ignore_index=True)
+
+        labels = _tree_labels(paths)
+        n_paths = len(labels[levels[0]]) if levels else 0
+
+        node_labels, node_depth, node_parent = [], [], []
+        path_node = np.full(n_paths, -1, dtype=np.int64)  # nó do prefixo de cada caminho
+        offset = 0
+        for depth, col in enumerate(levels):
+            # Um nó por (pai, rótulo), ordenado por pai e depois por rótulo
+            keys = pd.DataFrame({"parent": path_node, "label": labels[col]})
+            grouper = keys.groupby(["parent", "label"], sort=True)
+            nodes = grouper.size().index
+            path_node = offset + grouper.ngroup().to_numpy()
+
+            node_parent.append(nodes.get_level_values("parent").to_numpy())
+            node_labels.append(nodes.get_level_values("label").to_numpy(dtype=str))
+            node_depth.append(np.full(len(nodes), depth))
+            offset += len(nodes)
+
+        tree = AccountTree(
+            levels,
+            np.concatenate(node_labels) if levels else np.array([], dtype=str),
+            np.concatenate(node_depth) if levels else np.array([], dtype=np.int8),
+            np.concatenate(node_parent) if levels else np.array([], dtype=np.int32),
+        )
+        logger.info(f"Built account tree with {len(tree)} nodes over {len(levels)} levels")
+        return tree
+
+    def merge_hierarchy(
+        self,
+        existing: Dict[str, List[str]],
+        new_df: pd.DataFrame,
+    ) -> Dict[str, List[str]]:
+        """
+        Merge the categories of newly ingested rows into an existing hierarchy.
+
+        Only new_df is scanned, so the cost depends on the size of the delta
+        and not on the full history. Categories are only added: a cc_nome
+        that no longer appears in the data is kept (rebuild the hierarchy
+        with extract_category_hierarchy() to drop it).
+
+        Args:
+            existing: Current hierarchy (e.g., loaded from categories.json).
+            new_df: DataFrame with only the newly ingested rows.
+
+        Returns:
+            Dict[str, List[str]]: Merged hierarchy, sorted as in
+                extract_category_hierarchy(). The input dictionary is not modified.
+
+        Raises:
+            ValueError: If required columns are missing from new_df.
+            TypeError: If new_df is not a pandas DataFrame.
+
+        Example:
+            >>> existing = manager.load_categories_json("categories.json")
+            >>> merged = manager.merge_hierarchy(existing, df_novo_mes)
+        """
+        delta = self.extract_category_hierarchy(new_df)
+
+        merged = {group: list(details) for group, details in existing.items()}
+        for group, details in delta.items():
+            merged[group] = sorted(set(merged.get(group, [])) | set(details))
+
+        return dict(sorted(merged.items()))
+
+    def update_categories_json(
+        self,
+        df: pd.DataFrame,
+        output_path: Union[str, Path] = config.CATEGORIES_JSON_PATH,
+        meta_path: Union[str, Path] = config.CATEGORIES_META_PATH,
+        rebuild: bool = False,
+    ) -> Dict[str, List[str]]:
+        """
+        Incrementally update categories.json and its metadata sidecar.
+
+        The sidecar records the months already merged with their row counts,
+        a version number (incremented whenever the hierarchy changes) and the
+        first month in which each cc_nome was seen. The rows of a month whose
+        row count matches the sidecar are skipped without being scanned; a
+        month with a different count (a re-exported open month, or another
+        company group's export for the same month) is scanned again. Of the
+        remaining rows, those whose (Nome Grupo, cc_nome) pair is already in
+        the hierarchy are skipped with a vectorized filter over the distinct
+        pairs, and only the rest go through merge_hierarchy(). Both files are
+        written atomically.
+
+        Args:
+            df: DataFrame with the processed DRE data. It may contain months
+                that were merged before, or only some months (see
+                unmerged_months()), but each month in it must be complete.
+            output_path: Path of categories.json.
+            meta_path: Path of the metadata sidecar.
+            rebuild: Rebuild the hierarchy from df alone (e.g., to drop
+                details that no longer appear). The version keeps counting
+                up from the sidecar and first_seen keeps the earliest month.
+
+        Returns:
+            Dict[str, List[str]]: The updated hierarchy.
+
+        Raises:
+            ValueError: If required columns are missing, or if the resulting
+                hierarchy is empty.
+        """
+        output_path = Path(output_path)
+        meta_path = Path(meta_path)
+
+        existing: Dict[str, List[str]] = {}
+        previous: Dict[str, List[str]] = {}
+        meta: Dict[str, Any] = {"version": 0, "months": [], "month_rows": {}, "first_seen": {}}
+        if output_path.exists():
+            previous = self.load_categories_json(output_path)
+            if meta_path.exists():
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    meta.update(json.load(f))
+        if rebuild:
+            # Only the hierarchy is rebuilt: the version keeps counting up and
+            # first_seen keeps the months recorded before
+            meta["months"], meta["month_rows"] = [], {}
+        existing = {} if rebuild else previous
+
+        # Months already merged with the same row count are skipped; of the other
+        # rows, only those with a (group, detail) pair not yet in the hierarchy are merged
+        codes, labels, counts = self._month_rows(df)
+        scanned = df
+        if existing:
+            merged = [meta["month_rows"].get(label) == count for label, count in zip(labels, counts)]
+            scanned = df[~np.array(merged + [False])[codes]]  # code -1 (no month) is always scanned
+        new_df = scanned
+        if existing and {self.group_column, self.detail_column} <= set(scanned.columns):
+            new_df = scanned[~self._known_pairs(scanned, existing)]
+
+        logger.info(
+            f"Merging {len(new_df)} of {len(df)} rows into the category hierarchy"
+        )
+        categories = self.merge_hierarchy(existing, new_df)
+        if not categories:
+            raise ValueError("Categories dictionary cannot be empty")
+
+        # Every scanned row counts, so a backfilled earlier month moves first_seen back
+        first_seen: Dict[str, str] = dict(meta["first_seen"])
+        if self.month_column in scanned.columns and not scanned.empty:
+            first_months = scanned.groupby(self.detail_column, observed=True)[
+                self.month_column
+            ].min()
+            for detail, month in first_months.items():
+                if pd.notna(month):
+                    detail, label = clean_encoding(str(detail)), _month_label(month)
+                    first_seen[detail] = min(first_seen.get(detail, label), label)
+
+        if categories != previous or meta["version"] == 0:
+            meta["version"] += 1
+        meta["months"] = sorted(set(meta["months"]) | set(labels))
+        meta["month_rows"] = dict(sorted({**meta["month_rows"], **dict(zip(labels, counts))}.items()))
+        meta["first_seen"] = first_seen
+
+        self.save_categories_json(categories, output_path)
+        _write_json_atomic(meta, meta_path)
+        logger.info(
+            f"Category hierarchy version {meta['version']} saved "
+            f"({len(new_df)} new rows, {len(meta['months'])} months merged)"
+        )
+        return categories
+
+    def unmerged_months(
+        self,
+        months: pd.Series,
+        output_path: Union[str, Path] = config.CATEGORIES_JSON_PATH,
+        meta_path: Union[str, Path] = config.CATEGORIES_META_PATH,
+    ) -> List[Any]:
+        """
+        Months that update_categories_json() would scan again.
+
+        A month is merged when categories.json exists and the sidecar has
+        the same row count for it, so only the month column of the full
+        data is needed to decide which rows to read.
+
+        Args:
+            months: Month column of every processed row.
+            output_path: Path of categories.json.
+            meta_path: Path of the metadata sidecar.
+
+        Returns:
+            List[Any]: Distinct values of months (as in the column) whose
+                rows are new or changed; every month if nothing was merged yet.
+        """
+        codes, uniques = pd.factorize(months)
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        month_rows: Dict[str, int] = {}
+        if Path(output_path).exists() and Path(meta_path).exists():
+            with open(meta_path, "r", encoding="utf-8") as f:
+                month_rows = json.load(f).get("month_rows", {})
+        return [
+            value for value, count in zip(uniques, counts)
+            if month_rows.get(_month_label(value)) != int(count)
+        ]
+
+    def _month_rows(self, df: pd.DataFrame) -> tuple[np.ndarray, List[str], List[int]]:
+        """Month code of each row (-1 if missing), and the label and row count of each month."""
+        if self.month_column not in df.columns:
+            return np.full(len(df), -1, dtype=np.int64), [], []
+        codes, uniques = pd.factorize(df[self.month_column])
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        return codes, [_month_label(value) for value in uniques], [int(n) for n in counts]
+
+    def _known_pairs(self, df: pd.DataFrame, existing: Dict[str, List[str]]) -> np.ndarray:
+        """
+        Mask of the rows whose (group, detail) pair is already in existing.
+
+        Each distinct pair is repaired (clean_encoding) and looked up once.
+        Rows with a missing detail count as known when their group is.
+        """
+        known = {(group, detail) for group, details in existing.items() for detail in details}
+        group_codes, groups = pd.factorize(df[self.group_column], use_na_sentinel=True)
+        detail_codes, details = pd.factorize(df[self.detail_column], use_na_sentinel=True)
+        clean_groups = [clean_encoding(str(value)) for value in groups]
+        clean_details = [clean_encoding(str(value)) for value in details]
+
+        pair_codes = group_codes.astype(np.int64) * (len(details) + 1) + (detail_codes + 1)
+        unique_pairs, inverse = np.unique(pair_codes, return_inverse=True)
+        is_known = np.empty(len(unique_pairs), dtype=bool)
+        for i, pair in enumerate(unique_pairs):
+            group_code, detail_code = divmod(int(pair), len(details) + 1)
+            if group_code < 0:
+                is_known[i] = False
+            elif detail_code == 0:
+                is_known[i] = clean_groups[group_code] in existing
+            else:
+                is_known[i] = (clean_groups[group_code], clean_details[detail_code - 1]) in known
+        return is_known[inverse.reshape(-1)]
+
     def load_categories_json(
         self, input_path: Union[str, Path]
     ) -> Dict[str, List[str]]:
@@ -310,3 +863,248 @@ class CategoryManager:
         }
         return summary
 
+
+# Caracteres de pontuação e espaço separam tokens na busca
+_TOKEN_PATTERN = re.compile(r"[A-Z0-9]+")
+# Chave dos nós da trie com os ids das entradas que passam pelo nó
+_TRIE_IDS = "\0"
+
+
+def normalize_category(text: str) -> str:
+    """
+    Normalize a category name (or an expense description) for searching.
+
+    Repairs the encoding (clean_encoding), removes accents, upper-cases and
+    keeps only alphanumeric tokens separated by single spaces, so
+    "Cortesia - Negócios" and "CORTESIA NEGOCIOS" have the same key. The
+    classification cache uses the same key for its descriptions.
+
+    Args:
+        text: Category name or description.
+
+    Returns:
+        str: Normalized key ("" if there are no alphanumeric tokens).
+    """
+    text = unicodedata.normalize("NFKD", clean_encoding(text))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).upper()
+    return " ".join(_TOKEN_PATTERN.findall(text))
+
+
+def _trigrams(key: str) -> set:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass(frozen=True)
+class CategoryMatch:
+    """
+    A search result of CategoryIndex.
+
+    Attributes:
+        name: Category name (cc_nome) as stored in categories.json.
+        group: Owning macro category (Nome Grupo).
+        score: 1.0 for exact matches; prefix and fuzzy matches score lower.
+    """
+
+    name: str
+    group: str
+    score: float
+
+
+class CategoryIndex:
+    """
+    In-memory search index over a category hierarchy.
+
+    Built once from {Nome Grupo: [cc_nome, ...]} and answers, without
+    scanning the flattened lists:
+
+        - exact lookups on the normalized name (accents, case and
+          punctuation ignored) through a dict;
+        - prefix lookups through a character trie over the full name and
+          over each of its tokens ("FRAN" finds "CARNE DE FRANGO");
+        - fuzzy lookups through character-trigram postings, ranked by the
+          Dice coefficient.
+
+    A cc_nome listed under more than one group yields one entry per group;
+    lookup() returns the first group in hierarchy order.
+
+    Use get_category_index() to share one instance per categories.json
+    version between the dashboard and the classifiers.
+
+    Example:
+        >>> index = CategoryIndex({"( - ) CUSTOS VARIÁVEIS": ["BOVINOS", "AVES"]})
+        >>> index.lookup("bovinos")
+        '( - ) CUSTOS VARIÁVEIS'
+        >>> [m.name for m in index.search_fuzzy("BOVINO")]
+        ['BOVINOS']
+    """
+
+    def __init__(self, hierarchy: Dict[str, List[str]]) -> None:
+        """
+        Build the index.
+
+        Args:
+            hierarchy: Dictionary mapping macro categories to detail lists.
+        """
+        self._entries: List[tuple] = []  # (name, group, normalized key)
+        self._exact: Dict[str, List[int]] = {}
+        self._trie: Dict[str, Any] = {}
+        self._postings: Dict[str, List[int]] = {}
+
+        for group, names in hierarchy.items():
+            for name in names:
+                key = normalize_category(name)
+                entry_id = len(self._entries)
+                self._entries.append((name, group, key))
+                self._exact.setdefault(key, []).append(entry_id)
+
+                tokens = key.split(" ")
+                for start in range(len(tokens)):
+                    self._insert_prefix(" ".join(tokens[start:]), entry_id)
+                for trigram in _trigrams(key):
+                    self._postings.setdefault(trigram, []).append(entry_id)
+
+        self.hierarchy: Dict[str, List[str]] = {
+            group: list(names) for group, names in hierarchy.items()
+        }
+        self.names: List[str] = list(dict.fromkeys(name for name, _, _ in self._entries))
+        self.prompt_text: str = ", ".join(self.names)
+
+    @classmethod
+    def from_names(cls, names: List[str], group: str = "") -> "CategoryIndex":
+        """
+        Index a flat list of category names (e.g., the cc_nome values of the
+        narrative report, used when categories.json is not available).
+
+        Args:
+            names: Category names; missing values are ignored.
+            group: Group reported for every name.
+        """
+        return cls({group: [name for name in names if isinstance(name, str)]})
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _insert_prefix(self, key: str, entry_id: int) -> None:
+        node = self._trie
+        for char in key:
+            node = node.setdefault(char, {})
+            ids = node.setdefault(_TRIE_IDS, [])
+            # All keys of an entry are inserted together: repeats are adjacent
+            if not ids or ids[-1] != entry_id:
+                ids.append(entry_id)
+
+    def _match(self, entry_id: int, score: float) -> CategoryMatch:
+        name, group, _ = self._entries[entry_id]
+        return CategoryMatch(name, group, score)
+
+    def search_exact(self, text: str) -> List[CategoryMatch]:
+        """Entries whose normalized name equals the normalized text."""
+        if not isinstance(text, str):
+            return []
+        return [self._match(i, 1.0) for i in self._exact.get(normalize_category(text), [])]
+
+    def search_prefix(self, prefix: str, limit: int = 10) -> List[CategoryMatch]:
+        """
+        Entries whose name, or one of its tokens, starts with prefix.
+
+        Names that start with the prefix come first, then shorter names.
+        """
+        key = normalize_category(prefix) if isinstance(prefix, str) else ""
+        if not key:
+            return []
+
+        node = self._trie
+        for char in key:
+            node = node.get(char)
+            if node is None:
+                return []
+
+        ranked = sorted(
+            node[_TRIE_IDS],
+            key=lambda i: (not self._entries[i][2].startswith(key), len(self._entries[i][2]), i),
+        )
+        return [
+            self._match(i, len(key) / len(self._entries[i][2])) for i in ranked[:limit]
+        ]
+
+    def search_fuzzy(
+        self, text: str, limit: int = 5, min_score: float = 0.3
+    ) -> List[CategoryMatch]:
+        """
+        Entries most similar to text by character trigrams (Dice coefficient).
+
+        Args:
+            text: Text to search (e.g., a misspelled category or an AI answer).
+            limit: Maximum number of matches.
+            min_score: Minimum similarity, between 0 and 1.
+        """
+        key = normalize_category(text) if isinstance(text, str) else ""
+        if not key:
+            return []
+
+        query = _trigrams(key)
+        shared: Dict[int, int] = {}
+        for trigram in query:
+            for entry_id in self._postings.get(trigram, ()):
+                shared[entry_id] = shared.get(entry_id, 0) + 1
+
+        scored = []
+        for entry_id, count in shared.items():
+            size = len(self._entries[entry_id][2]) + 1  # trigramas com o preenchimento
+            score = 2 * count / (len(query) + size)
+            if score >= min_score:
+                scored.append((-score, entry_id))
+
+        scored.sort()
+        return [self._match(i, -neg) for neg, i in scored[:limit]]
+
+    def search(self, text: str, limit: int = 5) -> List[CategoryMatch]:
+        """Exact matches if any, otherwise prefix matches, otherwise fuzzy matches."""
+        return (
+            self.search_exact(text)
+            or self.search_prefix(text, limit)
+            or self.search_fuzzy(text, limit)
+        )
+
+    def lookup(self, text: str) -> str | None:
+        """Owning Nome Grupo of an exact (normalized) cc_nome match, or None."""
+        matches = self.search_exact(text)
+        return matches[0].group if matches else None
+
+    def canonical_name(self, text: str) -> str | None:
+        """cc_nome as written in categories.json for an exact (normalized) match, or None."""
+        matches = self.search_exact(text)
+        return matches[0].name if matches else None
+
+
+@lru_cache(maxsize=4)
+def _cached_category_index(path: str, mtime_ns: int, size: int) -> CategoryIndex:
+    with open(path, "r", encoding="utf-8") as f:
+        hierarchy = json.load(f)
+    index = CategoryIndex(hierarchy)
+    logger.info(f"Category index built from {path} ({len(index)} entries)")
+    return index
+
+
+def get_category_index(
+    categories_path: Union[str, Path] = config.CATEGORIES_JSON_PATH,
+) -> CategoryIndex:
+    """
+    Shared CategoryIndex for a categories.json file.
+
+    The index is built once per version of the file (path, modification
+    time and size) and reused by every caller in the process.
+
+    Args:
+        categories_path: Path to categories.json.
+
+    Returns:
+        CategoryIndex: Index of the hierarchy; empty if the file does not exist.
+    """
+    path = Path(categories_path).resolve()
+    if not path.exists():
+        logger.warning(f"Categories file not found: {path}")
+        return CategoryIndex({})
+    stat = path.stat()
+    return _cached_category_index(str(path), stat.st_mtime_ns, stat.st_size)
@@ -0,0 +1,248 @@
+"""
+Cache Persistente de Classificações da IA (SQLite).
+
+Gastos recorrentes ("Pagamento AWS", os mesmos fornecedores todo mês)
+eram enviados ao Gemini de novo a cada execução. Este módulo guarda as
+categorias já obtidas em um banco SQLite (output/cache/), com a chave:
+
+    - descrição normalizada (sem acentos, maiúsculas, só letras e números,
+      então "Pagamento  aws" e "PAGAMENTO AWS" são a mesma chave);
+    - hash do contexto de categorias enviado no prompt (context_hash()).
+
+Com config.AI_CACHE_STRICT_CONTEXT ativo, uma resposta só é reutilizada
+se o conjunto de categorias não mudou; desativado, vale a resposta mais
+recente de qualquer contexto (o ai_classifier ainda confere se a
+categoria existe no conjunto atual).
+
+Entradas expiram após config.AI_CACHE_TTL_DAYS e, acima de
+config.AI_CACHE_MAX_ENTRIES, as menos usadas recentemente são removidas.
+
+Classes:
+    ClassificationCache: Cache SQLite de classificações com TTL e LRU.
+
+Funções:
+    normalize_description: Chave normalizada de uma descrição.
+    context_hash: Hash do contexto de categorias do prompt.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Iterable, Union
+
+try:
+    import config
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    import config
+
+from src.category_engine import normalize_category
+
+logger = logging.getLogger(__name__)
+
+# Limite de parâmetros por consulta (SQLite antigo aceita até 999)
+_SQL_CHUNK: int = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS classifications (
+    description TEXT NOT NULL,
+    context_hash TEXT NOT NULL,
+    category TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (description, context_hash)
+);
+CREATE INDEX IF NOT EXISTS idx_classifications_last_used ON classifications (last_used);
+"""
+
+
+def normalize_description(description: str) -> str:
+    """
+    Chave normalizada de uma descrição de gasto.
+
+    Exemplo:
+        >>> normalize_description("  Pagamento  aws ")
+        'PAGAMENTO AWS'
+    """
+    return normalize_category(description) if isinstance(description, str) else ""
+
+
+def context_hash(context: str) -> str:
+    """Hash (SHA-256, 16 caracteres) do contexto de categorias enviado no prompt."""
+    return hashlib.sha256(context.encode("utf-8")).hexdigest()[:16]
+
+
+def _chunks(items: list, size: int = _SQL_CHUNK) -> Iterable[list]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class ClassificationCache:
+    """
+    Cache SQLite de classificações com expiração (TTL) e remoção LRU.
+
+    Attributes:
+        path: Caminho do banco SQLite.
+        ttl_seconds: Validade de cada entrada (0 = sem expiração).
+        max_entries: Máximo de entradas (0 = sem limite).
+        strict_context: Reutiliza só respostas do mesmo contexto de categorias.
+        hits: Descrições encontradas no cache.
+        misses: Descrições não encontradas.
+
+    Exemplo:
+        >>> with ClassificationCache() as cache:
+        ...     cache.put_many({"PAGAMENTO AWS": "SOFTWARE"}, "ab12")
+        ...     cache.get_many(["PAGAMENTO AWS", "LUZ"], "ab12")
+        {'PAGAMENTO AWS': 'SOFTWARE'}
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path, None] = None,
+        ttl_days: float | None = None,
+        max_entries: int | None = None,
+        strict_context: bool | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """
+        Abre (ou cria) o banco do cache.
+
+        Args:
+            path: Caminho do banco. Se None, usa config.AI_CACHE_PATH.
+            ttl_days: Validade em dias. Se None, usa config.AI_CACHE_TTL_DAYS.
+            max_entries: Se None, usa config.AI_CACHE_MAX_ENTRIES.
+            strict_context: Se None, usa config.AI_CACHE_STRICT_CONTEXT.
+            clock: Relógio em segundos (para testes).
+        """
+        self.path = Path(path) if path else config.AI_CACHE_PATH
+        ttl_days = config.AI_CACHE_TTL_DAYS if ttl_days is None else ttl_days
+        self.ttl_seconds = ttl_days * 86_400
+        self.max_entries = config.AI_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self.strict_context = (
+            config.AI_CACHE_STRICT_CONTEXT if strict_context is None else strict_context
+        )
+        self._clock = clock
+        self.hits = 0
+        self.misses = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path)
+        self._conn.executescript(_SCHEMA)
+
+    def __enter__(self) -> "ClassificationCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Fecha a conexão com o banco."""
+        self._conn.close()
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM classifications").fetchone()[0]
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Acertos, faltas e entradas armazenadas."""
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self)}
+
+    def _oldest_valid(self) -> float:
+        return self._clock() - self.ttl_seconds if self.ttl_seconds else float("-inf")
+
+    def get_many(
+        self,
+        descriptions: list[str],
+        ctx_hash: str,
+        is_valid: Callable[[str], bool] | None = None,
+    ) -> dict[str, str]:
+        """
+        Categorias em cache para descrições já normalizadas.
+
+        Args:
+            descriptions: Chaves de normalize_description().
+            ctx_hash: Hash do contexto atual (context_hash()).
+            is_valid: Filtro das categorias aceitas (ex: se ainda existem no
+                conjunto atual); as recusadas contam como faltas.
+
+        Returns:
+            dict[str, str]: Descrição -> categoria, só para os acertos.
+        """
+        keys = list(dict.fromkeys(descriptions))
+        oldest = self._oldest_valid()
+        found: dict[str, tuple[bool, float, str, str]] = {}
+
+        for chunk in _chunks(keys):
+            placeholders = ",".join("?" * len(chunk))
+            query = (
+                "SELECT description, context_hash, category, last_used FROM classifications "
+                f"WHERE description IN ({placeholders}) AND created_at >= ?"
+            )
+            params: list = [*chunk, oldest]
+            if self.strict_context:
+                query += " AND context_hash = ?"
+                params.append(ctx_hash)
+            for description, row_hash, category, last_used in self._conn.execute(query, params):
+                if is_valid is not None and not is_valid(category):
+                    continue
+                # Mesmo contexto primeiro; depois a resposta usada mais recentemente
+                rank = (row_hash == ctx_hash, last_used, category, row_hash)
+                if description not in found or rank > found[description]:
+                    found[description] = rank
+
+        if found:
+            now = self._clock()
+            with self._conn:
+                self._conn.executemany(
+                    "UPDATE classifications SET last_used = ? "
+                    "WHERE description = ? AND context_hash = ?",
+                    [(now, description, rank[3]) for description, rank in found.items()],
+                )
+
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return {description: rank[2] for description, rank in found.items()}
+
+    def put_many(self, categories: dict[str, str], ctx_hash: str) -> None:
+        """
+        Guarda categorias (descrição normalizada -> categoria) e aplica a
+        expiração e o limite de entradas.
+        """
+        if not categories:
+            return
+        now = self._clock()
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO classifications "
+                "(description, context_hash, category, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(description, ctx_hash, category, now, now)
+                 for description, category in categories.items() if description],
+            )
+        self.evict()
+
+    def evict(self) -> int:
+        """
+        Remove entradas expiradas e, acima de max_entries, as menos usadas
+        recentemente.
+
+        Returns:
+            int: Entradas removidas.
+        """
+        with self._conn:
+            removed = self._conn.execute(
+                "DELETE FROM classifications WHERE created_at < ?", (self._oldest_valid(),)
+            ).rowcount
+            excess = len(self) - self.max_entries if self.max_entries else 0
+            if excess > 0:
+                removed += self._conn.execute(
+                    "DELETE FROM classifications WHERE rowid IN ("
+                    "SELECT rowid FROM classifications ORDER BY last_used ASC LIMIT ?)",
+                    (excess,),
+                ).rowcount
+        if removed:
+            logger.info(f"Cache de classificações: {removed} entradas removidas")
+        return removed
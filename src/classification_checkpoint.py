@@ -0,0 +1,218 @@
+"""
+Checkpoint da Classificação de Entradas Grandes (JSONL só de acréscimo).
+
+O ai_classifier só gravava o relatório mestre ao final. Se a execução
+morresse no meio de um entrada.csv grande, todas as respostas da IA já
+pagas se perdiam. Com o checkpoint, cada micro-lote classificado é
+acrescentado imediatamente a um arquivo JSONL (config.AI_CHECKPOINT_PATH),
+uma linha por linha da entrada:
+
+    {"row": "<sha256 da linha>", "cc_nome": "BOVINOS"}
+
+Uma nova execução pula as linhas cujo hash já está no checkpoint e só as
+restantes vão para a classificação. O relatório mestre é atualizado uma
+vez, ao fim de todos os micro-lotes, e então o checkpoint é descartado.
+
+Linhas sem categoria válida (ERRO_IA) ficam de fora, mas cada tentativa
+frustrada é contada no próprio checkpoint:
+
+    {"row": "<sha256 da linha>", "tentativas": 2}
+
+Assim, uma linha cuja resposta nunca é aceita pode ser encerrada depois de
+config.AI_CHECKPOINT_MAX_ATTEMPTS execuções, sem bloquear o mestre.
+
+O checkpoint também guarda o identificador da execução, criado quando ele
+começa e descartado com ele:
+
+    {"run": "3f9a0c1d2e4b5a67"}
+
+É a chave do acréscimo ao mestre (MasterStore.append): retomar a mesma
+execução não duplica linhas, e uma nova entrada.csv idêntica, classificada
+depois do clear(), é gravada de novo.
+
+Uma última linha incompleta (interrupção durante a gravação) é ignorada.
+
+Classes:
+    ClassificationCheckpoint: Lê e acrescenta resultados ao checkpoint.
+
+Funções:
+    row_hashes: Hash de cada linha de um DataFrame.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import uuid
+import sys
+from pathlib import Path
+from typing import Iterable, Iterator, Union
+
+import pandas as pd
+
+try:
+    import config
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    import config
+
+logger = logging.getLogger(__name__)
+
+# Separadores que não aparecem em células de CSV comuns
+_SEP_COLUNA = "\x1f"
+_SEP_VALOR = "\x1e"
+
+
+def row_hashes(df: pd.DataFrame, exclude: Iterable[str] = ()) -> list[str]:
+    """
+    Hash SHA-256 de cada linha (nomes e valores das colunas, como texto).
+
+    Linhas idênticas têm o mesmo hash e, portanto, a mesma classificação.
+
+    Args:
+        df: DataFrame de entrada.
+        exclude: Colunas ignoradas (ex: a própria coluna de categoria).
+
+    Returns:
+        Lista de hashes hexadecimais, alinhada às linhas de df.
+    """
+    excluir = set(exclude)
+    colunas = [col for col in df.columns if col not in excluir]
+    texto = df[colunas].astype(str)
+    prefixos = [f"{col}{_SEP_VALOR}" for col in colunas]
+    return [
+        hashlib.sha256(
+            _SEP_COLUNA.join(p + v for p, v in zip(prefixos, valores)).encode("utf-8")
+        ).hexdigest()
+        for valores in texto.itertuples(index=False, name=None)
+    ]
+
+
+class ClassificationCheckpoint:
+    """
+    Resultados da classificação já obtidos, por hash de linha.
+
+    Attributes:
+        path: Caminho do arquivo JSONL.
+
+    Exemplo:
+        >>> checkpoint = ClassificationCheckpoint()
+        >>> checkpoint.append({"9f2c...": "BOVINOS"})
+        >>> checkpoint.load()
+        {'9f2c...': 'BOVINOS'}
+        >>> checkpoint.record_attempts(["7a1d..."])
+        {'7a1d...': 1}
+        >>> checkpoint.run_id()
+        '3f9a0c1d2e4b5a67'
+    """
+
+    def __init__(self, path: Union[str, Path, None] = None) -> None:
+        """
+        Args:
+            path: Caminho do checkpoint. Se None, usa config.AI_CHECKPOINT_PATH.
+        """
+        self.path = Path(path) if path else config.AI_CHECKPOINT_PATH
+
+    def __len__(self) -> int:
+        return len(self.load())
+
+    def _records(self) -> Iterator[dict]:
+        """Registros do checkpoint, na ordem em que foram gravados."""
+        if not self.path.exists():
+            return
+        with open(self.path, encoding="utf-8", errors="replace") as f:
+            for numero, linha in enumerate(f, start=1):
+                try:
+                    registro = json.loads(linha)
+                    if not isinstance(registro.get("row", registro.get("run")), str):
+                        raise TypeError
+                except (ValueError, AttributeError, TypeError):
+                    logger.warning(f"Linha {numero} do checkpoint {self.path} ignorada (incompleta)")
+                    continue
+                yield registro
+
+    def load(self) -> dict[str, str]:
+        """
+        Lê o checkpoint (a última resposta de cada linha prevalece).
+
+        Returns:
+            Dicionário hash da linha -> categoria; vazio se não houver checkpoint.
+        """
+        return {
+            registro["row"]: registro["cc_nome"]
+            for registro in self._records()
+            if "row" in registro and "cc_nome" in registro
+        }
+
+    def attempts(self) -> dict[str, int]:
+        """
+        Tentativas frustradas (sem categoria válida) de cada linha.
+
+        Returns:
+            Dicionário hash da linha -> número de tentativas.
+        """
+        return {
+            registro["row"]: int(registro["tentativas"])
+            for registro in self._records()
+            if "row" in registro and "tentativas" in registro
+        }
+
+    def run_id(self) -> str:
+        """
+        Identificador da execução, criado na primeira chamada e gravado no checkpoint.
+
+        Returns:
+            16 caracteres hexadecimais; o mesmo até o clear().
+        """
+        for registro in self._records():
+            if "run" in registro:
+                return registro["run"]
+        run = uuid.uuid4().hex[:16]
+        self._write([{"run": run}])
+        return run
+
+    def append(self, results: dict[str, str]) -> None:
+        """
+        Acrescenta um micro-lote ao checkpoint, gravado em disco antes de retornar.
+
+        Args:
+            results: Dicionário hash da linha -> categoria.
+        """
+        self._write({"row": row, "cc_nome": categoria} for row, categoria in results.items())
+
+    def record_attempts(self, rows: Iterable[str]) -> dict[str, int]:
+        """
+        Conta mais uma tentativa frustrada para cada linha.
+
+        Args:
+            rows: Hashes das linhas que ficaram sem categoria válida.
+
+        Returns:
+            Dicionário hash da linha -> tentativas, já contando esta.
+        """
+        rows = list(dict.fromkeys(rows))
+        if not rows:
+            return {}
+        anteriores = self.attempts()
+        contagem = {row: anteriores.get(row, 0) + 1 for row in rows}
+        self._write({"row": row, "tentativas": n} for row, n in contagem.items())
+        return contagem
+
+    def _write(self, records: Iterable[dict]) -> None:
+        texto = "".join(json.dumps(registro, ensure_ascii=False) + "\n" for registro in records)
+        if not texto:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "ab+") as f:
+            # Linha incompleta de uma gravação interrompida: começa em uma linha nova
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    texto = "\n" + texto
+            f.write(texto.encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def clear(self) -> None:
+        """Descarta o checkpoint (após a gravação do relatório mestre)."""
+        self.path.unlink(missing_ok=True)
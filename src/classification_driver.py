@@ -0,0 +1,448 @@
+"""
+Execução Concorrente de Chamadas à IA com Limite de Taxa.
+
+Mesmo com os lotes de classificar_lote(), as chamadas ao Gemini eram
+feitas uma após a outra. Este módulo envia os prompts com asyncio:
+
+    - concorrência limitada por um semáforo (config.AI_MAX_CONCURRENCY);
+    - balde de fichas (token bucket) ajustado à cota da API
+      (config.AI_REQUESTS_PER_MINUTE, rajada de config.AI_RATE_BURST);
+    - novas tentativas com espera exponencial e jitter aleatório quando a
+      API responde 429 (cota) ou 5xx (config.AI_MAX_RETRIES).
+
+O mesmo driver é usado pelo ai_classifier, pelo data_processor_ia e pela
+página classificacao_ia do dashboard (via ai_classifier.get_driver()).
+
+Todas as chamadas rodam em um único loop de eventos persistente, em uma
+thread própria: clientes assíncronos (ex: o gRPC do SDK do Gemini) ficam
+presos ao primeiro loop em que são usados, então um asyncio.run() novo a
+cada run() quebraria a segunda chamada.
+
+StubModel simula localmente a latência e os erros de cota da API, para
+testes de carga sem rede:
+
+    python -m src.classification_driver --prompts 200 --rpm 600
+
+Classes:
+    TokenBucket: Balde de fichas para limitar requisições por minuto.
+    ClassificationDriver: Envia prompts concorrentes com limite de taxa e retentativas.
+    StubModel: Modelo local que simula latência e erros 429/5xx.
+    StubAPIError: Erro HTTP simulado pelo StubModel.
+
+Funções:
+    is_retryable: Indica se um erro da API deve ser tentado de novo.
+    estimate_tokens: Estimativa do número de tokens de um prompt.
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import logging
+import math
+import random
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+try:
+    import config
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    import config
+
+logger = logging.getLogger(__name__)
+
+# Códigos HTTP tentados de novo: cota excedida e falhas temporárias do servidor
+RETRYABLE_STATUS_CODES: frozenset[int] = frozenset({429, 500, 502, 503, 504})
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Indica se um erro da API deve ser tentado de novo.
+
+    As exceções do google-api-core (ResourceExhausted, ServiceUnavailable,
+    ...) trazem o status HTTP no atributo "code"; outros clientes usam
+    "status_code".
+    """
+    code = getattr(error, "code", None)
+    if not isinstance(code, int):
+        code = getattr(error, "status_code", None)
+    return isinstance(code, int) and code in RETRYABLE_STATUS_CODES
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimativa do número de tokens de um texto (cerca de 4 caracteres por
+    token), para comparar tamanhos de prompt sem chamar a API.
+    """
+    return math.ceil(len(text) / 4)
+
+
+class TokenBucket:
+    """
+    Balde de fichas: até capacity requisições de uma vez e, depois, rate
+    requisições por segundo.
+
+    reserve() não bloqueia: consome uma ficha (o saldo pode ficar negativo)
+    e devolve quantos segundos o chamador deve esperar. O estado são só
+    números, então o mesmo balde pode ser dividido entre drivers (mesma
+    cota) e entre threads.
+
+    Attributes:
+        rate: Fichas repostas por segundo.
+        capacity: Máximo de fichas acumuladas (tamanho da rajada).
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError(f"rate deve ser positivo, recebido {rate}")
+        self.rate = float(rate)
+        self.capacity = max(1.0, float(capacity))
+        self._clock = clock
+        self._tokens = self.capacity
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Consome uma ficha e devolve a espera, em segundos, até poder usá-la."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1.0
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+class _Interrupted(Exception):
+    """KeyboardInterrupt/SystemExit do modelo, levado do loop do driver até run()."""
+
+
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_lock = threading.Lock()
+
+
+def _driver_loop() -> asyncio.AbstractEventLoop:
+    """Loop de eventos compartilhado pelos drivers, em uma thread daemon criada na primeira chamada."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_loop.run_forever, name="classification-driver", daemon=True
+            ).start()
+        return _loop
+
+
+class ClassificationDriver:
+    """
+    Envia prompts a um modelo de forma concorrente, com limite de taxa e
+    novas tentativas.
+
+    Attributes:
+        model: Modelo com generate_content(prompt) (e, opcionalmente,
+            generate_content_async(prompt)) cuja resposta tem o atributo text.
+        max_concurrency: Chamadas simultâneas.
+        max_retries: Novas tentativas por prompt em erros 429/5xx.
+        stats: Contadores de chamadas, novas tentativas e erros.
+
+    Exemplo:
+        >>> driver = ClassificationDriver(get_model())
+        >>> respostas = driver.run(["prompt 1", "prompt 2"])
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        max_concurrency: int | None = None,
+        requests_per_minute: float | None = None,
+        burst: int | None = None,
+        max_retries: int | None = None,
+        backoff_base: float | None = None,
+        backoff_max: float | None = None,
+        rng: random.Random | None = None,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+        bucket: TokenBucket | None = None,
+    ) -> None:
+        """
+        Args:
+            model: Modelo de IA (ex: genai.GenerativeModel ou StubModel).
+            max_concurrency: Se None, usa config.AI_MAX_CONCURRENCY.
+            requests_per_minute: Cota da API. Se None, usa
+                config.AI_REQUESTS_PER_MINUTE; 0 desativa o limite.
+            burst: Requisições liberadas de uma vez. Se None, usa config.AI_RATE_BURST.
+            max_retries: Se None, usa config.AI_MAX_RETRIES.
+            backoff_base: Espera base em segundos. Se None, usa config.AI_BACKOFF_BASE_SECONDS.
+            backoff_max: Espera máxima em segundos. Se None, usa config.AI_BACKOFF_MAX_SECONDS.
+            rng: Gerador aleatório do jitter (para testes reprodutíveis).
+            sleep: Função de espera assíncrona (para testes).
+            bucket: Balde de fichas dividido com outros drivers da mesma
+                cota. Se informado, substitui requests_per_minute e burst.
+        """
+        self.model = model
+        self.max_concurrency = max(1, max_concurrency or config.AI_MAX_CONCURRENCY)
+        rpm = config.AI_REQUESTS_PER_MINUTE if requests_per_minute is None else requests_per_minute
+        if bucket is None and rpm:
+            bucket = TokenBucket(rpm / 60.0, burst if burst is not None else config.AI_RATE_BURST)
+        self.bucket = bucket
+        self.max_retries = config.AI_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base = config.AI_BACKOFF_BASE_SECONDS if backoff_base is None else backoff_base
+        self.backoff_max = config.AI_BACKOFF_MAX_SECONDS if backoff_max is None else backoff_max
+        self._rng = rng or random.Random()
+        self._sleep = sleep
+        self.stats: dict[str, int] = {"calls": 0, "retries": 0, "errors": 0}
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Espera antes da tentativa seguinte: uniforme entre 0 e base * 2^attempt (limitada)."""
+        return self._rng.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def _call_model(self, prompt: str) -> str:
+        generate_async = getattr(self.model, "generate_content_async", None)
+        if inspect.iscoroutinefunction(generate_async):
+            response = await generate_async(prompt)
+        else:
+            response = await asyncio.to_thread(self.model.generate_content, prompt)
+        return response.text
+
+    async def generate(self, prompt: str, semaphore: asyncio.Semaphore | None = None) -> str:
+        """
+        Envia um prompt respeitando a concorrência, a cota e as retentativas.
+
+        Raises:
+            Exception: O erro da API, se não for 429/5xx ou se as
+                tentativas acabarem.
+        """
+        semaphore = semaphore or asyncio.Semaphore(self.max_concurrency)
+        attempt = 0
+        while True:
+            async with semaphore:
+                if self.bucket is not None:
+                    wait = self.bucket.reserve()
+                    if wait > 0:
+                        await self._sleep(wait)
+                self.stats["calls"] += 1
+                try:
+                    return await self._call_model(prompt)
+                except (KeyboardInterrupt, SystemExit) as e:
+                    # Levantada no loop, derrubaria a thread do loop persistente;
+                    # run() a levanta de novo na thread do chamador
+                    raise _Interrupted() from e
+                except Exception as e:
+                    if not is_retryable(e) or attempt >= self.max_retries:
+                        self.stats["errors"] += 1
+                        raise
+                    error = e
+
+            # A espera acontece fora do semáforo, liberando a vaga para outros prompts
+            delay = self.backoff_delay(attempt)
+            attempt += 1
+            self.stats["retries"] += 1
+            logger.warning(
+                f"Erro temporário da IA ({error}); tentativa {attempt}/{self.max_retries} "
+                f"em {delay:.1f}s"
+            )
+            await self._sleep(delay)
+
+    async def gather(self, prompts: list[str]) -> list[str | Exception]:
+        """
+        Envia todos os prompts; erros são devolvidos na posição do prompt.
+
+        Uma interrupção do modelo (KeyboardInterrupt/SystemExit) cancela os
+        prompts restantes, como o Ctrl+C faria fora do loop.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        tasks = [asyncio.ensure_future(self.generate(prompt, semaphore)) for prompt in prompts]
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_EXCEPTION)
+            if any(isinstance(task.exception(), _Interrupted) for task in done):
+                for task in pending:
+                    task.cancel()
+                if pending:
+                    await asyncio.wait(pending)
+                break
+        return [
+            asyncio.CancelledError() if task.cancelled() else task.exception() or task.result()
+            for task in tasks
+        ]
+
+    def run(self, prompts: list[str]) -> list[str | Exception]:
+        """
+        Versão síncrona de gather().
+
+        Os prompts rodam no loop persistente do módulo (_driver_loop()), o
+        mesmo em todas as chamadas. Pode ser chamada de código síncrono
+        (main.py, Streamlit) e também de dentro de outro loop de eventos
+        já em execução (ex: Jupyter).
+        """
+        if not prompts:
+            return []
+        loop = _driver_loop()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            raise RuntimeError("run() não pode ser chamado de dentro do loop do driver; use gather()")
+        future = asyncio.run_coroutine_threadsafe(self.gather(prompts), loop)
+        try:
+            results = future.result()
+        except BaseException:
+            future.cancel()  # Ctrl+C na thread do chamador: não deixa os prompts rodando
+            raise
+        for result in results:
+            if isinstance(result, _Interrupted):
+                raise result.__cause__
+        return results
+
+    def generate_sync(self, prompt: str) -> str:
+        """Envia um único prompt de forma síncrona (levanta o erro da API, se houver)."""
+        result = self.run([prompt])[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+# =============================================================================
+# Modelo Simulado (testes de carga offline)
+# =============================================================================
+
+class StubAPIError(Exception):
+    """Erro HTTP simulado (code=429 para cota, 503 para indisponibilidade)."""
+
+    def __init__(self, code: int, message: str) -> None:
+        super().__init__(f"{code} {message}")
+        self.code = code
+
+
+class _StubResponse:
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+
+# Itens numerados de um prompt em lote: 3. "descrição"
+_ITEM_LOTE = re.compile(r'^\s*(\d+)\. "', re.MULTILINE)
+
+
+def _default_responder(prompt: str) -> str:
+    """Responde "OUTROS" para cada item (JSON em prompts com itens numerados)."""
+    itens = _ITEM_LOTE.findall(prompt)
+    if itens:
+        return json.dumps({numero: "OUTROS" for numero in itens})
+    return "OUTROS"
+
+
+class StubModel:
+    """
+    Modelo local que simula a API Gemini: latência, cota por minuto e erros.
+
+    Attributes:
+        latency: Latência média de cada chamada, em segundos.
+        latency_per_1k_tokens: Latência adicional por mil tokens do prompt
+            (estimate_tokens()), em segundos.
+        requests_per_minute: Cota simulada; acima dela a chamada levanta
+            StubAPIError(429). None desativa a cota.
+        error_rate: Fração das chamadas que levanta StubAPIError(503).
+        responder: Função prompt -> texto da resposta.
+        stats: Contadores de chamadas, erros 429 e erros 503.
+
+    Exemplo:
+        >>> driver = ClassificationDriver(StubModel(latency=0.01))
+        >>> driver.run(["Classifique: picanha"])
+        ['OUTROS']
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.05,
+        jitter: float = 0.0,
+        requests_per_minute: float | None = None,
+        error_rate: float = 0.0,
+        responder: Callable[[str], str] | None = None,
+        seed: int | None = None,
+        latency_per_1k_tokens: float = 0.0,
+    ) -> None:
+        self.latency = latency
+        self.latency_per_1k_tokens = latency_per_1k_tokens
+        self.jitter = jitter
+        self.requests_per_minute = requests_per_minute
+        self.error_rate = error_rate
+        self.responder = responder or _default_responder
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._recent: list[float] = []
+        self.stats: dict[str, int] = {"calls": 0, "rate_limited": 0, "server_errors": 0}
+
+    def _admit(self, prompt: str) -> tuple[float, str]:
+        """Registra a chamada e devolve (latência, resposta) ou levanta o erro simulado."""
+        with self._lock:
+            self.stats["calls"] += 1
+            now = time.monotonic()
+            if self.requests_per_minute:
+                self._recent = [t for t in self._recent if now - t < 60.0]
+                if len(self._recent) >= self.requests_per_minute:
+                    self.stats["rate_limited"] += 1
+                    raise StubAPIError(429, "Resource has been exhausted (e.g. check quota).")
+                self._recent.append(now)
+            if self.error_rate and self._rng.random() < self.error_rate:
+                self.stats["server_errors"] += 1
+                raise StubAPIError(503, "The service is currently unavailable.")
+            delay = max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+            delay += self.latency_per_1k_tokens * estimate_tokens(prompt) / 1000
+        return delay, self.responder(prompt)
+
+    def generate_content(self, prompt: str) -> _StubResponse:
+        delay, text = self._admit(prompt)
+        time.sleep(delay)
+        return _StubResponse(text)
+
+    async def generate_content_async(self, prompt: str) -> _StubResponse:
+        delay, text = self._admit(prompt)
+        await asyncio.sleep(delay)
+        return _StubResponse(text)
+
+
+# =============================================================================
+# Standalone Execution (teste de carga)
+# =============================================================================
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    parser = argparse.ArgumentParser(description="Teste de carga do driver com o StubModel.")
+    parser.add_argument("--prompts", type=int, default=100, help="Número de prompts")
+    parser.add_argument("--latency", type=float, default=0.2, help="Latência simulada (s)")
+    parser.add_argument("--rpm", type=float, default=config.AI_REQUESTS_PER_MINUTE,
+                        help="Cota do driver (requisições por minuto)")
+    parser.add_argument("--quota", type=float, default=None,
+                        help="Cota simulada pelo StubModel (padrão: igual a --rpm)")
+    parser.add_argument("--concurrency", type=int, default=config.AI_MAX_CONCURRENCY)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fração de erros 503")
+    args = parser.parse_args()
+
+    stub = StubModel(
+        latency=args.latency,
+        jitter=args.latency / 2,
+        requests_per_minute=args.quota if args.quota is not None else args.rpm,
+        error_rate=args.error_rate,
+        seed=0,
+    )
+    driver = ClassificationDriver(
+        stub, max_concurrency=args.concurrency, requests_per_minute=args.rpm
+    )
+
+    inicio = time.perf_counter()
+    resultados = driver.run([f'Classifique:\n1. "item {i}"' for i in range(args.prompts)])
+    decorrido = time.perf_counter() - inicio
+
+    falhas = sum(isinstance(r, Exception) for r in resultados)
+    print(f"{args.prompts} prompts em {decorrido:.1f}s ({args.prompts / decorrido:.1f} prompts/s)")
+    print(f"Driver: {driver.stats} | Stub: {stub.stats} | Falhas finais: {falhas}")
@@ -0,0 +1,114 @@
+"""
+Interface Comum dos Backends de Classificação.
+
+O ai_classifier e o data_processor_ia chamavam o Gemini cada um à sua
+maneira. Agora os dois usam um backend com a mesma interface:
+
+    labels, scores = backend.classify_batch(descriptions)
+
+Implementações:
+
+    - GeminiBackend (src/ai_classifier.py): prompts em lote pelo driver
+      compartilhado (cota, concorrência e novas tentativas). Com um
+      HttpModel (src/http_model.py) no lugar do modelo do Gemini, é o
+      backend "http", que fala com o servidor local de testes;
+    - NgramBackend (este módulo): classificador offline de n-gramas
+      (src/ngram_classifier.py), sem chave de API nem rede.
+
+ai_classifier.get_backend() escolhe a implementação por config.AI_BACKEND.
+
+Classes:
+    ClassifierBackend: Protocolo dos backends.
+    NgramBackend: Backend do classificador offline.
+"""
+
+import sys
+from pathlib import Path
+from typing import Protocol, runtime_checkable
+
+try:
+    import config
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    import config
+
+from src.category_engine import CategoryIndex
+from src.ngram_classifier import NgramClassifier
+
+
+@runtime_checkable
+class ClassifierBackend(Protocol):
+    """
+    Backend de classificação de gastos.
+
+    Attributes:
+        name: Nome do backend em config.AI_BACKEND ("gemini", "http", "ngram").
+        cacheable: Se as respostas podem ir para o cache persistente
+            (src/classification_cache.py).
+        calls: Chamadas ao modelo remoto feitas até agora (0 nos locais).
+    """
+
+    name: str
+    cacheable: bool
+
+    @property
+    def calls(self) -> int: ...
+
+    def classify_batch(self, descriptions: list[str]) -> tuple[list[str], list[float]]:
+        """
+        Classifica as descrições.
+
+        Returns:
+            Tupla (categorias, confianças), alinhadas a descriptions. As
+            categorias são o nome exato do índice, "OUTROS" ou "ERRO_IA";
+            a confiança vai de 0 a 1.
+        """
+        ...
+
+
+class NgramBackend:
+    """
+    Backend do classificador offline de n-gramas.
+
+    Previsões com confiança abaixo de config.NGRAM_MIN_CONFIDENCE, ou fora
+    das categorias do índice, ficam como "OUTROS" (confiança 0). As
+    respostas não vão para o cache: são recalculadas a cada execução.
+
+    Exemplo:
+        >>> backend = NgramBackend(get_ngram_classifier(), indice)
+        >>> backend.classify_batch(["Refrigerante lata"])
+        (['REFRIGERANTES'], [0.83])
+    """
+
+    name: str = "ngram"
+    cacheable: bool = False
+    calls: int = 0
+
+    def __init__(
+        self,
+        model: NgramClassifier,
+        indice: CategoryIndex,
+        min_confidence: float | None = None,
+    ) -> None:
+        """
+        Args:
+            model: Classificador treinado (get_ngram_classifier()).
+            indice: Categorias válidas.
+            min_confidence: Se None, usa config.NGRAM_MIN_CONFIDENCE.
+        """
+        self.model = model
+        self.indice = indice
+        self.min_confidence = (
+            config.NGRAM_MIN_CONFIDENCE if min_confidence is None else min_confidence
+        )
+
+    def classify_batch(self, descriptions: list[str]) -> tuple[list[str], list[float]]:
+        labels: list[str] = []
+        scores: list[float] = []
+        for match in self.model.predict(descriptions):
+            category = None
+            if match.category is not None and match.confidence >= self.min_confidence:
+                category = self.indice.canonical_name(match.category)
+            labels.append(category or "OUTROS")
+            scores.append(match.confidence if category else 0.0)
+        return labels, scores
@@ -0,0 +1,183 @@
+"""
+Detecção de Encoding e Separador de Arquivos CSV.
+
+O relatório narrativo e os CSVs de entrada do classificador podem chegar
+em UTF-8 (com ou sem BOM) ou Latin-1, separados por ";" ou ",". Em vez de
+tentar ler o arquivo inteiro com cada combinação, este módulo inspeciona
+uma única vez os primeiros KB do arquivo:
+
+    - BOM: UTF-8 ("utf-8-sig") ou UTF-16;
+    - bytes: se a amostra é UTF-8 válido usa "utf-8", senão "latin-1"
+      (que aceita qualquer byte); como só a amostra é inspecionada, um
+      arquivo Latin-1 com começo só em ASCII é relido em Latin-1 quando a
+      leitura em UTF-8 falha (read_csv_sniffed);
+    - separador: o candidato que divide o cabeçalho em mais de um campo e
+      gera o mesmo número de campos no maior número de linhas da amostra.
+
+O resultado fica em cache por caminho, data de modificação e tamanho do
+arquivo, então cada arquivo é inspecionado uma vez e lido uma vez.
+
+Classes:
+    CsvDialect: Encoding e separador detectados.
+
+Funções:
+    sniff_csv_dialect: Detecta (com cache) o encoding e o separador de um CSV.
+    read_csv_sniffed: Lê um CSV com o encoding e o separador detectados.
+"""
+
+import codecs
+import csv
+import io
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Union
+
+import pandas as pd
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Separadores testados, em ordem de preferência em caso de empate
+CANDIDATE_SEPARATORS: tuple[str, ...] = (";", ",", "\t", "|")
+
+_BOMS: tuple[tuple[bytes, str], ...] = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+@dataclass(frozen=True)
+class CsvDialect:
+    """
+    Encoding e separador de um arquivo CSV.
+
+    Attributes:
+        encoding: Encoding para pd.read_csv (ex: "utf-8-sig", "latin-1").
+        sep: Separador de campos.
+    """
+
+    encoding: str
+    sep: str
+
+
+def _detect_encoding(sample: bytes, truncated: bool) -> str:
+    """Encoding da amostra pelo BOM ou pela validade dos bytes como UTF-8."""
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+
+    # final=False tolera um caractere multibyte cortado no fim da amostra
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        decoder.decode(sample, final=not truncated)
+    except UnicodeDecodeError:
+        return "latin-1"
+    return "utf-8"
+
+
+def _detect_separator(text: str, truncated: bool) -> str | None:
+    """Separador que gera campos consistentes nas linhas da amostra."""
+    lines = text.splitlines()
+    if truncated and len(lines) > 1:
+        lines = lines[:-1]  # Última linha pode estar incompleta
+    if not lines:
+        return None
+
+    best, best_score = None, (0, 0)
+    for sep in CANDIDATE_SEPARATORS:
+        counts = [len(row) for row in csv.reader(io.StringIO("\n".join(lines)), delimiter=sep)]
+        header_fields = counts[0] if counts else 0
+        if header_fields < 2:
+            continue
+        score = (sum(count == header_fields for count in counts), header_fields)
+        if score > best_score:
+            best, best_score = sep, score
+    return best
+
+
+@lru_cache(maxsize=64)
+def _sniff_cached(path: str, mtime_ns: int, size: int, sample_size: int) -> CsvDialect:
+    with open(path, "rb") as f:
+        sample = f.read(sample_size)
+    truncated = size > len(sample)
+
+    encoding = _detect_encoding(sample, truncated)
+    text = sample.decode(encoding, errors="ignore")
+    sep = _detect_separator(text, truncated)
+    if sep is None:
+        logger.warning(
+            f"Separador não identificado em {Path(path).name}; "
+            f"usando config.CSV_SEPARATOR='{config.CSV_SEPARATOR}'"
+        )
+        sep = config.CSV_SEPARATOR
+
+    logger.debug(f"Dialeto de {Path(path).name}: encoding={encoding}, sep='{sep}'")
+    return CsvDialect(encoding=encoding, sep=sep)
+
+
+def sniff_csv_dialect(
+    file_path: Union[str, Path],
+    sample_size: int | None = None,
+) -> CsvDialect:
+    """
+    Detecta o encoding e o separador de um arquivo CSV.
+
+    Apenas os primeiros sample_size bytes são lidos. O resultado fica em
+    cache por caminho, data de modificação e tamanho: chamadas repetidas
+    para o mesmo arquivo inalterado não leem o disco.
+
+    Args:
+        file_path: Caminho do arquivo CSV.
+        sample_size: Bytes inspecionados. Se None, usa config.CSV_SNIFF_BYTES.
+
+    Returns:
+        CsvDialect: Encoding e separador detectados.
+
+    Raises:
+        FileNotFoundError: Se o arquivo não existir.
+
+    Exemplo:
+        >>> sniff_csv_dialect("output/relatorio_narrativo_ia.csv")
+        CsvDialect(encoding='utf-8-sig', sep=';')
+    """
+    path = Path(file_path).resolve()
+    if not path.is_file():
+        raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
+
+    stat = path.stat()
+    return _sniff_cached(
+        str(path), stat.st_mtime_ns, stat.st_size, sample_size or config.CSV_SNIFF_BYTES
+    )
+
+
+def read_csv_sniffed(file_path: Union[str, Path], **kwargs) -> pd.DataFrame:
+    """
+    Lê um CSV com o encoding e o separador detectados por sniff_csv_dialect().
+
+    Se o arquivo foi detectado como UTF-8 (sem BOM) mas tem bytes inválidos
+    depois da amostra, a leitura é refeita em Latin-1.
+
+    Args:
+        file_path: Caminho do arquivo CSV.
+        **kwargs: Argumentos adicionais para pd.read_csv (ex: on_bad_lines).
+
+    Returns:
+        pd.DataFrame: Conteúdo do arquivo.
+
+    Raises:
+        FileNotFoundError: Se o arquivo não existir.
+    """
+    dialect = sniff_csv_dialect(file_path)
+    try:
+        return pd.read_csv(file_path, encoding=dialect.encoding, sep=dialect.sep, **kwargs)
+    except UnicodeDecodeError:
+        if dialect.encoding != "utf-8":
+            raise
+        logger.warning(
+            f"{Path(file_path).name} não é UTF-8 após os primeiros bytes; relendo em latin-1"
+        )
+        return pd.read_csv(file_path, encoding="latin-1", sep=dialect.sep, **kwargs)
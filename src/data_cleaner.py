@@ -6,24 +6,45 @@ dados de DRE (Demonstração do Resultado do Exercício) de arquivos Excel e CSV
 
 Funções:
     load_dre_excel: Carrega arquivo Excel DRE com configuração adequada.
+    read_excel_sheet_cached: Lê uma planilha através de uma cópia Parquet em cache.
     load_dre_csv: Carrega arquivo CSV DRE com configuração adequada (legado).
     load_dre_file: Carrega arquivo DRE detectando formato automaticamente.
+    read_dre_preamble: Lê os metadados (Ano Txt, GrupoEmpresa) antes do cabeçalho.
+    apply_dimension_categoricals: Converte colunas de dimensão para categóricas.
+    stream_dre_csv_to_parquet: Processa CSV DRE em blocos e grava direto no Parquet.
     convert_brazilian_currency: Converte strings de moeda brasileira para float.
+    convert_brazilian_currency_series: Converte uma coluna inteira de moeda em uma passada.
     convert_month_to_date: Converte abreviações de meses em português para datetime.
+    convert_month_series: Converte uma coluna de meses resolvendo cada valor distinto uma vez.
 """
 
+import json
 import logging
+import os
 import re
+from functools import lru_cache
 from pathlib import Path
 from typing import Union
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
 
 import config
+from src.category_engine import clean_encoding
+from src.run_manifest import file_sha256
 
 # Configura logger do módulo
 logger = logging.getLogger(__name__)
 
+# Códigos de motivo usados no relatório de valores de moeda inválidos
+CURRENCY_INVALID_TYPE: str = "invalid_type"
+CURRENCY_INVALID_CHARACTERS: str = "invalid_characters"
+CURRENCY_NOT_A_NUMBER: str = "not_a_number"
+
 
 def _fix_column_encoding(df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -100,15 +121,139 @@ def _validate_dre_dataframe(df: pd.DataFrame, file_path: Path) -> pd.DataFrame:
     return df
 
 
-def load_dre_excel(file_path: Union[str, Path]) -> pd.DataFrame:
+# Colunas de dimensão são lidas do CSV direto como categóricas (as categorias
+# chegam sempre como texto, preservando códigos como "01.01")
+_DIMENSION_DTYPES: dict[str, str] = {col: "category" for col in config.DIMENSION_COLUMNS}
+
+# No modo em blocos o tipo de cada coluna é fixado explicitamente: sem isso,
+# o pandas infere float64 para uma coluna toda vazia em um bloco e o bloco não
+# cabe mais no schema do Parquet, derivado do primeiro bloco
+_STREAMING_DTYPES: dict[str, str] = {
+    **_DIMENSION_DTYPES,
+    config.COLUMN_MES: "str",
+    config.COLUMN_REALIZADO: "str",
+}
+
+
+def _load_category_order(categories_path: Path) -> dict[str, list[str]]:
+    """
+    Lê a ordem de categorias do categories.json.
+
+    Returns:
+        dict: {coluna: [valores em ordem]} para Nome Grupo e cc_nome.
+            Vazio se o arquivo não existir ou for inválido.
+    """
+    if not categories_path.exists():
+        return {}
+    try:
+        with open(categories_path, "r", encoding="utf-8") as f:
+            hierarchy = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"Ordem de categorias ignorada ({categories_path}): {e}")
+        return {}
+
+    # dict.fromkeys remove repetidos preservando a ordem de aparição
+    details = dict.fromkeys(name for names in hierarchy.values() for name in names)
+    return {
+        config.COLUMN_NOME_GRUPO: list(hierarchy),
+        config.COLUMN_CC_NOME: list(details),
+    }
+
+
+def _dimension_categories(values: pd.Series, order: list[str]) -> list[str]:
+    """
+    Ordena os valores distintos de uma coluna de dimensão.
+
+    Valores presentes em order (comparados também após clean_encoding, já
+    que o categories.json guarda os nomes corrigidos) vêm primeiro, na mesma
+    ordem; os demais são anexados em ordem alfabética.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        uniques = values.cat.remove_unused_categories().cat.categories
+    else:
+        uniques = pd.unique(values.dropna())
+
+    rank = {name: i for i, name in enumerate(order)}
+    known, unknown = [], []
+    for value in uniques:
+        position = rank.get(value)
+        if position is None and isinstance(value, str):
+            position = rank.get(clean_encoding(value))
+        if position is None:
+            unknown.append(value)
+        else:
+            known.append((position, str(value), value))
+
+    return [value for *_, value in sorted(known)] + sorted(unknown, key=str)
+
+
+def apply_dimension_categoricals(
+    df: pd.DataFrame,
+    columns: list[str] | None = None,
+    categories_path: Union[str, Path, None] = None,
+) -> pd.DataFrame:
+    """
+    Converte as colunas de dimensão para pd.Categorical.
+
+    Colunas como Loja, Nome Grupo e cc_nome repetem poucas centenas de
+    valores em todas as linhas; como categóricas ocupam uma fração da
+    memória, o groupby trabalha sobre códigos inteiros e o Parquet as grava
+    dictionary-encoded (a leitura devolve categóricas na mesma ordem).
+
+    A ordem das categorias é estável: Nome Grupo e cc_nome seguem o
+    categories.json; os demais valores entram em ordem alfabética.
+
+    Args:
+        df: DataFrame DRE.
+        columns: Colunas a converter. Se None, usa config.DIMENSION_COLUMNS.
+            Colunas ausentes no DataFrame são ignoradas.
+        categories_path: JSON de categorias usado para a ordem.
+            Se None, usa config.CATEGORIES_JSON_PATH.
+
+    Returns:
+        pd.DataFrame: DataFrame com as colunas de dimensão categóricas.
+
+    Exemplo:
+        >>> df = apply_dimension_categoricals(df)
+        >>> df["cc_nome"].dtype
+        CategoricalDtype(categories=['DINHEIRO', 'IFOOD', ...], ordered=False, ...)
+    """
+    columns = config.DIMENSION_COLUMNS if columns is None else columns
+    present = [col for col in columns if col in df.columns]
+    if not present:
+        return df
+
+    category_order = _load_category_order(
+        Path(categories_path) if categories_path else config.CATEGORIES_JSON_PATH
+    )
+
+    converted = {}
+    for col in present:
+        categories = _dimension_categories(df[col], category_order.get(col, []))
+        converted[col] = pd.Categorical(df[col], categories=categories)
+
+    logger.info(f"Colunas de dimensão convertidas para categóricas: {present}")
+    return df.assign(**converted)
+
+
+def load_dre_excel(
+    file_path: Union[str, Path],
+    use_cache: bool | None = None,
+) -> pd.DataFrame:
     """
     Carrega arquivo Excel DRE ignorando linhas de metadados.
 
     Esta função lê um arquivo Excel contendo dados DRE, pulando as primeiras
     4 linhas de metadados e usando a 5ª linha como cabeçalho.
 
+    Com o cache ativo (config.EXCEL_CACHE_ENABLED), a planilha é lida por
+    read_excel_sheet_cached(): a primeira leitura converte a planilha para
+    Parquet e as seguintes leem essa cópia em vez de abrir o XLSX.
+
     Args:
         file_path: Caminho para o arquivo Excel. Pode ser string ou objeto Path.
+        use_cache: Usa a cópia Parquet da planilha. Se None, usa
+            config.EXCEL_CACHE_ENABLED.
 
     Returns:
         pd.DataFrame: DataFrame contendo os dados DRE carregados.
@@ -135,18 +280,311 @@ def load_dre_excel(file_path: Union[str, Path]) -> pd.DataFrame:
 
     logger.info(f"Carregando DRE Excel de: {file_path}")
 
+    if use_cache is None:
+        use_cache = config.EXCEL_CACHE_ENABLED
+
     try:
-        df = pd.read_excel(
-            file_path,
-            sheet_name=config.EXCEL_SHEET_NAME,
-            header=config.EXCEL_HEADER_ROW,
-            engine='openpyxl',  # Motor para arquivos .xlsx
-        )
+        if use_cache:
+            df = read_excel_sheet_cached(file_path)
+        else:
+            df = pd.read_excel(
+                file_path,
+                sheet_name=config.EXCEL_SHEET_NAME,
+                header=config.EXCEL_HEADER_ROW,
+                engine='openpyxl',  # Motor para arquivos .xlsx
+            )
     except Exception as e:
         logger.error(f"Erro ao ler arquivo Excel: {e}")
         raise
 
-    return _validate_dre_dataframe(df, file_path)
+    return apply_dimension_categoricals(_validate_dre_dataframe(df, file_path))
+
+
+def _excel_cache_path(
+    file_path: Path,
+    sheet_name: str | int,
+    header_row: int,
+    cache_dir: Path,
+) -> Path:
+    """
+    Monta o caminho da cópia Parquet de uma planilha.
+
+    A chave combina o hash do conteúdo do arquivo, a planilha e a linha de
+    cabeçalho; qualquer alteração no XLSX gera uma chave nova.
+    """
+    digest = file_sha256(file_path)[:16]
+    sheet_key = re.sub(r"[^\w.-]+", "_", str(sheet_name))
+    return cache_dir / f"{file_path.stem}-{sheet_key}-h{header_row}-{digest}.parquet"
+
+
+def read_excel_sheet_cached(
+    file_path: Union[str, Path],
+    sheet_name: str | int = config.EXCEL_SHEET_NAME,
+    header_row: int = config.EXCEL_HEADER_ROW,
+    cache_dir: Union[str, Path, None] = None,
+) -> pd.DataFrame:
+    """
+    Lê uma planilha Excel através de uma cópia Parquet em cache.
+
+    A cópia fica em cache_dir, com nome derivado do hash do conteúdo do
+    arquivo, da planilha e da linha de cabeçalho. Se ela já existir, é lida
+    diretamente (sem openpyxl). Caso contrário, a planilha é convertida em
+    modo somente leitura e em lotes (_convert_excel_sheet_to_parquet), e
+    cópias antigas da mesma planilha são removidas.
+
+    Args:
+        file_path: Caminho para o arquivo Excel.
+        sheet_name: Nome ou índice da planilha.
+        header_row: Índice (base 0) da linha de cabeçalho.
+        cache_dir: Diretório das cópias. Se None, usa config.EXCEL_CACHE_DIR.
+
+    Returns:
+        pd.DataFrame: Dados da planilha, sem validação de colunas.
+
+    Raises:
+        ValueError: Se a planilha não contiver a linha de cabeçalho.
+    """
+    file_path = Path(file_path)
+    cache_dir = Path(cache_dir) if cache_dir else config.EXCEL_CACHE_DIR
+    cache_path = _excel_cache_path(file_path, sheet_name, header_row, cache_dir)
+
+    if cache_path.exists():
+        logger.info(f"Usando cópia Parquet da planilha: {cache_path}")
+        return pd.read_parquet(cache_path)
+
+    logger.info(f"Convertendo planilha '{sheet_name}' de {file_path} para Parquet")
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    _convert_excel_sheet_to_parquet(file_path, sheet_name, header_row, cache_path)
+
+    # Remove cópias de versões anteriores do mesmo arquivo/planilha
+    prefix = cache_path.name.rsplit("-", 1)[0] + "-"
+    for stale in cache_dir.glob(f"{prefix}*.parquet"):
+        if stale != cache_path:
+            stale.unlink(missing_ok=True)
+
+    return pd.read_parquet(cache_path)
+
+
+class _ExcelSchemaDrift(Exception):
+    """Coluna com tipo diferente do inferido no primeiro lote."""
+
+    def __init__(self, column: str, numeric: bool = False) -> None:
+        super().__init__(column)
+        self.column = column
+        # Inteiros (ou vazios) seguidos de números: a coluna pode ser float, como no pd.read_excel
+        self.numeric = numeric
+
+
+def _all_numeric(values: list) -> bool:
+    """Se os valores são só números (int ou float, sem bool) e vazios."""
+    return all(
+        v is None or (isinstance(v, (int, float)) and not isinstance(v, bool)) for v in values
+    )
+
+
+def _excel_column_names(header: tuple) -> list[str]:
+    """Gera nomes de colunas como o pandas (vazias viram 'Unnamed: i')."""
+    names: list[str] = []
+    for i, value in enumerate(header):
+        name = f"Unnamed: {i}" if value is None else str(value)
+        base, k = name, 1
+        while name in names:
+            name = f"{base}.{k}"
+            k += 1
+        names.append(name)
+    return names
+
+
+def _excel_batch_to_table(
+    rows: list[tuple],
+    columns: list[str],
+    schema: pa.Schema | None,
+    string_columns: set[str],
+    float_columns: set[str] = frozenset(),
+) -> pa.Table:
+    """
+    Converte um lote de linhas do openpyxl em tabela Arrow.
+
+    No primeiro lote (schema None) os tipos são inferidos; colunas mistas
+    viram texto, colunas vazias ficam com tipo nulo e as de float_columns são
+    float64. Nos lotes seguintes os valores precisam caber no schema do
+    primeiro lote, senão _ExcelSchemaDrift é levantada.
+    """
+    arrays = []
+    for i, name in enumerate(columns):
+        values = [row[i] if i < len(row) else None for row in rows]
+        if name in string_columns:
+            arrays.append(pa.array(
+                [None if v is None else str(v) for v in values], type=pa.string()
+            ))
+            continue
+        if schema is None:
+            try:
+                if name in float_columns:
+                    array = pa.array(values, type=pa.float64(), from_pandas=True)
+                else:
+                    array = pa.array(values, from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                raise _ExcelSchemaDrift(name)
+        else:
+            field_type = schema.field(name).type
+            widens = pa.types.is_integer(field_type) or pa.types.is_null(field_type)
+            if pa.types.is_integer(field_type) and any(isinstance(v, float) for v in values):
+                # pa.array truncaria os decimais em silêncio
+                raise _ExcelSchemaDrift(name, numeric=_all_numeric(values))
+            try:
+                array = pa.array(values, type=field_type, from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                raise _ExcelSchemaDrift(name, numeric=widens and _all_numeric(values))
+        arrays.append(array)
+    return pa.Table.from_arrays(arrays, names=columns)
+
+
+def _convert_excel_sheet_to_parquet(
+    file_path: Path,
+    sheet_name: str | int,
+    header_row: int,
+    target: Path,
+    batch_rows: int = config.EXCEL_CACHE_BATCH_ROWS,
+) -> None:
+    """
+    Converte uma planilha para Parquet sem materializar todas as células.
+
+    O workbook é aberto em modo somente leitura e as linhas são lidas como
+    valores (iter_rows(values_only=True)) e gravadas em lotes de batch_rows
+    linhas. Linhas totalmente vazias são ignoradas, como no pd.read_excel.
+    Se uma coluna mudar de tipo entre lotes, a conversão recomeça com essa
+    coluna como float64 (inteiros ou vazios seguidos de números, como no
+    pd.read_excel) ou, nos demais casos, como texto.
+    """
+    import openpyxl
+
+    string_columns: set[str] = set()
+    float_columns: set[str] = set()
+    temp_path = target.with_name(target.name + ".tmp")
+
+    while True:
+        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        writer: pq.ParquetWriter | None = None
+        try:
+            if isinstance(sheet_name, int):
+                worksheet = workbook.worksheets[sheet_name]
+            else:
+                worksheet = workbook[sheet_name]
+
+            rows = worksheet.iter_rows(values_only=True)
+            for _ in range(header_row):
+                next(rows, None)
+            header = next(rows, None)
+            if header is None:
+                raise ValueError("O arquivo não contém dados após o cabeçalho.")
+            columns = _excel_column_names(header)
+
+            batch: list[tuple] = []
+            for row in rows:
+                if all(value is None for value in row):
+                    continue
+                batch.append(row)
+                if len(batch) >= batch_rows:
+                    writer = _write_excel_batch(
+                        writer, batch, columns, string_columns, float_columns, temp_path
+                    )
+                    batch = []
+            if batch or writer is None:
+                writer = _write_excel_batch(
+                    writer, batch, columns, string_columns, float_columns, temp_path
+                )
+        except _ExcelSchemaDrift as drift:
+            if drift.numeric and drift.column not in float_columns:
+                logger.info(f"Coluna '{drift.column}' com inteiros e decimais; convertendo como float")
+                float_columns.add(drift.column)
+            else:
+                logger.info(f"Coluna '{drift.column}' com tipos mistos; convertendo como texto")
+                string_columns.add(drift.column)
+            continue
+        except Exception:
+            if writer is not None:
+                writer.close()
+                writer = None
+            temp_path.unlink(missing_ok=True)
+            raise
+        finally:
+            if writer is not None:
+                writer.close()
+            workbook.close()
+
+        os.replace(temp_path, target)
+        return
+
+
+def _write_excel_batch(
+    writer: pq.ParquetWriter | None,
+    batch: list[tuple],
+    columns: list[str],
+    string_columns: set[str],
+    float_columns: set[str],
+    temp_path: Path,
+) -> pq.ParquetWriter:
+    """Grava um lote de linhas, abrindo o ParquetWriter no primeiro lote."""
+    schema = writer.schema if writer is not None else None
+    table = _excel_batch_to_table(batch, columns, schema, string_columns, float_columns)
+    if writer is None:
+        writer = pq.ParquetWriter(temp_path, table.schema)
+    writer.write_table(table)
+    return writer
+
+
+def read_dre_preamble(file_path: Union[str, Path]) -> dict[str, str]:
+    """
+    Lê as linhas de metadados que antecedem o cabeçalho de um export DRE.
+
+    Os exports trazem pares chave/valor antes do cabeçalho, por exemplo:
+        Ano Txt;2025
+        situacao;(Vários itens)
+        GrupoEmpresa;Grupo J+
+
+    Args:
+        file_path: Caminho do arquivo DRE (CSV ou Excel).
+
+    Returns:
+        dict: {chave: valor} das linhas de metadados não vazias
+            (ex: {"Ano Txt": "2025", "GrupoEmpresa": "Grupo J+"}).
+
+    Raises:
+        FileNotFoundError: Se o arquivo não existir.
+        ValueError: Se o formato não for suportado.
+    """
+    file_path = Path(file_path)
+    if not file_path.exists():
+        raise FileNotFoundError(f"Arquivo DRE não encontrado: {file_path}")
+
+    extension = file_path.suffix.lower()
+    if extension == ".csv":
+        with open(file_path, "r", encoding=config.CSV_ENCODING, newline="") as f:
+            lines = [f.readline().rstrip("\r\n") for _ in range(config.CSV_HEADER_ROW)]
+        rows = [line.split(config.CSV_SEPARATOR) for line in lines]
+    elif extension in (".xlsx", ".xls"):
+        import openpyxl
+
+        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            sheet = config.EXCEL_SHEET_NAME
+            worksheet = workbook.worksheets[sheet] if isinstance(sheet, int) else workbook[sheet]
+            rows = list(worksheet.iter_rows(max_row=config.EXCEL_HEADER_ROW, values_only=True))
+        finally:
+            workbook.close()
+    else:
+        raise ValueError(
+            f"Formato de arquivo não suportado: '{extension}'. Use .xlsx, .xls ou .csv"
+        )
+
+    preamble = {}
+    for row in rows:
+        if len(row) < 2 or row[0] is None or not str(row[0]).strip():
+            continue
+        value = row[1]
+        preamble[str(row[0]).strip()] = "" if value is None else str(value).strip()
+    return preamble
 
 
 def load_dre_file(file_path: Union[str, Path]) -> pd.DataFrame:
@@ -186,17 +624,30 @@ def load_dre_file(file_path: Union[str, Path]) -> pd.DataFrame:
         )
 
 
-def load_dre_csv(file_path: Union[str, Path]) -> pd.DataFrame:
+def load_dre_csv(
+    file_path: Union[str, Path],
+    engine: str | None = None,
+) -> pd.DataFrame:
     """
     Carrega arquivo CSV DRE ignorando linhas de metadados.
 
     Esta função lê um arquivo CSV contendo dados DRE, pulando as primeiras
     4 linhas de metadados e usando a 5ª linha como cabeçalho.
 
+    Dois motores de leitura estão disponíveis (config.CSV_ENGINE):
+        - "pandas": parser do pandas; todas as colunas chegam como texto.
+        - "pyarrow": leitura multi-thread com pyarrow.csv; as colunas de texto
+          chegam como categóricas (dictionary-encoded) e a coluna Realizado
+          já chega convertida para float (ou como texto, se algum valor for
+          inválido, para que as regras de qualidade coloquem essas linhas
+          em quarentena).
+
     Nota: Para novos projetos, prefira usar load_dre_excel() ou load_dre_file().
 
     Args:
         file_path: Caminho para o arquivo CSV. Pode ser string ou objeto Path.
+        engine: Motor de leitura ("pandas" ou "pyarrow").
+            Se None, usa config.CSV_ENGINE.
 
     Returns:
         pd.DataFrame: DataFrame contendo os dados DRE carregados.
@@ -222,7 +673,17 @@ def load_dre_csv(file_path: Union[str, Path]) -> pd.DataFrame:
         logger.error(f"Caminho não é um arquivo: {file_path}")
         raise ValueError(f"Caminho não é um arquivo válido: {file_path}")
 
-    logger.info(f"Carregando DRE CSV de: {file_path}")
+    engine = engine or config.CSV_ENGINE
+    if engine not in ("pandas", "pyarrow"):
+        raise ValueError(
+            f"Motor de leitura CSV não suportado: '{engine}'. Use 'pandas' ou 'pyarrow'"
+        )
+
+    logger.info(f"Carregando DRE CSV de: {file_path} (engine={engine})")
+
+    if engine == "pyarrow":
+        df = _validate_dre_dataframe(_read_csv_pyarrow(file_path), file_path)
+        return apply_dimension_categoricals(df)
 
     try:
         df = pd.read_csv(
@@ -230,6 +691,7 @@ def load_dre_csv(file_path: Union[str, Path]) -> pd.DataFrame:
             sep=config.CSV_SEPARATOR,
             header=config.CSV_HEADER_ROW,
             encoding=config.CSV_ENCODING,
+            dtype=_DIMENSION_DTYPES,
         )
     except pd.errors.EmptyDataError as e:
         logger.error(f"Arquivo vazio ou corrompido: {file_path}")
@@ -240,7 +702,226 @@ def load_dre_csv(file_path: Union[str, Path]) -> pd.DataFrame:
         logger.error(f"Erro ao ler arquivo CSV: {e}")
         raise
 
-    return _validate_dre_dataframe(df, file_path)
+    return apply_dimension_categoricals(_validate_dre_dataframe(df, file_path))
+
+
+def _read_csv_pyarrow(file_path: Path) -> pd.DataFrame:
+    """
+    Lê o CSV DRE com pyarrow.csv.
+
+    As linhas de metadados (config.CSV_HEADER_ROW) são puladas, o arquivo é
+    transcodificado de config.CSV_ENCODING para UTF-8 e lido com o separador
+    config.CSV_SEPARATOR. Colunas de texto são dictionary-encoded (viram
+    categóricas no pandas) e a coluna Realizado é convertida para float com
+    os mesmos kernels de convert_brazilian_currency_series().
+
+    Se algum valor de Realizado for inválido, a coluna fica como texto, como
+    no motor "pandas": as regras de src.data_quality colocam as linhas
+    inválidas em quarentena e apply_currency_conversion() converte as demais
+    (ou levanta ValueError, se as regras não forem aplicadas).
+
+    Args:
+        file_path: Caminho para o arquivo CSV.
+
+    Returns:
+        pd.DataFrame: Dados com colunas categóricas e Realizado numérico
+            (ou texto, se houver valores inválidos).
+
+    Raises:
+        pd.errors.EmptyDataError: Se o arquivo estiver vazio ou só com metadados.
+    """
+    # Lê apenas a linha de cabeçalho para declarar todas as colunas como texto
+    # (evita que códigos como "01.01" sejam inferidos como número)
+    with open(file_path, "r", encoding=config.CSV_ENCODING, newline="") as f:
+        for _ in range(config.CSV_HEADER_ROW):
+            f.readline()
+        header = f.readline().rstrip("\r\n")
+    column_names = header.split(config.CSV_SEPARATOR) if header else []
+
+    try:
+        table = pa_csv.read_csv(
+            file_path,
+            read_options=pa_csv.ReadOptions(
+                skip_rows=config.CSV_HEADER_ROW,
+                encoding=config.CSV_ENCODING,
+            ),
+            parse_options=pa_csv.ParseOptions(delimiter=config.CSV_SEPARATOR),
+            convert_options=pa_csv.ConvertOptions(
+                column_types={name: pa.string() for name in column_names},
+                strings_can_be_null=True,
+            ),
+        )
+    except pa.ArrowInvalid as e:
+        if "Empty CSV file" in str(e):
+            logger.error(f"Arquivo vazio ou corrompido: {file_path}")
+            raise pd.errors.EmptyDataError(
+                f"O arquivo {file_path} está vazio ou contém apenas linhas de metadados."
+            ) from e
+        logger.error(f"Erro ao ler arquivo CSV com pyarrow: {e}")
+        raise
+
+    columns = {}
+    for name, column in zip(table.column_names, table.columns):
+        if name == config.COLUMN_REALIZADO:
+            text = column.cast(pa.string())
+            values, reasons, _ = _convert_currency_arrow(text)
+            invalid = pd.notna(reasons)
+            if invalid.any():
+                logger.warning(
+                    f"{int(invalid.sum())} valores inválidos em '{name}'; "
+                    "coluna mantida como texto para as regras de qualidade"
+                )
+                columns[name] = text
+            else:
+                columns[name] = pa.array(values, type=pa.float64())
+        elif pa.types.is_string(column.type) or pa.types.is_null(column.type):
+            columns[name] = pc.dictionary_encode(column.cast(pa.string()))
+        else:
+            columns[name] = column
+
+    return pa.table(columns).to_pandas()
+
+
+def stream_dre_csv_to_parquet(
+    file_path: Union[str, Path],
+    output_path: Union[str, Path] = config.PROCESSED_PARQUET_PATH,
+    chunk_size: int = config.CSV_CHUNK_SIZE,
+    reference_year: int = config.REFERENCE_YEAR,
+    quarantine_path: Union[str, Path, None] = None,
+) -> int:
+    """
+    Processa um CSV DRE em blocos e grava o resultado direto no Parquet.
+
+    Cada bloco de até chunk_size linhas passa pela validação de cabeçalho,
+    _fix_column_encoding e pelas conversões de moeda e mês, e é anexado
+    ao arquivo Parquet como um row group. Apenas um bloco fica em memória
+    por vez, então o pico de memória não depende do tamanho do arquivo.
+
+    O Parquet é escrito em um arquivo temporário e só substitui o destino
+    quando todos os blocos foram processados.
+
+    As colunas de dimensão são gravadas como categóricas; como cada bloco só
+    conhece os próprios valores, as categorias ficam na ordem de aparição.
+    Aplique apply_dimension_categoricals() após a leitura para a ordem estável.
+
+    Com quarantine_path, cada bloco passa antes pelas regras de
+    src.data_quality (chaves duplicadas são detectadas também entre blocos):
+    as linhas reprovadas são gravadas nesse Parquet em vez de interromper
+    o processamento.
+
+    Args:
+        file_path: Caminho para o arquivo CSV.
+        output_path: Caminho do Parquet de saída.
+        chunk_size: Número máximo de linhas por bloco.
+        reference_year: Ano usado na conversão de meses.
+        quarantine_path: Parquet das linhas reprovadas. Se None, as regras
+            de qualidade não são aplicadas e um valor inválido levanta ValueError.
+
+    Returns:
+        int: Número total de registros gravados.
+
+    Raises:
+        FileNotFoundError: Se o arquivo especificado não existir.
+        ValueError: Se colunas obrigatórias estiverem ausentes ou algum
+            valor não puder ser convertido.
+        pd.errors.EmptyDataError: Se o arquivo estiver vazio ou só com metadados.
+
+    Exemplo:
+        >>> stream_dre_csv_to_parquet("DRE_BI(BaseDRE).csv", "output/processed_dre.parquet")
+        15501
+    """
+    file_path = Path(file_path)
+    output_path = Path(output_path)
+
+    if not file_path.exists():
+        logger.error(f"Arquivo não encontrado: {file_path}")
+        raise FileNotFoundError(f"Arquivo DRE não encontrado: {file_path}")
+
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size deve ser positivo, recebido: {chunk_size}")
+
+    logger.info(f"Processando DRE CSV em blocos de {chunk_size} linhas: {file_path}")
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = output_path.with_name(output_path.name + ".tmp")
+    writer: pq.ParquetWriter | None = None
+    total_rows = 0
+
+    quality_rules = None
+    quarantined: list[pd.DataFrame] = []
+    if quarantine_path is not None:
+        # Import local: data_quality depende deste módulo
+        from src.data_quality import apply_quality_rules, default_quality_rules, write_quarantine
+
+        quality_rules = default_quality_rules()
+
+    try:
+        reader = pd.read_csv(
+            file_path,
+            sep=config.CSV_SEPARATOR,
+            header=config.CSV_HEADER_ROW,
+            encoding=config.CSV_ENCODING,
+            dtype=_STREAMING_DTYPES,
+            chunksize=chunk_size,
+        )
+        with reader:
+            for chunk in reader:
+                chunk = _validate_dre_dataframe(chunk, file_path)
+                chunk = apply_dimension_categoricals(chunk)
+                if quality_rules is not None:
+                    chunk, rejected = apply_quality_rules(chunk, quality_rules)
+                    if not rejected.empty:
+                        quarantined.append(rejected)
+                chunk = apply_currency_conversion(chunk, config.COLUMN_REALIZADO)
+                chunk = apply_month_conversion(chunk, config.COLUMN_MES, reference_year)
+
+                if writer is None:
+                    schema = _streaming_schema(chunk)
+                    writer = pq.ParquetWriter(temp_path, schema)
+                table = pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=False)
+                writer.write_table(table)
+                total_rows += len(chunk)
+    except pd.errors.EmptyDataError as e:
+        logger.error(f"Arquivo vazio ou corrompido: {file_path}")
+        raise pd.errors.EmptyDataError(
+            f"O arquivo {file_path} está vazio ou contém apenas linhas de metadados."
+        ) from e
+    except Exception:
+        if writer is not None:
+            writer.close()
+        temp_path.unlink(missing_ok=True)
+        raise
+
+    if writer is None:
+        raise ValueError("O arquivo não contém dados após o cabeçalho.")
+
+    writer.close()
+    os.replace(temp_path, output_path)
+    logger.info(f"Parquet gravado em blocos: {output_path} ({total_rows} registros)")
+    if quality_rules is not None:
+        write_quarantine(
+            pd.concat(quarantined) if quarantined else rejected.iloc[:0],
+            quarantine_path,
+        )
+    return total_rows
+
+
+def _streaming_schema(chunk: pd.DataFrame) -> pa.Schema:
+    """
+    Deriva o schema Parquet a partir do primeiro bloco processado.
+
+    Colunas totalmente vazias no primeiro bloco têm tipo nulo no Arrow;
+    elas são declaradas como texto para aceitar valores dos blocos seguintes.
+    Colunas categóricas usam índices int32, já que os blocos seguintes podem
+    ter mais categorias que o primeiro.
+    """
+    schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+    for i, field in enumerate(schema):
+        if pa.types.is_null(field.type):
+            schema = schema.set(i, field.with_type(pa.string()))
+        elif pa.types.is_dictionary(field.type):
+            schema = schema.set(i, field.with_type(pa.dictionary(pa.int32(), pa.string())))
+    return schema
 
 
 def convert_brazilian_currency(value: str) -> float:
@@ -331,6 +1012,160 @@ def convert_brazilian_currency(value: str) -> float:
     return result
 
 
+def _currency_text(series: pd.Series) -> tuple[pa.Array, np.ndarray]:
+    """
+    Convert a currency column to a pyarrow string array.
+
+    Returns:
+        Tuple (text, non_string) where non_string flags non-null cells that
+        are not strings (the reference parser raises TypeError for them).
+    """
+    inferred = pd.api.types.infer_dtype(series, skipna=True)
+    if inferred in ("string", "empty"):
+        non_string = np.zeros(len(series), dtype=bool)
+    else:
+        non_string = (series.notna() & ~series.map(type).eq(str)).to_numpy()
+    text = pa.array(
+        series.where(~non_string).to_numpy(dtype=object),
+        type=pa.string(),
+        from_pandas=True,
+    )
+    return text, non_string
+
+
+def _strip_leading_minus(text: pa.Array) -> tuple[pa.Array, pa.Array]:
+    """Remove a leading "-" from each value, returning (text, had_minus)."""
+    has_minus = pc.fill_null(pc.starts_with(text, "-"), False)
+    stripped = pc.utf8_trim_whitespace(pc.utf8_slice_codeunits(text, 1))
+    return pc.if_else(has_minus, stripped, text), has_minus
+
+
+def _parse_currency_uniques(text: pa.Array) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Parse distinct, non-null currency strings with pyarrow compute kernels.
+
+    Returns:
+        Tuple (values, reasons, blank) aligned with the input array.
+    """
+    text = pc.utf8_trim_whitespace(text)
+    blank = pc.equal(text, "").to_numpy(zero_copy_only=False)
+
+    # Leading minus before "R$" ("-R$ 1.234") or after it ("R$ -1.234")
+    text, negative_before = _strip_leading_minus(text)
+    text = pc.utf8_trim_whitespace(pc.replace_substring(text, "R$", ""))
+    text, negative_after = _strip_leading_minus(text)
+    negative = pc.or_(negative_before, negative_after)
+
+    valid_chars = pc.match_substring_regex(text, r"^[\d.,]+$")
+    numeric = pc.replace_substring(pc.replace_substring(text, ".", ""), ",", ".")
+    # Same inputs accepted by float(): "5", "5.", ".5", "5.25"
+    parseable = pc.and_(
+        valid_chars, pc.match_substring_regex(numeric, r"^(\d+\.?\d*|\.\d+)$")
+    )
+    parsed = pc.cast(pc.if_else(parseable, numeric, pa.scalar(None, pa.string())), pa.float64())
+    parsed = pc.if_else(negative, pc.negate(parsed), parsed)
+
+    values = parsed.to_numpy(zero_copy_only=False).astype("float64")
+    values[blank] = 0.0
+    valid_chars = valid_chars.to_numpy(zero_copy_only=False)
+    parseable = parseable.to_numpy(zero_copy_only=False)
+
+    reasons = np.full(len(text), None, dtype=object)
+    reasons[~blank & ~valid_chars] = CURRENCY_INVALID_CHARACTERS
+    reasons[valid_chars & ~parseable] = CURRENCY_NOT_A_NUMBER
+    return values, reasons, blank
+
+
+def _convert_currency_arrow(
+    text: Union[pa.Array, pa.ChunkedArray]
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Convert an Arrow string array of Brazilian currency values.
+
+    The kernels run over the distinct values of the array (dictionary
+    encoding) and the result is broadcast back to the rows by index.
+
+    Returns:
+        Tuple (values, reasons, blank) with one entry per row; reasons is
+        None for valid rows and blank flags null/empty cells (value 0.0).
+    """
+    if isinstance(text, pa.ChunkedArray):
+        text = text.combine_chunks()
+
+    encoded = text.dictionary_encode()
+    unique_values, unique_reasons, unique_blank = _parse_currency_uniques(encoded.dictionary)
+    is_null = pc.is_null(encoded.indices).to_numpy(zero_copy_only=False)
+    indices = pc.fill_null(encoded.indices, 0).to_numpy(zero_copy_only=False)
+
+    if len(unique_values):
+        values = np.where(is_null, 0.0, unique_values[indices])
+        reasons = np.where(is_null, None, unique_reasons[indices])
+        blank = is_null | unique_blank[indices]
+    else:
+        values = np.zeros(len(text), dtype="float64")
+        reasons = np.full(len(text), None, dtype=object)
+        blank = is_null.copy()
+
+    return values, reasons, blank
+
+
+def convert_brazilian_currency_series(series: pd.Series) -> tuple[pd.Series, pd.DataFrame]:
+    """
+    Convert a whole column of Brazilian currency strings to float in one pass.
+
+    Vectorized counterpart of convert_brazilian_currency(): the same rules
+    (optional leading minus before or after "R$", dots as thousand separators,
+    comma as decimal separator, empty/NaN as 0.0) are applied with pyarrow
+    compute kernels instead of a Python call per row. The kernels run over
+    the distinct values of the column and the result is broadcast back to
+    the rows. Invalid cells do not stop the conversion; they become NaN and
+    are returned in a report.
+
+    Args:
+        series: Series with currency strings (e.g., "R$ 1.234,56", "-R$ 19.026").
+
+    Returns:
+        tuple[pd.Series, pd.DataFrame]: The float64 values (same index as the
+            input) and a report of invalid rows indexed like the input, with
+            columns "value" (original cell) and "reason" (one of
+            CURRENCY_INVALID_TYPE, CURRENCY_INVALID_CHARACTERS,
+            CURRENCY_NOT_A_NUMBER).
+
+    Examples:
+        >>> values, invalid = convert_brazilian_currency_series(
+        ...     pd.Series(["R$ 1.234,56", "-R$ 5", "abc"]))
+        >>> values.tolist()
+        [1234.56, -5.0, nan]
+        >>> invalid["reason"].tolist()
+        ['invalid_characters']
+    """
+    text, non_string = _currency_text(series)
+    values, reason, blank = _convert_currency_arrow(text)
+
+    values[non_string] = np.nan
+    reason[non_string] = CURRENCY_INVALID_TYPE
+    blank &= ~non_string
+    invalid_mask = pd.notna(reason)
+    values[invalid_mask] = np.nan
+
+    invalid = pd.DataFrame({
+        "value": series[invalid_mask],
+        "reason": reason[invalid_mask],
+    })
+
+    blank_count = int(blank.sum())
+    if blank_count:
+        logger.warning(f"{blank_count} valores vazios/NaN convertidos para 0.0")
+
+    return pd.Series(values, index=series.index, name=series.name), invalid
+
+
+@lru_cache(maxsize=1)
+def _month_lookup_casefold() -> dict[str, int]:
+    """Return config.MONTH_MAPPING keyed by lower-case abbreviation (built once; do not mutate)."""
+    return {key.lower(): value for key, value in config.MONTH_MAPPING.items()}
+
+
 def convert_month_to_date(
     month_str: str,
     reference_year: int = config.REFERENCE_YEAR
@@ -377,10 +1212,7 @@ def convert_month_to_date(
 
     # If not found, try case-insensitive match
     if month_num is None:
-        for key, value in config.MONTH_MAPPING.items():
-            if key.lower() == month_str.lower():
-                month_num = value
-                break
+        month_num = _month_lookup_casefold().get(month_str.lower())
 
     if month_num is None:
         valid_months = list(config.MONTH_MAPPING.keys())
@@ -399,6 +1231,47 @@ def convert_month_to_date(
     return timestamp
 
 
+def convert_month_series(
+    series: pd.Series,
+    reference_year: int = config.REFERENCE_YEAR
+) -> pd.Series:
+    """
+    Convert a column of Portuguese month abbreviations to datetime64.
+
+    The column is factorized and convert_month_to_date() runs once per
+    distinct abbreviation; the resulting timestamps are broadcast back to
+    the rows through the factorization codes. The cost therefore depends
+    on the number of distinct values (about 12), not on the row count.
+
+    Args:
+        series: Series with month abbreviations (e.g., "Jan", "ago", " Set ").
+        reference_year: Year to use for the dates.
+
+    Returns:
+        pd.Series: datetime64[ns] Series with the same index and name.
+
+    Raises:
+        ValueError: If the column contains NaN/None or an unknown abbreviation.
+        TypeError: If a value is not a string.
+
+    Examples:
+        >>> convert_month_series(pd.Series(["Ago", "Ago", "Dez"]), 2025).tolist()
+        [Timestamp('2025-08-01 00:00:00'), Timestamp('2025-08-01 00:00:00'),
+         Timestamp('2025-12-01 00:00:00')]
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+
+    if (codes == -1).any():
+        logger.warning("Received NaN/None month value")
+        raise ValueError("Month value cannot be NaN or None")
+
+    resolved = pd.DatetimeIndex(
+        [convert_month_to_date(value, reference_year) for value in uniques]
+    ).as_unit("ns")
+
+    return pd.Series(resolved.take(codes), index=series.index, name=series.name)
+
+
 def apply_currency_conversion(df: pd.DataFrame, column: str = config.COLUMN_REALIZADO) -> pd.DataFrame:
     """
     Apply currency conversion to a DataFrame column.
@@ -412,14 +1285,37 @@ def apply_currency_conversion(df: pd.DataFrame, column: str = config.COLUMN_REAL
 
     Raises:
         KeyError: If the specified column does not exist.
-        ValueError: If conversion fails for any value.
+        ValueError: If conversion fails for any value. The message reports
+            every invalid row, not only the first one.
     """
     if column not in df.columns:
         raise KeyError(f"Column '{column}' not found in DataFrame")
 
+    if pd.api.types.is_float_dtype(df[column]):
+        # Already converted (e.g., loaded with the pyarrow CSV engine); empty
+        # values still become 0.0, as with the text path
+        logger.info(f"Column '{column}' is already numeric, skipping conversion")
+        blank_count = int(df[column].isna().sum())
+        if blank_count:
+            logger.warning(f"{blank_count} valores vazios/NaN convertidos para 0.0")
+            df = df.assign(**{column: df[column].fillna(0.0)})
+        return df
+
     logger.info(f"Converting currency values in column: {column}")
-    df = df.copy()
-    df[column] = df[column].apply(convert_brazilian_currency)
+    values, invalid = convert_brazilian_currency_series(df[column])
+    if not invalid.empty:
+        sample = "; ".join(
+            f"linha {idx}: '{row.value}' ({row.reason})"
+            for idx, row in invalid.head(10).iterrows()
+        )
+        raise ValueError(
+            f"Invalid currency values in column '{column}': {len(invalid)} rows. "
+            f"First rows: {sample}"
+        )
+    # assign() devolve um novo DataFrame que só substitui esta coluna; com
+    # copy-on-write ativo (config.PANDAS_COPY_ON_WRITE) as demais colunas
+    # são compartilhadas com o DataFrame de entrada em vez de copiadas
+    df = df.assign(**{column: values})
     logger.info(f"Successfully converted {len(df)} currency values")
     return df
 
@@ -448,8 +1344,8 @@ def apply_month_conversion(
         raise KeyError(f"Column '{column}' not found in DataFrame")
 
     logger.info(f"Converting month values in column: {column}")
-    df = df.copy()
-    df[column] = df[column].apply(lambda x: convert_month_to_date(x, reference_year))
+    # Substitui só esta coluna (ver apply_currency_conversion)
+    df = df.assign(**{column: convert_month_series(df[column], reference_year)})
     logger.info(f"Successfully converted {len(df)} month values")
     return df
 
@@ -24,12 +24,17 @@ except ImportError:
 
 # Reutiliza funções do ai_classifier
 from src.ai_classifier import (
-    get_model,
+    get_backend,
     carregar_dados,
+    colunas_do_mestre,
     GENAI_AVAILABLE,
     API_KEY,
     ARQUIVO_MESTRE,
 )
+from src.ai_classifier import classificar_gasto as _classificar_gasto_ia
+from src.category_engine import CategoryIndex, get_category_index
+from src.master_store import MasterStore, month_partitions
+from src.pre_classifier import PreClassifier
 
 logger = logging.getLogger(__name__)
 
@@ -69,39 +74,35 @@ def trava_seguranca_duplicidade(df_mestre: pd.DataFrame, df_novo: pd.DataFrame)
     print("[OK] Validacao de Mes: OK (Dados novos detectados).")
 
 
-def classificar_gasto(descricao: str, categorias_validas: list) -> str:
+def classificar_gasto(
+    descricao: str,
+    categorias_validas: list,
+    indice: CategoryIndex = None,
+) -> str:
     """
     Classifica um gasto usando IA.
 
+    Usa o mesmo prompt e o mesmo driver do ai_classifier (cota da API e
+    novas tentativas em erros 429/5xx).
+
     Args:
         descricao: Descrição do gasto.
         categorias_validas: Lista de categorias válidas.
+        indice: Índice de categorias. Se informado, a lista do prompt vem do
+            índice (montada uma vez) e a resposta é normalizada para o nome
+            exato da categoria.
 
     Returns:
         Categoria classificada ou "ERRO_IA"/"OUTROS".
     """
-    model = get_model()
-    if model is None:
-        return "ERRO_IA"
-
-    categorias_str = ", ".join(categorias_validas)
-    prompt = f"""
-    Atue como analista. Classifique o gasto abaixo em UMA das categorias existentes.
-    Contexto: [{categorias_str}]
-    Gasto: "{descricao}"
-    Responda apenas a categoria. Use 'OUTROS' se não encaixar.
-    """
-    try:
-        response = model.generate_content(prompt)
-        return response.text.strip()
-    except Exception:
-        return "ERRO_IA"
+    return _classificar_gasto_ia(descricao, categorias_validas, indice=indice)
 
 
 def processar_com_validacao(
     df_mestre: pd.DataFrame,
     df_novo: pd.DataFrame,
-    output_path: Path = None
+    output_path: Path = None,
+    store: MasterStore = None,
 ) -> pd.DataFrame:
     """
     Processa dados com validação e classificação.
@@ -109,7 +110,10 @@ def processar_com_validacao(
     Args:
         df_mestre: DataFrame com dados históricos.
         df_novo: DataFrame com novos dados.
-        output_path: Caminho para salvar resultado.
+        output_path: Caminho para salvar resultado (CSV).
+        store: Mestre particionado. Se informado, só os itens novos são
+            gravados nele e acrescentados ao CSV de output_path, sem
+            regravar o histórico.
 
     Returns:
         DataFrame final com dados concatenados.
@@ -117,12 +121,16 @@ def processar_com_validacao(
     # 1. Validar duplicidade
     trava_seguranca_duplicidade(df_mestre, df_novo)
 
-    # 2. Preparar contexto
+    # 2. Preparar contexto: índice compartilhado do categories.json; as
+    # categorias do histórico só são usadas se o arquivo não existir
     coluna_categoria = 'cc_nome'
     if coluna_categoria in df_mestre.columns:
         categorias = df_mestre[coluna_categoria].dropna().unique().tolist()
     else:
         categorias = ["Despesas Gerais", "Custos"]
+    indice = get_category_index()
+    if not indice:
+        indice = CategoryIndex.from_names(categorias)
 
     # 3. Classificar novos dados
     logger.info(f"Classificando {len(df_novo)} novos itens...")
@@ -130,18 +138,45 @@ def processar_com_validacao(
     if coluna_categoria not in df_novo.columns:
         df_novo[coluna_categoria] = ""
 
-    for i, row in df_novo.iterrows():
-        desc = str(row.get('Descricao', ''))
-        cat = classificar_gasto(desc, categorias)
-        df_novo.at[i, coluna_categoria] = cat
+    descricoes = df_novo.get('Descricao', pd.Series('', index=df_novo.index))
+    descricoes = descricoes.fillna('').astype(str).tolist()
+
+    # Pré-classificação local; só os itens não resolvidos vão para a IA
+    cats = [None] * len(descricoes)
+    if config.PRE_CLASSIFIER_ENABLED:
+        pre = PreClassifier.from_master(df_mestre, indice, col_cat=coluna_categoria)
+        cats = pre.resolve(descricoes)
+        logger.info(
+            f"Pré-classificação local: {pre.stats['resolved']}/{len(descricoes)} itens "
+            f"({pre.hit_rate:.0%}); {pre.stats['resolved']} chamadas à IA evitadas"
+        )
+    pendentes = [i for i, cat in enumerate(cats) if cat is None]
+
+    # Itens pendentes vão para o backend de config.AI_BACKEND (lotes concorrentes na IA)
+    backend = get_backend(indice, categorias_fallback=categorias) if pendentes else None
+    if pendentes and backend is None:
+        for i in pendentes:
+            cats[i] = "ERRO_IA"
+    elif pendentes:
+        previstas, _ = backend.classify_batch([descricoes[i] for i in pendentes])
+        for i, cat in zip(pendentes, previstas):
+            cats[i] = cat
+
+    for desc, cat in zip(descricoes, cats):
         logger.info(f"Item: {desc[:20]}... -> {cat}")
+    df_novo[coluna_categoria] = cats
 
     # 4. Append e retornar
-    df_novo = df_novo.reindex(columns=df_mestre.columns, fill_value='')
+    meses = month_partitions(df_novo)
+    df_novo = df_novo.reindex(columns=colunas_do_mestre(df_mestre, df_novo), fill_value='')
+    if store is not None:
+        store.append(df_novo, meses)
     df_final = pd.concat([df_mestre, df_novo], ignore_index=True)
 
     # 5. Salvar se path fornecido
-    if output_path:
+    if output_path and store is not None:
+        store.export_csv(output_path, new_rows=df_novo)
+    elif output_path:
         df_final.to_csv(output_path, sep=';', index=False, encoding='utf-8')
         logger.info(f"Arquivo salvo em {output_path}")
 
@@ -158,7 +193,8 @@ if __name__ == "__main__":
         format="%(asctime)s - %(levelname)s - %(message)s",
     )
 
-    if not API_KEY:
+    # Sem chave, "auto" usa o classificador offline; "http" não precisa dela
+    if not API_KEY and config.AI_BACKEND.strip().lower() == "gemini":
         print("Erro: GEMINI_API_KEY não configurada.")
         sys.exit(1)
 
@@ -172,7 +208,12 @@ if __name__ == "__main__":
         sys.exit(0)
 
     # Processar com validação
-    df_final = processar_com_validacao(df_mestre, df_novo, ARQUIVO_MESTRE)
+    df_final = processar_com_validacao(
+        df_mestre,
+        df_novo,
+        ARQUIVO_MESTRE if config.NARRATIVE_EXPORT_CSV else None,
+        store=MasterStore(),
+    )
 
     print(f"[OK] SUCESSO: Relatorio atualizado com {len(df_novo)} novos itens.")
 
@@ -0,0 +1,285 @@
+"""
+Regras de Qualidade de Dados e Quarentena para Automação DRE.
+
+Antes, uma única célula de Realizado malformada ou um mês desconhecido
+levantava ValueError e interrompia o main.py depois de o arquivo inteiro
+já ter sido lido. Aqui a validação é declarativa: cada regra avalia uma
+coluna inteira com máscaras booleanas e devolve um código de motivo por
+linha. As linhas reprovadas vão para a quarentena
+(output/quarantine.parquet) e as demais seguem no pipeline.
+
+Regras padrão (na ordem em que são avaliadas):
+    - currency_rule: sintaxe de moeda de Realizado;
+    - month_rule: abreviação de mês presente e conhecida;
+    - required_dimensions_rule: dimensões obrigatórias preenchidas;
+    - duplicate_key_rule: chave (Loja, _key_centro_custo, Mês) repetida.
+
+Cada linha recebe o motivo da primeira regra em que falhou; as regras
+seguintes só avaliam as linhas ainda aprovadas.
+
+Classes:
+    QualityRule: Regra declarativa de qualidade.
+
+Funções:
+    default_quality_rules: Regras padrão configuradas pelo config.
+    apply_quality_rules: Separa as linhas aprovadas das linhas em quarentena.
+    write_quarantine: Grava as linhas em quarentena em Parquet.
+"""
+
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Union
+
+import numpy as np
+import pandas as pd
+
+import config
+from src.data_cleaner import _month_lookup_casefold, convert_brazilian_currency_series
+
+logger = logging.getLogger(__name__)
+
+# Códigos de motivo gravados na quarentena
+REASON_CURRENCY_PREFIX: str = "currency_"  # + motivo de convert_brazilian_currency_series
+REASON_MISSING_MONTH: str = "missing_month"
+REASON_UNKNOWN_MONTH: str = "unknown_month"
+REASON_MISSING_DIMENSION: str = "missing_dimension"
+REASON_DUPLICATE_KEY: str = "duplicate_key"
+
+# Colunas adicionadas às linhas em quarentena
+QUARANTINE_REASON_COLUMN: str = "reason"
+QUARANTINE_RULE_COLUMNS: str = "reason_columns"
+QUARANTINE_ROW_COLUMN: str = "row"
+
+
+@dataclass(frozen=True)
+class QualityRule:
+    """
+    Regra declarativa de qualidade de dados.
+
+    Attributes:
+        name: Nome da regra (usado nos logs).
+        columns: Colunas avaliadas pela regra.
+        check: Função que recebe o DataFrame e devolve uma Series de códigos
+            de motivo alinhada ao índice (ausente nas linhas aprovadas).
+    """
+
+    name: str
+    columns: tuple[str, ...]
+    check: Callable[[pd.DataFrame], pd.Series]
+
+
+def _no_failures(df: pd.DataFrame) -> pd.Series:
+    return pd.Series(None, index=df.index, dtype=object)
+
+
+def currency_rule(column: str = config.COLUMN_REALIZADO) -> QualityRule:
+    """
+    Regra de sintaxe de moeda brasileira (ex: "R$ 1.234,56", "-R$ 19.026").
+
+    Os motivos são os de convert_brazilian_currency_series() com o prefixo
+    "currency_" (ex: "currency_invalid_characters"). Colunas já numéricas
+    são aprovadas: o motor pyarrow só converte a coluna na leitura quando
+    todos os valores são válidos, senão ela chega como texto.
+    """
+
+    def check(df: pd.DataFrame) -> pd.Series:
+        reasons = _no_failures(df)
+        if column not in df.columns or pd.api.types.is_float_dtype(df[column]):
+            return reasons
+        _, invalid = convert_brazilian_currency_series(df[column])
+        reasons.loc[invalid.index] = REASON_CURRENCY_PREFIX + invalid["reason"]
+        return reasons
+
+    return QualityRule("currency", (column,), check)
+
+
+def month_rule(column: str = config.COLUMN_MES) -> QualityRule:
+    """
+    Regra de domínio do mês: abreviação de config.MONTH_MAPPING
+    (sem diferenciar maiúsculas e ignorando espaços nas pontas).
+
+    Cada valor distinto é verificado uma vez (pd.factorize).
+    """
+
+    def check(df: pd.DataFrame) -> pd.Series:
+        if column not in df.columns:
+            return _no_failures(df)
+
+        codes, uniques = pd.factorize(df[column], use_na_sentinel=True)
+        lookup = _month_lookup_casefold()
+        known = np.array(
+            [isinstance(value, str) and value.strip().lower() in lookup for value in uniques],
+            dtype=bool,
+        )
+        missing = codes == -1
+        unknown = np.zeros(len(df), dtype=bool)
+        unknown[~missing] = ~known[codes[~missing]]
+
+        reasons = np.full(len(df), None, dtype=object)
+        reasons[missing] = REASON_MISSING_MONTH
+        reasons[unknown] = REASON_UNKNOWN_MONTH
+        return pd.Series(reasons, index=df.index)
+
+    return QualityRule("month", (column,), check)
+
+
+def required_dimensions_rule(columns: list[str] | None = None) -> QualityRule:
+    """
+    Regra de dimensões obrigatórias: nenhuma das colunas pode estar vazia.
+
+    Args:
+        columns: Colunas obrigatórias. Se None, usa config.QUALITY_REQUIRED_DIMENSIONS.
+    """
+    columns = tuple(columns if columns is not None else config.QUALITY_REQUIRED_DIMENSIONS)
+
+    def check(df: pd.DataFrame) -> pd.Series:
+        present = [col for col in columns if col in df.columns]
+        reasons = _no_failures(df)
+        if not present:
+            return reasons
+        values = df[present]
+        missing = values.isna().any(axis=1)
+        # Textos só com espaços também contam como vazios
+        for col in present:
+            if not pd.api.types.is_numeric_dtype(values[col]):
+                missing |= values[col].astype("string").str.strip().eq("").fillna(False)
+        reasons[missing] = REASON_MISSING_DIMENSION
+        return reasons
+
+    return QualityRule("required_dimensions", columns, check)
+
+
+def duplicate_key_rule(columns: list[str] | None = None) -> QualityRule:
+    """
+    Regra de chave duplicada: a primeira ocorrência é aprovada e as demais
+    vão para a quarentena.
+
+    A regra guarda o hash das chaves já vistas, então uma mesma instância
+    aplicada a blocos sucessivos (streaming) também detecta repetições
+    entre blocos. Se alguma coluna da chave estiver ausente, a regra não
+    reprova nenhuma linha.
+
+    Args:
+        columns: Colunas da chave. Se None, usa config.QUALITY_DUPLICATE_KEY.
+    """
+    columns = tuple(columns if columns is not None else config.QUALITY_DUPLICATE_KEY)
+    seen: list[np.ndarray] = []
+
+    def check(df: pd.DataFrame) -> pd.Series:
+        reasons = _no_failures(df)
+        if any(col not in df.columns for col in columns):
+            return reasons
+
+        hashes = pd.util.hash_pandas_object(df[list(columns)], index=False).to_numpy()
+        duplicated = pd.Series(hashes).duplicated().to_numpy()
+        if seen:
+            duplicated |= np.isin(hashes, np.concatenate(seen))
+        seen.append(np.unique(hashes))
+
+        reasons[duplicated] = REASON_DUPLICATE_KEY
+        return reasons
+
+    return QualityRule("duplicate_key", columns, check)
+
+
+def default_quality_rules() -> list[QualityRule]:
+    """
+    Regras padrão, configuradas por config.QUALITY_REQUIRED_DIMENSIONS e
+    config.QUALITY_DUPLICATE_KEY.
+
+    Cada chamada devolve instâncias novas (a regra de chave duplicada
+    guarda as chaves já vistas); reutilize a mesma lista entre os blocos
+    de um mesmo arquivo.
+    """
+    return [
+        currency_rule(),
+        month_rule(),
+        required_dimensions_rule(),
+        duplicate_key_rule(),
+    ]
+
+
+def apply_quality_rules(
+    df: pd.DataFrame,
+    rules: list[QualityRule] | None = None,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Avalia as regras e separa as linhas aprovadas das linhas em quarentena.
+
+    Args:
+        df: DataFrame DRE ainda não convertido (Realizado e Mês como texto).
+        rules: Regras a avaliar, em ordem. Se None, usa default_quality_rules().
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame]: As linhas aprovadas (o próprio df
+            se nenhuma falhar) e as linhas em quarentena com os valores
+            originais e as colunas "reason" (código do motivo) e
+            "reason_columns" (colunas avaliadas pela regra).
+
+    Exemplo:
+        >>> clean, quarantined = apply_quality_rules(df)
+        >>> quarantined["reason"].value_counts()
+        currency_invalid_characters    1
+    """
+    rules = default_quality_rules() if rules is None else rules
+    reason = pd.Series(None, index=df.index, dtype=object)
+    reason_columns = pd.Series(None, index=df.index, dtype=object)
+
+    for rule in rules:
+        pending = reason.isna()
+        if not pending.any():
+            break
+        subset = df if pending.all() else df.loc[pending]
+        found = rule.check(subset)
+        failed = found.notna()
+        if failed.any():
+            rows = found.index[failed]
+            reason.loc[rows] = found[failed]
+            reason_columns.loc[rows] = ", ".join(rule.columns)
+
+    bad = reason.notna()
+    quarantined = df.loc[bad].assign(**{
+        QUARANTINE_REASON_COLUMN: reason[bad],
+        QUARANTINE_RULE_COLUMNS: reason_columns[bad],
+    })
+    if not bad.any():
+        return df, quarantined
+
+    counts = ", ".join(f"{code}={n}" for code, n in reason[bad].value_counts().items())
+    logger.warning(f"{int(bad.sum())} registros enviados para a quarentena ({counts})")
+    return df.loc[~bad], quarantined
+
+
+def write_quarantine(
+    quarantined: pd.DataFrame,
+    output_path: Union[str, Path, None] = None,
+) -> Path:
+    """
+    Grava as linhas em quarentena em Parquet.
+
+    O arquivo é sempre gravado (vazio se não houver linhas), para não
+    deixar a quarentena de uma execução anterior no lugar. Os valores são
+    gravados como texto, como vieram do arquivo, e o índice vira a coluna
+    "row" (linha de dados no arquivo de origem, a partir de 0).
+
+    Args:
+        quarantined: Linhas em quarentena (ver apply_quality_rules).
+        output_path: Caminho do Parquet. Se None, usa config.QUARANTINE_PARQUET_PATH.
+
+    Returns:
+        Path: Caminho do arquivo gravado.
+    """
+    output_path = Path(output_path) if output_path else config.QUARANTINE_PARQUET_PATH
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    table = quarantined.rename_axis(QUARANTINE_ROW_COLUMN).reset_index()
+    row = table[QUARANTINE_ROW_COLUMN].astype("int64")
+    table = table.astype("string").assign(**{QUARANTINE_ROW_COLUMN: row})
+
+    temp_path = output_path.with_name(output_path.name + ".tmp")
+    table.to_parquet(temp_path, engine="pyarrow", index=False)
+    os.replace(temp_path, output_path)
+    logger.info(f"Quarentena gravada: {output_path} ({len(table)} registros)")
+    return output_path
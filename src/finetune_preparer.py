@@ -24,6 +24,8 @@ except ImportError:
     sys.path.insert(0, str(Path(__file__).parent.parent))
     import config
 
+from src.csv_dialect import read_csv_sniffed, sniff_csv_dialect
+
 
 logger = logging.getLogger(__name__)
 
@@ -75,29 +77,23 @@ class FineTuneDatasetBuilder:
                 f"Arquivo de narrativas não encontrado: {self.narrative_path}"
             )
         
-        # Tenta diferentes encodings e separadores
-        for encoding in ['utf-8-sig', 'utf-8', 'latin-1']:
-            for sep in [';', ',']:
-                try:
-                    df = pd.read_csv(
-                        self.narrative_path,
-                        encoding=encoding,
-                        sep=sep,
-                        on_bad_lines='skip',  # Ignora linhas corrompidas
-                    )
-                    if len(df.columns) > 1:
-                        self.narratives_df = df
-                        logger.info(
-                            f"Narrativas carregadas: {len(df)} registros "
-                            f"(encoding={encoding}, sep='{sep}')"
-                        )
-                        return df
-                except Exception:
-                    continue
-        
-        raise ValueError(
-            f"Não foi possível carregar narrativas de {self.narrative_path}"
+        # Encoding e separador detectados uma vez, a partir do início do arquivo
+        dialect = sniff_csv_dialect(self.narrative_path)
+        df = read_csv_sniffed(
+            self.narrative_path,
+            on_bad_lines='skip',  # Ignora linhas corrompidas
+        )
+        if len(df.columns) <= 1:
+            raise ValueError(
+                f"Não foi possível carregar narrativas de {self.narrative_path}"
+            )
+
+        self.narratives_df = df
+        logger.info(
+            f"Narrativas carregadas: {len(df)} registros "
+            f"(encoding={dialect.encoding}, sep='{dialect.sep}')"
         )
+        return df
     
     def load_categories(self) -> dict[str, list[str]]:
         """
@@ -212,7 +208,7 @@ class FineTuneDatasetBuilder:
         if not self.qa_pairs:
             self.create_qa_pairs()
         
-        output_path = output_path or config.OUTPUT_DIR / "finetune_dataset.jsonl"
+        output_path = output_path or config.FINETUNE_JSONL_PATH
         output_path.parent.mkdir(parents=True, exist_ok=True)
         
         with open(output_path, 'w', encoding='utf-8') as f:
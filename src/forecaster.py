@@ -135,7 +135,7 @@ class DREForecaster:
             df = df[df["cc_nome"] == categoria]
         
         # Agregar por mes
-        monthly = df.groupby(mes_col)[valor_col].sum().reset_index()
+        monthly = df.groupby(mes_col, observed=True)[valor_col].sum().reset_index()
         monthly.columns = ["ds", "y"]
         monthly["ds"] = pd.to_datetime(monthly["ds"])
         monthly = monthly.sort_values("ds")
@@ -270,7 +270,7 @@ class DREForecaster:
         """Retorna lista de grupos DRE disponiveis."""
         if self.df is None:
             self.load_data()
-        grupos = [g for g in self.df["Nome Grupo"].unique().tolist() if g is not None]
+        grupos = self.df["Nome Grupo"].dropna().unique().tolist()
         return sorted(grupos)
 
     def forecast_all_grupos(
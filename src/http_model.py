@@ -0,0 +1,73 @@
+"""
+Cliente HTTP do Endpoint de Geração do Gemini.
+
+O HttpModel chama a rota REST generateContent (a API do Gemini ou o
+servidor local de src/stub_server.py) e tem o mesmo generate_content() do
+SDK, então pode ser usado pelo ClassificationDriver e pelo GeminiBackend
+(config.AI_BACKEND = "http") no lugar do modelo do google-generativeai:
+
+    POST /v1beta/models/{modelo}:generateContent
+    {"contents": [{"parts": [{"text": "prompt"}]}]}
+
+Classes:
+    HttpModel: Cliente de um endpoint generateContent.
+    GenerateResponse: Resposta de generate_content().
+"""
+
+import json
+import sys
+import urllib.request
+from dataclasses import dataclass
+from pathlib import Path
+
+try:
+    import config
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    import config
+
+
+@dataclass(frozen=True)
+class GenerateResponse:
+    """Resposta de generate_content() (mesmo atributo text do SDK)."""
+
+    text: str
+
+
+class HttpModel:
+    """
+    Cliente de um endpoint generateContent (servidor local ou API REST do Gemini).
+
+    Erros HTTP são levantados como urllib.error.HTTPError, cujo atributo
+    code permite ao ClassificationDriver tentar de novo em 429/5xx.
+    """
+
+    def __init__(
+        self,
+        base_url: str | None = None,
+        model: str = "gemini-2.0-flash-001",
+        api_key: str | None = None,
+        timeout: float | None = None,
+    ) -> None:
+        """
+        Args:
+            base_url: URL base. Se None, usa config.AI_HTTP_URL.
+            model: Nome do modelo na rota.
+            api_key: Chave enviada no parâmetro key (desnecessária no servidor local).
+            timeout: Segundos por requisição. Se None, usa config.AI_HTTP_TIMEOUT_SECONDS.
+        """
+        base_url = (base_url or config.AI_HTTP_URL).rstrip("/")
+        self.url = f"{base_url}/v1beta/models/{model}:generateContent"
+        if api_key:
+            self.url += f"?key={api_key}"
+        self.timeout = config.AI_HTTP_TIMEOUT_SECONDS if timeout is None else timeout
+
+    def generate_content(self, prompt: str) -> GenerateResponse:
+        body = json.dumps({"contents": [{"parts": [{"text": prompt}]}]}).encode("utf-8")
+        request = urllib.request.Request(
+            self.url, data=body, headers={"Content-Type": "application/json"}, method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            payload = json.loads(response.read())
+        parts = payload["candidates"][0]["content"]["parts"]
+        return GenerateResponse("".join(part.get("text", "") for part in parts))
@@ -0,0 +1,381 @@
+"""
+Relatório Mestre em Dataset Parquet Particionado por Mês.
+
+O relatorio_narrativo_ia.csv era lido inteiro, concatenado com os itens
+novos e regravado inteiro a cada classificação: o custo de cada execução
+crescia com todo o histórico do projeto. Agora o mestre é um dataset
+Parquet particionado por mês, no estilo Hive:
+
+    output/relatorio_narrativo/particao_mes=2025-04/<ns>-<chave>.parquet
+
+Cada classificação só acrescenta arquivos novos (um por mês presente nos
+itens novos), sem reescrever os existentes. O mês vem da coluna Mês
+(config.COLUMN_MES) ou, nos lançamentos da entrada.csv, da coluna Data;
+registros sem data vão para particao_mes=SEM_MES.
+
+Com uma chave (ex: o identificador da execução do classificador, guardado
+no checkpoint), o acréscimo é idempotente: os arquivos levam a chave no
+nome e um mês que já tem a chave não é gravado de novo, então repetir uma
+execução interrompida não duplica linhas.
+compact() junta os arquivos pequenos de cada mês em um só, guardando as
+chaves dos arquivos juntados nos metadados do Parquet.
+
+O CSV continua disponível para quem o abre no Excel (e para o dashboard,
+o classificador offline e o fine-tuning): export_csv() acrescenta ao CSV
+só as linhas novas e o regrava inteiro apenas quando ele não existe, o
+cabeçalho mudou ou o número de linhas não bate com o do dataset.
+
+Classes:
+    MasterStore: Lê, acrescenta e exporta o relatório mestre.
+
+Funções:
+    month_partitions: Partição (AAAA-MM) de cada linha de um DataFrame.
+"""
+
+import csv
+import logging
+import os
+import shutil
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Iterator, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+try:
+    import config
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    import config
+
+from src.csv_dialect import read_csv_sniffed
+
+logger = logging.getLogger(__name__)
+
+# Partição dos registros sem mês reconhecível
+UNKNOWN_MONTH: str = "SEM_MES"
+
+# Metadado do Parquet com as chaves dos arquivos juntados por compact()
+_KEYS_METADATA: bytes = b"master_store_keys"
+
+# Colunas de data e seus formatos, em ordem de preferência
+_DATE_COLUMNS: list[tuple[str, str]] = [
+    (config.COLUMN_MES, "ISO8601"),  # 2025-04-01 (relatório gerado pelo main.py)
+    ("Data", "%d/%m/%Y"),  # 15/01/2026 (entrada.csv)
+]
+
+
+def month_partitions(df: pd.DataFrame) -> pd.Series:
+    """
+    Partição de cada linha: mês no formato AAAA-MM, ou UNKNOWN_MONTH.
+
+    Args:
+        df: Registros do mestre ou da entrada.csv.
+
+    Returns:
+        pd.Series de strings alinhada a df.
+    """
+    months = pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns]")
+    for column, date_format in _DATE_COLUMNS:
+        if column in df.columns:
+            parsed = pd.to_datetime(
+                df[column].astype(str).str.strip(), format=date_format, errors="coerce"
+            )
+            months = months.fillna(parsed)
+    return months.dt.strftime("%Y-%m").fillna(UNKNOWN_MONTH)
+
+
+def _file_keys(path: Path) -> set[str]:
+    """Chaves de um arquivo: a do nome (<ns>-<chave>) e as juntadas por compact()."""
+    keys = {path.stem.split("-", 1)[-1]}
+    metadata = pq.read_schema(path).metadata or {}
+    keys.update(metadata.get(_KEYS_METADATA, b"").decode("utf-8").split())
+    return keys
+
+
+def _text_as_string(df: pd.DataFrame) -> pd.DataFrame:
+    """Colunas de texto como string: valores mistos (ex: "" e números) não quebram o Parquet."""
+    for column in df.columns[df.dtypes == object]:
+        df[column] = df[column].astype("string")
+    return df
+
+
+class MasterStore:
+    """
+    Relatório mestre como dataset Parquet particionado por mês.
+
+    Attributes:
+        dataset_dir: Diretório do dataset.
+
+    Exemplo:
+        >>> store = MasterStore()
+        >>> store.append(df_classificados)  # Só os itens novos
+        >>> store.export_csv(new_rows=df_classificados)
+        >>> df_mestre = store.read()
+    """
+
+    def __init__(self, dataset_dir: Union[str, Path, None] = None) -> None:
+        """
+        Args:
+            dataset_dir: Diretório do dataset. Se None, usa config.NARRATIVE_DATASET_DIR.
+        """
+        self.dataset_dir = Path(dataset_dir) if dataset_dir else config.NARRATIVE_DATASET_DIR
+
+    def exists(self) -> bool:
+        """Se o dataset já foi criado (mesmo que vazio)."""
+        return self.dataset_dir.is_dir()
+
+    def _files(self) -> list[Path]:
+        """Arquivos do dataset na ordem em que foram gravados (e, em cada gravação, por mês)."""
+        if not self.exists():
+            return []
+        return sorted(self.dataset_dir.glob("*/*.parquet"), key=lambda p: (p.name, p.parent.name))
+
+    def months(self) -> list[str]:
+        """Partições (AAAA-MM) existentes, sem ler os arquivos."""
+        if not self.exists():
+            return []
+        prefix = f"{config.NARRATIVE_PARTITION_COLUMN}="
+        return sorted(
+            p.name[len(prefix):] for p in self.dataset_dir.glob(f"{prefix}*")
+            if p.is_dir() and any(p.glob("*.parquet"))
+        )
+
+    def columns(self) -> list[str]:
+        """Colunas do mestre, na ordem do primeiro arquivo (sem ler os dados)."""
+        names: list[str] = []
+        for path in self._files():
+            names.extend(n for n in pq.read_schema(path).names if n not in names)
+        return names
+
+    def __len__(self) -> int:
+        return sum(pq.ParquetFile(path).metadata.num_rows for path in self._files())
+
+    def _read_files(self, columns: list[str] | None = None) -> Iterator[pd.DataFrame]:
+        for path in self._files():
+            if columns is None:
+                yield pd.read_parquet(path, engine="pyarrow")
+            else:
+                available = set(pq.read_schema(path).names)
+                yield pd.read_parquet(
+                    path, engine="pyarrow", columns=[c for c in columns if c in available]
+                )
+
+    def read(self, columns: list[str] | None = None) -> pd.DataFrame:
+        """
+        Lê o mestre inteiro (ou só algumas colunas) como um DataFrame.
+
+        Args:
+            columns: Colunas a ler. Se None, todas.
+
+        Returns:
+            pd.DataFrame com os registros na ordem em que foram gravados
+            (dentro de cada gravação, por mês).
+        """
+        columns_out = self.columns() if columns is None else list(columns)
+        frames = [df for df in self._read_files(columns) if len(df)]
+        if not frames:
+            return pd.DataFrame(columns=columns_out)
+        return pd.concat(frames, ignore_index=True).reindex(columns=columns_out)
+
+    def _write_partitions(
+        self,
+        df: pd.DataFrame,
+        dataset_dir: Path,
+        months: pd.Series,
+        key: str | None = None,
+    ) -> list[Path]:
+        """
+        Grava um arquivo novo por mês (arquivo temporário + os.replace).
+
+        Com key, os meses que já têm um arquivo com a chave são pulados e os
+        que faltam (de uma gravação interrompida) usam o mesmo nome.
+        """
+        df = _text_as_string(df.reset_index(drop=True))
+        months = pd.Series(months.to_numpy(), index=df.index)
+
+        stamp = f"{time.time_ns()}-{key or uuid.uuid4().hex[:8]}"
+        if key:
+            previous = sorted(dataset_dir.glob(f"*/*-{key}.parquet"))
+            if previous:
+                stamp = previous[0].stem
+        written = []
+        for month, part in df.groupby(months, sort=True):
+            month_dir = dataset_dir / f"{config.NARRATIVE_PARTITION_COLUMN}={month}"
+            if key and any(key in _file_keys(path) for path in month_dir.glob("*.parquet")):
+                continue
+            target = month_dir / f"{stamp}.parquet"
+            target.parent.mkdir(parents=True, exist_ok=True)
+            temp = target.with_name(f".{target.name}.tmp")
+            part.to_parquet(temp, engine="pyarrow", index=False)
+            os.replace(temp, target)
+            written.append(target)
+        return written
+
+    def append(
+        self,
+        df: pd.DataFrame,
+        months: pd.Series | None = None,
+        key: str | None = None,
+    ) -> list[Path]:
+        """
+        Acrescenta registros ao mestre, sem reescrever os arquivos existentes.
+
+        Args:
+            df: Registros novos.
+            months: Partição de cada linha. Se None, month_partitions(df).
+            key: Identificador dos registros (ex: a execução do classificador). Os
+                meses já gravados com a mesma chave não são gravados de novo.
+
+        Returns:
+            Arquivos gravados (um por mês; só os que faltavam, com key).
+        """
+        self.dataset_dir.mkdir(parents=True, exist_ok=True)
+        if df.empty:
+            return []
+        months = month_partitions(df) if months is None else months
+        written = self._write_partitions(df, self.dataset_dir, months, key)
+        if key and not written:
+            logger.info(f"Registros da chave {key} já estão em {self.dataset_dir}; nada acrescentado")
+        else:
+            logger.info(f"{len(df)} registros acrescentados a {self.dataset_dir} ({len(written)} meses)")
+        return written
+
+    def compact(self, min_files: int | None = None) -> list[str]:
+        """
+        Junta em um arquivo só os meses com muitos arquivos pequenos.
+
+        Cada mês compactado é montado em um diretório temporário e troca de
+        lugar com o atual, como em replace(). O arquivo novo mantém a ordem
+        das linhas do mês e guarda as chaves dos arquivos juntados, então
+        append() com uma dessas chaves continua sem efeito.
+
+        Args:
+            min_files: Arquivos a partir dos quais o mês é compactado. Se
+                None, usa config.NARRATIVE_COMPACT_MIN_FILES.
+
+        Returns:
+            Meses (AAAA-MM) compactados.
+        """
+        min_files = max(2, min_files or config.NARRATIVE_COMPACT_MIN_FILES)
+        work = self.dataset_dir.with_name(f"{self.dataset_dir.name}.compact")
+        prefix = f"{config.NARRATIVE_PARTITION_COLUMN}="
+        compacted = []
+        for month_dir in sorted(self.dataset_dir.glob(f"{prefix}*")):
+            files = sorted(month_dir.glob("*.parquet"), key=lambda p: p.name)
+            if len(files) < min_files:
+                continue
+            keys = sorted(set().union(*(_file_keys(path) for path in files)))
+            df = pd.concat(
+                [pd.read_parquet(path, engine="pyarrow") for path in files], ignore_index=True
+            )
+            table = pa.Table.from_pandas(_text_as_string(df), preserve_index=False)
+            metadata = {**(table.schema.metadata or {}), _KEYS_METADATA: " ".join(keys).encode("utf-8")}
+
+            shutil.rmtree(work, ignore_errors=True)
+            staging, previous = work / "novo", work / "anterior"
+            staging.mkdir(parents=True)
+            pq.write_table(table.replace_schema_metadata(metadata), staging / files[0].name)
+            os.replace(month_dir, previous)
+            os.replace(staging, month_dir)
+            shutil.rmtree(work, ignore_errors=True)
+            compacted.append(month_dir.name[len(prefix):])
+
+        if compacted:
+            logger.info(f"Mestre compactado: {len(compacted)} meses em {self.dataset_dir}")
+        return compacted
+
+    def replace(self, df: pd.DataFrame) -> None:
+        """
+        Substitui o mestre inteiro (ex: relatório regenerado pelo main.py).
+
+        O dataset novo é montado em um diretório temporário e troca de lugar
+        com o atual só no fim.
+        """
+        staging = self.dataset_dir.with_name(f"{self.dataset_dir.name}.tmp")
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir(parents=True)
+        if not df.empty:
+            self._write_partitions(df, staging, month_partitions(df))
+
+        previous = self.dataset_dir.with_name(f"{self.dataset_dir.name}.old")
+        shutil.rmtree(previous, ignore_errors=True)
+        if self.exists():
+            os.replace(self.dataset_dir, previous)
+        os.replace(staging, self.dataset_dir)
+        shutil.rmtree(previous, ignore_errors=True)
+        logger.info(f"Mestre regravado em {self.dataset_dir} ({len(df)} registros)")
+
+    def import_csv(self, csv_path: Union[str, Path, None] = None) -> int:
+        """
+        Cria o dataset a partir do CSV mestre (migração única).
+
+        Args:
+            csv_path: Se None, usa config.NARRATIVE_CSV_PATH.
+
+        Returns:
+            Registros importados.
+        """
+        csv_path = Path(csv_path) if csv_path else config.NARRATIVE_CSV_PATH
+        df = read_csv_sniffed(csv_path)
+        self.replace(df)
+        return len(df)
+
+    def export_csv(
+        self,
+        csv_path: Union[str, Path, None] = None,
+        new_rows: pd.DataFrame | None = None,
+    ) -> Path:
+        """
+        Exporta o mestre para CSV (UTF-8 com BOM e config.CSV_SEPARATOR, para o Excel).
+
+        Com new_rows (os registros recém-acrescentados por append()), as
+        linhas são só acrescentadas ao CSV existente, se o cabeçalho dele
+        for igual às colunas de new_rows e o CSV tiver as linhas do dataset
+        sem as novas; se já tiver todas (exportação repetida após uma
+        falha), nada é gravado. Caso contrário, o CSV é regravado a partir
+        do dataset inteiro (arquivo temporário + os.replace).
+
+        Args:
+            csv_path: Se None, usa config.NARRATIVE_CSV_PATH.
+            new_rows: Registros novos, já gravados no dataset.
+
+        Returns:
+            Caminho do CSV.
+        """
+        csv_path = Path(csv_path) if csv_path else config.NARRATIVE_CSV_PATH
+        sep = config.CSV_SEPARATOR
+
+        if new_rows is not None and csv_path.exists():
+            with open(csv_path, encoding="utf-8-sig", newline="") as f:
+                reader = csv.reader(f, delimiter=sep)
+                header = next(reader, [])
+                csv_rows = sum(1 for row in reader if row)
+            if header == [str(c) for c in new_rows.columns]:
+                total = len(self)
+                if csv_rows == total:
+                    logger.info(f"{csv_path} já tem as {len(new_rows)} linhas novas")
+                    return csv_path
+                if csv_rows == total - len(new_rows):
+                    with open(csv_path, "a", encoding="utf-8", newline="") as f:
+                        new_rows.to_csv(f, sep=sep, index=False, header=False)
+                    logger.info(f"{len(new_rows)} linhas acrescentadas a {csv_path}")
+                    return csv_path
+                logger.warning(
+                    f"{csv_path} tem {csv_rows} linhas e o mestre {total}; regravando o CSV"
+                )
+
+        columns = self.columns()
+        temp = csv_path.with_name(f"{csv_path.name}.tmp")
+        csv_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(temp, "w", encoding="utf-8-sig", newline="") as f:
+            pd.DataFrame(columns=columns).to_csv(f, sep=sep, index=False)
+            for df in self._read_files():
+                df.reindex(columns=columns).to_csv(f, sep=sep, index=False, header=False)
+        os.replace(temp, csv_path)
+        logger.info(f"Mestre exportado para {csv_path}")
+        return csv_path
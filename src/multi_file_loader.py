@@ -0,0 +1,349 @@
+"""
+Ingestão Paralela de Múltiplos Exports DRE.
+
+Recebemos um export DRE por ano e por grupo de empresas. Este módulo
+resolve a lista de arquivos de entrada (arquivos, diretórios ou padrões
+glob), carrega e limpa cada export em um pool de processos e grava o
+resultado em um único dataset Parquet particionado no estilo Hive
+(linhas reprovadas pelas regras de qualidade vão para a quarentena):
+
+    output/dre_dataset/Ano=2025/GrupoEmpresa=Grupo%20J%2B/<arquivo>.parquet
+
+O ano de cada export vem da linha "Ano Txt" do próprio preâmbulo (e não de
+config.REFERENCE_YEAR, usado apenas como fallback) e o grupo de empresas da
+linha "GrupoEmpresa".
+
+Funções:
+    resolve_input_paths: Expande arquivos, diretórios e globs em uma lista de exports.
+    ingest_dre_exports: Processa os exports em paralelo e monta o dataset particionado.
+    read_partitioned_dataset: Lê o dataset particionado como um único DataFrame.
+    write_dataset_parquet: Copia o dataset para um único Parquet, um row group por vez.
+"""
+
+import glob
+import hashlib
+import logging
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+from typing import Iterable, Union
+from urllib.parse import quote, unquote
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import config
+from src.data_cleaner import (
+    apply_currency_conversion,
+    apply_dimension_categoricals,
+    apply_month_conversion,
+    load_dre_file,
+    read_dre_preamble,
+    stream_dre_csv_to_parquet,
+)
+from src.data_quality import QUARANTINE_ROW_COLUMN, apply_quality_rules, write_quarantine
+
+logger = logging.getLogger(__name__)
+
+# Chaves do preâmbulo dos exports
+PREAMBLE_YEAR_KEY: str = "Ano Txt"
+PREAMBLE_GROUP_KEY: str = "GrupoEmpresa"
+
+# Partição usada quando o export não informa o grupo de empresas
+UNKNOWN_GROUP: str = "SEM_GRUPO"
+
+# Coluna da quarentena com o nome do export de origem
+QUARANTINE_SOURCE_COLUMN: str = "source_file"
+
+
+def resolve_input_paths(inputs: Iterable[Union[str, Path]]) -> list[Path]:
+    """
+    Expande a especificação de entrada em uma lista de exports DRE.
+
+    Cada item pode ser um arquivo, um diretório (todos os arquivos que casam
+    com config.INPUT_FILE_PATTERNS, sem recursão) ou um padrão glob
+    (ex: "exports/DRE_*.csv").
+
+    Args:
+        inputs: Arquivos, diretórios ou padrões glob.
+
+    Returns:
+        list[Path]: Arquivos encontrados, sem repetição e em ordem.
+
+    Raises:
+        FileNotFoundError: Se algum item não corresponder a nenhum arquivo.
+    """
+    paths: list[Path] = []
+    for item in inputs:
+        item_path = Path(item)
+        if item_path.is_dir():
+            matches = sorted(
+                path
+                for pattern in config.INPUT_FILE_PATTERNS
+                for path in item_path.glob(pattern)
+                if path.is_file()
+            )
+        elif item_path.is_file():
+            matches = [item_path]
+        else:
+            matches = sorted(Path(p) for p in glob.glob(str(item)) if Path(p).is_file())
+
+        if not matches:
+            raise FileNotFoundError(f"Nenhum arquivo DRE encontrado em: {item}")
+        paths.extend(matches)
+
+    # dict.fromkeys remove repetidos preservando a ordem
+    return list(dict.fromkeys(path.resolve() for path in paths))
+
+
+def _export_year(preamble: dict[str, str], file_path: Path) -> int:
+    """Ano do export a partir do preâmbulo (fallback: config.REFERENCE_YEAR)."""
+    value = preamble.get(PREAMBLE_YEAR_KEY, "")
+    try:
+        return int(float(value))
+    except ValueError:
+        logger.warning(
+            f"'{PREAMBLE_YEAR_KEY}' ausente ou inválido em {file_path.name}; "
+            f"usando config.REFERENCE_YEAR={config.REFERENCE_YEAR}"
+        )
+        return config.REFERENCE_YEAR
+
+
+def _partition_file(dataset_dir: Path, year: int, group: str, file_path: Path) -> Path:
+    """
+    Caminho do arquivo Parquet de um export dentro do dataset.
+
+    O nome inclui um hash curto do caminho de origem para que exports com o
+    mesmo nome em diretórios diferentes não se sobrescrevam.
+    """
+    digest = hashlib.sha1(str(file_path).encode("utf-8")).hexdigest()[:8]
+    return (
+        dataset_dir
+        / f"{config.COLUMN_ANO}={year}"
+        / f"{config.COLUMN_GRUPO_EMPRESA}={quote(group, safe='')}"
+        / f"{file_path.stem}-{digest}.parquet"
+    )
+
+
+def _ingest_export(
+    file_path: Path, dataset_dir: Path
+) -> tuple[Path, int, str, int, pd.DataFrame]:
+    """
+    Carrega, valida, limpa e grava um export no dataset (executado nos workers).
+
+    Linhas reprovadas pelas regras de src.data_quality não interrompem o
+    export: são devolvidas para a quarentena.
+
+    Returns:
+        Tupla (arquivo de origem, ano, grupo de empresas, registros gravados,
+        linhas em quarentena).
+    """
+    preamble = read_dre_preamble(file_path)
+    year = _export_year(preamble, file_path)
+    group = preamble.get(PREAMBLE_GROUP_KEY) or UNKNOWN_GROUP
+    target = _partition_file(dataset_dir, year, group, file_path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+
+    if config.CSV_STREAMING and file_path.suffix.lower() == ".csv":
+        # Quarentena temporária fora do dataset, lida de volta logo em seguida
+        quarantine_path = dataset_dir.with_name(f"{dataset_dir.name}.{target.stem}.quarantine")
+        try:
+            rows = stream_dre_csv_to_parquet(
+                file_path, target, reference_year=year, quarantine_path=quarantine_path
+            )
+            quarantined = pd.read_parquet(quarantine_path).set_index(QUARANTINE_ROW_COLUMN)
+        finally:
+            quarantine_path.unlink(missing_ok=True)
+    else:
+        df, quarantined = apply_quality_rules(load_dre_file(file_path))
+        df = apply_currency_conversion(df, config.COLUMN_REALIZADO)
+        df = apply_month_conversion(df, config.COLUMN_MES, year)
+        df.to_parquet(target, engine="pyarrow", index=False)
+        rows = len(df)
+
+    logger.info(
+        f"Export {file_path.name}: ano={year}, grupo='{group}', {rows} registros, "
+        f"{len(quarantined)} em quarentena"
+    )
+    quarantined = quarantined.assign(**{QUARANTINE_SOURCE_COLUMN: file_path.name})
+    return file_path, year, group, rows, quarantined
+
+
+def ingest_dre_exports(
+    paths: list[Path],
+    dataset_dir: Union[str, Path, None] = None,
+    max_workers: int | None = None,
+    quarantine_path: Union[str, Path, None] = None,
+    load: bool = True,
+) -> pd.DataFrame | None:
+    """
+    Processa os exports em paralelo e monta o dataset particionado.
+
+    Cada export é carregado, validado pelas regras de src.data_quality,
+    convertido (moeda e mês, com o ano do próprio preâmbulo) e gravado como
+    Parquet em um processo do pool; o tempo total depende do número de CPUs,
+    não do número de arquivos. O dataset é montado em um diretório
+    temporário e só substitui o anterior quando todos os exports foram
+    processados. As linhas reprovadas de todos os exports vão para um único
+    arquivo de quarentena, com a coluna "source_file".
+
+    Args:
+        paths: Exports DRE (ver resolve_input_paths).
+        dataset_dir: Diretório do dataset. Se None, usa config.PARTITIONED_DATASET_DIR.
+        max_workers: Processos do pool. Se None, usa config.INGEST_MAX_WORKERS
+            (None = número de CPUs). Com um único export não há pool.
+        quarantine_path: Parquet da quarentena. Se None, usa config.QUARANTINE_PARQUET_PATH.
+        load: Se False, o dataset não é lido de volta para a memória
+            (ex: no modo em blocos, ver write_dataset_parquet).
+
+    Returns:
+        pd.DataFrame: Todos os exports combinados (ver read_partitioned_dataset),
+            ou None com load=False.
+
+    Raises:
+        ValueError: Se a lista de exports estiver vazia ou algum export for inválido.
+        FileNotFoundError: Se algum export não existir.
+    """
+    if not paths:
+        raise ValueError("Nenhum export DRE informado.")
+
+    dataset_dir = Path(dataset_dir) if dataset_dir else config.PARTITIONED_DATASET_DIR
+    workers = max_workers or config.INGEST_MAX_WORKERS or os.cpu_count() or 1
+    workers = min(workers, len(paths))
+
+    temp_dir = dataset_dir.with_name(dataset_dir.name + ".tmp")
+    shutil.rmtree(temp_dir, ignore_errors=True)
+    temp_dir.mkdir(parents=True)
+
+    logger.info(f"Processando {len(paths)} export(s) DRE com {workers} processo(s)")
+    try:
+        if workers == 1:
+            results = [_ingest_export(path, temp_dir) for path in paths]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_ingest_export, paths, repeat(temp_dir)))
+    except Exception:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
+
+    # Troca o dataset anterior pelo novo
+    old_dir = dataset_dir.with_name(dataset_dir.name + ".old")
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if dataset_dir.exists():
+        dataset_dir.rename(old_dir)
+    temp_dir.rename(dataset_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+    total = sum(rows for *_, rows, _ in results)
+    logger.info(f"Dataset particionado gravado em {dataset_dir} ({total} registros)")
+    quarantined = [rows for *_, rows in results if not rows.empty]
+    write_quarantine(
+        pd.concat(quarantined) if quarantined else results[0][-1], quarantine_path
+    )
+    return read_partitioned_dataset(dataset_dir) if load else None
+
+
+def read_partitioned_dataset(dataset_dir: Union[str, Path, None] = None) -> pd.DataFrame:
+    """
+    Lê o dataset particionado como um único DataFrame.
+
+    As colunas de partição voltam como colunas comuns: Ano (inteiro) e
+    GrupoEmpresa (categórica). As colunas de dimensão recebem a ordem de
+    categorias estável de apply_dimension_categoricals().
+
+    Args:
+        dataset_dir: Diretório do dataset. Se None, usa config.PARTITIONED_DATASET_DIR.
+
+    Returns:
+        pd.DataFrame: Registros de todos os exports.
+
+    Raises:
+        FileNotFoundError: Se o dataset não existir.
+    """
+    dataset_dir = Path(dataset_dir) if dataset_dir else config.PARTITIONED_DATASET_DIR
+    if not dataset_dir.exists():
+        raise FileNotFoundError(f"Dataset particionado não encontrado: {dataset_dir}")
+
+    df = pd.read_parquet(dataset_dir, engine="pyarrow")
+    df[config.COLUMN_ANO] = df[config.COLUMN_ANO].astype("int64")
+    return apply_dimension_categoricals(df)
+
+
+def write_dataset_parquet(
+    output_path: Union[str, Path],
+    dataset_dir: Union[str, Path, None] = None,
+) -> int:
+    """
+    Copia o dataset particionado para um único Parquet, um row group por vez.
+
+    Equivale a gravar read_partitioned_dataset() com to_parquet(), mas sem
+    carregar o dataset: só um row group fica em memória por vez. As colunas
+    de partição (Ano e GrupoEmpresa) viram colunas comuns e as de dimensão
+    são gravadas como dicionário (categóricas na leitura com o pandas).
+
+    Args:
+        output_path: Parquet de saída (gravado em um arquivo temporário e
+            trocado de lugar no fim).
+        dataset_dir: Diretório do dataset. Se None, usa config.PARTITIONED_DATASET_DIR.
+
+    Returns:
+        int: Número de registros gravados.
+
+    Raises:
+        FileNotFoundError: Se o dataset não existir ou estiver vazio.
+    """
+    dataset_dir = Path(dataset_dir) if dataset_dir else config.PARTITIONED_DATASET_DIR
+    files = sorted(dataset_dir.glob("*/*/*.parquet"))
+    if not files:
+        raise FileNotFoundError(f"Dataset particionado não encontrado: {dataset_dir}")
+
+    output_path = Path(output_path)
+    temp_path = output_path.with_name(output_path.name + ".tmp")
+    writer: pq.ParquetWriter | None = None
+    total_rows = 0
+    try:
+        for path in files:
+            year = int(path.parent.parent.name.partition("=")[2])
+            group = unquote(path.parent.name.partition("=")[2])
+            for batch in pq.ParquetFile(path).iter_batches():
+                table = _with_partition_columns(pa.Table.from_batches([batch]), year, group)
+                if writer is None:
+                    writer = pq.ParquetWriter(temp_path, _dataset_schema(table.schema))
+                writer.write_table(table.select(writer.schema.names).cast(writer.schema))
+                total_rows += len(table)
+        if writer is None:
+            # Só exports vazios: grava o schema do primeiro arquivo
+            table = _with_partition_columns(pq.read_schema(files[0]).empty_table(), year, group)
+            writer = pq.ParquetWriter(temp_path, _dataset_schema(table.schema))
+    except Exception:
+        if writer is not None:
+            writer.close()
+        temp_path.unlink(missing_ok=True)
+        raise
+
+    writer.close()
+    os.replace(temp_path, output_path)
+    logger.info(f"Dataset copiado para {output_path} ({total_rows} registros)")
+    return total_rows
+
+
+def _with_partition_columns(table: pa.Table, year: int, group: str) -> pa.Table:
+    """Acrescenta Ano e GrupoEmpresa (valores da partição) como colunas comuns."""
+    table = table.replace_schema_metadata(None)
+    return table.append_column(
+        config.COLUMN_ANO, pa.array([year] * len(table), pa.int64())
+    ).append_column(
+        config.COLUMN_GRUPO_EMPRESA,
+        pa.array([group] * len(table), pa.string()).dictionary_encode(),
+    )
+
+
+def _dataset_schema(schema: pa.Schema) -> pa.Schema:
+    """Schema comum aos arquivos do dataset: dicionários com índices int32."""
+    for i, field in enumerate(schema):
+        if pa.types.is_dictionary(field.type):
+            schema = schema.set(i, field.with_type(pa.dictionary(pa.int32(), pa.string())))
+    return schema
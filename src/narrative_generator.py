@@ -23,6 +23,9 @@ except ImportError:
     sys.path.insert(0, str(Path(__file__).parent.parent))
     import config
 
+from src.master_store import MasterStore
+from src.text_repair import get_text_repairer
+
 
 logger = logging.getLogger(__name__)
 
@@ -37,33 +40,12 @@ def clean_text(text: Any) -> Any:
     Returns:
         Cleaned text if input was string, otherwise original value.
     """
-    if not isinstance(text, str):
-        return text
-
-    for error, fix in config.TEXT_REPLACEMENTS.items():
-        text = text.replace(error, fix)
-
-    return text.strip()
+    return get_text_repairer().repair(text)
 
 
-def create_narrative(row: pd.Series) -> str:
-    """
-    Transform a data row into a natural language narrative.
-
-    Args:
-        row: Pandas Series representing a single row of financial data.
-
-    Returns:
-        A natural language description of the financial record.
-    """
+def _format_narrative(mes: Any, grupo: Any, item: Any, valor: Any, subcat: Any) -> str:
+    """Build the narrative text from the values of a single record."""
     try:
-        # Get values safely (handles missing columns)
-        mes = row.get(config.COLUMN_MES, "N/D")
-        grupo = row.get(config.COLUMN_NOME_GRUPO, "Categoria Desconhecida")
-        item = row.get(config.COLUMN_CC_NOME, "Item Desconhecido")
-        valor = row.get(config.COLUMN_REALIZADO, "0")
-        subcat = row.get("Camada03", "")
-
         # Format value if it's a number
         if isinstance(valor, (int, float)):
             valor_str = f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
@@ -87,6 +69,30 @@ def create_narrative(row: pd.Series) -> str:
         return ""
 
 
+# Columns used in the narrative and their defaults when missing
+_NARRATIVE_FIELDS: list[tuple[str, str]] = [
+    (config.COLUMN_MES, "N/D"),
+    (config.COLUMN_NOME_GRUPO, "Categoria Desconhecida"),
+    (config.COLUMN_CC_NOME, "Item Desconhecido"),
+    (config.COLUMN_REALIZADO, "0"),
+    ("Camada03", ""),
+]
+
+
+def create_narrative(row: pd.Series) -> str:
+    """
+    Transform a data row into a natural language narrative.
+
+    Args:
+        row: Pandas Series representing a single row of financial data.
+
+    Returns:
+        A natural language description of the financial record.
+    """
+    # Get values safely (handles missing columns)
+    return _format_narrative(*(row.get(column, default) for column, default in _NARRATIVE_FIELDS))
+
+
 def generate_narratives(df: pd.DataFrame) -> pd.DataFrame:
     """
     Generate narratives for all rows in a DataFrame.
@@ -94,6 +100,9 @@ def generate_narratives(df: pd.DataFrame) -> pd.DataFrame:
     This is the main function to be called from the pipeline.
     It adds a 'Narrativa_IA' column to the DataFrame.
 
+    Narratives are built column-wise from plain Python lists instead of
+    DataFrame.apply(axis=1), which would create one Series per row.
+
     Args:
         df: DataFrame with financial data (must have required columns).
 
@@ -102,11 +111,19 @@ def generate_narratives(df: pd.DataFrame) -> pd.DataFrame:
     """
     logger.info("Generating narratives for financial data...")
 
-    # Create a copy to avoid modifying the original
-    df_with_narratives = df.copy()
+    columns = [
+        df[column].tolist() if column in df.columns else [default] * len(df)
+        for column, default in _NARRATIVE_FIELDS
+    ]
+    narratives = pd.Series(
+        [_format_narrative(*values) for values in zip(*columns)],
+        index=df.index,
+        dtype=object,
+    )
 
-    # Generate narratives
-    df_with_narratives["Narrativa_IA"] = df_with_narratives.apply(create_narrative, axis=1)
+    # Add narratives as a new column; the input DataFrame is not modified.
+    # With copy-on-write enabled the other columns are shared, not copied.
+    df_with_narratives = df.assign(Narrativa_IA=narratives)
 
     # Count successful narratives
     successful = df_with_narratives["Narrativa_IA"].str.len() > 0
@@ -115,6 +132,18 @@ def generate_narratives(df: pd.DataFrame) -> pd.DataFrame:
     return df_with_narratives
 
 
+def _report_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Columns of the narrative report, in report order."""
+    cols_to_keep = [
+        "Narrativa_IA",
+        config.COLUMN_MES,
+        config.COLUMN_NOME_GRUPO,
+        config.COLUMN_CC_NOME,
+        config.COLUMN_REALIZADO,
+    ]
+    return df[[c for c in cols_to_keep if c in df.columns]]
+
+
 def save_narrative_report(
     df: pd.DataFrame,
     output_path: Path | str | None = None,
@@ -136,18 +165,7 @@ def save_narrative_report(
         raise ValueError("DataFrame must have 'Narrativa_IA' column. Run generate_narratives() first.")
 
     output_path = Path(output_path) if output_path else config.NARRATIVE_CSV_PATH
-
-    # Select columns for the report
-    cols_to_keep = [
-        "Narrativa_IA",
-        config.COLUMN_MES,
-        config.COLUMN_NOME_GRUPO,
-        config.COLUMN_CC_NOME,
-        config.COLUMN_REALIZADO,
-    ]
-    cols_final = [c for c in cols_to_keep if c in df.columns]
-
-    df_final = df[cols_final]
+    df_final = _report_frame(df)
 
     # Save with proper encoding for Brazilian Portuguese
     df_final.to_csv(
@@ -162,6 +180,34 @@ def save_narrative_report(
     return output_path
 
 
+def save_narrative_dataset(
+    df: pd.DataFrame,
+    dataset_dir: Path | str | None = None,
+) -> Path:
+    """
+    Save the narrative report as the month-partitioned master dataset.
+
+    Replaces the whole dataset (the classifier only appends to it); see
+    src/master_store.py.
+
+    Args:
+        df: DataFrame with 'Narrativa_IA' column.
+        dataset_dir: Optional custom directory. Defaults to config.NARRATIVE_DATASET_DIR.
+
+    Returns:
+        Path to the dataset directory.
+
+    Raises:
+        ValueError: If DataFrame doesn't have 'Narrativa_IA' column.
+    """
+    if "Narrativa_IA" not in df.columns:
+        raise ValueError("DataFrame must have 'Narrativa_IA' column. Run generate_narratives() first.")
+
+    store = MasterStore(dataset_dir)
+    store.replace(_report_frame(df))
+    return store.dataset_dir
+
+
 def get_narrative_summary(df: pd.DataFrame) -> dict:
     """
     Generate summary statistics for narrative report.
@@ -204,13 +250,11 @@ if __name__ == "__main__":
         file_ext = config.INPUT_FILE_PATH.suffix.lower()
 
         if file_ext == ".xlsx":
-            # Load Excel file
+            # Load Excel file (through the Parquet copy kept by data_cleaner)
+            from src.data_cleaner import read_excel_sheet_cached
+
             print(f"Carregando arquivo Excel: {config.INPUT_FILE_PATH}")
-            df = pd.read_excel(
-                config.INPUT_FILE_PATH,
-                sheet_name=config.EXCEL_SHEET_NAME,
-                header=config.EXCEL_HEADER_ROW,
-            )
+            df = read_excel_sheet_cached(config.INPUT_FILE_PATH)
         else:
             # Load CSV file
             print(f"Carregando arquivo CSV: {config.INPUT_FILE_PATH}")
@@ -225,8 +269,9 @@ if __name__ == "__main__":
         df = df.dropna(how="all", axis=1)
         df.columns = [clean_text(col) for col in df.columns]
 
+        repairer = get_text_repairer()
         for col in df.select_dtypes(include=["object"]).columns:
-            df[col] = df[col].apply(clean_text)
+            df[col] = repairer.repair_series(df[col])
 
         # Filter invalid rows
         if "Loja" in df.columns:
@@ -235,6 +280,7 @@ if __name__ == "__main__":
         # Generate and save
         df = generate_narratives(df)
         output_path = save_narrative_report(df)
+        save_narrative_dataset(df)
 
         summary = get_narrative_summary(df)
         print(f"\n[OK] Sucesso! Arquivo '{output_path}' gerado.")
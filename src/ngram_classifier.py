@@ -0,0 +1,448 @@
+"""
+Classificador Offline por N-gramas de Caracteres (TF-IDF + vizinhos).
+
+Alternativa ao Gemini que não precisa de chave de API nem de rede. O
+modelo é construído a partir do histórico rotulado:
+
+    - relatorio_narrativo_ia.csv: cc_nome e Nome Grupo de cada registro
+      (e a coluna Descricao, quando o arquivo mestre a tiver);
+    - finetune_dataset.jsonl: perguntas "Classifique o gasto 'X'..." e
+      o grupo da resposta.
+
+Cada texto vira um vetor esparso de n-gramas de caracteres
+(config.NGRAM_RANGE) com pesos TF-IDF normalizados (L2), então o produto
+escalar é a similaridade do cosseno. A classificação busca os
+config.NGRAM_TOP_K exemplos mais próximos (produto de matrizes esparsas
+do SciPy + argpartition do NumPy) e vota pelo cc_nome, ponderando pela
+similaridade. A confiança é a similaridade do vizinho mais próximo do
+rótulo vencedor multiplicada pela fração dos votos.
+
+O modelo é salvo em output/ngram_classifier.npz (sem pickle) e
+reconstruído quando o histórico muda (get_ngram_classifier()).
+
+Classes:
+    NgramMatch: Categoria prevista e sua confiança.
+    NgramClassifier: Índice TF-IDF de n-gramas com busca top-k.
+
+Funções:
+    load_labelled_history: Exemplos rotulados do histórico.
+    get_ngram_classifier: Modelo compartilhado (carregado ou treinado).
+"""
+
+import json
+import logging
+import math
+import os
+import re
+import sys
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Union
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+try:
+    import config
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    import config
+
+from src.classification_cache import normalize_description
+from src.csv_dialect import read_csv_sniffed
+from src.text_repair import get_text_repairer
+
+logger = logging.getLogger(__name__)
+
+# Pergunta e resposta de classificação do finetune_dataset.jsonl
+_PERGUNTA_CLASSIFICACAO = re.compile(r"Classifique o gasto '(.+?)' em uma categoria DRE")
+_RESPOSTA_GRUPO = re.compile(r"pertence ao grupo '(.+?)'")
+
+# Similaridades calculadas por bloco de consultas (limita a matriz densa)
+_SIMILARITY_CELLS: int = 1 << 22
+
+
+@dataclass(frozen=True)
+class NgramMatch:
+    """
+    Resultado do classificador offline.
+
+    Attributes:
+        category: cc_nome previsto (None se nenhum n-grama for conhecido).
+        group: Nome Grupo do cc_nome no histórico.
+        confidence: Confiança entre 0 e 1.
+    """
+
+    category: str | None
+    group: str
+    confidence: float
+
+
+def _finetune_examples(path: Path) -> list[tuple[str, str, str]]:
+    """Exemplos (texto, cc_nome, grupo) das perguntas de classificação do JSONL."""
+    examples = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if "messages" in record:  # formato OpenAI
+                texts = [m.get("content", "") for m in record["messages"]]
+            else:  # formatos Gemini e genérico
+                texts = [record.get("text_input", record.get("question", "")),
+                         record.get("output", record.get("answer", ""))]
+            question = _PERGUNTA_CLASSIFICACAO.search(texts[0] if texts else "")
+            answer = _RESPOSTA_GRUPO.search(texts[-1] if texts else "")
+            if question and answer:
+                name = question.group(1).strip()
+                examples.append((name, name, answer.group(1).strip()))
+    return examples
+
+
+def load_labelled_history(
+    narrative_path: Union[str, Path, None] = None,
+    finetune_path: Union[str, Path, None] = None,
+) -> pd.DataFrame:
+    """
+    Exemplos rotulados do histórico, sem repetições.
+
+    Args:
+        narrative_path: Relatório narrativo. Se None, usa config.NARRATIVE_CSV_PATH.
+        finetune_path: Dataset de fine-tuning. Se None, usa config.FINETUNE_JSONL_PATH.
+            Arquivos inexistentes são ignorados.
+
+    Returns:
+        pd.DataFrame: Colunas text, label (cc_nome) e group (Nome Grupo).
+    """
+    narrative_path = Path(narrative_path) if narrative_path else config.NARRATIVE_CSV_PATH
+    finetune_path = Path(finetune_path) if finetune_path else config.FINETUNE_JSONL_PATH
+    frames = []
+
+    if narrative_path.exists():
+        df = read_csv_sniffed(narrative_path)
+        col_cat, col_grupo = config.COLUMN_CC_NOME, config.COLUMN_NOME_GRUPO
+        if col_cat in df.columns:
+            groups = df[col_grupo] if col_grupo in df.columns else pd.Series("", index=df.index)
+            frames.append(pd.DataFrame({"text": df[col_cat], "label": df[col_cat], "group": groups}))
+            if "Descricao" in df.columns:
+                frames.append(pd.DataFrame({
+                    "text": df["Descricao"], "label": df[col_cat], "group": groups,
+                }))
+
+    if finetune_path.exists():
+        frames.append(pd.DataFrame(
+            _finetune_examples(finetune_path), columns=["text", "label", "group"]
+        ))
+
+    if not frames:
+        return pd.DataFrame(columns=["text", "label", "group"])
+    history = pd.concat(frames, ignore_index=True).dropna(subset=["text", "label"])
+    # Os exports trazem grupos com a codificação quebrada (ex: "VARIï¿½VEIS")
+    history["group"] = get_text_repairer().repair_series(history["group"].fillna("").astype(str))
+    history = history.astype(str).drop_duplicates(["text", "label"], ignore_index=True)
+    if len(history) and (history["text"] == history["label"]).all():
+        logger.warning(
+            "Histórico sem descrições rotuladas (só os nomes das categorias): o "
+            "classificador offline reconhece nomes, não descrições livres"
+        )
+    return history
+
+
+def _char_ngrams(text: str, ngram_range: tuple[int, int]) -> Counter:
+    """N-gramas de caracteres da descrição normalizada (com espaço nas pontas)."""
+    key = normalize_description(text)
+    if not key:
+        return Counter()
+    padded = f" {key} "
+    low, high = ngram_range
+    return Counter(
+        padded[i:i + n]
+        for n in range(low, high + 1)
+        for i in range(len(padded) - n + 1)
+    )
+
+
+class NgramClassifier:
+    """
+    Classificador de vizinhos mais próximos sobre vetores TF-IDF de
+    n-gramas de caracteres.
+
+    Attributes:
+        labels: cc_nome distintos do histórico.
+        groups: Nome Grupo de cada rótulo (alinhado a labels).
+        ngram_range: Tamanhos mínimo e máximo dos n-gramas.
+        k: Vizinhos consultados por descrição.
+
+    Exemplo:
+        >>> modelo = NgramClassifier.fit(["BOVINOS", "AVES"], ["BOVINOS", "AVES"])
+        >>> modelo.predict(["bovino"])[0].category
+        'BOVINOS'
+    """
+
+    def __init__(
+        self,
+        vocabulary: np.ndarray,
+        idf: np.ndarray,
+        vectors: sparse.csr_matrix,
+        example_labels: np.ndarray,
+        labels: np.ndarray,
+        groups: np.ndarray,
+        ngram_range: tuple[int, int],
+        k: int | None = None,
+    ) -> None:
+        """Use fit(), from_history() ou load() para construir o modelo."""
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.vectors = vectors
+        self.example_labels = example_labels
+        self.labels = labels
+        self.groups = groups
+        self.ngram_range = (int(ngram_range[0]), int(ngram_range[1]))
+        self.k = max(1, k or config.NGRAM_TOP_K)
+        self._columns = {gram: j for j, gram in enumerate(vocabulary.tolist())}
+
+    @classmethod
+    def fit(
+        cls,
+        texts: list[str],
+        labels: list[str],
+        groups: list[str] | None = None,
+        ngram_range: tuple[int, int] | None = None,
+        k: int | None = None,
+    ) -> "NgramClassifier":
+        """
+        Treina o modelo (vocabulário, IDF e vetores dos exemplos).
+
+        Args:
+            texts: Textos de exemplo (descrições ou nomes de categoria).
+            labels: cc_nome de cada exemplo.
+            groups: Nome Grupo de cada exemplo (opcional).
+            ngram_range: Se None, usa config.NGRAM_RANGE.
+            k: Vizinhos por consulta. Se None, usa config.NGRAM_TOP_K.
+        """
+        ngram_range = tuple(ngram_range or config.NGRAM_RANGE)
+        groups = list(groups) if groups is not None else [""] * len(labels)
+        counts = [_char_ngrams(text, ngram_range) for text in texts]
+        keep = [i for i, grams in enumerate(counts) if grams]
+        counts = [counts[i] for i in keep]
+
+        label_codes, label_names = pd.factorize(pd.Series([labels[i] for i in keep], dtype=object))
+        # Grupo de cada rótulo: o primeiro não vazio
+        label_groups: dict[str, str] = {}
+        for i in keep:
+            if not label_groups.get(labels[i]):
+                label_groups[labels[i]] = groups[i]
+
+        vocabulary = np.array(sorted({gram for grams in counts for gram in grams}), dtype=str)
+        columns = {gram: j for j, gram in enumerate(vocabulary.tolist())}
+        document_frequency = np.zeros(len(vocabulary), dtype=np.float64)
+        for grams in counts:
+            document_frequency[[columns[gram] for gram in grams]] += 1
+        # IDF suavizado: n-gramas de todos os exemplos ainda pesam 1
+        idf = np.log((1 + len(counts)) / (1 + document_frequency)) + 1
+
+        model = cls(
+            vocabulary,
+            idf,
+            sparse.csr_matrix((0, len(vocabulary))),
+            label_codes.astype(np.int32),
+            np.array(label_names.tolist(), dtype=str),
+            np.array([label_groups[name] for name in label_names], dtype=str),
+            ngram_range,
+            k,
+        )
+        model.vectors = model._vectorize_counts(counts)
+        logger.info(
+            f"Classificador offline treinado: {len(counts)} exemplos, "
+            f"{len(model.labels)} categorias, {len(vocabulary)} n-gramas"
+        )
+        return model
+
+    @classmethod
+    def from_history(
+        cls,
+        narrative_path: Union[str, Path, None] = None,
+        finetune_path: Union[str, Path, None] = None,
+        **kwargs,
+    ) -> "NgramClassifier":
+        """Treina com load_labelled_history() (relatório narrativo e JSONL de fine-tuning)."""
+        history = load_labelled_history(narrative_path, finetune_path)
+        if history.empty:
+            raise ValueError("Histórico rotulado vazio: nada para treinar")
+        return cls.fit(history["text"].tolist(), history["label"].tolist(),
+                       history["group"].tolist(), **kwargs)
+
+    def __len__(self) -> int:
+        return self.vectors.shape[0]
+
+    def _vectorize_counts(self, counts: list[Counter]) -> sparse.csr_matrix:
+        indptr = [0]
+        indices: list[int] = []
+        data: list[float] = []
+        for grams in counts:
+            for gram, count in grams.items():
+                j = self._columns.get(gram)
+                if j is not None:
+                    indices.append(j)
+                    data.append(1.0 + math.log(count))  # TF sublinear
+            indptr.append(len(indices))
+
+        matrix = sparse.csr_matrix(
+            (np.asarray(data, dtype=np.float64), np.asarray(indices, dtype=np.int32), indptr),
+            shape=(len(counts), len(self.vocabulary)),
+        )
+        matrix = matrix.multiply(self.idf).tocsr()
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        return sparse.diags(1.0 / norms) @ matrix
+
+    def transform(self, texts: list[str]) -> sparse.csr_matrix:
+        """Vetores TF-IDF (L2) dos textos; n-gramas fora do vocabulário são ignorados."""
+        return self._vectorize_counts([_char_ngrams(text, self.ngram_range) for text in texts])
+
+    def kneighbors(self, texts: list[str], k: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Exemplos mais próximos de cada texto pela similaridade do cosseno.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Similaridades e índices dos
+                exemplos, ambos (len(texts), k), em ordem decrescente.
+        """
+        k = min(k or self.k, len(self))
+        queries = self.transform(texts)
+        similarities = np.zeros((len(texts), k))
+        neighbours = np.zeros((len(texts), k), dtype=np.int64)
+        if k == 0:
+            return similarities, neighbours
+
+        step = max(1, _SIMILARITY_CELLS // len(self))
+        examples_t = self.vectors.T.tocsc()
+        for start in range(0, len(texts), step):
+            block = (queries[start:start + step] @ examples_t).toarray()
+            top = np.argpartition(-block, k - 1, axis=1)[:, :k]
+            top_sims = np.take_along_axis(block, top, axis=1)
+            order = np.argsort(-top_sims, axis=1, kind="stable")
+            neighbours[start:start + step] = np.take_along_axis(top, order, axis=1)
+            similarities[start:start + step] = np.take_along_axis(top_sims, order, axis=1)
+        return similarities, neighbours
+
+    def predict(self, texts: list[str]) -> list[NgramMatch]:
+        """
+        Classifica as descrições pelo voto dos vizinhos mais próximos.
+
+        Os votos são ponderados pelo quadrado da similaridade, o que
+        favorece os vizinhos realmente próximos.
+
+        Returns:
+            list[NgramMatch]: Um resultado por texto, na mesma ordem.
+        """
+        similarities, neighbours = self.kneighbors(texts)
+        results = []
+        for sims, ids in zip(similarities, neighbours):
+            if not sims.size or sims[0] <= 0:
+                results.append(NgramMatch(None, "", 0.0))
+                continue
+            codes = self.example_labels[ids]
+            votes = np.bincount(codes, weights=sims ** 2, minlength=len(self.labels))
+            winner = int(np.argmax(votes))
+            share = votes[winner] / votes.sum()
+            confidence = float(sims[codes == winner].max() * share)
+            results.append(NgramMatch(
+                str(self.labels[winner]), str(self.groups[winner]), round(confidence, 4)
+            ))
+        return results
+
+    def save(self, path: Union[str, Path, None] = None) -> Path:
+        """
+        Grava o modelo em .npz comprimido (escrita atômica).
+
+        Args:
+            path: Destino. Se None, usa config.NGRAM_MODEL_PATH.
+        """
+        path = Path(path) if path else config.NGRAM_MODEL_PATH
+        path.parent.mkdir(parents=True, exist_ok=True)
+        vectors = self.vectors.tocsr()
+        temp_path = path.with_name(path.name + ".tmp.npz")
+        np.savez_compressed(
+            temp_path,
+            vocabulary=self.vocabulary,
+            idf=self.idf,
+            data=vectors.data,
+            indices=vectors.indices,
+            indptr=vectors.indptr,
+            shape=np.array(vectors.shape),
+            example_labels=self.example_labels,
+            labels=self.labels,
+            groups=self.groups,
+            ngram_range=np.array(self.ngram_range),
+        )
+        os.replace(temp_path, path)
+        logger.info(f"Classificador offline salvo em {path}")
+        return path
+
+    @classmethod
+    def load(cls, path: Union[str, Path, None] = None, k: int | None = None) -> "NgramClassifier":
+        """Carrega um modelo gravado por save()."""
+        path = Path(path) if path else config.NGRAM_MODEL_PATH
+        with np.load(path, allow_pickle=False) as arrays:
+            vectors = sparse.csr_matrix(
+                (arrays["data"], arrays["indices"], arrays["indptr"]),
+                shape=tuple(arrays["shape"]),
+            )
+            return cls(
+                arrays["vocabulary"],
+                arrays["idf"],
+                vectors,
+                arrays["example_labels"],
+                arrays["labels"],
+                arrays["groups"],
+                tuple(arrays["ngram_range"]),
+                k,
+            )
+
+
+@lru_cache(maxsize=2)
+def _cached_ngram_classifier(path: str, mtime_ns: int, size: int) -> NgramClassifier:
+    return NgramClassifier.load(path)
+
+
+def get_ngram_classifier(
+    model_path: Union[str, Path, None] = None,
+    narrative_path: Union[str, Path, None] = None,
+    finetune_path: Union[str, Path, None] = None,
+) -> NgramClassifier | None:
+    """
+    Modelo offline compartilhado.
+
+    Carrega o modelo salvo; se ele não existir ou for mais antigo que o
+    histórico, treina de novo e salva. Cada versão do arquivo é carregada
+    uma vez por processo.
+
+    Args:
+        model_path: Se None, usa config.NGRAM_MODEL_PATH.
+        narrative_path: Se None, usa config.NARRATIVE_CSV_PATH.
+        finetune_path: Se None, usa config.FINETUNE_JSONL_PATH.
+
+    Returns:
+        NgramClassifier, ou None se não houver modelo nem histórico.
+    """
+    model_path = Path(model_path) if model_path else config.NGRAM_MODEL_PATH
+    sources = [
+        Path(narrative_path) if narrative_path else config.NARRATIVE_CSV_PATH,
+        Path(finetune_path) if finetune_path else config.FINETUNE_JSONL_PATH,
+    ]
+    existing = [p for p in sources if p.exists()]
+    stale = not model_path.exists() or any(
+        p.stat().st_mtime_ns > model_path.stat().st_mtime_ns for p in existing
+    )
+    if stale:
+        if not existing:
+            logger.warning("Sem histórico rotulado para o classificador offline")
+            return None
+        NgramClassifier.from_history(*sources).save(model_path)
+
+    stat = model_path.stat()
+    return _cached_ngram_classifier(str(model_path.resolve()), stat.st_mtime_ns, stat.st_size)
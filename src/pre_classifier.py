@@ -0,0 +1,316 @@
+"""
+Pré-classificador Local (determinístico) para a Classificação de Gastos.
+
+A maioria das novas entradas casa, exatamente ou quase, com um cc_nome que
+já existe no relatorio_narrativo_ia.csv ou no categories.json, e mesmo
+assim cada uma ia para o Gemini. Este módulo resolve essas descrições
+localmente, sem chamadas de rede, a partir de um índice das categorias
+válidas e do histórico de rótulos:
+
+    1. nome exato: a descrição normalizada é o próprio nome da categoria
+       (confiança 1.0);
+    2. histórico: a descrição normalizada já foi rotulada no arquivo
+       mestre (confiança = fração do rótulo mais frequente);
+    3. fornecedor: regra de palavra-chave de config.PRE_CLASSIFIER_KEYWORD_RULES
+       (ex: "SABESP" -> AGUA E ESGOTO);
+    4. palavras: sobreposição de palavras com o nome da categoria,
+       ponderada por IDF (palavras raras entre as categorias pesam mais).
+       As palavras são comparadas por um radical simples (sem o plural:
+       FRETE casa com FRETES). Toda palavra da descrição que aparece em
+       algum nome de categoria tem de estar no nome escolhido: "Taxa
+       cartão crédito" não é a receita CARTAO CREDITO, porque TAXA indica
+       outras categorias (ex: TAXA DE BOLETO). Palavras que não estão em
+       nenhuma categoria pesam como as mais raras, e o nome escolhido tem
+       de explicar ao menos config.PRE_CLASSIFIER_MIN_QUERY_COVERAGE do
+       peso da descrição: em "Devolução de cartão de crédito", DEVOLUCAO
+       muda o sentido e a descrição fica para a IA.
+
+Apenas as resoluções com confiança >= config.PRE_CLASSIFIER_MIN_CONFIDENCE
+são aceitas; as demais descrições (sem casamento, com baixa confiança ou
+ambíguas) seguem para a IA.
+
+Classes:
+    LocalMatch: Categoria encontrada localmente e sua confiança.
+    PreClassifier: Pré-classificador sobre as categorias e o histórico.
+"""
+
+import logging
+import math
+import sys
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import config
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    import config
+
+from src.category_engine import CategoryIndex
+from src.classification_cache import normalize_description
+
+logger = logging.getLogger(__name__)
+
+# Métodos de resolução (na ordem em que são tentados)
+METHOD_EXACT: str = "exact"
+METHOD_HISTORY: str = "history"
+METHOD_KEYWORD: str = "keyword"
+METHOD_TOKENS: str = "tokens"
+
+_KEYWORD_CONFIDENCE: float = 0.95
+
+# Palavras sem valor para distinguir categorias (ignoradas na sobreposição)
+_STOPWORDS: frozenset = frozenset({
+    "A", "AS", "O", "OS", "E", "DE", "DA", "DAS", "DO", "DOS", "EM", "NA", "NO",
+    "PARA", "POR", "COM", "S", "REF", "PAGAMENTO", "PGTO", "PAG", "COMPRA",
+    "NF", "NFE", "NOTA", "FISCAL",
+})
+
+
+@dataclass(frozen=True)
+class LocalMatch:
+    """
+    Categoria encontrada pelo pré-classificador.
+
+    Attributes:
+        category: cc_nome como escrito no índice de categorias.
+        confidence: Confiança entre 0 e 1.
+        method: Método que resolveu (exact, history, keyword ou tokens).
+    """
+
+    category: str
+    confidence: float
+    method: str
+
+
+def _tokens(key: str) -> list[str]:
+    """Palavras relevantes de uma chave normalizada (sem stopwords nem números)."""
+    return [tok for tok in key.split() if tok not in _STOPWORDS and not tok.isdigit()]
+
+
+# Plurais e suas formas no singular, do sufixo mais longo ao mais curto
+_PLURAL_SUFFIXES: tuple[tuple[str, str], ...] = (
+    ("OES", "AO"), ("AES", "AO"), ("AIS", "AL"), ("EIS", "EL"), ("NS", "M"), ("S", ""),
+)
+
+
+def _stem(token: str) -> str:
+    """Radical simples de uma palavra: a forma no singular (CARTOES -> CARTAO)."""
+    if len(token) <= 3:
+        return token
+    for suffix, replacement in _PLURAL_SUFFIXES:
+        if token.endswith(suffix):
+            return token[:-len(suffix)] + replacement
+    return token
+
+
+def _contains(tokens: list[str], phrase: list[str]) -> bool:
+    """Se a sequência phrase aparece, contígua, em tokens."""
+    size = len(phrase)
+    return any(tokens[i:i + size] == phrase for i in range(len(tokens) - size + 1))
+
+
+class PreClassifier:
+    """
+    Pré-classificador determinístico sobre as categorias válidas.
+
+    Construído uma vez por execução (as categorias de um CategoryIndex, o
+    histórico de rótulos e as regras de fornecedor) e reutilizado para
+    todas as descrições. Conta as descrições avaliadas e as resolvidas
+    por método em stats.
+
+    Exemplo:
+        >>> pre = PreClassifier(CategoryIndex.from_names(["ENERGIA", "BOVINOS"]))
+        >>> pre.classify("Pagamento de energia")
+        LocalMatch(category='ENERGIA', confidence=1.0, method='tokens')
+        >>> pre.resolve(["bovinos", "Manutenção do forno"])
+        ['BOVINOS', None]
+    """
+
+    def __init__(
+        self,
+        indice: CategoryIndex,
+        history: dict[str, str] | pd.Series | None = None,
+        keyword_rules: dict[str, str] | None = None,
+        min_confidence: float | None = None,
+        min_query_coverage: float | None = None,
+    ) -> None:
+        """
+        Args:
+            indice: Índice com as categorias válidas (get_category_index() ou
+                CategoryIndex.from_names()).
+            history: Rótulos já atribuídos, descrição -> cc_nome (ex: as
+                colunas Descricao e cc_nome do arquivo mestre). Rótulos fora
+                do índice são ignorados.
+            keyword_rules: Palavra-chave -> cc_nome. Se None, usa
+                config.PRE_CLASSIFIER_KEYWORD_RULES.
+            min_confidence: Confiança mínima de resolve(). Se None, usa
+                config.PRE_CLASSIFIER_MIN_CONFIDENCE.
+            min_query_coverage: Fração mínima do peso das palavras da
+                descrição explicada pelo nome no casamento por palavras. Se
+                None, usa config.PRE_CLASSIFIER_MIN_QUERY_COVERAGE.
+        """
+        self.indice = indice
+        self.min_confidence = (
+            config.PRE_CLASSIFIER_MIN_CONFIDENCE if min_confidence is None else min_confidence
+        )
+        self.min_query_coverage = (
+            config.PRE_CLASSIFIER_MIN_QUERY_COVERAGE
+            if min_query_coverage is None else min_query_coverage
+        )
+        self.stats: dict[str, int] = {"items": 0, "resolved": 0}
+
+        # Índice invertido radical -> categorias, com o IDF de cada radical
+        self._names: list[str] = []
+        self._name_tokens: list[dict[str, int]] = []
+        self._postings: dict[str, list[int]] = {}
+        for name in indice.names:
+            tokens = Counter(_stem(tok) for tok in _tokens(normalize_description(name)))
+            if not tokens:
+                continue
+            name_id = len(self._names)
+            self._names.append(name)
+            self._name_tokens.append(tokens)
+            for token in tokens:
+                self._postings.setdefault(token, []).append(name_id)
+        total = max(len(self._names), 1)
+        self._idf: dict[str, float] = {
+            token: math.log(1 + total / len(ids)) for token, ids in self._postings.items()
+        }
+        self._unknown_idf = math.log(1 + total)
+
+        # Histórico: descrição normalizada -> (rótulo mais frequente, fração)
+        self._history: dict[str, tuple[str, float]] = {}
+        if history is not None:
+            items = history.items() if isinstance(history, dict) else zip(history.index, history)
+            votes: dict[str, Counter] = {}
+            for description, label in items:
+                category = indice.canonical_name(label) if isinstance(label, str) else None
+                key = normalize_description(description)
+                if category and key:
+                    votes.setdefault(key, Counter())[category] += 1
+            for key, counter in votes.items():
+                category, count = counter.most_common(1)[0]
+                self._history[key] = (category, count / sum(counter.values()))
+
+        # Regras de fornecedor válidas no conjunto atual, das mais longas às mais curtas
+        rules = config.PRE_CLASSIFIER_KEYWORD_RULES if keyword_rules is None else keyword_rules
+        self._keywords: list[tuple[list[str], str]] = []
+        for keyword, category in rules.items():
+            canonical = indice.canonical_name(category)
+            phrase = normalize_description(keyword).split()
+            if canonical is None or not phrase:
+                logger.debug(f"Regra de fornecedor ignorada: {keyword} -> {category}")
+                continue
+            self._keywords.append((phrase, canonical))
+        self._keywords.sort(key=lambda rule: -len(rule[0]))
+
+    @classmethod
+    def from_master(
+        cls,
+        df_mestre: pd.DataFrame,
+        indice: CategoryIndex,
+        col_cat: str = "cc_nome",
+        col_desc: str = "Descricao",
+        **kwargs,
+    ) -> "PreClassifier":
+        """
+        Pré-classificador com o histórico do arquivo mestre (quando ele tem
+        as colunas de descrição e de categoria).
+        """
+        history = None
+        if col_desc in df_mestre.columns and col_cat in df_mestre.columns:
+            rotulados = df_mestre[[col_desc, col_cat]].dropna()
+            history = pd.Series(rotulados[col_cat].to_numpy(), index=rotulados[col_desc].to_numpy())
+        return cls(indice, history=history, **kwargs)
+
+    @property
+    def hit_rate(self) -> float:
+        """Fração das descrições avaliadas por resolve() que foram resolvidas."""
+        return self.stats["resolved"] / self.stats["items"] if self.stats["items"] else 0.0
+
+    def _by_tokens(self, tokens: list[str]) -> LocalMatch | None:
+        if not tokens:
+            return None
+        query = Counter(_stem(tok) for tok in tokens)
+        weight = lambda tok: self._idf.get(tok, self._unknown_idf)  # noqa: E731
+        query_weight = sum(weight(tok) for tok in query)
+
+        # Palavras da descrição que são de alguma categoria: todas precisam
+        # estar no nome escolhido (uma palavra de categoria a mais pode mudar o sentido)
+        category_words = [tok for tok in query if tok in self._postings]
+        scores: dict[int, float] = {}
+        candidates = {name_id for tok in query for name_id in self._postings.get(tok, ())}
+        for name_id in candidates:
+            name_tokens = self._name_tokens[name_id]
+            if any(tok not in name_tokens for tok in category_words):
+                continue
+            shared = sum(weight(tok) for tok in name_tokens if tok in query)
+            name_coverage = shared / sum(weight(tok) for tok in name_tokens)
+            query_coverage = shared / query_weight
+            # Palavras fora das categorias (ex: DEVOLUCAO) podem mudar o sentido
+            if query_coverage < self.min_query_coverage:
+                continue
+            # Todas as palavras da categoria pesam mais que explicar a descrição inteira
+            scores[name_id] = name_coverage * (0.5 + 0.5 * query_coverage)
+
+        if not scores:
+            return None
+        ranked = sorted(scores.items(), key=lambda item: -item[1])
+        best_id, best = ranked[0]
+        # Empate entre categorias diferentes: ambíguo, fica para a IA
+        if len(ranked) > 1 and ranked[1][1] >= best:
+            return None
+        return LocalMatch(self._names[best_id], round(best, 4), METHOD_TOKENS)
+
+    def classify(self, description: str) -> LocalMatch | None:
+        """
+        Melhor categoria local para uma descrição, com qualquer confiança.
+
+        Returns:
+            LocalMatch, ou None se nada casar (ou se o casamento for ambíguo).
+        """
+        key = normalize_description(description)
+        if not key:
+            return None
+
+        category = self.indice.canonical_name(key)
+        if category is not None:
+            return LocalMatch(category, 1.0, METHOD_EXACT)
+
+        if key in self._history:
+            category, share = self._history[key]
+            return LocalMatch(category, round(share, 4), METHOD_HISTORY)
+
+        tokens = key.split()
+        found = {category for phrase, category in self._keywords if _contains(tokens, phrase)}
+        if len(found) == 1:
+            return LocalMatch(found.pop(), _KEYWORD_CONFIDENCE, METHOD_KEYWORD)
+
+        return self._by_tokens(_tokens(key))
+
+    def resolve(self, descriptions: list[str]) -> list[str | None]:
+        """
+        Categorias das descrições resolvidas com confiança suficiente.
+
+        Args:
+            descriptions: Descrições a classificar.
+
+        Returns:
+            Lista alinhada a descriptions com o cc_nome, ou None nas
+            descrições que devem ir para a IA.
+        """
+        results: list[str | None] = []
+        for description in descriptions:
+            match = self.classify(description)
+            if match is not None and match.confidence >= self.min_confidence:
+                self.stats["resolved"] += 1
+                self.stats[match.method] = self.stats.get(match.method, 0) + 1
+                results.append(match.category)
+            else:
+                results.append(None)
+        self.stats["items"] += len(descriptions)
+        return results
@@ -0,0 +1,223 @@
+"""
+Contexto RAG Reduzido para os Prompts de Classificação.
+
+formatar_contexto_rag() coloca todos os grupos e todos os cc_nome do
+categories.json em cada prompt, então o tamanho do prompt (e com ele a
+latência e o custo de cada chamada) cresce com o plano de contas. Este
+módulo recupera, para cada gasto, só as categorias mais parecidas:
+
+    - cada cc_nome e cada Nome Grupo vira um vetor TF-IDF de n-gramas de
+      caracteres (o mesmo NgramClassifier do classificador offline);
+    - a pontuação de uma categoria é a similaridade do cosseno da
+      descrição com o cc_nome, mais uma fração da similaridade com o grupo;
+    - o prompt leva as config.RAG_TOP_K categorias de maior pontuação de
+      cada gasto do lote e as categorias fixas de
+      config.RAG_FALLBACK_CATEGORIES, agrupadas por Nome Grupo (o grupo
+      mais relevante primeiro).
+
+A similaridade é só lexical: gastos cujo nome não lembra o da categoria
+(ex: "Picanha" -> BOVINOS) perdem a categoria certa. Por isso a poda vem
+desligada (config.RAG_TOP_K = 0) e recall() mede, com gastos rotulados,
+a fração dos rótulos que sobrevive à seleção.
+
+Classes:
+    ContextRetriever: Seleção das categorias candidatas de um CategoryIndex.
+
+Funções:
+    get_context_retriever: Seletor compartilhado por CategoryIndex.
+"""
+
+import logging
+import sys
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+try:
+    import config
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    import config
+
+from src.category_engine import CategoryIndex, CategoryMatch
+from src.ngram_classifier import NgramClassifier
+
+logger = logging.getLogger(__name__)
+
+# Peso da similaridade com o Nome Grupo na pontuação de cada categoria
+_GROUP_WEIGHT: float = 0.25
+
+
+class ContextRetriever:
+    """
+    Seleciona, por similaridade lexical, as categorias do prompt de cada gasto.
+
+    Construído uma vez por CategoryIndex (use get_context_retriever()).
+    RAG_TOP_K e RAG_FALLBACK_CATEGORIES são lidos do config a cada
+    chamada, salvo se informados no construtor.
+
+    Exemplo:
+        >>> seletor = ContextRetriever(get_category_index(), top_k=3)
+        >>> seletor.select(["Conta de energia elétrica"])
+        {'( - ) UTILIDADES E SERVIÇOS': ['ENERGIA', ...], ...}
+    """
+
+    def __init__(
+        self,
+        indice: CategoryIndex,
+        top_k: int | None = None,
+        fallback: list[str] | None = None,
+    ) -> None:
+        """
+        Args:
+            indice: Índice das categorias (a hierarquia do categories.json).
+            top_k: Categorias por gasto. Se None, usa config.RAG_TOP_K.
+            fallback: Categorias sempre incluídas. Se None, usa
+                config.RAG_FALLBACK_CATEGORIES. Nomes fora do índice são ignorados.
+        """
+        self.indice = indice
+        self.top_k = top_k
+        self.fallback = fallback
+
+        # Entradas (cc_nome, grupo) e a posição do grupo de cada uma
+        self._groups: list[str] = list(indice.hierarchy)
+        self._entries: list[tuple[str, str]] = [
+            (name, group) for group, names in indice.hierarchy.items() for name in names
+        ]
+        self._entry_group = np.array(
+            [self._groups.index(group) for _, group in self._entries], dtype=np.int64
+        )
+
+        # Um único vocabulário para os nomes e os grupos; o rótulo é a posição do texto
+        self._model: NgramClassifier | None = None
+        texts = [name for name, _ in self._entries] + self._groups
+        if self._entries:
+            self._model = NgramClassifier.fit(texts, [str(i) for i in range(len(texts))])
+            positions = np.array([int(label) for label in self._model.labels], dtype=np.int64)
+            self._row_text = positions[self._model.example_labels]
+        self._n_texts = len(texts)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def scores(self, descricoes: list[str]) -> np.ndarray:
+        """
+        Pontuação de cada categoria para cada descrição.
+
+        Returns:
+            np.ndarray: Matriz (len(descricoes), len(self)), na ordem da hierarquia.
+        """
+        if self._model is None or not descricoes:
+            return np.zeros((len(descricoes), len(self._entries)))
+        similarities = np.zeros((len(descricoes), self._n_texts))
+        similarities[:, self._row_text] = (
+            self._model.transform(descricoes) @ self._model.vectors.T
+        ).toarray()
+        n_entries = len(self._entries)
+        by_group = similarities[:, n_entries:]
+        return similarities[:, :n_entries] + _GROUP_WEIGHT * by_group[:, self._entry_group]
+
+    def rank(self, descricao: str, limit: int | None = None) -> list[CategoryMatch]:
+        """
+        Categorias mais parecidas com uma descrição (pontuação > 0).
+
+        Args:
+            descricao: Descrição do gasto.
+            limit: Máximo de resultados. Se None, usa o top_k do seletor.
+        """
+        limit = self._limit() if limit is None else limit
+        row = self.scores([descricao])[0]
+        ranked = [i for i in np.argsort(-row, kind="stable")[:limit] if row[i] > 0]
+        return [
+            CategoryMatch(self._entries[i][0], self._entries[i][1], round(float(row[i]), 4))
+            for i in ranked
+        ]
+
+    def _limit(self) -> int:
+        return config.RAG_TOP_K if self.top_k is None else self.top_k
+
+    def select(self, descricoes: list[str]) -> dict[str, list[str]]:
+        """
+        Hierarquia reduzida aos candidatos de um lote de descrições.
+
+        União das top_k categorias de cada descrição com as categorias
+        fixas; grupos e categorias em ordem decrescente de pontuação.
+
+        Args:
+            descricoes: Descrições dos gastos do prompt.
+
+        Returns:
+            dict: {Nome Grupo: [cc_nome, ...]} no formato do categories.json
+                (aceito por formatar_contexto_rag()).
+        """
+        limit = min(self._limit(), len(self._entries))
+        scores = self.scores(descricoes)
+        best = np.zeros(len(self._entries))
+        for row in scores:
+            if limit > 0:
+                top = np.argpartition(-row, limit - 1)[:limit]
+                top = top[row[top] > 0]
+                best[top] = np.maximum(best[top], row[top])
+
+        chosen = set(np.flatnonzero(best).tolist())
+        fallback = config.RAG_FALLBACK_CATEGORIES if self.fallback is None else self.fallback
+        fallback_names = {self.indice.canonical_name(name) for name in fallback} - {None}
+        chosen.update(i for i, (name, _) in enumerate(self._entries) if name in fallback_names)
+
+        # Mais relevante primeiro; as categorias fixas sem pontuação vão por último
+        selection: dict[str, list[str]] = {}
+        for i in sorted(chosen, key=lambda i: (-best[i], i)):
+            name, group = self._entries[i]
+            names = selection.setdefault(group, [])
+            if name not in names:
+                names.append(name)
+        return selection
+
+
+    def recall(
+        self,
+        descricoes: list[str],
+        labels: list[str],
+        batch_size: int = 1,
+    ) -> float:
+        """
+        Fração dos gastos rotulados cujo cc_nome correto está na seleção do
+        seu lote (o prompt podado ainda oferece a resposta certa).
+
+        Args:
+            descricoes: Descrições dos gastos.
+            labels: cc_nome correto de cada descrição.
+            batch_size: Gastos por prompt (a seleção é a união do lote).
+
+        Returns:
+            float: Recall entre 0 e 1 (0.0 sem descrições).
+        """
+        if not descricoes:
+            return 0.0
+        batch_size = max(1, batch_size)
+        hits = 0
+        for pos in range(0, len(descricoes), batch_size):
+            selected = {
+                name
+                for names in self.select(descricoes[pos:pos + batch_size]).values()
+                for name in names
+            }
+            hits += sum(
+                self.indice.canonical_name(label) in selected
+                for label in labels[pos:pos + batch_size]
+            )
+        return hits / len(descricoes)
+
+
+@lru_cache(maxsize=4)
+def get_context_retriever(indice: CategoryIndex) -> ContextRetriever:
+    """
+    Seletor compartilhado de um CategoryIndex.
+
+    get_category_index() devolve a mesma instância enquanto o
+    categories.json não muda, então o seletor é montado uma vez por versão.
+    """
+    retriever = ContextRetriever(indice)
+    logger.info(f"Seletor de contexto RAG montado ({len(retriever)} categorias)")
+    return retriever
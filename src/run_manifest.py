@@ -0,0 +1,251 @@
+"""
+Manifesto de Execução Incremental do Pipeline DRE.
+
+Este módulo registra, para cada etapa do main.py, uma impressão digital
+(fingerprint) formada pelos hashes das entradas, da configuração e do
+código da etapa. Em uma nova execução, a etapa cuja fingerprint não mudou
+e cujos artefatos continuam intactos é pulada e seus artefatos reutilizados.
+
+O manifesto é salvo como JSON em config.RUN_MANIFEST_PATH.
+
+Classes:
+    RunManifest: Carrega, consulta e grava o manifesto de execução.
+
+Funções:
+    file_sha256: Hash SHA-256 do conteúdo de um arquivo.
+    path_sha256: Hash SHA-256 de um arquivo ou diretório.
+    config_sha256: Hash de um conjunto de parâmetros do config.py.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable, Union
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Versão do formato do manifesto (mudanças incompatíveis invalidam tudo)
+MANIFEST_FORMAT_VERSION: int = 1
+
+
+def file_sha256(file_path: Union[str, Path], block_size: int = 1024 * 1024) -> str:
+    """
+    Calcula o hash SHA-256 do conteúdo de um arquivo, lendo em blocos.
+
+    Args:
+        file_path: Caminho do arquivo.
+        block_size: Tamanho do bloco de leitura em bytes.
+
+    Returns:
+        str: Hash hexadecimal do conteúdo.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def path_sha256(path: Union[str, Path]) -> str:
+    """
+    Calcula o hash SHA-256 de um arquivo ou de um diretório inteiro.
+
+    Para diretórios, o hash combina o caminho relativo e o conteúdo de cada
+    arquivo (em ordem), então arquivos novos, removidos ou alterados mudam
+    o resultado.
+
+    Args:
+        path: Caminho do arquivo ou diretório.
+
+    Returns:
+        str: Hash hexadecimal.
+    """
+    path = Path(path)
+    if not path.is_dir():
+        return file_sha256(path)
+
+    digest = hashlib.sha256()
+    for file_path in sorted(p for p in path.rglob("*") if p.is_file()):
+        digest.update(file_path.relative_to(path).as_posix().encode("utf-8"))
+        digest.update(file_sha256(file_path).encode("ascii"))
+    return digest.hexdigest()
+
+
+def config_sha256(keys: Iterable[str]) -> str:
+    """
+    Calcula o hash dos valores de parâmetros do config.py.
+
+    Args:
+        keys: Nomes dos parâmetros (ex: ["REFERENCE_YEAR", "CSV_ENGINE"]).
+
+    Returns:
+        str: Hash hexadecimal dos valores, em ordem de nome.
+    """
+    snapshot = {key: repr(getattr(config, key, None)) for key in sorted(keys)}
+    payload = json.dumps(snapshot, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RunManifest:
+    """
+    Manifesto de execução incremental das etapas do pipeline.
+
+    Cada etapa registra sua fingerprint e o hash de cada artefato gerado.
+    Uma etapa é considerada atual (pode ser reutilizada) quando a
+    fingerprint é a mesma da última execução e todos os artefatos ainda
+    existem com o mesmo conteúdo.
+
+    Attributes:
+        path: Caminho do arquivo JSON do manifesto.
+        force: Se True, nenhuma etapa é reutilizada.
+        stages: Registros por etapa carregados/atualizados.
+        executed: Etapas executadas nesta execução.
+        reused: Etapas reutilizadas nesta execução.
+
+    Example:
+        >>> manifest = RunManifest(config.RUN_MANIFEST_PATH)
+        >>> fp = manifest.fingerprint("categories", inputs=[parquet_path],
+        ...                           config_keys=["COLUMN_CC_NOME"],
+        ...                           code_files=[Path("src/category_engine.py")])
+        >>> if not manifest.is_current("categories", fp, [json_path]):
+        ...     ...  # executa a etapa
+        ...     manifest.record("categories", fp, [json_path])
+        >>> manifest.save()
+    """
+
+    def __init__(self, path: Union[str, Path, None] = None, force: bool = False) -> None:
+        """
+        Inicializa o manifesto, carregando o arquivo existente se houver.
+
+        Args:
+            path: Caminho do JSON. Se None, usa config.RUN_MANIFEST_PATH.
+            force: Ignora o manifesto e executa todas as etapas.
+        """
+        self.path = Path(path) if path else config.RUN_MANIFEST_PATH
+        self.force = force
+        self.stages: dict[str, dict[str, Any]] = {}
+        self.executed: list[str] = []
+        self.reused: list[str] = []
+        self._load()
+
+    def _load(self) -> None:
+        """Carrega o manifesto do disco; arquivos inválidos são ignorados."""
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Manifesto de execução ignorado ({self.path}): {e}")
+            return
+        if data.get("format_version") != MANIFEST_FORMAT_VERSION:
+            logger.info("Formato do manifesto mudou; todas as etapas serão executadas")
+            return
+        self.stages = data.get("stages", {})
+
+    def fingerprint(
+        self,
+        stage: str,
+        inputs: Iterable[Union[str, Path]] = (),
+        config_keys: Iterable[str] = (),
+        code_files: Iterable[Union[str, Path]] = (),
+    ) -> str:
+        """
+        Calcula a fingerprint de uma etapa.
+
+        Args:
+            stage: Nome da etapa.
+            inputs: Arquivos de entrada (o conteúdo entra no hash).
+            config_keys: Parâmetros do config.py que afetam a etapa.
+            code_files: Arquivos de código da etapa (versão do código).
+
+        Returns:
+            str: Hash hexadecimal que identifica a etapa.
+        """
+        parts = {
+            "stage": stage,
+            "inputs": [file_sha256(p) for p in inputs],
+            "config": config_sha256(config_keys),
+            "code": [file_sha256(p) for p in code_files],
+        }
+        payload = json.dumps(parts, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def is_current(
+        self,
+        stage: str,
+        fingerprint: str,
+        artifacts: Iterable[Union[str, Path]],
+    ) -> bool:
+        """
+        Verifica se a etapa pode ser reutilizada.
+
+        Se puder, a etapa é registrada como reutilizada.
+
+        Args:
+            stage: Nome da etapa.
+            fingerprint: Fingerprint calculada para esta execução.
+            artifacts: Artefatos que a etapa produz.
+
+        Returns:
+            bool: True se a fingerprint e os artefatos não mudaram.
+        """
+        if self.force:
+            return False
+
+        record = self.stages.get(stage)
+        if not record or record.get("fingerprint") != fingerprint:
+            return False
+
+        recorded = record.get("artifacts", {})
+        for artifact in artifacts:
+            artifact = Path(artifact)
+            if not artifact.exists() or recorded.get(artifact.name) != path_sha256(artifact):
+                return False
+
+        self.reused.append(stage)
+        logger.info(f"Etapa '{stage}' inalterada; reutilizando artefatos")
+        return True
+
+    def record(
+        self,
+        stage: str,
+        fingerprint: str,
+        artifacts: Iterable[Union[str, Path]],
+        summary: dict[str, Any] | None = None,
+    ) -> None:
+        """
+        Registra a execução de uma etapa.
+
+        Args:
+            stage: Nome da etapa.
+            fingerprint: Fingerprint usada na execução.
+            artifacts: Arquivos ou diretórios produzidos (o hash de cada um é guardado).
+            summary: Dados opcionais (JSON) para reaproveitar em execuções futuras.
+        """
+        self.stages[stage] = {
+            "fingerprint": fingerprint,
+            "artifacts": {Path(a).name: path_sha256(a) for a in artifacts},
+            "summary": summary or {},
+            "updated_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        self.executed.append(stage)
+
+    def summary(self, stage: str) -> dict[str, Any]:
+        """Retorna os dados opcionais gravados para a etapa."""
+        return self.stages.get(stage, {}).get("summary", {})
+
+    def save(self) -> None:
+        """Grava o manifesto de forma atômica (arquivo temporário + rename)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_name(self.path.name + ".tmp")
+        data = {"format_version": MANIFEST_FORMAT_VERSION, "stages": self.stages}
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(temp_path, self.path)
+        logger.info(f"Manifesto de execução salvo: {self.path}")
@@ -0,0 +1,186 @@
+"""
+Servidor HTTP Local que Simula o Endpoint de Geração do Gemini.
+
+Para medir a vazão da classificação e ajustar a concorrência
+(config.AI_MAX_CONCURRENCY, config.AI_BATCH_SIZE) sem rede nem chave de
+API, este módulo sobe um servidor HTTP local com a mesma rota e o mesmo
+formato da API REST do Gemini:
+
+    POST /v1beta/models/{modelo}:generateContent
+    {"contents": [{"parts": [{"text": "prompt"}]}]}
+
+As respostas vêm de um StubModel (src/classification_driver.py), com
+latência, cota por minuto (429) e erros 503 configuráveis. O cliente é o
+HttpModel (src/http_model.py), usado pelo ClassificationDriver e pelo
+GeminiBackend (config.AI_BACKEND = "http").
+
+    python -m src.stub_server --port 8765 --latency 0.2
+    AI_BACKEND=http python -m src.ai_classifier
+
+Classes:
+    StubServer: Servidor local (em uma thread) com o StubModel.
+"""
+
+import argparse
+import json
+import logging
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+try:
+    import config
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    import config
+
+from src.classification_driver import StubAPIError, StubModel, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Status da API do Gemini para cada código HTTP simulado
+_STATUS_API: dict[int, str] = {
+    400: "INVALID_ARGUMENT",
+    404: "NOT_FOUND",
+    429: "RESOURCE_EXHAUSTED",
+    503: "UNAVAILABLE",
+}
+
+
+class _GenerateHandler(BaseHTTPRequestHandler):
+    server: "StubServer"
+
+    def log_message(self, format: str, *args) -> None:  # noqa: A002
+        logger.debug(format % args)
+
+    def _reply(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: int, message: str) -> None:
+        self._reply(status, {"error": {
+            "code": status, "message": message, "status": _STATUS_API.get(status, "INTERNAL"),
+        }})
+
+    def do_POST(self) -> None:  # noqa: N802
+        if not self.path.split("?")[0].endswith(":generateContent"):
+            self._error(404, f"Rota desconhecida: {self.path}")
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            prompt = "".join(
+                part.get("text", "")
+                for content in request.get("contents", [])
+                for part in content.get("parts", [])
+            )
+        except (ValueError, AttributeError) as e:
+            self._error(400, f"Requisição inválida: {e}")
+            return
+
+        try:
+            text = self.server.model.generate_content(prompt).text
+        except StubAPIError as e:
+            self._error(e.code, str(e))
+            return
+        self._reply(200, {
+            "candidates": [{
+                "content": {"role": "model", "parts": [{"text": text}]},
+                "finishReason": "STOP",
+            }],
+            "usageMetadata": {"promptTokenCount": estimate_tokens(prompt)},
+        })
+
+
+class StubServer(ThreadingHTTPServer):
+    """
+    Servidor local do endpoint generateContent, em uma thread própria.
+
+    Cada requisição é atendida em uma thread, então chamadas concorrentes
+    do driver são realmente simultâneas.
+
+    Exemplo:
+        >>> from src.http_model import HttpModel
+        >>> with StubServer(StubModel(latency=0.05)) as server:
+        ...     HttpModel(server.url).generate_content("Classifique: picanha").text
+        'OUTROS'
+    """
+
+    daemon_threads = True
+
+    def __init__(self, model: StubModel | None = None, host: str = "127.0.0.1", port: int = 0) -> None:
+        """
+        Args:
+            model: Modelo simulado das respostas. Se None, StubModel() padrão.
+            host: Endereço de escuta.
+            port: Porta; 0 escolhe uma porta livre.
+        """
+        super().__init__((host, port), _GenerateHandler)
+        self.model = model or StubModel()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        """URL base do servidor (ex: http://127.0.0.1:8765)."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubServer":
+        """Atende requisições em uma thread de fundo."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Servidor de testes em {self.url}")
+        return self
+
+    def stop(self) -> None:
+        """Para o servidor e libera a porta."""
+        if self._thread is not None:
+            self.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.server_close()
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+# =============================================================================
+# Standalone Execution
+# =============================================================================
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    parser = argparse.ArgumentParser(description="Servidor local do endpoint generateContent.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2, help="Latência fixa (s)")
+    parser.add_argument("--latency-per-1k", type=float, default=0.0,
+                        help="Latência adicional por mil tokens do prompt (s)")
+    parser.add_argument("--quota", type=float, default=None, help="Cota simulada (req/min)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fração de erros 503")
+    args = parser.parse_args()
+
+    stub = StubModel(
+        latency=args.latency,
+        latency_per_1k_tokens=args.latency_per_1k,
+        requests_per_minute=args.quota,
+        error_rate=args.error_rate,
+    )
+    server = StubServer(stub, args.host, args.port)
+    print(f"Servidor em {server.url} (Ctrl+C para parar)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Chamadas: {stub.stats}")
@@ -0,0 +1,167 @@
+"""
+Motor de Correção de Texto (encoding) para Automação DRE.
+
+Os exports do BI chegam com encoding misto e trazem textos corrompidos
+(ex: "VARIï¿½VEIS", "Ã§"). Este módulo concentra a correção usada pelo
+narrative_generator, pelo category_engine e pelo dashboard:
+
+    - Todas as substituições são compiladas uma única vez em uma regex
+      combinada (alternância ordenada da chave mais longa para a mais
+      curta), aplicada em uma passada por texto em vez de um str.replace
+      por substituição.
+    - Em colunas, a correção é feita apenas sobre os valores distintos
+      (pd.factorize ou as categorias de uma coluna categórica) e mapeada
+      de volta, então o custo depende da cardinalidade e não do número de
+      linhas.
+
+Classes:
+    TextRepairer: Conjunto compilado de substituições de texto.
+
+Funções:
+    get_text_repairer: TextRepairer com as substituições de config.TEXT_REPLACEMENTS.
+"""
+
+import re
+from functools import lru_cache
+from typing import Any, Mapping
+
+import numpy as np
+import pandas as pd
+
+import config
+
+
+class TextRepairer:
+    """
+    Conjunto compilado de substituições de texto.
+
+    A correção de um texto segue sempre a mesma ordem:
+        1. remove os caracteres de remove_chars (sequências inteiras);
+        2. aplica as substituições em uma única passada;
+        3. colapsa espaços repetidos (collapse_whitespace) e/ou remove
+           espaços das pontas (strip).
+
+    Valores que não são texto passam sem alteração.
+
+    Attributes:
+        replacements: Mapeamento {texto corrompido: texto corrigido}.
+
+    Example:
+        >>> repairer = TextRepairer({"VARIVEIS": "VARIÁVEIS"}, strip=True)
+        >>> repairer.repair(" CUSTOS VARIVEIS ")
+        'CUSTOS VARIÁVEIS'
+        >>> df["Nome Grupo"] = repairer.repair_series(df["Nome Grupo"])
+    """
+
+    def __init__(
+        self,
+        replacements: Mapping[str, str],
+        remove_chars: str = "",
+        collapse_whitespace: bool = False,
+        strip: bool = False,
+    ) -> None:
+        """
+        Compila as substituições.
+
+        Args:
+            replacements: Mapeamento {texto corrompido: texto corrigido}.
+                Em sobreposições vence a chave mais longa.
+            remove_chars: Caracteres removidos antes das substituições.
+            collapse_whitespace: Substitui sequências de espaços por um único
+                espaço e remove os das pontas.
+            strip: Remove espaços das pontas.
+        """
+        self.replacements = {key: value for key, value in replacements.items() if key}
+        self._collapse_whitespace = collapse_whitespace
+        self._strip = strip or collapse_whitespace
+
+        self._remove_pattern = (
+            re.compile(f"[{re.escape(remove_chars)}]+") if remove_chars else None
+        )
+        keys = sorted(self.replacements, key=len, reverse=True)
+        self._pattern = re.compile("|".join(map(re.escape, keys))) if keys else None
+
+    def _replace(self, match: re.Match) -> str:
+        return self.replacements[match.group(0)]
+
+    def repair(self, text: Any) -> Any:
+        """
+        Corrige um único texto.
+
+        Args:
+            text: Texto a corrigir, ou qualquer outro valor (retornado sem alteração).
+
+        Returns:
+            Texto corrigido, ou o valor original se não for texto.
+        """
+        if not isinstance(text, str):
+            return text
+
+        if self._remove_pattern is not None:
+            text = self._remove_pattern.sub("", text)
+        if self._pattern is not None:
+            text = self._pattern.sub(self._replace, text)
+        if self._collapse_whitespace:
+            text = " ".join(text.split())
+        elif self._strip:
+            text = text.strip()
+        return text
+
+    def repair_series(self, series: pd.Series) -> pd.Series:
+        """
+        Corrige uma coluna inteira corrigindo cada valor distinto uma vez.
+
+        Colunas categóricas têm apenas as categorias corrigidas (categorias
+        que passam a ser iguais são unificadas, mantendo a ordem da primeira);
+        nas demais colunas os valores distintos vêm de pd.factorize. Valores
+        ausentes e que não são texto são preservados.
+
+        Args:
+            series: Coluna a corrigir.
+
+        Returns:
+            pd.Series: Nova coluna com o mesmo índice, nome e tipo (object ou category).
+        """
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            repaired = pd.Index([self.repair(value) for value in series.cat.categories])
+            if repaired.is_unique:
+                return series.cat.rename_categories(repaired)
+
+            categories = repaired.unique()
+            remap = categories.get_indexer(repaired)
+            codes = series.cat.codes.to_numpy()
+            codes = np.where(codes >= 0, remap[codes], -1)
+            return pd.Series(
+                pd.Categorical.from_codes(codes, categories, ordered=series.cat.ordered),
+                index=series.index,
+                name=series.name,
+            )
+
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        repaired = np.empty(len(uniques), dtype=object)
+        repaired[:] = [self.repair(value) for value in uniques]
+
+        values = series.to_numpy(dtype=object, copy=True)
+        mask = codes >= 0
+        values[mask] = repaired[codes[mask]]
+        return pd.Series(values, index=series.index, name=series.name)
+
+
+@lru_cache(maxsize=8)
+def _compile_text_repairer(items: tuple[tuple[str, str], ...], strip: bool) -> TextRepairer:
+    return TextRepairer(dict(items), strip=strip)
+
+
+def get_text_repairer(strip: bool = True) -> TextRepairer:
+    """
+    TextRepairer com as substituições de config.TEXT_REPLACEMENTS.
+
+    A compilação fica em cache e só é refeita se o dicionário mudar.
+
+    Args:
+        strip: Remove espaços das pontas após a correção.
+
+    Returns:
+        TextRepairer: Instância compartilhada.
+    """
+    return _compile_text_repairer(tuple(config.TEXT_REPLACEMENTS.items()), strip)
@@ -0,0 +1,28 @@
+"""
+Fixtures compartilhadas pelos testes.
+
+O ambiente_isolado vale para todos os testes: driver de IA sem limite de
+taxa e recriado a cada teste, cache de classificações em tmp_path e o
+backend do Gemini (os testes trocam o modelo por um mock).
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Adiciona o diretório raiz ao path para importação
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import config  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def ambiente_isolado(monkeypatch, tmp_path):
+    """Driver de IA sem limite de taxa e recriado a cada teste; cache isolado."""
+    import src.ai_classifier
+
+    monkeypatch.setattr(config, "AI_REQUESTS_PER_MINUTE", 0)
+    monkeypatch.setattr(config, "AI_CACHE_PATH", tmp_path / "classificacoes.sqlite")
+    monkeypatch.setattr(config, "AI_BACKEND", "gemini")
+    monkeypatch.setattr(src.ai_classifier, "_driver", None)
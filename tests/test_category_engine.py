@@ -16,7 +16,7 @@ import pytest
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.category_engine import CategoryManager
+from src.category_engine import AccountTree, CategoryIndex, CategoryManager, get_category_index
 
 
 class TestCategoryManager:
@@ -165,3 +165,388 @@ class TestCategoryManager:
         hierarchy = category_manager.extract_category_hierarchy(df)
         assert hierarchy["GROUP_A"] == ["ITEM_1", "ITEM_2"]
 
+
+
+class TestIncrementalMerge:
+    """Tests for merge_hierarchy and update_categories_json."""
+
+    @staticmethod
+    def _month_df(month: str, rows: list[tuple[str, str]]) -> pd.DataFrame:
+        return pd.DataFrame({
+            "Nome Grupo": [group for group, _ in rows],
+            "cc_nome": [detail for _, detail in rows],
+            "Mês": pd.to_datetime([month] * len(rows)),
+            "Realizado": [1.0] * len(rows),
+        })
+
+    @pytest.fixture
+    def paths(self, tmp_path: Path) -> tuple[Path, Path]:
+        return tmp_path / "categories.json", tmp_path / "categories_meta.json"
+
+    def test_merge_hierarchy_adds_new_details(self):
+        """New groups and details are added; the existing dict is not modified."""
+        existing = {"GROUP_B": ["ITEM_2"]}
+        new_df = self._month_df(
+            "2025-02-01", [("GROUP_B", "ITEM_1"), ("GROUP_A", "ITEM_3"), ("GROUP_B", "ITEM_2")]
+        )
+
+        merged = CategoryManager().merge_hierarchy(existing, new_df)
+
+        assert merged == {"GROUP_A": ["ITEM_3"], "GROUP_B": ["ITEM_1", "ITEM_2"]}
+        assert list(merged) == ["GROUP_A", "GROUP_B"]
+        assert existing == {"GROUP_B": ["ITEM_2"]}
+
+    def test_merge_matches_full_extraction(self):
+        """Merging month by month gives the same hierarchy as a full extraction."""
+        manager = CategoryManager()
+        jan = self._month_df("2025-01-01", [("G1", "A"), ("G2", "B")])
+        feb = self._month_df("2025-02-01", [("G1", "C"), ("G2", "B")])
+
+        merged = manager.merge_hierarchy(manager.merge_hierarchy({}, jan), feb)
+
+        assert merged == manager.extract_category_hierarchy(pd.concat([jan, feb]))
+
+    def test_update_records_version_and_first_seen(self, paths):
+        """The sidecar records the version, merged months and first month of each cc_nome."""
+        json_path, meta_path = paths
+        manager = CategoryManager()
+        jan = self._month_df("2025-01-01", [("G1", "A")])
+        feb = self._month_df("2025-02-01", [("G1", "A"), ("G1", "B")])
+
+        manager.update_categories_json(jan, json_path, meta_path)
+        categories = manager.update_categories_json(pd.concat([jan, feb]), json_path, meta_path)
+
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        assert categories == {"G1": ["A", "B"]}
+        assert json.loads(json_path.read_text(encoding="utf-8")) == categories
+        assert meta["version"] == 2
+        assert meta["months"] == ["2025-01", "2025-02"]
+        assert meta["first_seen"] == {"A": "2025-01", "B": "2025-02"}
+        assert not list(json_path.parent.glob("*.tmp"))
+
+    def test_update_scans_only_new_pairs(self, paths, monkeypatch):
+        """Rows whose (Nome Grupo, cc_nome) pair is already merged are not scanned again."""
+        json_path, meta_path = paths
+        manager = CategoryManager()
+        jan = self._month_df("2025-01-01", [("G1", "A")] * 5)
+        feb = self._month_df("2025-02-01", [("G1", "B")] * 2)
+        manager.update_categories_json(jan, json_path, meta_path)
+
+        scanned = []
+        original = manager.extract_category_hierarchy
+        monkeypatch.setattr(
+            manager, "extract_category_hierarchy", lambda df: scanned.append(len(df)) or original(df)
+        )
+        manager.update_categories_json(pd.concat([jan, feb]), json_path, meta_path)
+
+        assert scanned == [2]
+
+    def test_unchanged_months_are_not_scanned(self, paths, monkeypatch):
+        """Months merged before with the same row count skip even the pair filter."""
+        json_path, meta_path = paths
+        manager = CategoryManager()
+        jan = self._month_df("2025-01-01", [("G1", "A")] * 5)
+        feb = self._month_df("2025-02-01", [("G1", "A"), ("G1", "B")])
+        manager.update_categories_json(jan, json_path, meta_path)
+
+        checked = []
+        original = manager._known_pairs
+        monkeypatch.setattr(
+            manager, "_known_pairs", lambda df, existing: checked.append(len(df)) or original(df, existing)
+        )
+        categories = manager.update_categories_json(pd.concat([jan, feb]), json_path, meta_path)
+
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        assert checked == [2]
+        assert categories == {"G1": ["A", "B"]}
+        assert meta["month_rows"] == {"2025-01": 5, "2025-02": 2}
+
+    def test_unmerged_months(self, paths):
+        """Only new months and months with a different row count are read again."""
+        json_path, meta_path = paths
+        manager = CategoryManager()
+        jan = self._month_df("2025-01-01", [("G1", "A")])
+        feb = self._month_df("2025-02-01", [("G1", "B")])
+        months = pd.concat([jan, feb, feb])["Mês"]
+
+        assert manager.unmerged_months(months, json_path, meta_path) == list(months.unique())
+
+        manager.update_categories_json(pd.concat([jan, feb]), json_path, meta_path)
+
+        assert manager.unmerged_months(months, json_path, meta_path) == [pd.Timestamp("2025-02-01")]
+
+    def test_update_with_unmerged_months_only(self, paths):
+        """Passing only the unmerged months keeps the row counts of the others."""
+        json_path, meta_path = paths
+        manager = CategoryManager()
+        jan = self._month_df("2025-01-01", [("G1", "A")] * 3)
+        feb = self._month_df("2025-02-01", [("G1", "B")])
+        manager.update_categories_json(jan, json_path, meta_path)
+
+        categories = manager.update_categories_json(feb, json_path, meta_path)
+
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        assert categories == {"G1": ["A", "B"]}
+        assert meta["month_rows"] == {"2025-01": 3, "2025-02": 1}
+
+    def test_new_detail_in_merged_month(self, paths):
+        """A new cc_nome in a month that was already merged is still added."""
+        json_path, meta_path = paths
+        manager = CategoryManager()
+        jan = self._month_df("2025-01-01", [("G1", "A")])
+        jan_other_group = self._month_df("2025-01-01", [("G2", "NOVA"), ("G1", "A")])
+
+        manager.update_categories_json(jan, json_path, meta_path)
+        categories = manager.update_categories_json(jan_other_group, json_path, meta_path)
+
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        assert categories == {"G1": ["A"], "G2": ["NOVA"]}
+        assert meta["version"] == 2
+        assert meta["months"] == ["2025-01"]
+        assert meta["first_seen"] == {"A": "2025-01", "NOVA": "2025-01"}
+
+    def test_unchanged_data_keeps_version(self, paths):
+        """Running again with the same months does not bump the version."""
+        json_path, meta_path = paths
+        manager = CategoryManager()
+        jan = self._month_df("2025-01-01", [("G1", "A")])
+
+        manager.update_categories_json(jan, json_path, meta_path)
+        manager.update_categories_json(jan, json_path, meta_path)
+
+        assert json.loads(meta_path.read_text(encoding="utf-8"))["version"] == 1
+
+    def test_rebuild_drops_removed_details(self, paths):
+        """rebuild=True rebuilds the hierarchy from df alone."""
+        json_path, meta_path = paths
+        manager = CategoryManager()
+        manager.update_categories_json(
+            self._month_df("2025-01-01", [("G1", "A")]), json_path, meta_path
+        )
+
+        categories = manager.update_categories_json(
+            self._month_df("2025-02-01", [("G1", "B")]), json_path, meta_path, rebuild=True
+        )
+
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        assert categories == {"G1": ["B"]}
+        assert meta["months"] == ["2025-02"]
+
+    def test_rebuild_keeps_version_and_first_seen(self, paths):
+        """A rebuild counts the version up from the sidecar and keeps first_seen."""
+        json_path, meta_path = paths
+        manager = CategoryManager()
+        jan = self._month_df("2025-01-01", [("G1", "A")])
+        feb = self._month_df("2025-02-01", [("G1", "A"), ("G1", "B")])
+        manager.update_categories_json(jan, json_path, meta_path)
+        manager.update_categories_json(pd.concat([jan, feb]), json_path, meta_path)
+
+        manager.update_categories_json(feb, json_path, meta_path, rebuild=True)
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        assert meta["version"] == 2  # Same hierarchy
+        assert meta["first_seen"] == {"A": "2025-01", "B": "2025-02"}
+
+        manager.update_categories_json(
+            self._month_df("2025-02-01", [("G1", "B")]), json_path, meta_path, rebuild=True
+        )
+        assert json.loads(meta_path.read_text(encoding="utf-8"))["version"] == 3
+
+    def test_backfilled_month_moves_first_seen_back(self, paths):
+        """An earlier month merged later corrects the first month of known details."""
+        json_path, meta_path = paths
+        manager = CategoryManager()
+        feb = self._month_df("2025-02-01", [("G1", "A")])
+        jan = self._month_df("2025-01-01", [("G1", "A")])
+        manager.update_categories_json(feb, json_path, meta_path)
+
+        manager.update_categories_json(pd.concat([jan, feb]), json_path, meta_path)
+
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        assert meta["first_seen"] == {"A": "2025-01"}
+        assert meta["version"] == 1
+
+
+class TestCategoryIndex:
+    """Tests for CategoryIndex and get_category_index."""
+
+    @pytest.fixture
+    def index(self):
+        return CategoryIndex({
+            "( - ) CUSTOS VARIÁVEIS": ["BOVINOS", "AVES", "CARNE SUÍNA"],
+            "( - ) DEDUÇÕES SOBRE RECEITA": ["CORTESIA - NEGÓCIOS", "CONTA ASSINADA"],
+            "RECEITAS S/ VENDAS": ["DINHEIRO", "CONTA ASSINADA"],
+        })
+
+    def test_exact_lookup_ignores_case_and_accents(self, index):
+        """Normalized names resolve to the owning group and canonical name."""
+        assert index.lookup("cortesia negocios") == "( - ) DEDUÇÕES SOBRE RECEITA"
+        assert index.canonical_name(" carne suina ") == "CARNE SUÍNA"
+        assert index.lookup("PICANHA") is None
+
+    def test_name_in_two_groups(self, index):
+        """A name listed under two groups returns both, first group first."""
+        groups = [m.group for m in index.search_exact("CONTA ASSINADA")]
+
+        assert groups == ["( - ) DEDUÇÕES SOBRE RECEITA", "RECEITAS S/ VENDAS"]
+        assert index.names.count("CONTA ASSINADA") == 1
+
+    def test_prefix_matches_full_name_and_tokens(self, index):
+        """Names starting with the prefix come before token matches."""
+        assert [m.name for m in index.search_prefix("A")] == [
+            "AVES", "CONTA ASSINADA", "CONTA ASSINADA",
+        ]
+        assert [m.name for m in index.search_prefix("sui")] == ["CARNE SUÍNA"]
+        assert index.search_prefix("XYZ") == []
+
+    def test_fuzzy_tolerates_typos(self, index):
+        """Trigram similarity finds misspelled names."""
+        matches = index.search_fuzzy("BOVINO")
+
+        assert matches[0].name == "BOVINOS"
+        assert 0 < matches[0].score < 1
+
+    def test_search_falls_back_in_order(self, index):
+        """search() tries exact, then prefix, then fuzzy."""
+        assert index.search("aves")[0].score == 1.0
+        assert index.search("DINH")[0].name == "DINHEIRO"
+        assert index.search("DINHERO")[0].name == "DINHEIRO"
+
+    def test_from_names_and_prompt_text(self):
+        """Flat lists are indexed under one group, ignoring missing values."""
+        index = CategoryIndex.from_names(["BOVINOS", None, "AVES"])
+
+        assert index.prompt_text == "BOVINOS, AVES"
+        assert index.lookup("aves") == ""
+
+    def test_shared_index_rebuilt_when_file_changes(self, tmp_path):
+        """get_category_index returns one instance per file version."""
+        path = tmp_path / "categories.json"
+        path.write_text(json.dumps({"G1": ["A"]}), encoding="utf-8")
+        first = get_category_index(path)
+
+        assert get_category_index(path) is first
+
+        path.write_text(json.dumps({"G1": ["A", "B"]}), encoding="utf-8")
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        assert get_category_index(path).lookup("B") == "G1"
+        assert len(get_category_index(tmp_path / "missing.json")) == 0
+
+    def test_committed_categories_lookup_is_fast(self):
+        """Lookups on the committed categories.json stay below a millisecond."""
+        import time
+
+        import config
+
+        if not config.CATEGORIES_JSON_PATH.exists():
+            pytest.skip("categories.json not available")
+        index = get_category_index()
+
+        start = time.perf_counter()
+        for _ in range(100):
+            index.search("REFRIGERANTES")
+            index.search_fuzzy("TAXA ADM CARTAO")
+        elapsed = (time.perf_counter() - start) / 200
+
+        assert index.lookup("BOVINOS") is not None
+        assert elapsed < 1e-3
+
+
+class TestAccountTree:
+    """Tests for CategoryManager.build_account_tree and AccountTree."""
+
+    LEVELS = ["Nome Grupo", "cc_parent_nome", "cc_nome", "_key_centro_custo"]
+
+    @pytest.fixture
+    def df(self):
+        return pd.DataFrame({
+            "Nome Grupo": ["RECEITAS", "RECEITAS", "RECEITAS", "CUSTOS", "CUSTOS", None],
+            "cc_parent_nome": ["01.01", "01.01", "01.02", "02.01", "02.01", "02.04"],
+            "cc_nome": ["PIX", "DINHEIRO", "PIX", "BOVINOS", "BOVINOS", "OUTROS"],
+            "_key_centro_custo": ["01.01.002", "01.01.001", "01.02.001", "02.01.001", "02.01.001", "02.04.011"],
+            "Realizado": [10.0, 20.0, 5.0, -7.0, -3.0, -1.0],
+        })
+
+    @pytest.fixture
+    def tree(self, df):
+        return CategoryManager().build_account_tree(df, levels=self.LEVELS)
+
+    def test_nodes_in_breadth_first_order(self, tree):
+        """Levels are contiguous and siblings are sorted by label."""
+        assert tree.level_offsets.tolist() == [0, 3, 7, 12, 17]
+        assert tree.labels[tree.level_ids("Nome Grupo")].tolist() == ["", "CUSTOS", "RECEITAS"]
+        assert tree.parent[tree.level_ids(0)].tolist() == [-1, -1, -1]
+
+    def test_children_are_contiguous_ranges(self, tree):
+        """Each node's children come from child_offsets and point back to it."""
+        for node in range(len(tree)):
+            children = tree.children(node)
+            assert (tree.parent[children] == node).all()
+        receitas = 2
+        assert tree.labels[tree.children(receitas)].tolist() == ["01.01", "01.02"]
+
+    def test_same_name_under_two_parents_gives_two_nodes(self, tree):
+        """Nodes are identified by their full path."""
+        pix = [n for n in tree.level_ids("cc_nome") if tree.labels[n] == "PIX"]
+
+        assert [tree.path(n) for n in pix] == [
+            ["RECEITAS", "01.01", "PIX"],
+            ["RECEITAS", "01.02", "PIX"],
+        ]
+
+    def test_rollup_matches_groupby(self, df, tree):
+        """Subtotals at every level equal the groupby sums."""
+        for depth in range(len(self.LEVELS)):
+            columns = self.LEVELS[:depth + 1]
+            expected = df.fillna({"Nome Grupo": ""}).groupby(columns)["Realizado"].sum()
+
+            result = tree.subtotals(df, depth).set_index(columns)["Realizado"]
+
+            pd.testing.assert_series_equal(result.sort_index(), expected.sort_index())
+
+    def test_rows_outside_tree_are_ignored(self, df, tree):
+        """Unknown paths get leaf id -1 and do not count in the totals."""
+        extra = pd.concat([df, df.iloc[[0]].assign(cc_nome="NOVO")], ignore_index=True)
+
+        ids = tree.leaf_ids(extra)
+        totals = tree.rollup(extra["Realizado"], ids)
+
+        assert ids[-1] == -1
+        assert totals[tree.level_ids(0)].sum() == pytest.approx(df["Realizado"].sum())
+
+    def test_save_and_load_roundtrip(self, df, tree, tmp_path):
+        """The .npz file restores the same arrays and subtotals."""
+        path = tmp_path / "account_tree.npz"
+        tree.save(path)
+
+        loaded = AccountTree.load(path)
+
+        assert loaded.levels == self.LEVELS
+        assert loaded.labels.tolist() == tree.labels.tolist()
+        assert loaded.child_offsets.tolist() == tree.child_offsets.tolist()
+        pd.testing.assert_frame_equal(loaded.subtotals(df, 2), tree.subtotals(df, 2))
+        assert not path.with_name(path.name + ".tmp").exists()
+
+    def test_base_tree_plus_new_rows(self, df, tree):
+        """A saved tree plus the new rows gives the same tree as all rows."""
+        manager = CategoryManager()
+        new_rows = df.iloc[[0]].assign(cc_nome="NOVO", _key_centro_custo="01.01.009")
+
+        incremental = manager.build_account_tree(new_rows, levels=self.LEVELS, base=tree)
+        full = manager.build_account_tree(pd.concat([df, new_rows]), levels=self.LEVELS)
+
+        assert incremental.labels.tolist() == full.labels.tolist()
+        assert incremental.parent.tolist() == full.parent.tolist()
+        with pytest.raises(ValueError):
+            manager.build_account_tree(new_rows, levels=self.LEVELS[:3], base=tree)
+
+    def test_missing_columns_raise_error(self, df):
+        """Missing level columns raise ValueError."""
+        with pytest.raises(ValueError):
+            CategoryManager().build_account_tree(df, levels=["Nome Grupo", "Camada03"])
+
+    def test_load_missing_file_raises_error(self, tmp_path):
+        """A missing tree file raises FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            AccountTree.load(tmp_path / "missing.npz")
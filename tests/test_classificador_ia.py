@@ -146,6 +146,155 @@ class TestClassificarGasto:
 
         assert resultado == "ERRO_IA"
 
+    @patch('src.ai_classifier.get_model')
+    def test_classificar_gasto_normaliza_com_indice(self, mock_get_model):
+        """Com índice, a resposta volta com o nome exato da categoria."""
+        mock_model = MagicMock()
+        mock_model.generate_content.return_value = MagicMock(text=" bovinos\n")
+        mock_get_model.return_value = mock_model
+
+        from src.ai_classifier import classificar_gasto
+        from src.category_engine import CategoryIndex
+
+        indice = CategoryIndex.from_names(['DINHEIRO', 'BOVINOS'])
+        resultado = classificar_gasto("Compra de carne bovina", indice=indice)
+
+        assert resultado == "BOVINOS"
+        assert "DINHEIRO, BOVINOS" in mock_model.generate_content.call_args[0][0]
+
+
+# =============================================================================
+# Testes para classificar_lote()
+# =============================================================================
+
+def _modelo_com_respostas(*textos):
+    """Modelo falso que devolve os textos informados, em ordem."""
+    mock_model = MagicMock()
+    mock_model.generate_content.side_effect = [MagicMock(text=texto) for texto in textos]
+    return mock_model
+
+
+class TestClassificarLote:
+    """Testes para a classificação em lote."""
+
+    @pytest.fixture
+    def indice(self):
+        from src.category_engine import CategoryIndex
+
+        return CategoryIndex.from_names(['DINHEIRO', 'BOVINOS', 'REFRIGERANTES'])
+
+    @patch('src.ai_classifier.get_model')
+    def test_resposta_json(self, mock_get_model, indice):
+        """Uma chamada para o lote; respostas normalizadas e validadas."""
+        mock_get_model.return_value = _modelo_com_respostas(
+            '```json\n{"1": "bovinos", "2": "REFRIGERANTES", "3": "OUTROS"}\n```'
+        )
+
+        from src.ai_classifier import classificar_lote
+
+        resultado = classificar_lote(["Picanha", "Coca-Cola", "Parafuso"], indice)
+
+        assert resultado == ["BOVINOS", "REFRIGERANTES", "OUTROS"]
+        prompt = mock_get_model.return_value.generate_content.call_args[0][0]
+        assert '1. "Picanha"' in prompt and '3. "Parafuso"' in prompt
+
+    @patch('src.ai_classifier.get_model')
+    def test_itens_invalidos_ou_ausentes(self, mock_get_model, indice):
+        """Categoria inexistente e item sem resposta viram None."""
+        mock_get_model.return_value = _modelo_com_respostas('{"1": "CARNES", "2": "DINHEIRO"}')
+
+        from src.ai_classifier import classificar_lote
+
+        assert classificar_lote(["a", "b", "c"], indice) == [None, "DINHEIRO", None]
+
+    @patch('src.ai_classifier.get_model')
+    def test_resposta_em_linhas_numeradas(self, mock_get_model, indice):
+        """Sem JSON, linhas numeradas também são aceitas."""
+        mock_get_model.return_value = _modelo_com_respostas('1. BOVINOS\n2) "DINHEIRO"')
+
+        from src.ai_classifier import classificar_lote
+
+        assert classificar_lote(["a", "b"], indice) == ["BOVINOS", "DINHEIRO"]
+
+    @patch('src.ai_classifier.get_model')
+    def test_erro_na_chamada(self, mock_get_model, indice):
+        """Falha da API deixa todos os itens pendentes."""
+        mock_model = MagicMock()
+        mock_model.generate_content.side_effect = Exception("API Error")
+        mock_get_model.return_value = mock_model
+
+        from src.ai_classifier import classificar_lote
+
+        assert classificar_lote(["a", "b"], indice) == [None, None]
+
+    @patch('src.ai_classifier.get_model')
+    def test_processar_reenvia_apenas_itens_falhos(self, mock_get_model, sample_mestre_df):
+        """Lotes de 2: três chamadas em lote e uma individual para o item inválido."""
+        respostas = {
+            '1. "item 0"': '{"1": "BOVINOS", "2": "XPTO"}',
+            '1. "item 2"': '{"1": "DINHEIRO", "2": "BOVINOS"}',
+            '1. "item 4"': '{"1": "OUTROS"}',
+            'GASTO: "item 1"': 'DINHEIRO',
+        }
+
+        def responder(prompt):
+            return MagicMock(text=next(r for chave, r in respostas.items() if chave in prompt))
+
+        mock_model = MagicMock()
+        mock_model.generate_content.side_effect = responder
+        mock_get_model.return_value = mock_model
+        df_novo = pd.DataFrame({'Descricao': [f'item {i}' for i in range(5)]})
+
+        from src.ai_classifier import processar_classificacao
+
+        resultado = processar_classificacao(sample_mestre_df, df_novo, "", batch_size=2)
+
+        assert resultado['cc_nome'].tolist() == ['BOVINOS', 'DINHEIRO', 'DINHEIRO', 'BOVINOS', 'OUTROS']
+        assert mock_model.generate_content.call_count == 4
+
+    def test_driver_divide_a_cota_entre_modelos(self, monkeypatch):
+        """Trocar de modelo recria o driver, mas não zera o balde de fichas da API."""
+        import config
+        from src.ai_classifier import get_driver
+
+        monkeypatch.setattr(config, "AI_REQUESTS_PER_MINUTE", 60)
+        primeiro = get_driver(MagicMock())
+        segundo = get_driver(MagicMock())
+        http = get_driver(MagicMock(), api="http")
+
+        assert segundo is not primeiro
+        assert segundo.bucket is primeiro.bucket
+        assert http.bucket is not primeiro.bucket
+
+    @patch('src.ai_classifier.get_model')
+    def test_processar_nao_reenvia_lote_com_erro_de_api(self, mock_get_model, sample_mestre_df):
+        """Lote cuja chamada falhou (ex: 429) fica como ERRO_IA, sem perguntas individuais."""
+        def responder(prompt):
+            if '1. "item 0"' in prompt:
+                raise Exception("429 Resource exhausted")
+            return MagicMock(text='{"1": "DINHEIRO", "2": "BOVINOS"}')
+
+        mock_model = MagicMock()
+        mock_model.generate_content.side_effect = responder
+        mock_get_model.return_value = mock_model
+        df_novo = pd.DataFrame({'Descricao': [f'item {i}' for i in range(4)]})
+
+        from src.ai_classifier import processar_classificacao
+
+        resultado = processar_classificacao(sample_mestre_df, df_novo, "", batch_size=2)
+
+        assert resultado['cc_nome'].tolist() == ['ERRO_IA', 'ERRO_IA', 'DINHEIRO', 'BOVINOS']
+        assert mock_model.generate_content.call_count == 2
+
+    @patch('src.ai_classifier.get_model')
+    def test_resposta_individual_invalida_vira_erro(self, mock_get_model, indice):
+        """Texto livre fora das categorias não vai para o cc_nome."""
+        mock_get_model.return_value = _modelo_com_respostas('Acho que é carne bovina')
+
+        from src.ai_classifier import classificar_gasto
+
+        assert classificar_gasto("Picanha", indice=indice) == "ERRO_IA"
+
 
 # =============================================================================
 # Testes para main()
@@ -191,6 +340,111 @@ class TestMain:
         assert resultado == "Sem categorias disponíveis."
 
 
+# =============================================================================
+# Testes do Contexto RAG Compartilhado
+# =============================================================================
+
+class TestContextoRAG:
+    """Testes para get_contexto_rag e o cache de contexto no provedor."""
+
+    @pytest.fixture
+    def categories_json(self, tmp_path):
+        import json
+
+        path = tmp_path / "categories.json"
+        path.write_text(json.dumps({"CUSTOS": ["BOVINOS", "AVES"]}), encoding="utf-8")
+        return path
+
+    @pytest.fixture
+    def genai_falso(self, monkeypatch):
+        """google.generativeai simulado, com CachedContent e from_cached_content."""
+        import src.ai_classifier
+
+        genai = MagicMock()
+        genai.caching.CachedContent.create.return_value = MagicMock(name="cachedContents/1")
+        modelo_em_cache = genai.GenerativeModel.from_cached_content.return_value
+        modelo_em_cache.generate_content.return_value = MagicMock(text="BOVINOS")
+        google = MagicMock(generativeai=genai)
+        monkeypatch.setitem(sys.modules, "google", google)
+        monkeypatch.setitem(sys.modules, "google.generativeai", genai)
+        monkeypatch.setattr(src.ai_classifier, "genai", genai)
+        monkeypatch.setattr(src.ai_classifier, "_modelos_com_contexto", {})
+        return genai
+
+    def test_carregado_uma_vez_por_versao(self, categories_json):
+        """Mesmo objeto enquanto o arquivo não muda; recarrega quando muda."""
+        import json
+
+        from src.ai_classifier import get_contexto_rag
+
+        primeiro = get_contexto_rag(categories_json)
+        assert get_contexto_rag(categories_json) is primeiro
+        assert "- CUSTOS: BOVINOS, AVES" in primeiro.texto
+        assert primeiro.texto in primeiro.prefixo
+        assert primeiro.indice.canonical_name("aves") == "AVES"
+
+        categories_json.write_text(json.dumps({"CUSTOS": ["SUINOS"]}), encoding="utf-8")
+        futuro = categories_json.stat().st_mtime_ns + 10**9
+        os.utime(categories_json, ns=(futuro, futuro))
+
+        segundo = get_contexto_rag(categories_json)
+        assert segundo is not primeiro
+        assert segundo.hash != primeiro.hash
+        assert "SUINOS" in segundo.texto
+
+    def test_arquivo_inexistente(self, tmp_path):
+        """Sem categories.json o contexto fica vazio."""
+        from src.ai_classifier import get_contexto_rag
+
+        contexto = get_contexto_rag(tmp_path / "nao_existe.json")
+
+        assert contexto.texto == ""
+        assert contexto.categorias == {}
+
+    @patch('src.ai_classifier.get_model')
+    def test_hierarquia_enviada_uma_vez(self, mock_get_model, categories_json, genai_falso, monkeypatch):
+        """Com o cache no provedor, os prompts levam só a tarefa."""
+        import config
+        from src.ai_classifier import classificar_gasto, get_contexto_rag
+
+        monkeypatch.setattr(config, "AI_PROVIDER_CACHE_MIN_TOKENS", 1)
+        contexto = get_contexto_rag(categories_json)
+
+        for _ in range(2):
+            resultado = classificar_gasto("Picanha", contexto_rag=contexto.texto, indice=contexto.indice)
+
+        assert resultado == "BOVINOS"
+        criar = genai_falso.caching.CachedContent.create
+        assert criar.call_count == 1
+        assert criar.call_args.kwargs["system_instruction"] == contexto.prefixo
+        modelo_em_cache = genai_falso.GenerativeModel.from_cached_content.return_value
+        prompt = modelo_em_cache.generate_content.call_args[0][0]
+        assert "Picanha" in prompt and "AVES" not in prompt
+        mock_get_model.return_value.generate_content.assert_not_called()
+
+    @patch('src.ai_classifier.get_model')
+    def test_prefixo_pequeno_nao_usa_cache(self, mock_get_model, categories_json, genai_falso):
+        """Abaixo do mínimo de tokens o contexto segue em cada prompt."""
+        from src.ai_classifier import get_contexto_rag, get_model_com_contexto
+
+        assert get_model_com_contexto(get_contexto_rag(categories_json).prefixo) is None
+        genai_falso.caching.CachedContent.create.assert_not_called()
+
+    @patch('src.ai_classifier.get_model')
+    def test_falha_do_provedor(self, mock_get_model, categories_json, genai_falso, monkeypatch):
+        """Se o provedor recusa o cache, não tenta de novo até o fim da validade."""
+        import config
+        from src.ai_classifier import get_contexto_rag, get_model_com_contexto
+
+        monkeypatch.setattr(config, "AI_PROVIDER_CACHE_MIN_TOKENS", 1)
+        genai_falso.caching.CachedContent.create.side_effect = RuntimeError("400 too small")
+        prefixo = get_contexto_rag(categories_json).prefixo
+
+        assert get_model_com_contexto(prefixo) is None
+        assert get_model_com_contexto(prefixo) is None
+        assert genai_falso.caching.CachedContent.create.call_count == 1
+
+
 # =============================================================================
 # Testes de Integração RAG
 # =============================================================================
@@ -0,0 +1,191 @@
+"""
+Testes unitários para o módulo classification_cache.
+
+Cobertura de testes:
+- Normalização das descrições e hash do contexto
+- Contexto estrito e não estrito
+- Expiração (TTL) e remoção LRU
+- Contadores de acertos e faltas
+- Deduplicação e reuso do cache em processar_classificacao
+"""
+
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import pytest
+
+import config
+from src.classification_cache import ClassificationCache, context_hash, normalize_description
+
+
+class FakeClock:
+    """Relógio controlado pelo teste."""
+
+    def __init__(self, now: float = 1_000_000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(tmp_path: Path, clock: FakeClock):
+    with ClassificationCache(
+        tmp_path / "cache.sqlite", ttl_days=1, max_entries=0, strict_context=True, clock=clock
+    ) as cache:
+        yield cache
+
+
+# =============================================================================
+# Testes de Normalização
+# =============================================================================
+
+class TestNormalization:
+    """Testes para normalize_description e context_hash."""
+
+    def test_equivalent_descriptions_share_key(self):
+        """Espaços, maiúsculas, acentos e pontuação não mudam a chave."""
+        assert normalize_description("  Pagamento  aws ") == "PAGAMENTO AWS"
+        assert normalize_description("Pagamento-AWS!") == "PAGAMENTO AWS"
+        assert normalize_description("Energia Elétrica") == normalize_description("ENERGIA ELETRICA")
+
+    def test_non_string_description(self):
+        """Valores que não são texto viram chave vazia."""
+        assert normalize_description(None) == ""
+
+    def test_context_hash(self):
+        """Hash estável, curto e sensível ao contexto."""
+        assert context_hash("A, B") == context_hash("A, B")
+        assert context_hash("A, B") != context_hash("A, C")
+        assert len(context_hash("A, B")) == 16
+
+
+# =============================================================================
+# Testes do Cache
+# =============================================================================
+
+class TestClassificationCache:
+    """Testes para a classe ClassificationCache."""
+
+    def test_roundtrip_and_counters(self, cache):
+        """Acertos e faltas são contados por descrição distinta."""
+        cache.put_many({"PAGAMENTO AWS": "SOFTWARE"}, "ctx")
+
+        found = cache.get_many(["PAGAMENTO AWS", "LUZ", "PAGAMENTO AWS"], "ctx")
+
+        assert found == {"PAGAMENTO AWS": "SOFTWARE"}
+        assert cache.stats == {"hits": 1, "misses": 1, "entries": 1}
+
+    def test_persists_between_instances(self, tmp_path):
+        """As entradas continuam no banco após fechar e reabrir."""
+        path = tmp_path / "sub" / "cache.sqlite"
+        with ClassificationCache(path) as cache:
+            cache.put_many({"LUZ": "ENERGIA"}, "ctx")
+
+        with ClassificationCache(path) as cache:
+            assert cache.get_many(["LUZ"], "ctx") == {"LUZ": "ENERGIA"}
+
+    def test_strict_context(self, cache):
+        """No modo estrito, outro contexto de categorias é uma falta."""
+        cache.put_many({"LUZ": "ENERGIA"}, "antigo")
+
+        assert cache.get_many(["LUZ"], "novo") == {}
+
+    def test_non_strict_prefers_same_context(self, tmp_path, clock):
+        """Fora do modo estrito vale o mesmo contexto e, depois, o mais recente."""
+        with ClassificationCache(tmp_path / "c.sqlite", strict_context=False, clock=clock) as cache:
+            cache.put_many({"LUZ": "ENERGIA", "AWS": "SOFTWARE"}, "atual")
+            clock.now += 10
+            cache.put_many({"LUZ": "OUTROS", "AWS": "NUVEM"}, "outro")
+
+            assert cache.get_many(["LUZ"], "atual") == {"LUZ": "ENERGIA"}
+            assert cache.get_many(["AWS"], "terceiro") == {"AWS": "NUVEM"}
+
+    def test_is_valid_filter(self, cache):
+        """Categorias recusadas pelo filtro contam como faltas."""
+        cache.put_many({"LUZ": "EXTINTA", "AWS": "SOFTWARE"}, "ctx")
+
+        found = cache.get_many(["LUZ", "AWS"], "ctx", is_valid=lambda cat: cat != "EXTINTA")
+
+        assert found == {"AWS": "SOFTWARE"}
+        assert cache.misses == 1
+
+    def test_ttl_expiration(self, cache, clock):
+        """Entradas mais antigas que o TTL não são devolvidas e são removidas."""
+        cache.put_many({"LUZ": "ENERGIA"}, "ctx")
+        clock.now += 86_400 + 1
+
+        assert cache.get_many(["LUZ"], "ctx") == {}
+        assert cache.evict() == 1
+        assert len(cache) == 0
+
+    def test_lru_eviction(self, tmp_path, clock):
+        """Acima do limite, sai a entrada usada há mais tempo."""
+        with ClassificationCache(tmp_path / "c.sqlite", max_entries=2, clock=clock) as cache:
+            cache.put_many({"A": "X"}, "ctx")
+            clock.now += 1
+            cache.put_many({"B": "Y"}, "ctx")
+            clock.now += 1
+            cache.get_many(["A"], "ctx")
+            clock.now += 1
+            cache.put_many({"C": "Z"}, "ctx")
+
+            assert len(cache) == 2
+            assert cache.get_many(["A", "B", "C"], "ctx") == {"A": "X", "C": "Z"}
+
+    def test_many_descriptions(self, cache):
+        """Consultas com mais descrições que o limite de parâmetros do SQLite."""
+        categories = {f"ITEM {i}": "OUTROS" for i in range(1_200)}
+        cache.put_many(categories, "ctx")
+
+        assert cache.get_many(list(categories), "ctx") == categories
+
+
+# =============================================================================
+# Testes de processar_classificacao com Cache
+# =============================================================================
+
+class TestProcessarComCache:
+    """Deduplicação e reuso do cache na classificação por IA."""
+
+    @patch('src.ai_classifier.get_model')
+    def test_second_run_uses_cache(self, mock_get_model, cache):
+        """Descrições repetidas vão uma vez para a IA; a segunda execução não chama a IA."""
+        mock_model = MagicMock()
+        mock_model.generate_content.return_value = MagicMock(text='{"1": "BOVINOS", "2": "DINHEIRO"}')
+        mock_get_model.return_value = mock_model
+        df_mestre = pd.DataFrame({'cc_nome': ['BOVINOS', 'DINHEIRO']})
+
+        from src.ai_classifier import processar_classificacao
+
+        def novo() -> pd.DataFrame:
+            return pd.DataFrame({'Descricao': ['Compra gado', 'Venda', 'COMPRA  GADO']})
+
+        primeiro = processar_classificacao(df_mestre, novo(), "", batch_size=10, cache=cache)
+        segundo = processar_classificacao(df_mestre, novo(), "", batch_size=10, cache=cache)
+
+        assert primeiro['cc_nome'].tolist() == ['BOVINOS', 'DINHEIRO', 'BOVINOS']
+        assert segundo['cc_nome'].tolist() == primeiro['cc_nome'].tolist()
+        assert mock_model.generate_content.call_count == 1
+        assert cache.hits == 2
+
+    @patch('src.ai_classifier.get_model')
+    def test_invalid_answers_are_not_cached(self, mock_get_model, cache):
+        """Erros da IA não entram no cache."""
+        mock_get_model.return_value = None
+        df_mestre = pd.DataFrame({'cc_nome': ['BOVINOS']})
+
+        from src.ai_classifier import processar_classificacao
+
+        resultado = processar_classificacao(
+            df_mestre, pd.DataFrame({'Descricao': ['x']}), "", cache=cache
+        )
+
+        assert resultado['cc_nome'].tolist() == ['ERRO_IA']
+        assert len(cache) == 0
@@ -0,0 +1,242 @@
+"""
+Testes unitários para o módulo classification_checkpoint.
+
+Cobertura de testes:
+- Hash das linhas da entrada
+- Gravação e leitura do checkpoint (inclusive linha incompleta)
+- Contagem de tentativas frustradas por linha
+- Identificador da execução (chave do acréscimo ao mestre)
+- Classificação em micro-lotes e retomada após interrupção
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import pytest
+
+import config
+from src.classification_checkpoint import ClassificationCheckpoint, row_hashes
+
+
+@pytest.fixture
+def checkpoint(tmp_path) -> ClassificationCheckpoint:
+    return ClassificationCheckpoint(tmp_path / "checkpoint.jsonl")
+
+
+# =============================================================================
+# Testes do row_hashes
+# =============================================================================
+
+class TestRowHashes:
+    """Testes para o hash das linhas."""
+
+    def test_identical_rows(self):
+        """Linhas iguais têm o mesmo hash; a coluna excluída não conta."""
+        df = pd.DataFrame({
+            'Descricao': ['Picanha', 'Picanha', 'Coca'],
+            'Valor': [10, 10, 10],
+            'cc_nome': ['', 'BOVINOS', ''],
+        })
+
+        hashes = row_hashes(df, exclude=['cc_nome'])
+
+        assert hashes[0] == hashes[1]
+        assert hashes[0] != hashes[2]
+        assert len(hashes[0]) == 64
+
+    def test_column_names_matter(self):
+        """O mesmo valor em outra coluna muda o hash."""
+        assert row_hashes(pd.DataFrame({'a': ['x']})) != row_hashes(pd.DataFrame({'b': ['x']}))
+
+
+# =============================================================================
+# Testes do ClassificationCheckpoint
+# =============================================================================
+
+class TestClassificationCheckpoint:
+    """Testes de gravação e leitura."""
+
+    def test_append_and_load(self, checkpoint):
+        """Micro-lotes acrescentados são lidos de volta; o último valor prevalece."""
+        checkpoint.append({"a": "BOVINOS", "b": "OUTROS"})
+        checkpoint.append({"b": "REFRIGERANTES"})
+
+        assert checkpoint.load() == {"a": "BOVINOS", "b": "REFRIGERANTES"}
+        assert len(checkpoint) == 2
+
+    def test_missing_file(self, checkpoint):
+        """Sem arquivo, o checkpoint está vazio."""
+        assert checkpoint.load() == {}
+        checkpoint.clear()
+
+    def test_truncated_line(self, checkpoint):
+        """A linha incompleta de uma gravação interrompida é ignorada."""
+        checkpoint.append({"a": "BOVINOS"})
+        with open(checkpoint.path, "a", encoding="utf-8") as f:
+            f.write('{"row": "b", "cc_no')
+        checkpoint.append({"c": "ENERGIA"})
+
+        assert checkpoint.load() == {"a": "BOVINOS", "c": "ENERGIA"}
+
+    def test_attempts(self, checkpoint):
+        """Tentativas frustradas são contadas por linha, à parte das categorias."""
+        assert checkpoint.record_attempts(["a", "b", "a"]) == {"a": 1, "b": 1}
+        assert checkpoint.record_attempts(["a"]) == {"a": 2}
+        checkpoint.append({"c": "ENERGIA"})
+
+        assert checkpoint.attempts() == {"a": 2, "b": 1}
+        assert checkpoint.load() == {"c": "ENERGIA"}
+        assert checkpoint.record_attempts([]) == {}
+
+    def test_run_id(self, checkpoint):
+        """O identificador da execução é o mesmo até o clear(), e depois é outro."""
+        run = checkpoint.run_id()
+        checkpoint.append({"a": "BOVINOS"})
+        checkpoint.record_attempts(["b"])
+
+        assert ClassificationCheckpoint(checkpoint.path).run_id() == run
+        assert checkpoint.load() == {"a": "BOVINOS"}
+        assert checkpoint.attempts() == {"b": 1}
+
+        checkpoint.clear()
+        assert checkpoint.run_id() != run
+
+    def test_clear(self, checkpoint):
+        """clear() remove o arquivo."""
+        checkpoint.append({"a": "BOVINOS"})
+        checkpoint.clear()
+
+        assert not checkpoint.path.exists()
+
+
+# =============================================================================
+# Testes do processar_com_checkpoint
+# =============================================================================
+
+class TestProcessarComCheckpoint:
+    """Classificação em micro-lotes com retomada."""
+
+    @pytest.fixture(autouse=True)
+    def sem_cache(self, monkeypatch, tmp_path):
+        """Toda descrição vai para a IA; checkpoint padrão em tmp_path."""
+        monkeypatch.setattr(config, "AI_CACHE_ENABLED", False)
+        monkeypatch.setattr(config, "AI_CHECKPOINT_PATH", tmp_path / "padrao.jsonl")
+        monkeypatch.setattr(config, "PRE_CLASSIFIER_ENABLED", False)
+
+    @pytest.fixture
+    def df_mestre(self) -> pd.DataFrame:
+        return pd.DataFrame({'cc_nome': ['BOVINOS', 'REFRIGERANTES']})
+
+    @staticmethod
+    def entrada() -> pd.DataFrame:
+        return pd.DataFrame({
+            'Descricao': ['Picanha', 'Coca', 'Fraldinha', 'Guarana'],
+            'Valor': [10, 5, 12, 4],
+        })
+
+    @patch('src.ai_classifier.get_model')
+    def test_micro_batches(self, mock_get_model, df_mestre, checkpoint):
+        """Cada micro-lote é gravado no checkpoint."""
+        mock_model = MagicMock()
+        mock_model.generate_content.return_value = MagicMock(text="BOVINOS")
+        mock_get_model.return_value = mock_model
+
+        from src.ai_classifier import processar_com_checkpoint
+
+        resultado = processar_com_checkpoint(
+            df_mestre, self.entrada(), "", checkpoint, rows_per_checkpoint=2, batch_size=1
+        )
+
+        assert resultado['cc_nome'].tolist() == ['BOVINOS'] * 4
+        assert len(checkpoint) == 4
+        assert resultado.attrs["classificacao"]["chamadas_ia"] == 4
+        assert resultado.attrs["classificacao"]["retomadas"] == 0
+
+    @patch('src.ai_classifier.get_model')
+    def test_resume_after_interruption(self, mock_get_model, df_mestre, checkpoint):
+        """Após uma interrupção, só as linhas fora do checkpoint vão para a IA."""
+        mock_model = MagicMock()
+        mock_model.generate_content.side_effect = [
+            MagicMock(text="BOVINOS"), MagicMock(text="REFRIGERANTES"), KeyboardInterrupt(),
+        ]
+        mock_get_model.return_value = mock_model
+
+        from src.ai_classifier import processar_com_checkpoint
+
+        with pytest.raises(KeyboardInterrupt):
+            processar_com_checkpoint(
+                df_mestre, self.entrada(), "", checkpoint, rows_per_checkpoint=2, batch_size=1
+            )
+        assert len(checkpoint) == 2
+
+        mock_model.generate_content.side_effect = None
+        mock_model.generate_content.reset_mock()
+        mock_model.generate_content.return_value = MagicMock(text="REFRIGERANTES")
+
+        resultado = processar_com_checkpoint(
+            df_mestre, self.entrada(), "", checkpoint, rows_per_checkpoint=2, batch_size=1
+        )
+
+        assert resultado['cc_nome'].tolist() == ['BOVINOS', 'REFRIGERANTES', 'REFRIGERANTES', 'REFRIGERANTES']
+        assert mock_model.generate_content.call_count == 2
+        assert resultado.attrs["classificacao"]["retomadas"] == 2
+
+    @patch('src.ai_classifier.get_model', return_value=None)
+    def test_errors_are_not_checkpointed(self, mock_get_model, df_mestre, checkpoint):
+        """Itens ERRO_IA ficam fora do checkpoint e são tentados de novo."""
+        from src.ai_classifier import processar_com_checkpoint
+
+        resultado = processar_com_checkpoint(df_mestre, self.entrada(), "", checkpoint)
+
+        assert resultado['cc_nome'].tolist() == ['ERRO_IA'] * 4
+        assert len(checkpoint) == 0
+        assert resultado.attrs["classificacao"]["nao_gravadas"] == 4
+
+    def test_invalid_categories_are_not_checkpointed(self, df_mestre, checkpoint):
+        """Só categorias do índice (ou OUTROS) vão para o checkpoint."""
+        backend = MagicMock(name="backend", cacheable=False, calls=0)
+        backend.name = "fake"
+        backend.classify_batch.return_value = (
+            ['BOVINOS', 'Refrigerante de cola', 'OUTROS', 'bovinos'], [1.0] * 4
+        )
+
+        from src.ai_classifier import processar_com_checkpoint
+
+        with patch('src.ai_classifier.get_backend', return_value=backend):
+            resultado = processar_com_checkpoint(df_mestre, self.entrada(), "", checkpoint)
+
+        assert sorted(checkpoint.load().values()) == ['BOVINOS', 'BOVINOS', 'OUTROS']
+        assert resultado['cc_nome'].tolist()[-1] == 'BOVINOS'
+        assert resultado.attrs["classificacao"]["nao_gravadas"] == 1
+
+    @patch('src.ai_classifier.get_model', return_value=None)
+    def test_rows_give_up_after_max_attempts(self, mock_get_model, monkeypatch, df_mestre, checkpoint):
+        """Na última tentativa permitida, a linha é gravada como OUTROS."""
+        monkeypatch.setattr(config, "AI_CHECKPOINT_MAX_ATTEMPTS", 2)
+
+        from src.ai_classifier import processar_com_checkpoint
+
+        primeira = processar_com_checkpoint(df_mestre, self.entrada(), "", checkpoint)
+        assert primeira['cc_nome'].tolist() == ['ERRO_IA'] * 4
+        assert primeira.attrs["classificacao"]["nao_gravadas"] == 4
+        assert primeira.attrs["classificacao"]["desistidas"] == 0
+
+        segunda = processar_com_checkpoint(df_mestre, self.entrada(), "", checkpoint)
+        assert segunda['cc_nome'].tolist() == ['OUTROS'] * 4
+        assert segunda.attrs["classificacao"]["nao_gravadas"] == 0
+        assert segunda.attrs["classificacao"]["desistidas"] == 4
+        assert set(checkpoint.load().values()) == {'OUTROS'}
+
+    @patch('src.ai_classifier.get_model', return_value=None)
+    def test_unlimited_attempts(self, mock_get_model, monkeypatch, df_mestre, checkpoint):
+        """Com AI_CHECKPOINT_MAX_ATTEMPTS = 0, a linha nunca é encerrada."""
+        monkeypatch.setattr(config, "AI_CHECKPOINT_MAX_ATTEMPTS", 0)
+
+        from src.ai_classifier import processar_com_checkpoint
+
+        for _ in range(3):
+            resultado = processar_com_checkpoint(df_mestre, self.entrada(), "", checkpoint)
+
+        assert resultado.attrs["classificacao"]["nao_gravadas"] == 4
+        assert set(checkpoint.attempts().values()) == {3}
+        assert len(checkpoint) == 0
@@ -0,0 +1,260 @@
+"""
+Testes unitários para o módulo classification_driver.
+
+Cobertura de testes:
+- Balde de fichas (token bucket)
+- Novas tentativas em erros 429/5xx com espera exponencial e jitter
+- Limite de concorrência
+- Modelo simulado (StubModel) com cota por minuto e latência por tamanho do prompt
+"""
+
+import asyncio
+import random
+
+import pytest
+
+from src.classification_driver import (
+    ClassificationDriver,
+    StubAPIError,
+    StubModel,
+    TokenBucket,
+    estimate_tokens,
+    is_retryable,
+)
+
+
+class FakeClock:
+    """Relógio controlado pelo teste."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class RecordingSleep:
+    """Substitui asyncio.sleep registrando as esperas."""
+
+    def __init__(self):
+        self.delays = []
+
+    async def __call__(self, delay):
+        self.delays.append(delay)
+
+
+class FlakyModel:
+    """Modelo assíncrono que levanta os erros informados antes de responder."""
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    async def generate_content_async(self, prompt):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return type("Resposta", (), {"text": f"ok:{prompt}"})()
+
+
+# =============================================================================
+# Testes do Balde de Fichas
+# =============================================================================
+
+class TestTokenBucket:
+    """Testes para a classe TokenBucket."""
+
+    def test_burst_then_rate(self):
+        """A rajada sai sem espera; as seguintes esperam 1/rate cada."""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2.0, capacity=2, clock=clock)
+
+        assert [bucket.reserve() for _ in range(4)] == [0.0, 0.0, 0.5, 1.0]
+
+    def test_tokens_refill_over_time(self):
+        """Fichas são repostas com o tempo, até a capacidade."""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1.0, capacity=2, clock=clock)
+        bucket.reserve()
+        bucket.reserve()
+
+        clock.now = 10.0
+
+        assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 1.0]
+
+    def test_invalid_rate_raises_error(self):
+        """Taxa não positiva levanta ValueError."""
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0)
+
+
+# =============================================================================
+# Testes do Driver
+# =============================================================================
+
+class TestClassificationDriver:
+    """Testes para a classe ClassificationDriver."""
+
+    def test_retryable_errors(self):
+        """429 e 5xx são tentados de novo; outros erros não."""
+        assert is_retryable(StubAPIError(429, "quota"))
+        assert is_retryable(StubAPIError(503, "indisponível"))
+        assert not is_retryable(StubAPIError(400, "inválido"))
+        assert not is_retryable(ValueError("x"))
+
+    def test_retries_with_jittered_backoff(self):
+        """Erros temporários são tentados de novo com espera crescente e aleatória."""
+        model = FlakyModel([StubAPIError(429, "quota"), StubAPIError(503, "x")])
+        sleep = RecordingSleep()
+        driver = ClassificationDriver(
+            model, requests_per_minute=0, max_retries=3, backoff_base=1.0,
+            backoff_max=10.0, rng=random.Random(1), sleep=sleep,
+        )
+
+        assert driver.run(["a"]) == ["ok:a"]
+        assert model.calls == 3
+        assert driver.stats["retries"] == 2
+        assert 0 <= sleep.delays[0] <= 1.0
+        assert 0 <= sleep.delays[1] <= 2.0
+
+    def test_gives_up_after_max_retries(self):
+        """Sem tentativas restantes, o erro é devolvido na posição do prompt."""
+        model = FlakyModel([StubAPIError(429, "quota")] * 5)
+        driver = ClassificationDriver(
+            model, requests_per_minute=0, max_retries=2, sleep=RecordingSleep()
+        )
+
+        result = driver.run(["a"])
+
+        assert isinstance(result[0], StubAPIError)
+        assert model.calls == 3
+
+    def test_non_retryable_error_is_not_retried(self):
+        """Erros que não são 429/5xx falham na primeira tentativa."""
+        model = FlakyModel([ValueError("prompt inválido")])
+        driver = ClassificationDriver(model, requests_per_minute=0, sleep=RecordingSleep())
+
+        with pytest.raises(ValueError):
+            driver.generate_sync("a")
+        assert model.calls == 1
+
+    def test_concurrency_limit(self):
+        """Nunca há mais chamadas simultâneas que max_concurrency."""
+        state = {"active": 0, "peak": 0}
+
+        class SlowModel:
+            async def generate_content_async(self, prompt):
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+                await asyncio.sleep(0.01)
+                state["active"] -= 1
+                return type("Resposta", (), {"text": prompt})()
+
+        driver = ClassificationDriver(SlowModel(), max_concurrency=3, requests_per_minute=0)
+
+        assert driver.run([str(i) for i in range(10)]) == [str(i) for i in range(10)]
+        assert state["peak"] == 3
+
+    def test_sync_model_runs_in_threads(self):
+        """Modelos só com generate_content (síncrono) também são aceitos."""
+        stub = StubModel(latency=0.01)
+        stub.generate_content_async = None
+        driver = ClassificationDriver(stub, max_concurrency=4, requests_per_minute=0)
+
+        assert driver.run(["x", 'Itens:\n1. "a"\n2. "b"']) == [
+            "OUTROS", '{"1": "OUTROS", "2": "OUTROS"}',
+        ]
+
+    def test_run_inside_event_loop(self):
+        """run() funciona quando já existe um loop de eventos em execução."""
+        driver = ClassificationDriver(StubModel(latency=0), requests_per_minute=0)
+
+        async def main():
+            return driver.run(["a"])
+
+        assert asyncio.run(main()) == ["OUTROS"]
+
+    def test_async_client_keeps_its_loop(self):
+        """Chamadas seguidas de run() usam o mesmo loop (clientes assíncronos ficam presos ao primeiro)."""
+        class LoopBoundModel:
+            loop = None
+
+            async def generate_content_async(self, prompt):
+                loop = asyncio.get_running_loop()
+                if self.loop is None:
+                    self.loop = loop
+                if loop is not self.loop:
+                    raise RuntimeError("attached to a different loop")
+                return type("Resposta", (), {"text": prompt})()
+
+        driver = ClassificationDriver(LoopBoundModel(), requests_per_minute=0)
+
+        assert driver.run(["a"]) == ["a"]
+        assert driver.run(["b", "c"]) == ["b", "c"]
+
+    def test_shared_bucket(self):
+        """Drivers com o mesmo balde dividem a cota."""
+        bucket = TokenBucket(rate=1.0, capacity=1, clock=FakeClock())
+        primeiro = ClassificationDriver(StubModel(latency=0), bucket=bucket)
+        segundo = ClassificationDriver(StubModel(latency=0), bucket=bucket)
+
+        assert segundo.bucket is primeiro.bucket
+        assert primeiro.bucket.reserve() == 0.0
+        assert segundo.bucket.reserve() == 1.0
+
+
+# =============================================================================
+# Testes com o Modelo Simulado
+# =============================================================================
+
+class TestStubModel:
+    """Testes de carga com o StubModel."""
+
+    def test_stub_enforces_quota(self):
+        """Acima da cota por minuto, o StubModel responde 429."""
+        stub = StubModel(latency=0, requests_per_minute=2)
+
+        stub.generate_content("a")
+        stub.generate_content("b")
+        with pytest.raises(StubAPIError) as info:
+            stub.generate_content("c")
+
+        assert info.value.code == 429
+        assert stub.stats["rate_limited"] == 1
+
+    def test_bucket_avoids_rate_limit_errors(self):
+        """Com o balde ajustado à cota, nenhuma chamada recebe 429."""
+        stub = StubModel(latency=0.001, requests_per_minute=5)
+        driver = ClassificationDriver(
+            stub, max_concurrency=8, requests_per_minute=6000, burst=5, max_retries=0
+        )
+
+        results = driver.run([str(i) for i in range(5)])
+
+        assert results == ["OUTROS"] * 5
+        assert stub.stats["rate_limited"] == 0
+
+    def test_server_errors_are_recovered(self):
+        """Erros 503 simulados são recuperados pelas novas tentativas."""
+        stub = StubModel(latency=0, error_rate=0.3, seed=3)
+        driver = ClassificationDriver(
+            stub, max_concurrency=4, requests_per_minute=0, max_retries=10,
+            backoff_base=0.0001, backoff_max=0.001,
+        )
+
+        results = driver.run([str(i) for i in range(30)])
+
+        assert results == ["OUTROS"] * 30
+        assert stub.stats["server_errors"] > 0
+        assert driver.stats["retries"] == stub.stats["server_errors"]
+
+    def test_latency_grows_with_prompt_size(self, monkeypatch):
+        """latency_per_1k_tokens soma latência proporcional ao prompt estimado."""
+        delays = []
+        monkeypatch.setattr("src.classification_driver.time.sleep", delays.append)
+        stub = StubModel(latency=0.1, latency_per_1k_tokens=1.0)
+
+        stub.generate_content("x" * 4000)
+
+        assert estimate_tokens("x" * 4000) == 1000
+        assert delays == [pytest.approx(1.1)]
@@ -0,0 +1,150 @@
+"""
+Testes unitários para o módulo classifier_backend e os backends do ai_classifier.
+
+Cobertura de testes:
+- Protocolo ClassifierBackend
+- NgramBackend (limiar de confiança e nomes canônicos)
+- GeminiBackend (lotes, confiança e modelo indisponível)
+- get_backend() conforme config.AI_BACKEND
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import pytest
+
+import config
+from src.category_engine import CategoryIndex
+from src.classifier_backend import ClassifierBackend, NgramBackend
+from src.ngram_classifier import NgramClassifier
+
+
+@pytest.fixture
+def indice() -> CategoryIndex:
+    return CategoryIndex.from_names(["BOVINOS", "REFRIGERANTES", "ENERGIA"])
+
+
+# =============================================================================
+# Testes do NgramBackend
+# =============================================================================
+
+class TestNgramBackend:
+    """Testes para o backend offline."""
+
+    @pytest.fixture
+    def backend(self, indice) -> NgramBackend:
+        modelo = NgramClassifier.fit(
+            ["Picanha bovina", "Contra file bovino", "Refrigerante lata", "Coca cola 2L"],
+            ["bovinos", "bovinos", "refrigerantes", "refrigerantes"],
+        )
+        return NgramBackend(modelo, indice, min_confidence=0.3)
+
+    def test_protocol(self, backend):
+        """NgramBackend segue o protocolo, sem chamadas remotas nem cache."""
+        assert isinstance(backend, ClassifierBackend)
+        assert backend.name == "ngram"
+        assert backend.cacheable is False
+        assert backend.calls == 0
+
+    def test_classify_batch(self, backend):
+        """Categorias no nome exato do índice; sem confiança fica OUTROS."""
+        labels, scores = backend.classify_batch(["Picanha bovina kg", "qqqq"])
+
+        assert labels == ["BOVINOS", "OUTROS"]
+        assert scores[0] >= 0.3
+        assert scores[1] == 0.0
+
+    def test_min_confidence(self, backend):
+        """Acima do limiar nenhuma previsão é aceita."""
+        backend.min_confidence = 1.1
+
+        assert backend.classify_batch(["Picanha bovina kg"]) == (["OUTROS"], [0.0])
+
+
+# =============================================================================
+# Testes do GeminiBackend
+# =============================================================================
+
+class TestGeminiBackend:
+    """Testes para o backend da IA."""
+
+    def test_classify_batch(self, indice):
+        """Um lote por chamada; respostas válidas com confiança 1."""
+        from src.ai_classifier import GeminiBackend
+
+        model = MagicMock()
+        model.generate_content.return_value = MagicMock(text='{"1": "bovinos", "2": "OUTROS"}')
+        backend = GeminiBackend(indice, batch_size=10, model=model)
+
+        labels, scores = backend.classify_batch(["Picanha", "Item xyz"])
+
+        assert isinstance(backend, ClassifierBackend)
+        assert labels == ["BOVINOS", "OUTROS"]
+        assert scores == [1.0, 1.0]
+        assert backend.calls == 1
+
+    def test_invalid_answer(self, indice):
+        """Resposta fora das categorias vira ERRO_IA com confiança 0 (o texto livre não é gravado)."""
+        from src.ai_classifier import GeminiBackend
+
+        model = MagicMock()
+        model.generate_content.return_value = MagicMock(text="INEXISTENTE")
+        backend = GeminiBackend(indice, batch_size=1, model=model)
+
+        assert backend.classify_batch(["Picanha"]) == (["ERRO_IA"], [0.0])
+
+    @patch('src.ai_classifier.get_model', return_value=None)
+    def test_unavailable(self, mock_get_model, indice):
+        """Sem modelo, todos os itens ficam como ERRO_IA."""
+        from src.ai_classifier import GeminiBackend
+
+        backend = GeminiBackend(indice)
+
+        assert backend.available is False
+        assert backend.classify_batch(["Picanha"]) == (["ERRO_IA"], [0.0])
+
+
+# =============================================================================
+# Testes do get_backend
+# =============================================================================
+
+class TestGetBackend:
+    """Escolha do backend por config.AI_BACKEND."""
+
+    @patch('src.ai_classifier.get_model', return_value=None)
+    def test_gemini_without_model(self, mock_get_model, indice):
+        """Sem modelo Gemini não há backend."""
+        from src.ai_classifier import get_backend
+
+        assert get_backend(indice) is None
+
+    @patch('src.ai_classifier.get_model', return_value=None)
+    def test_http(self, mock_get_model, indice, monkeypatch):
+        """Com "http" o backend usa o endpoint de config.AI_HTTP_URL."""
+        monkeypatch.setattr(config, "AI_BACKEND", "http")
+        monkeypatch.setattr(config, "AI_HTTP_URL", "http://127.0.0.1:9")
+
+        from src.ai_classifier import get_backend
+
+        backend = get_backend(indice)
+
+        assert backend.name == "http"
+        assert backend.cacheable is True
+        assert backend.driver.model.url.startswith("http://127.0.0.1:9/v1beta/models/")
+        mock_get_model.assert_not_called()
+
+    @patch('src.ai_classifier.get_ngram_classifier', return_value=None)
+    def test_ngram_without_history(self, mock_ngram, indice, monkeypatch):
+        """Sem modelo offline nem histórico não há backend; os itens ficam como ERRO_IA."""
+        monkeypatch.setattr(config, "AI_BACKEND", "ngram")
+        monkeypatch.setattr(config, "PRE_CLASSIFIER_ENABLED", False)
+
+        from src.ai_classifier import get_backend, processar_classificacao
+
+        resultado = processar_classificacao(
+            pd.DataFrame({'cc_nome': ['BOVINOS']}), pd.DataFrame({'Descricao': ['Picanha']}), ""
+        )
+
+        assert get_backend(indice) is None
+        assert resultado['cc_nome'].tolist() == ['ERRO_IA']
+        assert resultado.attrs["classificacao"]["backend"] is None
@@ -0,0 +1,123 @@
+"""
+Testes unitários para o módulo csv_dialect.
+
+Cobertura de testes:
+- Detecção de encoding (BOM, UTF-8, Latin-1, Latin-1 após a amostra)
+- Detecção de separador, inclusive com o separador alternativo dentro do texto
+- Cache por caminho e data de modificação
+"""
+
+import os
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+import config
+from src.csv_dialect import CsvDialect, read_csv_sniffed, sniff_csv_dialect
+
+
+@pytest.fixture
+def narratives_df() -> pd.DataFrame:
+    """Narrativas com vírgulas dentro do texto, como no relatório real."""
+    return pd.DataFrame({
+        "Narrativa_IA": ["Em Ago, o grupo 'RECEITAS' registrou R$ 1,00.", "Em Set, ação."],
+        "cc_nome": ["DINHEIRO", "AÇOUGUE"],
+        "Realizado": [1.0, -2.5],
+    })
+
+
+# =============================================================================
+# Testes de Detecção
+# =============================================================================
+
+class TestSniffCsvDialect:
+    """Testes para a função sniff_csv_dialect."""
+
+    @pytest.mark.parametrize(
+        ("encoding", "sep"),
+        [
+            ("utf-8-sig", ";"),
+            ("utf-8", ";"),
+            ("utf-8", ","),
+            ("latin-1", ";"),
+            ("latin-1", ","),
+            ("utf-16", "\t"),
+        ],
+    )
+    def test_detects_dialect(self, tmp_path: Path, narratives_df, encoding, sep):
+        """Detecta encoding e separador de cada combinação."""
+        path = tmp_path / "dados.csv"
+        narratives_df.to_csv(path, sep=sep, index=False, encoding=encoding)
+
+        dialect = sniff_csv_dialect(path)
+
+        assert dialect == CsvDialect(encoding=encoding, sep=sep)
+        pd.testing.assert_frame_equal(read_csv_sniffed(path), narratives_df)
+
+    def test_multibyte_character_cut_by_sample(self, tmp_path: Path):
+        """Caractere UTF-8 cortado no fim da amostra não vira Latin-1."""
+        path = tmp_path / "dados.csv"
+        path.write_bytes(b"a;b\n" + b"x;" + "ç".encode("utf-8") * 100 + b"\n")
+
+        assert sniff_csv_dialect(path, sample_size=8).encoding == "utf-8"
+
+    def test_latin1_after_ascii_sample(self, tmp_path: Path, narratives_df, monkeypatch):
+        """Latin-1 com amostra só em ASCII: a leitura é refeita em Latin-1."""
+        monkeypatch.setattr(config, "CSV_SNIFF_BYTES", 32)
+        path = tmp_path / "dados.csv"
+        narratives_df.to_csv(path, sep=";", index=False, encoding="latin-1")
+
+        assert sniff_csv_dialect(path).encoding == "utf-8"
+        pd.testing.assert_frame_equal(read_csv_sniffed(path), narratives_df)
+
+    def test_single_column_uses_config_separator(self, tmp_path: Path):
+        """Sem separador identificável, usa config.CSV_SEPARATOR."""
+        path = tmp_path / "dados.csv"
+        path.write_text("coluna\nvalor\n", encoding="utf-8")
+
+        assert sniff_csv_dialect(path).sep == config.CSV_SEPARATOR
+
+    def test_committed_narrative_report(self):
+        """Relatório narrativo do repositório: UTF-8 com BOM, separado por ';'."""
+        if not config.NARRATIVE_CSV_PATH.exists():
+            pytest.skip("relatorio_narrativo_ia.csv não disponível")
+
+        assert sniff_csv_dialect(config.NARRATIVE_CSV_PATH) == CsvDialect("utf-8-sig", ";")
+
+    def test_file_not_found_raises_error(self, tmp_path: Path):
+        """Arquivo inexistente levanta FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            sniff_csv_dialect(tmp_path / "nao_existe.csv")
+
+
+# =============================================================================
+# Testes de Cache
+# =============================================================================
+
+class TestDialectCache:
+    """Testes para o cache por caminho e data de modificação."""
+
+    def test_unchanged_file_is_not_reopened(self, tmp_path: Path, monkeypatch):
+        """A segunda detecção do mesmo arquivo não lê o disco."""
+        path = tmp_path / "dados.csv"
+        path.write_text("a;b\n1;2\n", encoding="utf-8")
+        sniff_csv_dialect(path)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("arquivo lido novamente")
+
+        monkeypatch.setattr("builtins.open", fail)
+        assert sniff_csv_dialect(path).sep == ";"
+
+    def test_modified_file_is_sniffed_again(self, tmp_path: Path):
+        """Arquivo modificado é inspecionado de novo."""
+        path = tmp_path / "dados.csv"
+        path.write_text("a;b\n1;2\n", encoding="utf-8")
+        assert sniff_csv_dialect(path).sep == ";"
+
+        path.write_text("a,b\n1,2\n", encoding="utf-8")
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        assert sniff_csv_dialect(path).sep == ","
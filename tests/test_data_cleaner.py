@@ -6,6 +6,7 @@ Testes cobrem conversão de moeda, parsing de mês e carregamento de arquivos CS
 
 import pytest
 import pandas as pd
+import numpy as np
 from pathlib import Path
 import tempfile
 import os
@@ -13,15 +14,30 @@ import os
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+import config
 from src.data_cleaner import (
+    apply_currency_conversion,
+    apply_dimension_categoricals,
     convert_brazilian_currency,
+    convert_brazilian_currency_series,
+    convert_month_series,
     convert_month_to_date,
     load_dre_csv,
     load_dre_excel,
     load_dre_file,
+    read_excel_sheet_cached,
+    stream_dre_csv_to_parquet,
 )
 
 
+@pytest.fixture(autouse=True)
+def excel_cache_dir(tmp_path, monkeypatch):
+    """Direciona o cache Parquet das planilhas para um diretório temporário."""
+    cache_dir = tmp_path / "excel_cache"
+    monkeypatch.setattr(config, "EXCEL_CACHE_DIR", cache_dir)
+    return cache_dir
+
+
 class TestConvertBrazilianCurrency:
     """Tests for the convert_brazilian_currency function."""
 
@@ -76,6 +92,79 @@ class TestConvertBrazilianCurrency:
             convert_brazilian_currency(1234.56)
 
 
+class TestConvertBrazilianCurrencySeries:
+    """Tests for the vectorized convert_brazilian_currency_series function."""
+
+    VALID_VALUES = [
+        "R$ 1.234,56", "-R$ 1.234,56", "R$ -5", "  R$ 0,00  ", "R$ 63.713",
+        "R$ 1.234.567,89", "R$ 5", "", None, "--R$ 5", "R$ 5,", "R$ ,5",
+    ]
+
+    def test_matches_reference_implementation(self):
+        """Test that every valid value matches convert_brazilian_currency."""
+        series = pd.Series(self.VALID_VALUES, dtype=object)
+        values, invalid = convert_brazilian_currency_series(series)
+
+        expected = [convert_brazilian_currency(v) for v in self.VALID_VALUES]
+        assert values.tolist() == expected
+        assert invalid.empty
+
+    def test_matches_reference_on_committed_csv(self):
+        """Test equivalence with the per-value parser on the real export."""
+        csv_path = Path(__file__).parent.parent / "DRE_BI(BaseDRE).csv"
+        if not csv_path.exists():
+            pytest.skip("DRE_BI(BaseDRE).csv não disponível")
+
+        df = pd.read_csv(csv_path, sep=";", header=4, encoding="latin-1")
+        values, invalid = convert_brazilian_currency_series(df["Realizado"])
+
+        assert invalid.empty
+        assert values.equals(df["Realizado"].apply(convert_brazilian_currency))
+
+    def test_invalid_rows_are_reported(self):
+        """Test that all invalid rows are reported instead of raising."""
+        series = pd.Series(
+            ["R$ 10", "abc", "R$ 1,2,3", 99.5, "R$ 20"],
+            index=[10, 11, 12, 13, 14],
+            dtype=object,
+        )
+        values, invalid = convert_brazilian_currency_series(series)
+
+        assert values.loc[10] == 10.0
+        assert values.loc[14] == 20.0
+        assert values.loc[[11, 12, 13]].isna().all()
+        assert invalid["reason"].to_dict() == {
+            11: "invalid_characters",
+            12: "not_a_number",
+            13: "invalid_type",
+        }
+        assert invalid.loc[11, "value"] == "abc"
+
+    def test_preserves_index_and_name(self):
+        """Test that the result keeps the input index and name."""
+        series = pd.Series(["R$ 1", "R$ 2"], index=["a", "b"], name="Realizado")
+        values, _ = convert_brazilian_currency_series(series)
+
+        assert values.index.tolist() == ["a", "b"]
+        assert values.name == "Realizado"
+        assert values.dtype == "float64"
+
+    def test_apply_currency_conversion_reports_all_invalid_rows(self):
+        """Test that apply_currency_conversion lists every invalid row."""
+        df = pd.DataFrame({"Realizado": ["R$ 1", "abc", "xyz"]})
+
+        with pytest.raises(ValueError, match="2 rows"):
+            apply_currency_conversion(df, "Realizado")
+
+    def test_apply_currency_conversion_float_column(self):
+        """Test that a float column keeps its values and NaN becomes 0.0."""
+        df = pd.DataFrame({"Realizado": [np.nan, 12.5]})
+        empty = pd.DataFrame({"Realizado": [np.nan, np.nan]})
+
+        assert apply_currency_conversion(df, "Realizado")["Realizado"].tolist() == [0.0, 12.5]
+        assert apply_currency_conversion(empty, "Realizado")["Realizado"].tolist() == [0.0, 0.0]
+
+
 class TestConvertMonthToDate:
     """Tests for the convert_month_to_date function."""
 
@@ -138,6 +227,88 @@ class TestConvertMonthToDate:
         assert result == pd.Timestamp("2024-03-01")
 
 
+class TestConvertMonthSeries:
+    """Tests for the factorized convert_month_series function."""
+
+    def test_matches_reference_implementation(self):
+        """Test equivalence with convert_month_to_date applied per row."""
+        series = pd.Series(["Jan", "ago", "  Set  ", "Jan", "DEZ", "Ago"])
+        result = convert_month_series(series, 2025)
+
+        expected = series.apply(lambda m: convert_month_to_date(m, 2025))
+        assert result.equals(expected)
+        assert str(result.dtype) == "datetime64[ns]"
+
+    def test_resolves_each_distinct_value_once(self, monkeypatch):
+        """Test that the cost depends on distinct values, not rows."""
+        import src.data_cleaner as data_cleaner
+
+        calls = []
+        original = data_cleaner.convert_month_to_date
+
+        def counting(month_str, reference_year):
+            calls.append(month_str)
+            return original(month_str, reference_year)
+
+        monkeypatch.setattr(data_cleaner, "convert_month_to_date", counting)
+        series = pd.Series(["Jan", "Fev", "Mar"] * 1000)
+        convert_month_series(series, 2025)
+
+        assert sorted(calls) == ["Fev", "Jan", "Mar"]
+
+    def test_preserves_index(self):
+        """Test that the result keeps the input index and name."""
+        series = pd.Series(["Mar", "Abr"], index=[7, 3], name="Mês")
+        result = convert_month_series(series, 2024)
+
+        assert result.index.tolist() == [7, 3]
+        assert result.name == "Mês"
+        assert result.loc[3] == pd.Timestamp("2024-04-01")
+
+    def test_unknown_month_raises_error(self):
+        """Test that an unknown abbreviation raises ValueError."""
+        with pytest.raises(ValueError, match="Unknown month abbreviation"):
+            convert_month_series(pd.Series(["Jan", "Xyz"]), 2025)
+
+    def test_missing_value_raises_error(self):
+        """Test that NaN values raise ValueError."""
+        with pytest.raises(ValueError, match="cannot be NaN"):
+            convert_month_series(pd.Series(["Jan", None]), 2025)
+
+
+class TestCopyOnWrite:
+    """Testes das funções apply_* com e sem copy-on-write."""
+
+    @pytest.fixture
+    def raw_df(self):
+        return pd.DataFrame({
+            "Mês": ["Jan", "Fev"],
+            "Realizado": ["R$ 1.000", "-R$ 50,50"],
+            "Valor": [1.0, 2.0],
+        })
+
+    @pytest.mark.parametrize("copy_on_write", [False, True])
+    def test_input_is_not_modified(self, raw_df, copy_on_write):
+        """Testa que as conversões não alteram o DataFrame de entrada."""
+        from src.data_cleaner import apply_month_conversion
+
+        original = raw_df.copy()
+        with pd.option_context("mode.copy_on_write", copy_on_write):
+            result = apply_currency_conversion(raw_df, "Realizado")
+            result = apply_month_conversion(result, "Mês", 2025)
+
+        pd.testing.assert_frame_equal(raw_df, original)
+        assert result["Realizado"].tolist() == [1000.0, -50.5]
+
+    def test_untouched_columns_are_shared(self, raw_df):
+        """Testa que, com copy-on-write, as colunas não alteradas não são copiadas."""
+        import numpy as np
+
+        with pd.option_context("mode.copy_on_write", True):
+            result = apply_currency_conversion(raw_df, "Realizado")
+            assert np.shares_memory(result["Valor"].to_numpy(), raw_df["Valor"].to_numpy())
+
+
 class TestLoadDreCsv:
     """Testes para a função load_dre_csv."""
 
@@ -175,6 +346,38 @@ TEST;01.01.002;01.01;RECEITAS S/ VENDAS;PIX;PIX;Set;R$ 10.000
             os.unlink(temp_path)
 
 
+    def test_load_valid_csv_pyarrow_engine(self, tmp_path):
+        """Testa o motor pyarrow: categóricas, Realizado float e códigos como texto."""
+        csv_content = """Ano Txt;2025;;;;;;
+situacao;(Vários itens);;;;;;
+GrupoEmpresa;Grupo J+;;;;;;
+;;;;;;;
+Loja;_key_centro_custo;cc_parent_nome;Nome Grupo;cc_nome;Camada03;Mês;Realizado
+TEST;01.01.001;01.01;RECEITAS S/ VENDAS;DINHEIRO;DINHEIRO;Ago;R$ 63.713
+TEST;01.01.002;01.01;RECEITAS S/ VENDAS;PIX;PIX;Set;-R$ 1.234,56
+"""
+        path = tmp_path / "dre.csv"
+        path.write_text(csv_content, encoding="latin-1")
+
+        df = load_dre_csv(path, engine="pyarrow")
+        expected = load_dre_csv(path, engine="pandas")
+
+        assert len(df) == 2
+        assert isinstance(df["cc_nome"].dtype, pd.CategoricalDtype)
+        assert df["cc_parent_nome"].tolist() == ["01.01", "01.01"]
+        assert df["Realizado"].tolist() == [63713.0, -1234.56]
+        assert df["Mês"].tolist() == expected["Mês"].tolist()
+        assert df.columns.tolist() == expected.columns.tolist()
+
+    def test_invalid_engine_raises_error(self, tmp_path):
+        """Testa que motor desconhecido levanta ValueError."""
+        path = tmp_path / "dre.csv"
+        path.write_text("x", encoding="latin-1")
+
+        with pytest.raises(ValueError, match="não suportado"):
+            load_dre_csv(path, engine="polars")
+
+
 class TestLoadDreExcel:
     """Testes para a função load_dre_excel."""
 
@@ -216,6 +419,101 @@ class TestLoadDreExcel:
             os.unlink(temp_path)
 
 
+class TestReadExcelSheetCached:
+    """Testes para o cache Parquet das planilhas Excel."""
+
+    ROWS = [
+        ['Ano Txt', '2025', '', '', '', '', '', ''],
+        ['situacao', '(Vários)', '', '', '', '', '', ''],
+        ['GrupoEmpresa', 'Grupo J+', '', '', '', '', '', ''],
+        ['', '', '', '', '', '', '', ''],
+        ['Loja', '_key_centro_custo', 'cc_parent_nome', 'Nome Grupo', 'cc_nome', 'Camada03', 'Mês', 'Realizado'],
+        ['TEST', '01.01.001', '01.01', 'RECEITAS S/ VENDAS', 'DINHEIRO', 'DINHEIRO', 'Ago', 'R$ 63.713'],
+        ['TEST', '01.01.002', '01.01', 'RECEITAS S/ VENDAS', 'PIX', 'PIX', 'Set', 'R$ 10.000'],
+    ]
+
+    @pytest.fixture
+    def excel_path(self, tmp_path):
+        """Cria um arquivo Excel DRE temporário."""
+        path = tmp_path / "dre.xlsx"
+        pd.DataFrame(self.ROWS).to_excel(path, index=False, header=False, engine='openpyxl')
+        return path
+
+    def test_matches_read_excel(self, excel_path, excel_cache_dir):
+        """Testa que a cópia Parquet preserva os valores das células como texto."""
+        df = read_excel_sheet_cached(excel_path, 0, 4, excel_cache_dir)
+        expected = pd.read_excel(excel_path, header=4, engine='openpyxl', dtype=str)
+
+        pd.testing.assert_frame_equal(df, expected)
+        assert df["cc_parent_nome"].tolist() == ["01.01", "01.01"]
+        assert len(list(excel_cache_dir.glob("*.parquet"))) == 1
+
+    def test_second_read_skips_openpyxl(self, excel_path, excel_cache_dir, monkeypatch):
+        """Testa que a segunda leitura usa a cópia sem abrir o XLSX."""
+        import openpyxl
+
+        read_excel_sheet_cached(excel_path, 0, 4, excel_cache_dir)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("openpyxl não deveria ser usado")
+
+        monkeypatch.setattr(openpyxl, "load_workbook", fail)
+        df = read_excel_sheet_cached(excel_path, 0, 4, excel_cache_dir)
+        assert len(df) == 2
+
+    def test_changed_file_replaces_stale_copy(self, excel_path, excel_cache_dir):
+        """Testa que alterar o arquivo gera nova chave e remove a cópia antiga."""
+        read_excel_sheet_cached(excel_path, 0, 4, excel_cache_dir)
+        first = list(excel_cache_dir.glob("*.parquet"))
+
+        rows = self.ROWS + [['TEST', '02.01.001', '02.01', 'CUSTOS', 'AVES', 'AVES', 'Out', '-R$ 5']]
+        pd.DataFrame(rows).to_excel(excel_path, index=False, header=False, engine='openpyxl')
+        df = read_excel_sheet_cached(excel_path, 0, 4, excel_cache_dir)
+
+        second = list(excel_cache_dir.glob("*.parquet"))
+        assert len(df) == 3
+        assert len(second) == 1
+        assert second != first
+
+    def test_mixed_types_across_batches_become_text(self, tmp_path):
+        """Testa que coluna com tipos diferentes entre lotes vira texto."""
+        from src.data_cleaner import _convert_excel_sheet_to_parquet
+
+        path = tmp_path / "mixed.xlsx"
+        pd.DataFrame([["Codigo", "Valor"], [1, 10], [2, 20], ["A3", 30]]).to_excel(
+            path, index=False, header=False, engine='openpyxl'
+        )
+        target = tmp_path / "mixed.parquet"
+        _convert_excel_sheet_to_parquet(path, 0, 0, target, batch_rows=1)
+
+        df = pd.read_parquet(target)
+        assert df["Codigo"].tolist() == ["1", "2", "A3"]
+        assert df["Valor"].tolist() == [10, 20, 30]
+
+    def test_numeric_columns_across_batches_stay_numeric(self, tmp_path):
+        """Testa que inteiros seguidos de decimais ou vazios continuam numéricos."""
+        from src.data_cleaner import _convert_excel_sheet_to_parquet
+
+        path = tmp_path / "numeric.xlsx"
+        pd.DataFrame(
+            [["Inteiro", "Decimal", "Vazio"], [1, 10, None], [2, 2.5, None], [None, 30, 4]]
+        ).to_excel(path, index=False, header=False, engine='openpyxl')
+        target = tmp_path / "numeric.parquet"
+        _convert_excel_sheet_to_parquet(path, 0, 0, target, batch_rows=1)
+
+        df = pd.read_parquet(target)
+        expected = pd.read_excel(path, engine='openpyxl')
+        pd.testing.assert_frame_equal(df, expected)
+        assert df.dtypes.tolist() == ["float64", "float64", "float64"]
+
+    def test_load_dre_excel_without_cache(self, excel_path, excel_cache_dir):
+        """Testa que use_cache=False lê o XLSX diretamente."""
+        df = load_dre_excel(excel_path, use_cache=False)
+
+        assert len(df) == 2
+        assert not excel_cache_dir.exists()
+
+
 class TestLoadDreFile:
     """Testes para a função load_dre_file (detecção automática de formato)."""
 
@@ -279,3 +577,187 @@ TEST;01.01.001;01.01;RECEITAS S/ VENDAS;DINHEIRO;DINHEIRO;Ago;R$ 63.713
         finally:
             os.unlink(temp_path)
 
+
+
+class TestStreamDreCsvToParquet:
+    """Testes para a função stream_dre_csv_to_parquet (modo em blocos)."""
+
+    CSV_CONTENT = """Ano Txt;2025;;;;;;
+situacao;(Vários itens);;;;;;
+GrupoEmpresa;Grupo J+;;;;;;
+;;;;;;;
+Loja;_key_centro_custo;cc_parent_nome;Nome Grupo;cc_nome;Camada03;Mês;Realizado
+TEST;01.01.001;01.01;RECEITAS S/ VENDAS;DINHEIRO;DINHEIRO;Ago;R$ 63.713
+TEST;01.01.002;01.01;RECEITAS S/ VENDAS;PIX;PIX;Set;R$ 10.000
+TEST;02.01.001;;( - ) CUSTOS VARIÁVEIS;BOVINOS;PROTEINAS;Set;-R$ 1.234,56
+TEST;02.01.002;02.01;( - ) CUSTOS VARIÁVEIS;AVES;PROTEINAS;Out;R$ 0
+"""
+
+    @pytest.fixture
+    def csv_path(self, tmp_path):
+        """Cria um CSV DRE temporário em latin-1."""
+        path = tmp_path / "dre.csv"
+        path.write_text(self.CSV_CONTENT, encoding="latin-1")
+        return path
+
+    def test_matches_in_memory_pipeline(self, csv_path, tmp_path):
+        """Testa que o resultado em blocos é igual ao carregamento completo."""
+        from src.data_cleaner import apply_currency_conversion, apply_month_conversion
+
+        output = tmp_path / "out.parquet"
+        rows = stream_dre_csv_to_parquet(csv_path, output, chunk_size=1, reference_year=2025)
+
+        expected = load_dre_csv(csv_path)
+        expected = apply_currency_conversion(expected, "Realizado")
+        expected = apply_month_conversion(expected, "Mês", 2025)
+
+        # Em blocos, as categorias ficam na ordem de aparição; a ordem estável
+        # é restaurada na leitura
+        result = apply_dimension_categoricals(pd.read_parquet(output))
+        assert rows == 4
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+    def test_chunk_with_empty_columns(self, tmp_path):
+        """Testa blocos com uma coluna de dimensão ou o Realizado todo vazio."""
+        csv_path = tmp_path / "dre.csv"
+        linhas = self.CSV_CONTENT.splitlines()
+        # 1º bloco sem cc_parent_nome; 2º bloco com cc_parent_nome e sem Realizado
+        linhas[5] = linhas[5].replace(";01.01;", ";;")
+        linhas[6] = linhas[6].replace(";01.01;", ";;")
+        linhas[7] = "TEST;02.01.001;02.01;( - ) CUSTOS VARIÁVEIS;BOVINOS;PROTEINAS;Set;"
+        linhas[8] = "TEST;02.01.002;02.01;( - ) CUSTOS VARIÁVEIS;AVES;PROTEINAS;Out;"
+        csv_path.write_text("\n".join(linhas) + "\n", encoding="latin-1")
+
+        output = tmp_path / "out.parquet"
+        assert stream_dre_csv_to_parquet(csv_path, output, chunk_size=2) == 4
+
+        result = pd.read_parquet(output)
+        assert result["cc_parent_nome"].tolist()[2:] == ["02.01", "02.01"]
+        assert result["cc_parent_nome"].isna().sum() == 2
+        assert result["Realizado"].tolist() == [63713.0, 10000.0, 0.0, 0.0]
+
+    def test_writes_one_row_group_per_chunk(self, csv_path, tmp_path):
+        """Testa que cada bloco vira um row group do Parquet."""
+        import pyarrow.parquet as pq
+
+        output = tmp_path / "out.parquet"
+        stream_dre_csv_to_parquet(csv_path, output, chunk_size=3)
+
+        assert pq.ParquetFile(output).num_row_groups == 2
+
+    def test_invalid_value_keeps_previous_output(self, csv_path, tmp_path):
+        """Testa que uma falha não deixa Parquet parcial no destino."""
+        output = tmp_path / "out.parquet"
+        output.write_bytes(b"previous")
+        csv_path.write_text(
+            self.CSV_CONTENT + "TEST;9;9;G;X;X;Dez;invalido\n", encoding="latin-1"
+        )
+
+        with pytest.raises(ValueError):
+            stream_dre_csv_to_parquet(csv_path, output, chunk_size=2)
+
+        assert output.read_bytes() == b"previous"
+        assert not (tmp_path / "out.parquet.tmp").exists()
+
+    def test_file_not_found_raises_error(self, tmp_path):
+        """Testa que arquivo inexistente levanta FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            stream_dre_csv_to_parquet(tmp_path / "nao_existe.csv", tmp_path / "out.parquet")
+
+
+class TestApplyDimensionCategoricals:
+    """Testes para a função apply_dimension_categoricals."""
+
+    @pytest.fixture
+    def categories_json(self, tmp_path):
+        """Cria um categories.json com a ordem de referência."""
+        import json
+
+        path = tmp_path / "categories.json"
+        hierarchy = {
+            "( - ) CUSTOS VARIÁVEIS": ["BOVINOS", "AVES"],
+            "RECEITAS S/ VENDAS": ["PIX", "DINHEIRO"],
+        }
+        path.write_text(json.dumps(hierarchy, ensure_ascii=False), encoding="utf-8")
+        return path
+
+    @pytest.fixture
+    def sample_df(self):
+        """DataFrame com dimensões em texto (com um grupo corrompido)."""
+        return pd.DataFrame({
+            "Loja": ["LOJA B", "LOJA A", "LOJA B", "LOJA A"],
+            "Nome Grupo": [
+                "RECEITAS S/ VENDAS",
+                "( - ) CUSTOS VARIï¿½VEIS",
+                None,
+                "RECEITAS S/ VENDAS",
+            ],
+            "cc_nome": ["DINHEIRO", "BOVINOS", "NOVO ITEM", "PIX"],
+            "Realizado": [1.0, -2.0, 3.0, 4.0],
+        })
+
+    def test_converts_dimension_columns(self, sample_df, categories_json):
+        """Testa que só as colunas de dimensão viram categóricas."""
+        result = apply_dimension_categoricals(sample_df, categories_path=categories_json)
+
+        for col in ["Loja", "Nome Grupo", "cc_nome"]:
+            assert isinstance(result[col].dtype, pd.CategoricalDtype)
+        assert result["Realizado"].dtype == "float64"
+        assert result[["Loja", "cc_nome"]].astype(str).equals(sample_df[["Loja", "cc_nome"]])
+        assert result["Nome Grupo"].isna().sum() == 1
+
+    def test_category_order_follows_categories_json(self, sample_df, categories_json):
+        """Testa a ordem: categories.json primeiro, demais em ordem alfabética."""
+        result = apply_dimension_categoricals(sample_df, categories_path=categories_json)
+
+        # O grupo corrompido é casado com o nome corrigido do JSON
+        assert result["Nome Grupo"].cat.categories.tolist() == [
+            "( - ) CUSTOS VARIï¿½VEIS",
+            "RECEITAS S/ VENDAS",
+        ]
+        assert result["cc_nome"].cat.categories.tolist() == [
+            "BOVINOS", "PIX", "DINHEIRO", "NOVO ITEM",
+        ]
+        assert result["Loja"].cat.categories.tolist() == ["LOJA A", "LOJA B"]
+
+    def test_order_is_independent_of_row_order(self, sample_df, categories_json):
+        """Testa que a ordem das categorias não depende da ordem das linhas."""
+        forward = apply_dimension_categoricals(sample_df, categories_path=categories_json)
+        backward = apply_dimension_categoricals(
+            sample_df.iloc[::-1], categories_path=categories_json
+        )
+
+        for col in ["Loja", "Nome Grupo", "cc_nome"]:
+            assert forward[col].cat.categories.equals(backward[col].cat.categories)
+
+    def test_missing_categories_json_sorts_alphabetically(self, sample_df, tmp_path):
+        """Testa a ordem alfabética quando não há categories.json."""
+        result = apply_dimension_categoricals(
+            sample_df, categories_path=tmp_path / "nao_existe.json"
+        )
+
+        assert result["cc_nome"].cat.categories.tolist() == [
+            "BOVINOS", "DINHEIRO", "NOVO ITEM", "PIX",
+        ]
+
+    def test_order_survives_parquet_roundtrip(self, sample_df, categories_json, tmp_path):
+        """Testa que o Parquet preserva as categóricas e a ordem."""
+        result = apply_dimension_categoricals(sample_df, categories_path=categories_json)
+        path = tmp_path / "dre.parquet"
+        result.to_parquet(path, index=False)
+
+        loaded = pd.read_parquet(path)
+
+        pd.testing.assert_frame_equal(loaded, result)
+
+    def test_load_dre_csv_returns_categoricals(self, tmp_path):
+        """Testa que o loader entrega dimensões categóricas e preserva códigos."""
+        path = tmp_path / "dre.csv"
+        path.write_text(TestStreamDreCsvToParquet.CSV_CONTENT, encoding="latin-1")
+
+        for engine in ("pandas", "pyarrow"):
+            df = load_dre_csv(path, engine=engine)
+
+            assert isinstance(df["cc_nome"].dtype, pd.CategoricalDtype)
+            assert isinstance(df["_key_centro_custo"].dtype, pd.CategoricalDtype)
+            assert "01.01" in df["cc_parent_nome"].cat.categories
@@ -0,0 +1,212 @@
+"""
+Testes unitários para o módulo data_quality.
+
+Cobertura de testes:
+- Regras de moeda, mês, dimensões obrigatórias e chave duplicada
+- Ordem de avaliação e motivo por linha
+- Gravação da quarentena
+- Quarentena no processamento em blocos (streaming)
+"""
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+import config
+from src.data_cleaner import stream_dre_csv_to_parquet
+from src.data_quality import (
+    QualityRule,
+    apply_quality_rules,
+    currency_rule,
+    default_quality_rules,
+    duplicate_key_rule,
+    month_rule,
+    required_dimensions_rule,
+    write_quarantine,
+)
+
+
+@pytest.fixture
+def dre_df() -> pd.DataFrame:
+    """Registros DRE ainda não convertidos, um problema por linha a partir da segunda."""
+    return pd.DataFrame({
+        "Loja": ["LJ1", "LJ1", "LJ1", None, "LJ1", "LJ2"],
+        "_key_centro_custo": ["01.01.001", "01.01.002", "01.01.003", "01.01.004", "01.01.001", "01.01.001"],
+        "Nome Grupo": ["RECEITAS", "RECEITAS", "RECEITAS", "RECEITAS", "RECEITAS", None],
+        "cc_nome": ["DINHEIRO", "PIX", "PIX", "PIX", "DINHEIRO", "DINHEIRO"],
+        "Mês": ["Ago", "Ago", "Xyz", "Ago", "Ago", " set "],
+        "Realizado": ["R$ 1.000", "R$ 1,2,3", "R$ 5", "R$ 5", "R$ 9", "-R$ 2"],
+    })
+
+
+def _reasons(df: pd.DataFrame, rule: QualityRule) -> list:
+    return rule.check(df).where(lambda s: s.notna(), None).tolist()
+
+
+# =============================================================================
+# Testes das Regras
+# =============================================================================
+
+class TestRules:
+    """Testes para as regras individuais."""
+
+    def test_currency_rule(self, dre_df):
+        """Moeda malformada recebe o motivo de convert_brazilian_currency_series."""
+        assert _reasons(dre_df, currency_rule()) == [
+            None, "currency_not_a_number", None, None, None, None,
+        ]
+
+    def test_currency_rule_accepts_numeric_column(self):
+        """Coluna já numérica (motor pyarrow) é aprovada."""
+        df = pd.DataFrame({"Realizado": [1.0, float("nan")]})
+
+        assert _reasons(df, currency_rule()) == [None, None]
+
+    def test_month_rule(self):
+        """Mês ausente e desconhecido têm motivos diferentes; maiúsculas e espaços são aceitos."""
+        df = pd.DataFrame({"Mês": ["Ago", " dez ", None, "Xyz", 3]})
+
+        assert _reasons(df, month_rule()) == [
+            None, None, "missing_month", "unknown_month", "unknown_month",
+        ]
+
+    def test_required_dimensions_rule(self):
+        """Valores ausentes ou em branco reprovam a linha; colunas ausentes são ignoradas."""
+        df = pd.DataFrame({"Loja": ["LJ1", None, "  "], "cc_nome": ["A", "B", "C"]})
+
+        assert _reasons(df, required_dimensions_rule(["Loja", "cc_nome", "Outra"])) == [
+            None, "missing_dimension", "missing_dimension",
+        ]
+
+    def test_duplicate_key_keeps_first(self):
+        """A primeira ocorrência da chave é aprovada."""
+        df = pd.DataFrame({"a": ["x", "y", "x"], "b": [1, 1, 1]})
+
+        assert _reasons(df, duplicate_key_rule(["a", "b"])) == [None, None, "duplicate_key"]
+
+    def test_duplicate_key_across_calls(self):
+        """A mesma instância detecta repetições entre blocos, inclusive categóricos."""
+        rule = duplicate_key_rule(["a"])
+        first = pd.DataFrame({"a": pd.Categorical(["x", "y"])})
+        second = pd.DataFrame({"a": pd.Categorical(["z", "x"])}, index=[2, 3])
+
+        assert _reasons(first, rule) == [None, None]
+        assert _reasons(second, rule) == [None, "duplicate_key"]
+
+    def test_duplicate_key_missing_column(self):
+        """Sem todas as colunas da chave, nenhuma linha é reprovada."""
+        df = pd.DataFrame({"a": ["x", "x"]})
+
+        assert _reasons(df, duplicate_key_rule(["a", "b"])) == [None, None]
+
+
+# =============================================================================
+# Testes de apply_quality_rules
+# =============================================================================
+
+class TestApplyQualityRules:
+    """Testes para a função apply_quality_rules."""
+
+    def test_splits_clean_and_quarantined_rows(self, dre_df):
+        """Cada linha reprovada recebe o motivo da primeira regra em que falhou."""
+        clean, quarantined = apply_quality_rules(dre_df)
+
+        assert clean.index.tolist() == [0, 5]
+        assert quarantined.index.tolist() == [1, 2, 3, 4]
+        assert quarantined["reason"].tolist() == [
+            "currency_not_a_number",
+            "unknown_month",
+            "missing_dimension",
+            "duplicate_key",
+        ]
+        assert quarantined.loc[4, "reason_columns"] == "Loja, _key_centro_custo, Mês"
+        assert quarantined["Realizado"].tolist() == ["R$ 1,2,3", "R$ 5", "R$ 5", "R$ 9"]
+
+    def test_failed_row_does_not_hide_duplicate(self):
+        """Uma linha já reprovada não conta como primeira ocorrência da chave."""
+        df = pd.DataFrame({
+            "Loja": ["LJ1", "LJ1"],
+            "_key_centro_custo": ["01", "01"],
+            "cc_nome": ["A", "A"],
+            "Mês": ["Ago", "Ago"],
+            "Realizado": ["R$ x", "R$ 1"],
+        })
+
+        clean, quarantined = apply_quality_rules(df)
+
+        assert clean.index.tolist() == [1]
+        assert quarantined["reason"].tolist() == ["currency_invalid_characters"]
+
+    def test_clean_dataframe_is_returned_unchanged(self, dre_df):
+        """Sem falhas, o próprio DataFrame é devolvido e a quarentena fica vazia."""
+        df = dre_df.loc[[0, 5]]
+
+        clean, quarantined = apply_quality_rules(df)
+
+        assert clean is df
+        assert quarantined.empty
+        assert "reason" in quarantined.columns
+
+    def test_committed_csv_has_no_quarantined_rows(self):
+        """O export do repositório passa em todas as regras."""
+        from src.data_cleaner import load_dre_file
+
+        df = load_dre_file(config.INPUT_FILE_PATH)
+        clean, quarantined = apply_quality_rules(df, default_quality_rules())
+
+        assert quarantined.empty
+        assert len(clean) == len(df)
+
+
+# =============================================================================
+# Testes de Gravação
+# =============================================================================
+
+class TestQuarantineOutput:
+    """Testes para write_quarantine e para a quarentena em streaming."""
+
+    def test_write_quarantine_roundtrip(self, dre_df, tmp_path: Path):
+        """Valores gravados como texto, com a linha de origem."""
+        _, quarantined = apply_quality_rules(dre_df)
+        path = write_quarantine(quarantined, tmp_path / "q.parquet")
+
+        result = pd.read_parquet(path)
+
+        assert result["row"].tolist() == [1, 2, 3, 4]
+        assert result["reason"].tolist() == quarantined["reason"].tolist()
+        assert result["Loja"].isna().tolist() == [False, False, True, False]
+
+    def test_empty_quarantine_replaces_previous_file(self, dre_df, tmp_path: Path):
+        """Uma execução sem falhas deixa a quarentena vazia."""
+        path = tmp_path / "q.parquet"
+        write_quarantine(apply_quality_rules(dre_df)[1], path)
+        write_quarantine(apply_quality_rules(dre_df.loc[[0]])[1], path)
+
+        assert pd.read_parquet(path).empty
+
+    def test_streaming_quarantine(self, tmp_path: Path):
+        """Em blocos, linhas inválidas e chaves repetidas entre blocos vão para a quarentena."""
+        csv_path = tmp_path / "dre.csv"
+        csv_path.write_text(
+            "Ano Txt;2025;;;;;;\n"
+            "situacao;(Vários itens);;;;;;\n"
+            "GrupoEmpresa;Grupo J+;;;;;;\n"
+            ";;;;;;;\n"
+            "Loja;_key_centro_custo;cc_parent_nome;Nome Grupo;cc_nome;Camada03;Mês;Realizado\n"
+            "LJ1;01.01.001;01.01;RECEITAS;DINHEIRO;DINHEIRO;Ago;R$ 1\n"
+            "LJ1;01.01.002;01.01;RECEITAS;PIX;PIX;Ago;R$ abc\n"
+            "LJ1;01.01.001;01.01;RECEITAS;DINHEIRO;DINHEIRO;Ago;R$ 3\n"
+            "LJ1;01.01.002;01.01;RECEITAS;PIX;PIX;Set;R$ 4\n",
+            encoding="latin-1",
+        )
+        output = tmp_path / "dre.parquet"
+        quarantine = tmp_path / "q.parquet"
+
+        rows = stream_dre_csv_to_parquet(csv_path, output, chunk_size=1, quarantine_path=quarantine)
+
+        assert rows == 2
+        assert pd.read_parquet(output)[config.COLUMN_REALIZADO].tolist() == [1.0, 4.0]
+        result = pd.read_parquet(quarantine)
+        assert result["row"].tolist() == [1, 2]
+        assert result["reason"].tolist() == ["currency_invalid_characters", "duplicate_key"]
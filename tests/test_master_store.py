@@ -0,0 +1,222 @@
+"""
+Testes unitários para o módulo master_store.
+
+Cobertura de testes:
+- Partição por mês (coluna Mês ou Data)
+- Acréscimo sem reescrever arquivos existentes (idempotente com chave)
+- Compactação dos arquivos de cada mês
+- Substituição, leitura e importação do CSV
+- Exportação do CSV (completa, só das linhas novas e reconciliada pela contagem)
+"""
+
+import pandas as pd
+import pytest
+
+import config
+from src.classification_checkpoint import ClassificationCheckpoint
+from src.csv_dialect import read_csv_sniffed
+from src.master_store import UNKNOWN_MONTH, MasterStore, month_partitions
+
+
+@pytest.fixture
+def store(tmp_path) -> MasterStore:
+    return MasterStore(tmp_path / "mestre")
+
+
+@pytest.fixture
+def df_mestre() -> pd.DataFrame:
+    return pd.DataFrame({
+        'Narrativa_IA': ['Em abril...', 'Em maio...', 'Em abril...'],
+        'Mês': ['2025-04-01', '2025-05-01', '2025-04-01'],
+        'cc_nome': ['BOVINOS', 'DINHEIRO', 'IFOOD'],
+        'Realizado': [-500.0, 1000.0, 800.0],
+    })
+
+
+# =============================================================================
+# Testes do month_partitions
+# =============================================================================
+
+class TestMonthPartitions:
+    """Testes para a partição de cada linha."""
+
+    def test_mes_and_data_columns(self):
+        """Mês (ISO) tem prioridade; Data (dd/mm/aaaa) é o fallback."""
+        df = pd.DataFrame({
+            'Mês': ['2025-04-01', '', None],
+            'Data': ['15/01/2026', '20/02/2026', 'ontem'],
+        })
+
+        assert month_partitions(df).tolist() == ['2025-04', '2026-02', UNKNOWN_MONTH]
+
+    def test_without_date_columns(self):
+        """Sem colunas de data, tudo vai para a partição sem mês."""
+        assert month_partitions(pd.DataFrame({'x': [1]})).tolist() == [UNKNOWN_MONTH]
+
+
+# =============================================================================
+# Testes do MasterStore
+# =============================================================================
+
+class TestMasterStore:
+    """Testes de gravação e leitura do dataset."""
+
+    def test_replace_and_read(self, store, df_mestre):
+        """O dataset é particionado por mês e lido de volta com as mesmas linhas."""
+        store.replace(df_mestre)
+
+        lido = store.read()
+        assert store.months() == ['2025-04', '2025-05']
+        assert len(store) == 3
+        assert store.columns() == list(df_mestre.columns)
+        assert sorted(lido['cc_nome']) == ['BOVINOS', 'DINHEIRO', 'IFOOD']
+        assert store.read(columns=['cc_nome']).columns.tolist() == ['cc_nome']
+
+    def test_append_keeps_existing_files(self, store, df_mestre):
+        """append() só cria arquivos novos; os existentes não mudam."""
+        store.replace(df_mestre)
+        antes = {p: p.stat().st_mtime_ns for p in store.dataset_dir.rglob("*.parquet")}
+
+        novos = pd.DataFrame({
+            'Narrativa_IA': [''], 'Mês': [''], 'cc_nome': ['OUTROS'], 'Realizado': [''],
+        })
+        escritos = store.append(novos, months=pd.Series(['2026-01']))
+
+        assert len(escritos) == 1
+        assert {p: p.stat().st_mtime_ns for p in antes} == antes
+        assert store.months() == ['2025-04', '2025-05', '2026-01']
+        assert store.read()['cc_nome'].tolist()[-1] == 'OUTROS'
+
+    def test_append_with_key_is_idempotent(self, store, df_mestre):
+        """Repetir o acréscimo com a mesma chave não duplica linhas."""
+        assert len(store.append(df_mestre, key="abc123")) == 2
+        assert store.append(df_mestre, key="abc123") == []
+
+        assert len(store) == 3
+        assert len(store.append(df_mestre.head(1), key="def456")) == 1
+        assert len(store) == 4
+
+    def test_append_with_key_completes_interrupted_write(self, store, df_mestre):
+        """Meses que faltaram em uma gravação interrompida são gravados com o mesmo nome."""
+        escritos = store.append(df_mestre, key="abc123")
+        escritos[-1].unlink()  # Mês 2025-05 não chegou a ser gravado
+
+        refeitos = store.append(df_mestre, key="abc123")
+
+        assert [p.name for p in refeitos] == [escritos[-1].name]
+        assert len(store) == 3
+
+    def test_append_keyed_by_checkpoint_run(self, store, df_mestre, tmp_path):
+        """Com a chave da execução, só a retomada é ignorada; uma entrada reenviada é gravada."""
+        checkpoint = ClassificationCheckpoint(tmp_path / "checkpoint.jsonl")
+        assert store.append(df_mestre, key=checkpoint.run_id())
+        assert store.append(df_mestre, key=checkpoint.run_id()) == []  # retomada
+        checkpoint.clear()
+
+        assert store.append(df_mestre, key=checkpoint.run_id())  # mesma entrada, nova execução
+        assert len(store) == 6
+
+    def test_compact(self, store, df_mestre):
+        """Os arquivos de cada mês viram um só, com as mesmas linhas e chaves."""
+        store.append(df_mestre, key="k1")
+        store.append(df_mestre.head(1).assign(cc_nome='OUTROS'), key="k2")
+        store.append(df_mestre.head(1).assign(cc_nome='AVES'), key="k3")
+
+        assert store.compact(min_files=3) == ['2025-04']
+
+        arquivos = list(store.dataset_dir.glob("particao_mes=2025-04/*.parquet"))
+        assert len(arquivos) == 1
+        assert store.read()['cc_nome'].tolist() == ['BOVINOS', 'IFOOD', 'OUTROS', 'AVES', 'DINHEIRO']
+        assert store.append(df_mestre.head(1), key="k2") == []
+        assert store.compact(min_files=3) == []
+
+    def test_replace_discards_previous(self, store, df_mestre):
+        """replace() descarta os registros anteriores."""
+        store.replace(df_mestre)
+        store.replace(df_mestre.head(1))
+
+        assert len(store) == 1
+        assert store.months() == ['2025-04']
+
+    def test_empty_store(self, store):
+        """Dataset inexistente lê vazio."""
+        assert not store.exists()
+        assert store.read().empty
+        assert store.months() == []
+
+    def test_import_csv(self, store, df_mestre, tmp_path):
+        """O CSV mestre é importado para o dataset."""
+        csv_path = tmp_path / "mestre.csv"
+        df_mestre.to_csv(csv_path, sep=';', index=False, encoding='utf-8-sig')
+
+        assert store.import_csv(csv_path) == 3
+        assert len(store) == 3
+
+
+class TestExportCsv:
+    """Testes do CSV de compatibilidade."""
+
+    def test_full_export(self, store, df_mestre, tmp_path):
+        """Sem CSV existente, exporta o dataset inteiro (UTF-8 com BOM)."""
+        store.replace(df_mestre)
+
+        csv_path = store.export_csv(tmp_path / "mestre.csv")
+
+        exportado = read_csv_sniffed(csv_path)
+        assert len(exportado) == 3
+        assert exportado.columns.tolist() == list(df_mestre.columns)
+        assert csv_path.read_bytes().startswith(b"\xef\xbb\xbf")
+
+    def test_incremental_export(self, store, df_mestre, tmp_path):
+        """Com o mesmo cabeçalho, só as linhas novas são acrescentadas."""
+        store.replace(df_mestre)
+        csv_path = store.export_csv(tmp_path / "mestre.csv")
+        novos = df_mestre.head(1).assign(cc_nome='OUTROS')
+        store.append(novos)
+
+        store.export_csv(csv_path, new_rows=novos)
+
+        exportado = read_csv_sniffed(csv_path)
+        assert len(exportado) == 4
+        assert exportado['cc_nome'].iloc[-1] == 'OUTROS'
+
+    def test_repeated_export_does_not_duplicate(self, store, df_mestre, tmp_path):
+        """Exportar de novo as mesmas linhas novas (após uma falha) não as duplica."""
+        store.replace(df_mestre)
+        csv_path = store.export_csv(tmp_path / "mestre.csv")
+        novos = df_mestre.head(1).assign(cc_nome='OUTROS')
+        store.append(novos)
+
+        store.export_csv(csv_path, new_rows=novos)
+        store.export_csv(csv_path, new_rows=novos)
+
+        assert len(read_csv_sniffed(csv_path)) == 4
+
+    def test_row_count_mismatch_rewrites(self, store, df_mestre, tmp_path):
+        """CSV defasado do dataset: é regravado em vez de receber as linhas novas."""
+        store.replace(df_mestre)
+        csv_path = store.export_csv(tmp_path / "mestre.csv")
+        store.append(df_mestre)  # Nunca exportadas
+        novos = df_mestre.head(1).assign(cc_nome='OUTROS')
+        store.append(novos)
+
+        store.export_csv(csv_path, new_rows=novos)
+
+        assert len(read_csv_sniffed(csv_path)) == 7
+
+    def test_header_mismatch_rewrites(self, store, df_mestre, tmp_path):
+        """Cabeçalho diferente: o CSV é regravado a partir do dataset."""
+        store.replace(df_mestre)
+        csv_path = tmp_path / "mestre.csv"
+        csv_path.write_text("a;b\n1;2\n", encoding="utf-8")
+
+        store.export_csv(csv_path, new_rows=df_mestre.head(1))
+
+        assert read_csv_sniffed(csv_path).columns.tolist() == list(df_mestre.columns)
+
+    def test_default_path(self, store, df_mestre, tmp_path, monkeypatch):
+        """Sem caminho, exporta para config.NARRATIVE_CSV_PATH."""
+        monkeypatch.setattr(config, "NARRATIVE_CSV_PATH", tmp_path / "padrao.csv")
+        store.replace(df_mestre)
+
+        assert store.export_csv() == tmp_path / "padrao.csv"
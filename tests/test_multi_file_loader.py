@@ -0,0 +1,337 @@
+"""
+Testes unitários para o módulo multi_file_loader.
+
+Cobertura de testes:
+- Resolução de arquivos, diretórios e padrões glob
+- Leitura do preâmbulo dos exports (Ano Txt, GrupoEmpresa)
+- Ingestão de exports de anos e grupos diferentes no dataset particionado
+- Ingestão com pool de processos
+- Quarentena de linhas inválidas (em memória e em streaming)
+- Cópia do dataset para um único Parquet sem carregá-lo
+"""
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+import config
+from src.data_cleaner import apply_dimension_categoricals, read_dre_preamble
+from src.multi_file_loader import (
+    ingest_dre_exports,
+    read_partitioned_dataset,
+    resolve_input_paths,
+    write_dataset_parquet,
+)
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+
+HEADER = "Loja;_key_centro_custo;cc_parent_nome;Nome Grupo;cc_nome;Camada03;Mês;Realizado"
+
+
+def _write_export(path: Path, year: str, group: str, rows: list[str]) -> Path:
+    """Grava um export CSV no formato do BI (preâmbulo + cabeçalho na linha 5)."""
+    lines = [
+        f"Ano Txt;{year};;;;;;",
+        "situacao;(Vários itens);;;;;;",
+        f"GrupoEmpresa;{group};;;;;;",
+        ";;;;;;;",
+        HEADER,
+        *rows,
+    ]
+    path.write_text("\n".join(lines) + "\n", encoding="latin-1")
+    return path
+
+
+@pytest.fixture(autouse=True)
+def quarantine_path(tmp_path: Path, monkeypatch) -> Path:
+    """Isola a quarentena no diretório temporário do teste."""
+    path = tmp_path / "quarantine.parquet"
+    monkeypatch.setattr(config, "QUARANTINE_PARQUET_PATH", path)
+    return path
+
+
+@pytest.fixture
+def exports_dir(tmp_path: Path) -> Path:
+    """Dois exports de anos e grupos diferentes."""
+    directory = tmp_path / "exports"
+    directory.mkdir()
+    _write_export(
+        directory / "DRE_2024.csv",
+        "2024",
+        "Grupo J+",
+        [
+            "LJ1;01.01.001;01.01;RECEITAS S/ VENDAS;DINHEIRO;DINHEIRO;Jan;R$ 100",
+            "LJ1;01.01.002;01.01;RECEITAS S/ VENDAS;PIX;PIX;Fev;R$ 200",
+        ],
+    )
+    _write_export(
+        directory / "DRE_2025.csv",
+        "2025",
+        "Grupo K/Z",
+        ["LJ2;01.01.001;01.01;RECEITAS S/ VENDAS;DINHEIRO;DINHEIRO;Mar;-R$ 50"],
+    )
+    (directory / "notas.txt").write_text("ignorado", encoding="utf-8")
+    return directory
+
+
+# =============================================================================
+# Testes de Resolução de Entradas
+# =============================================================================
+
+class TestResolveInputPaths:
+    """Testes para a função resolve_input_paths."""
+
+    def test_directory_uses_input_patterns(self, exports_dir):
+        """Diretório expande para os arquivos que casam com INPUT_FILE_PATTERNS."""
+        paths = resolve_input_paths([exports_dir])
+
+        assert [p.name for p in paths] == ["DRE_2024.csv", "DRE_2025.csv"]
+
+    def test_glob_pattern(self, exports_dir):
+        """Padrões glob são expandidos."""
+        paths = resolve_input_paths([str(exports_dir / "*_2025.csv")])
+
+        assert [p.name for p in paths] == ["DRE_2025.csv"]
+
+    def test_duplicates_are_removed(self, exports_dir):
+        """O mesmo arquivo informado duas vezes aparece uma vez."""
+        file_path = exports_dir / "DRE_2024.csv"
+        paths = resolve_input_paths([file_path, exports_dir])
+
+        assert [p.name for p in paths] == ["DRE_2024.csv", "DRE_2025.csv"]
+
+    def test_no_match_raises_error(self, tmp_path):
+        """Entrada sem arquivos levanta FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            resolve_input_paths([tmp_path / "inexistente_*.csv"])
+
+
+# =============================================================================
+# Testes do Preâmbulo
+# =============================================================================
+
+class TestReadDrePreamble:
+    """Testes para a função read_dre_preamble."""
+
+    def test_reads_csv_preamble(self, exports_dir):
+        """Chaves e valores do preâmbulo CSV."""
+        preamble = read_dre_preamble(exports_dir / "DRE_2025.csv")
+
+        assert preamble["Ano Txt"] == "2025"
+        assert preamble["GrupoEmpresa"] == "Grupo K/Z"
+        assert "" not in preamble
+
+    def test_reads_excel_preamble(self):
+        """Preâmbulo do arquivo Excel do repositório."""
+        excel_path = config.BASE_DIR / "DRE_BI.xlsx"
+        if not excel_path.exists():
+            pytest.skip("DRE_BI.xlsx não disponível")
+
+        preamble = read_dre_preamble(excel_path)
+
+        assert "Ano Txt" in preamble
+
+    def test_unsupported_format_raises_error(self, tmp_path):
+        """Extensão não suportada levanta ValueError."""
+        path = tmp_path / "dados.txt"
+        path.write_text("x", encoding="utf-8")
+
+        with pytest.raises(ValueError):
+            read_dre_preamble(path)
+
+
+# =============================================================================
+# Testes de Ingestão
+# =============================================================================
+
+class TestIngestDreExports:
+    """Testes para ingest_dre_exports e read_partitioned_dataset."""
+
+    def test_writes_partitioned_dataset(self, exports_dir, tmp_path):
+        """Cada export vai para a partição Ano=/GrupoEmpresa= do seu preâmbulo."""
+        dataset_dir = tmp_path / "dataset"
+        ingest_dre_exports(resolve_input_paths([exports_dir]), dataset_dir, max_workers=1)
+
+        partitions = sorted(
+            str(p.parent.relative_to(dataset_dir)) for p in dataset_dir.rglob("*.parquet")
+        )
+        assert partitions == [
+            "Ano=2024/GrupoEmpresa=Grupo%20J%2B",
+            "Ano=2025/GrupoEmpresa=Grupo%20K%2FZ",
+        ]
+        assert not dataset_dir.with_name("dataset.tmp").exists()
+
+    def test_month_uses_year_from_preamble(self, exports_dir, tmp_path):
+        """A data do mês usa o ano do export, não config.REFERENCE_YEAR."""
+        df = ingest_dre_exports(
+            resolve_input_paths([exports_dir]), tmp_path / "dataset", max_workers=1
+        )
+        df = df.sort_values(config.COLUMN_MES).reset_index(drop=True)
+
+        assert df[config.COLUMN_MES].tolist() == [
+            pd.Timestamp(2024, 1, 1),
+            pd.Timestamp(2024, 2, 1),
+            pd.Timestamp(2025, 3, 1),
+        ]
+        assert df[config.COLUMN_ANO].tolist() == [2024, 2024, 2025]
+        assert df[config.COLUMN_GRUPO_EMPRESA].astype(str).tolist() == [
+            "Grupo J+",
+            "Grupo J+",
+            "Grupo K/Z",
+        ]
+        assert df[config.COLUMN_REALIZADO].tolist() == [100.0, 200.0, -50.0]
+
+    def test_process_pool_matches_inline(self, exports_dir, tmp_path):
+        """O resultado com pool de processos é igual ao processamento em série."""
+        paths = resolve_input_paths([exports_dir])
+        inline = ingest_dre_exports(paths, tmp_path / "inline", max_workers=1)
+        pooled = ingest_dre_exports(paths, tmp_path / "pooled", max_workers=2)
+
+        key = [config.COLUMN_ANO, config.COLUMN_MES]
+        pd.testing.assert_frame_equal(
+            inline.sort_values(key).reset_index(drop=True),
+            pooled.sort_values(key).reset_index(drop=True),
+        )
+
+    def test_rerun_replaces_dataset(self, exports_dir, tmp_path):
+        """Uma nova ingestão substitui as partições anteriores."""
+        dataset_dir = tmp_path / "dataset"
+        ingest_dre_exports(resolve_input_paths([exports_dir]), dataset_dir, max_workers=1)
+        ingest_dre_exports(
+            resolve_input_paths([exports_dir / "DRE_2025.csv"]), dataset_dir, max_workers=1
+        )
+
+        df = read_partitioned_dataset(dataset_dir)
+        assert df[config.COLUMN_ANO].unique().tolist() == [2025]
+
+    def test_invalid_rows_go_to_quarantine(self, exports_dir, tmp_path, quarantine_path):
+        """Linhas inválidas vão para a quarentena e o restante segue."""
+        _write_export(
+            exports_dir / "DRE_2026.csv",
+            "2026",
+            "Grupo J+",
+            [
+                "LJ1;01.01.001;01.01;RECEITAS S/ VENDAS;DINHEIRO;DINHEIRO;Xyz;R$ 1",
+                "LJ1;01.01.001;01.01;RECEITAS S/ VENDAS;DINHEIRO;DINHEIRO;Abr;R$ 1,x",
+                "LJ1;01.01.001;01.01;RECEITAS S/ VENDAS;DINHEIRO;DINHEIRO;Mai;R$ 7",
+            ],
+        )
+
+        df = ingest_dre_exports(
+            resolve_input_paths([exports_dir]), tmp_path / "dataset", max_workers=1
+        )
+
+        assert len(df) == 4
+        quarantined = pd.read_parquet(quarantine_path)
+        assert quarantined["reason"].tolist() == [
+            "unknown_month",
+            "currency_invalid_characters",
+        ]
+        assert quarantined["source_file"].tolist() == ["DRE_2026.csv", "DRE_2026.csv"]
+        assert quarantined["row"].tolist() == [0, 1]
+
+    def test_pyarrow_engine_quarantine_matches_pandas(
+        self, exports_dir, tmp_path, quarantine_path, monkeypatch
+    ):
+        """Com CSV_ENGINE "pyarrow" a moeda inválida também vai para a quarentena."""
+        _write_export(
+            exports_dir / "DRE_2026.csv",
+            "2026",
+            "Grupo J+",
+            [
+                "LJ1;01.01.001;01.01;RECEITAS S/ VENDAS;DINHEIRO;DINHEIRO;Abr;R$ 1,x",
+                "LJ1;01.01.001;01.01;RECEITAS S/ VENDAS;DINHEIRO;DINHEIRO;Mai;R$ 7",
+            ],
+        )
+        paths = resolve_input_paths([exports_dir])
+        expected_df = ingest_dre_exports(paths, tmp_path / "pandas", max_workers=1)
+        expected = pd.read_parquet(quarantine_path)
+
+        monkeypatch.setattr(config, "CSV_ENGINE", "pyarrow")
+        df = ingest_dre_exports(paths, tmp_path / "pyarrow", max_workers=1)
+
+        assert len(df) == len(expected_df) == 4
+        assert sorted(df[config.COLUMN_REALIZADO]) == sorted(expected_df[config.COLUMN_REALIZADO])
+        assert expected["reason"].tolist() == ["currency_invalid_characters"]
+        pd.testing.assert_frame_equal(
+            pd.read_parquet(quarantine_path), expected, check_dtype=False, check_categorical=False
+        )
+
+    def test_streaming_quarantine_matches_in_memory(
+        self, exports_dir, tmp_path, quarantine_path, monkeypatch
+    ):
+        """Com CSV_STREAMING a quarentena tem as mesmas linhas."""
+        _write_export(
+            exports_dir / "DRE_2026.csv",
+            "2026",
+            "Grupo J+",
+            [
+                "LJ1;01.01.001;01.01;RECEITAS S/ VENDAS;DINHEIRO;DINHEIRO;Xyz;R$ 1",
+                "LJ1;01.01.001;01.01;RECEITAS S/ VENDAS;DINHEIRO;DINHEIRO;Mai;R$ 7",
+                "LJ1;01.01.001;01.01;RECEITAS S/ VENDAS;DINHEIRO;DINHEIRO;Mai;R$ 8",
+            ],
+        )
+        paths = resolve_input_paths([exports_dir])
+        ingest_dre_exports(paths, tmp_path / "memoria", max_workers=1)
+        expected = pd.read_parquet(quarantine_path)
+
+        monkeypatch.setattr(config, "CSV_STREAMING", True)
+        monkeypatch.setattr(config, "CSV_CHUNK_SIZE", 1)
+        df = ingest_dre_exports(paths, tmp_path / "streaming", max_workers=1)
+
+        assert len(df) == 4
+        pd.testing.assert_frame_equal(pd.read_parquet(quarantine_path), expected)
+        assert expected["reason"].tolist() == ["unknown_month", "duplicate_key"]
+        assert not list(tmp_path.glob("*.quarantine"))
+
+    def test_invalid_export_keeps_previous_dataset(self, exports_dir, tmp_path):
+        """Falha em um export não altera o dataset anterior."""
+        dataset_dir = tmp_path / "dataset"
+        ingest_dre_exports(resolve_input_paths([exports_dir]), dataset_dir, max_workers=1)
+        broken = tmp_path / "quebrado.csv"
+        broken.write_text("Ano Txt;2026\n\n\n\nLoja;Outra\nLJ1;x\n", encoding="latin-1")
+
+        with pytest.raises(ValueError):
+            ingest_dre_exports([broken], dataset_dir, max_workers=1)
+
+        assert len(read_partitioned_dataset(dataset_dir)) == 3
+
+    def test_write_dataset_parquet_matches_read(self, exports_dir, tmp_path, monkeypatch):
+        """O Parquet copiado em blocos tem os mesmos registros do dataset lido."""
+        monkeypatch.setattr(config, "CSV_STREAMING", True)
+        dataset_dir = tmp_path / "dataset"
+        _write_export(
+            exports_dir / "DRE_2026.csv",
+            "2026",
+            "Grupo J+",
+            ["LJ3;02.01.001;;( - ) CUSTOS;BOVINOS;PROTEINAS;Jan;-R$ 10"],
+        )
+
+        assert ingest_dre_exports(
+            resolve_input_paths([exports_dir]), dataset_dir, max_workers=1, load=False
+        ) is None
+        rows = write_dataset_parquet(tmp_path / "processed.parquet", dataset_dir)
+
+        expected = read_partitioned_dataset(dataset_dir)
+        result = apply_dimension_categoricals(pd.read_parquet(tmp_path / "processed.parquet"))
+        key = [config.COLUMN_ANO, config.COLUMN_MES]
+        assert rows == 4
+        pd.testing.assert_frame_equal(
+            result.sort_values(key).reset_index(drop=True),
+            expected.sort_values(key).reset_index(drop=True),
+            check_categorical=False,
+        )
+
+    def test_empty_input_raises_error(self, tmp_path):
+        """Lista de exports vazia levanta ValueError."""
+        with pytest.raises(ValueError):
+            ingest_dre_exports([], tmp_path / "dataset")
+
+    def test_missing_dataset_raises_error(self, tmp_path):
+        """Dataset inexistente levanta FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            read_partitioned_dataset(tmp_path / "inexistente")
@@ -144,6 +144,47 @@ class TestGenerateNarratives:
         
         assert "Narrativa_IA" not in df.columns
 
+    def test_generate_narratives_matches_create_narrative(self):
+        """Test that the column-wise build matches create_narrative per row."""
+        df = pd.DataFrame({
+            config.COLUMN_MES: pd.to_datetime(["2025-01-01", "2025-02-01", "2025-03-01"]),
+            config.COLUMN_NOME_GRUPO: pd.Categorical(["RECEITAS", None, "CUSTOS"]),
+            config.COLUMN_CC_NOME: ["PIX", "SALARIOS", "BOVINOS"],
+            config.COLUMN_REALIZADO: [1234.5, -500.0, 0.0],
+            "Camada03": ["PIX", "FOLHA", None],
+        })
+
+        result = generate_narratives(df)
+
+        expected = [create_narrative(row) for _, row in df.iterrows()]
+        assert result["Narrativa_IA"].tolist() == expected
+
+    def test_generate_narratives_empty_dataframe(self):
+        """Test that an empty DataFrame gets an empty Narrativa_IA column."""
+        df = pd.DataFrame(columns=[config.COLUMN_MES, config.COLUMN_CC_NOME])
+
+        result = generate_narratives(df)
+
+        assert "Narrativa_IA" in result.columns
+        assert result.empty
+
+    def test_generate_narratives_shares_columns_with_copy_on_write(self):
+        """Test that copy-on-write mode does not copy the untouched columns."""
+        import numpy as np
+
+        df = pd.DataFrame({
+            config.COLUMN_MES: ["Jan"],
+            config.COLUMN_CC_NOME: ["PIX"],
+            config.COLUMN_REALIZADO: [1000.0],
+        })
+
+        with pd.option_context("mode.copy_on_write", True):
+            result = generate_narratives(df)
+            assert np.shares_memory(
+                result[config.COLUMN_REALIZADO].to_numpy(),
+                df[config.COLUMN_REALIZADO].to_numpy(),
+            )
+
 
 class TestGetNarrativeSummary:
     """Tests for the get_narrative_summary function."""
@@ -0,0 +1,210 @@
+"""
+Testes unitários para o módulo ngram_classifier.
+
+Cobertura de testes:
+- Treino e previsão por vizinhos mais próximos
+- Confiança e descrições sem n-gramas conhecidos
+- Persistência (save/load) em .npz
+- Histórico rotulado (relatório narrativo e JSONL de fine-tuning)
+- Retreino do modelo compartilhado quando o histórico muda
+- Classificação offline em processar_classificacao (AI_BACKEND)
+"""
+
+import json
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+import config
+from src.ngram_classifier import (
+    NgramClassifier,
+    NgramMatch,
+    get_ngram_classifier,
+    load_labelled_history,
+)
+
+
+@pytest.fixture
+def modelo() -> NgramClassifier:
+    return NgramClassifier.fit(
+        ["BOVINOS", "Picanha bovina", "CERVEJAS", "Cerveja lata", "ENERGIA", "Conta de luz"],
+        ["BOVINOS", "BOVINOS", "CERVEJAS", "CERVEJAS", "ENERGIA", "ENERGIA"],
+        ["CUSTOS", "", "CUSTOS", "CUSTOS", "UTILIDADES", "UTILIDADES"],
+        ngram_range=(2, 4),
+        k=3,
+    )
+
+
+@pytest.fixture
+def historico(tmp_path: Path) -> tuple[Path, Path]:
+    """Relatório narrativo e JSONL de fine-tuning em tmp_path."""
+    narrative = tmp_path / "relatorio_narrativo_ia.csv"
+    pd.DataFrame({
+        config.COLUMN_CC_NOME: ["BOVINOS", "BOVINOS", "REFRIGERANTES"],
+        config.COLUMN_NOME_GRUPO: ["( - ) CUSTOS VARIÁVEIS"] * 3,
+    }).to_csv(narrative, index=False)
+
+    finetune = tmp_path / "finetune_dataset.jsonl"
+    registros = [
+        {"text_input": "Classifique o gasto 'REFRIGERANTES' em uma categoria DRE.",
+         "output": "O gasto 'REFRIGERANTES' pertence ao grupo '( - ) CUSTOS VARIÁVEIS'."},
+        {"messages": [
+            {"role": "user", "content": "Classifique o gasto 'ENERGIA' em uma categoria DRE."},
+            {"role": "assistant", "content": "O gasto 'ENERGIA' pertence ao grupo '( - ) UTILIDADES E SERVIÇOS'."},
+        ]},
+        {"question": "Qual o total de BOVINOS?", "answer": "R$ 10,00"},
+    ]
+    finetune.write_text("\n".join(json.dumps(r, ensure_ascii=False) for r in registros), encoding="utf-8")
+    return narrative, finetune
+
+
+# =============================================================================
+# Testes do Classificador
+# =============================================================================
+
+class TestNgramClassifier:
+    """Testes para fit, predict e persistência."""
+
+    def test_predict_nearest_label(self, modelo):
+        """Variações de grafia caem no rótulo mais parecido."""
+        resultados = modelo.predict(["picanha bovina kg", "cervejas lata 350ml", "luz"])
+
+        assert [r.category for r in resultados] == ["BOVINOS", "CERVEJAS", "ENERGIA"]
+
+    def test_group_is_first_non_empty(self, modelo):
+        """O grupo do rótulo ignora exemplos sem grupo."""
+        assert modelo.predict(["Picanha bovina"])[0].group == "CUSTOS"
+
+    def test_confidence(self, modelo):
+        """Texto idêntico a um exemplo tem confiança maior que um parecido."""
+        exato, parecido = modelo.predict(["Cerveja lata", "cerv"])
+
+        assert exato.confidence > parecido.confidence
+        assert 0.0 < exato.confidence <= 1.0
+
+    def test_unknown_text(self, modelo):
+        """Sem n-gramas em comum não há categoria."""
+        assert modelo.predict(["qqqq", ""]) == [NgramMatch(None, "", 0.0)] * 2
+
+    def test_kneighbors_order(self, modelo):
+        """Vizinhos em ordem decrescente de similaridade."""
+        sims, ids = modelo.kneighbors(["Conta de luz"], k=2)
+
+        assert ids.shape == (1, 2)
+        assert sims[0, 0] == pytest.approx(1.0)
+        assert sims[0, 0] >= sims[0, 1]
+
+    def test_save_load_roundtrip(self, modelo, tmp_path):
+        """O modelo salvo prevê igual ao original."""
+        path = modelo.save(tmp_path / "sub" / "modelo.npz")
+        carregado = NgramClassifier.load(path, k=3)
+        textos = ["picanha", "cerveja", "energia eletrica"]
+
+        assert not (tmp_path / "sub" / "modelo.npz.tmp.npz").exists()
+        assert len(carregado) == len(modelo)
+        assert carregado.ngram_range == (2, 4)
+        assert carregado.predict(textos) == modelo.predict(textos)
+
+
+# =============================================================================
+# Testes do Histórico
+# =============================================================================
+
+class TestHistorico:
+    """Testes para load_labelled_history e get_ngram_classifier."""
+
+    def test_load_labelled_history(self, historico):
+        """Une os dois arquivos, sem repetições e ignorando perguntas de outros tipos."""
+        history = load_labelled_history(*historico)
+
+        assert sorted(history["label"]) == ["BOVINOS", "ENERGIA", "REFRIGERANTES"]
+        assert set(history["group"]) == {"( - ) CUSTOS VARIÁVEIS", "( - ) UTILIDADES E SERVIÇOS"}
+
+    def test_history_without_descriptions_warns(self, tmp_path, caplog):
+        """Só nomes de categorias (sem Descricao): o aviso diz que o modelo não reconhece descrições."""
+        narrative = tmp_path / "mestre.csv"
+        pd.DataFrame({"cc_nome": ["BOVINOS", "ENERGIA"]}).to_csv(narrative, sep=";", index=False)
+
+        with caplog.at_level("WARNING", logger="src.ngram_classifier"):
+            load_labelled_history(narrative, tmp_path / "b.jsonl")
+
+        assert "sem descrições rotuladas" in caplog.text
+
+    def test_missing_files(self, tmp_path):
+        """Arquivos inexistentes resultam em histórico vazio."""
+        assert load_labelled_history(tmp_path / "a.csv", tmp_path / "b.jsonl").empty
+        with pytest.raises(ValueError):
+            NgramClassifier.from_history(tmp_path / "a.csv", tmp_path / "b.jsonl")
+
+    def test_get_ngram_classifier_retrains_when_stale(self, historico, tmp_path):
+        """Treina quando não há modelo e de novo quando o histórico é mais recente."""
+        narrative, finetune = historico
+        model_path = tmp_path / "ngram.npz"
+
+        primeiro = get_ngram_classifier(model_path, narrative, finetune)
+        assert model_path.exists()
+        assert primeiro.predict(["refrigerante"])[0].category == "REFRIGERANTES"
+        assert get_ngram_classifier(model_path, narrative, finetune) is primeiro
+
+        pd.DataFrame({config.COLUMN_CC_NOME: ["AVES"]}).to_csv(narrative, index=False)
+        futuro = model_path.stat().st_mtime_ns + 10**9
+        os.utime(narrative, ns=(futuro, futuro))
+
+        segundo = get_ngram_classifier(model_path, narrative, finetune)
+        assert "AVES" in segundo.labels.tolist()
+
+    def test_no_history(self, tmp_path):
+        """Sem modelo nem histórico não há classificador."""
+        assert get_ngram_classifier(tmp_path / "m.npz", tmp_path / "a.csv", tmp_path / "b.jsonl") is None
+
+
+# =============================================================================
+# Testes de Integração
+# =============================================================================
+
+class TestBackendOffline:
+    """processar_classificacao com o classificador offline."""
+
+    @pytest.fixture(autouse=True)
+    def historico_de_teste(self, monkeypatch, tmp_path, historico):
+        """Modelo e histórico do classificador offline em tmp_path."""
+        narrative, finetune = historico
+        monkeypatch.setattr(config, "NGRAM_MODEL_PATH", tmp_path / "ngram.npz")
+        monkeypatch.setattr(config, "NARRATIVE_CSV_PATH", narrative)
+        monkeypatch.setattr(config, "FINETUNE_JSONL_PATH", finetune)
+
+    @patch('src.ai_classifier.get_model')
+    def test_backend_ngram(self, mock_get_model, monkeypatch):
+        """Com AI_BACKEND "ngram" o Gemini não é consultado."""
+        monkeypatch.setattr(config, "AI_BACKEND", "ngram")
+        df_mestre = pd.DataFrame({'cc_nome': ['BOVINOS', 'REFRIGERANTES']})
+        df_novo = pd.DataFrame({'Descricao': ['Refrigerant lata', 'xyzw']})
+
+        from src.ai_classifier import processar_classificacao
+
+        resultado = processar_classificacao(df_mestre, df_novo, "")
+
+        assert resultado['cc_nome'].tolist() == ['REFRIGERANTES', 'OUTROS']
+        assert resultado.attrs["classificacao"]["backend"] == "ngram"
+        mock_get_model.assert_not_called()
+
+    @patch('src.ai_classifier.get_model', return_value=None)
+    def test_backend_auto_sem_chave(self, mock_get_model, monkeypatch):
+        """Com AI_BACKEND "auto" e sem modelo Gemini usa o classificador offline."""
+        monkeypatch.setattr(config, "AI_BACKEND", "auto")
+
+        from src.ai_classifier import usar_classificador_offline
+
+        assert usar_classificador_offline() is True
+
+    def test_backend_invalido(self, monkeypatch):
+        """Valor desconhecido em AI_BACKEND é um erro de configuração."""
+        monkeypatch.setattr(config, "AI_BACKEND", "openai")
+
+        from src.ai_classifier import usar_classificador_offline
+
+        with pytest.raises(ValueError):
+            usar_classificador_offline()
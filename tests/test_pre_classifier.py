@@ -0,0 +1,213 @@
+"""
+Testes unitários para o módulo pre_classifier.
+
+Cobertura de testes:
+- Resolução por nome exato, histórico, fornecedor e palavras
+- Confiança mínima e casamentos ambíguos
+- Estatísticas (taxa de resolução local)
+- Integração com processar_classificacao e processar_com_validacao
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import pytest
+
+import config
+from src.category_engine import CategoryIndex
+from src.pre_classifier import LocalMatch, PreClassifier
+
+
+@pytest.fixture
+def indice() -> CategoryIndex:
+    return CategoryIndex({
+        "( - ) CUSTOS VARIÁVEIS": ["BOVINOS", "CERVEJAS", "CERVEJAS ESPECIAIS"],
+        "( - ) UTILIDADES E SERVIÇOS": ["ENERGIA", "AGUA E ESGOTO"],
+        "( - ) SERVIÇOS DE TERCEIROS": ["SISTEMAS E SOFTWARES"],
+        "RECEITAS S/ VENDAS": ["PIX", "CARTAO CREDITO", "CARTAO DEBITO"],
+    })
+
+
+@pytest.fixture
+def pre(indice) -> PreClassifier:
+    return PreClassifier(
+        indice,
+        keyword_rules={"AWS": "SISTEMAS E SOFTWARES", "SABESP": "AGUA E ESGOTO", "X": "INEXISTENTE"},
+        min_confidence=0.75,
+    )
+
+
+# =============================================================================
+# Testes de classify
+# =============================================================================
+
+class TestClassify:
+    """Testes para PreClassifier.classify."""
+
+    def test_exact_name(self, pre):
+        """Nome da categoria, ignorando acentos e maiúsculas."""
+        assert pre.classify("  água e esgoto ") == LocalMatch("AGUA E ESGOTO", 1.0, "exact")
+
+    def test_history(self, indice):
+        """Descrição já rotulada usa o rótulo mais frequente e sua fração."""
+        pre = PreClassifier(indice, history={"Picanha": "bovinos", "PICANHA": "BOVINOS"})
+
+        assert pre.classify("picanha") == LocalMatch("BOVINOS", 1.0, "history")
+
+    def test_history_ignores_unknown_labels(self, indice):
+        """Rótulos fora das categorias válidas não entram no histórico."""
+        pre = PreClassifier(indice, history={"Picanha": "CARNES NOBRES"})
+
+        assert pre.classify("picanha") is None
+
+    def test_keyword_rule(self, pre):
+        """Fornecedor conhecido, em qualquer posição da descrição."""
+        assert pre.classify("Pagamento Teste AWS") == LocalMatch(
+            "SISTEMAS E SOFTWARES", 0.95, "keyword"
+        )
+
+    def test_keyword_must_match_whole_word(self, pre):
+        """Palavra-chave dentro de outra palavra não casa."""
+        assert pre.classify("AWSOME") is None
+
+    def test_token_overlap(self, pre):
+        """Todas as palavras da categoria presentes, no singular: a mais específica vence."""
+        match = pre.classify("Cerveja especial")
+
+        assert match == LocalMatch("CERVEJAS ESPECIAIS", 1.0, "tokens")
+
+    def test_unknown_words_need_query_coverage(self, pre):
+        """Palavras fora das categorias pesam contra: a descrição fica para a IA."""
+        assert pre.classify("Cervejas especiais artesanais") is None
+        assert pre.classify("Energia elétrica") is None
+
+        tolerante = PreClassifier(pre.indice, keyword_rules={}, min_query_coverage=0.5)
+        assert tolerante.classify("Energia elétrica").category == "ENERGIA"
+
+    def test_meaning_changing_words_are_not_resolved(self):
+        """Regressões: FRETE (singular de FRETES) e DEVOLUCAO mudam a categoria."""
+        indice = CategoryIndex({
+            "( - ) CUSTOS VARIÁVEIS": ["BOVINOS", "FRETES E ESTACIONAMENTO"],
+            "RECEITAS S/ VENDAS": ["CARTAO CREDITO", "CARTAO DEBITO", "PIX"],
+            "( - ) DEDUÇÕES SOBRE RECEITA": ["ESTORNO DE VENDAS CARTAO"],
+        })
+        pre = PreClassifier(indice, keyword_rules={}, min_confidence=0.75)
+
+        assert pre.resolve(["Frete de bovinos", "Devolução de cartão de crédito"]) == [None, None]
+        assert pre.resolve(["Estorno venda cartão"]) == ["ESTORNO DE VENDAS CARTAO"]
+
+    def test_extra_category_word_is_not_resolved(self):
+        """Palavra de outra categoria na descrição: "Taxa cartão crédito" não é a receita CARTAO CREDITO."""
+        indice = CategoryIndex.from_names(["TX ADM CARTO CREDITO", "CARTAO CREDITO", "TAXA DE BOLETO"])
+        pre = PreClassifier(indice, keyword_rules={})
+
+        assert pre.classify("Taxa cartão crédito") is None
+        assert pre.resolve(["Taxa cartão crédito"]) == [None]
+
+    def test_stopwords_and_numbers_are_ignored(self, pre):
+        """Palavras genéricas e números não reduzem a confiança."""
+        assert pre.classify("Pagamento de energia 03/2026").confidence == 1.0
+
+    def test_ambiguous_match(self, pre):
+        """Empate entre categorias diferentes fica para a IA."""
+        assert pre.classify("cartao") is None
+
+    def test_no_match(self, pre):
+        """Descrição sem relação com as categorias."""
+        assert pre.classify("Manutenção do forno") is None
+        assert pre.classify("") is None
+
+
+# =============================================================================
+# Testes de resolve
+# =============================================================================
+
+class TestResolve:
+    """Testes para PreClassifier.resolve e as estatísticas."""
+
+    def test_low_confidence_is_not_resolved(self, pre):
+        """Casamento parcial abaixo da confiança mínima não é aceito."""
+        assert pre.classify("Especiais").confidence < 0.75
+        assert pre.resolve(["Especiais"]) == [None]
+
+    def test_stats(self, pre):
+        """Contagem por método e taxa de resolução local."""
+        result = pre.resolve(["Bovinos", "Conta Sabesp", "Manutenção do forno", "Pgto energias"])
+
+        assert result == ["BOVINOS", "AGUA E ESGOTO", None, "ENERGIA"]
+        assert pre.stats == {"items": 4, "resolved": 3, "exact": 1, "keyword": 1, "tokens": 1}
+        assert pre.hit_rate == 0.75
+
+    def test_from_master_uses_description_history(self, indice):
+        """Colunas Descricao e cc_nome do arquivo mestre viram histórico."""
+        df_mestre = pd.DataFrame({
+            'Descricao': ['Frigorífico Boi Bom', None],
+            'cc_nome': ['BOVINOS', 'PIX'],
+        })
+
+        pre = PreClassifier.from_master(df_mestre, indice)
+
+        assert pre.resolve(["FRIGORIFICO BOI BOM"]) == ["BOVINOS"]
+
+
+# =============================================================================
+# Testes de Integração
+# =============================================================================
+
+class TestIntegracao:
+    """O pré-classificador evita chamadas à IA nos classificadores."""
+
+    @patch('src.ai_classifier.get_model')
+    def test_processar_classificacao_envia_so_pendentes(self, mock_get_model):
+        """Só a descrição não resolvida localmente vai para a IA."""
+        mock_model = MagicMock()
+        mock_model.generate_content.return_value = MagicMock(text="BOVINOS")
+        mock_get_model.return_value = mock_model
+        df_mestre = pd.DataFrame({'cc_nome': ['BOVINOS', 'DINHEIRO', 'PIX']})
+        df_novo = pd.DataFrame({'Descricao': ['Dinheiro', 'Pix', 'Fornecedor carne', 'PIX']})
+
+        from src.ai_classifier import processar_classificacao
+
+        resultado = processar_classificacao(df_mestre, df_novo, "", batch_size=1)
+
+        assert resultado['cc_nome'].tolist() == ['DINHEIRO', 'PIX', 'BOVINOS', 'PIX']
+        assert mock_model.generate_content.call_count == 1
+        resumo = resultado.attrs["classificacao"]
+        assert resumo["locais"] == 2
+        assert resumo["ia"] == 1
+        assert resumo["chamadas_evitadas"] == 2
+        assert resumo["taxa_local"] == pytest.approx(2 / 3)
+
+    @patch('src.ai_classifier.get_model')
+    def test_desativado(self, mock_get_model, monkeypatch):
+        """Com PRE_CLASSIFIER_ENABLED desligado tudo vai para a IA."""
+        monkeypatch.setattr(config, "PRE_CLASSIFIER_ENABLED", False)
+        mock_model = MagicMock()
+        mock_model.generate_content.return_value = MagicMock(text='{"1": "DINHEIRO"}')
+        mock_get_model.return_value = mock_model
+
+        from src.ai_classifier import processar_classificacao
+
+        resultado = processar_classificacao(
+            pd.DataFrame({'cc_nome': ['DINHEIRO']}), pd.DataFrame({'Descricao': ['Dinheiro']}), ""
+        )
+
+        assert resultado['cc_nome'].tolist() == ['DINHEIRO']
+        assert mock_model.generate_content.call_count == 1
+        assert resultado.attrs["classificacao"]["locais"] == 0
+
+    @patch('src.ai_classifier.get_model')
+    def test_processar_com_validacao_envia_so_pendentes(self, mock_get_model):
+        """O processador com trava também resolve localmente antes da IA."""
+        mock_model = MagicMock()
+        mock_model.generate_content.return_value = MagicMock(text='{"1": "BOVINOS"}')
+        mock_get_model.return_value = mock_model
+        df_mestre = pd.DataFrame({'Mes': ['Ago'], 'cc_nome': ['BOVINOS'], 'Descricao': ['x']})
+        df_novo = pd.DataFrame({'Mes': ['Set', 'Set'], 'Descricao': ['Bovinos', 'Fornecedor carne']})
+
+        from src.data_processor_ia import processar_com_validacao
+
+        resultado = processar_com_validacao(df_mestre, df_novo)
+
+        assert resultado['cc_nome'].tolist() == ['BOVINOS', 'BOVINOS', 'BOVINOS']
+        assert mock_model.generate_content.call_count == 1
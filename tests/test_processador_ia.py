@@ -135,7 +135,7 @@ class TestTravaSegurancaDuplicidade:
 class TestClassificarGastoProcessador:
     """Testes para a função classificar_gasto() do processador."""
 
-    @patch('src.data_processor_ia.get_model')
+    @patch('src.ai_classifier.get_model')
     def test_classificar_gasto_retorna_categoria(self, mock_get_model):
         """Testa que classificação retorna categoria correta."""
         mock_model = MagicMock()
@@ -151,7 +151,7 @@ class TestClassificarGastoProcessador:
 
         assert resultado == "REFRIGERANTES"
 
-    @patch('src.data_processor_ia.get_model')
+    @patch('src.ai_classifier.get_model')
     def test_classificar_gasto_erro_retorna_fallback(self, mock_get_model):
         """Testa fallback quando IA falha."""
         mock_model = MagicMock()
@@ -165,7 +165,7 @@ class TestClassificarGastoProcessador:
 
         assert resultado == "ERRO_IA"
 
-    @patch('src.data_processor_ia.get_model')
+    @patch('src.ai_classifier.get_model')
     def test_classificar_gasto_strip_whitespace(self, mock_get_model):
         """Testa que whitespace é removido da resposta."""
         mock_model = MagicMock()
@@ -181,7 +181,7 @@ class TestClassificarGastoProcessador:
 
         assert resultado == "BOVINOS"
 
-    @patch('src.data_processor_ia.get_model')
+    @patch('src.ai_classifier.get_model')
     def test_classificar_gasto_categoria_outros(self, mock_get_model):
         """Testa quando IA não consegue classificar."""
         mock_model = MagicMock()
@@ -205,7 +205,7 @@ class TestClassificarGastoProcessador:
 class TestIntegracaoProcessador:
     """Testes de integração do processador."""
 
-    @patch('src.data_processor_ia.get_model')
+    @patch('src.ai_classifier.get_model')
     def test_processar_com_validacao(self, mock_get_model, sample_mestre_df, sample_entrada_df, tmp_path):
         """Testa fluxo completo do processamento com validação."""
         mock_model = MagicMock()
@@ -227,6 +227,31 @@ class TestIntegracaoProcessador:
         assert len(df_resultado) >= len(sample_mestre_df)
         assert output_path.exists()
 
+    @patch('src.ai_classifier.get_model')
+    def test_processar_com_validacao_mestre_particionado(self, mock_get_model, sample_mestre_df, sample_entrada_df, tmp_path):
+        """Com o mestre particionado, só os itens novos são gravados."""
+        mock_model = MagicMock()
+        mock_model.generate_content.return_value = MagicMock(text='{"1": "BOVINOS", "2": "BOVINOS"}')
+        mock_get_model.return_value = mock_model
+
+        from src.data_processor_ia import processar_com_validacao
+        from src.master_store import MasterStore
+
+        store = MasterStore(tmp_path / "mestre")
+        store.replace(sample_mestre_df)
+        output_path = store.export_csv(tmp_path / "output.csv")
+
+        df_resultado = processar_com_validacao(
+            sample_mestre_df, sample_entrada_df, output_path, store=store
+        )
+
+        assert len(df_resultado) == 5
+        assert len(store) == 5
+        assert "2026-01" in store.months()
+        assert len(pd.read_csv(output_path, sep=';', encoding='utf-8-sig')) == 5
+        # A descrição fica no mestre: é o histórico do pré-classificador
+        assert store.read()['Descricao'].tolist()[-2:] == sample_entrada_df['Descricao'].tolist()
+
     def test_constantes_importadas_de_ai_classifier(self):
         """Verifica que constantes são importadas de ai_classifier."""
         from src.data_processor_ia import ARQUIVO_MESTRE
@@ -234,3 +259,22 @@ class TestIntegracaoProcessador:
 
         # Deve ser o mesmo objeto (importado)
         assert ARQUIVO_MESTRE == ARQUIVO_MESTRE_ORIGINAL
+
+    @patch('src.ai_classifier.get_model')
+    def test_processar_com_validacao_usa_indice_compartilhado(self, mock_get_model, sample_mestre_df, sample_entrada_df, tmp_path):
+        """O índice de categorias é o compartilhado do categories.json, não um novo por chamada."""
+        mock_model = MagicMock()
+        mock_model.generate_content.return_value = MagicMock(text='{"1": "BOVINOS", "2": "BOVINOS"}')
+        mock_get_model.return_value = mock_model
+
+        import src.data_processor_ia
+        from src.category_engine import CategoryIndex
+
+        indice = CategoryIndex({"( - ) CUSTOS VARIÁVEIS": ["BOVINOS"]})
+        with patch.object(src.data_processor_ia, 'get_category_index', return_value=indice), \
+                patch.object(CategoryIndex, 'from_names') as from_names:
+            src.data_processor_ia.processar_com_validacao(
+                sample_mestre_df, sample_entrada_df, tmp_path / "output.csv"
+            )
+
+        from_names.assert_not_called()
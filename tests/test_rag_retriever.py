@@ -0,0 +1,174 @@
+"""
+Testes unitários para o módulo rag_retriever.
+
+Cobertura de testes:
+- Ordenação das categorias por similaridade lexical
+- Seleção dos candidatos (top-k por gasto e categorias fixas)
+- Recall da poda com gastos rotulados
+- Contexto reduzido nos prompts de classificação
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import pytest
+
+import config
+from src.category_engine import CategoryIndex
+from src.rag_retriever import ContextRetriever, get_context_retriever
+
+
+@pytest.fixture
+def indice() -> CategoryIndex:
+    return CategoryIndex({
+        "( - ) CUSTOS VARIÁVEIS": ["BOVINOS", "CERVEJAS", "CERVEJAS ESPECIAIS", "MATERIA PRIMA"],
+        "( - ) UTILIDADES E SERVIÇOS": ["ENERGIA", "AGUA E ESGOTO", "CONDOMINIO"],
+        "( - ) DESPESAS FINANCEIRAS": ["TAXAS BANCARIAS", "JUROS/MULTAS"],
+    })
+
+
+@pytest.fixture
+def seletor(indice) -> ContextRetriever:
+    return ContextRetriever(indice, top_k=2, fallback=["MATERIA PRIMA", "INEXISTENTE"])
+
+
+# =============================================================================
+# Testes do ContextRetriever
+# =============================================================================
+
+class TestContextRetriever:
+    """Testes para rank e select."""
+
+    def test_rank(self, seletor):
+        """A categoria mais parecida com a descrição vem primeiro."""
+        ranking = seletor.rank("Conta de energia elétrica")
+
+        assert ranking[0].name == "ENERGIA"
+        assert ranking[0].group == "( - ) UTILIDADES E SERVIÇOS"
+        assert len(ranking) <= 2
+
+    def test_rank_without_similarity(self, seletor):
+        """Descrição sem n-gramas em comum não traz candidatos."""
+        assert seletor.rank("qqqq") == []
+
+    def test_select_top_k_and_fallback(self, seletor):
+        """Candidatos de cada gasto e as categorias fixas existentes no índice."""
+        selecao = seletor.select(["Bovinos picanha", "Juros de boleto"])
+
+        nomes = [nome for nomes in selecao.values() for nome in nomes]
+        assert {"BOVINOS", "JUROS/MULTAS", "MATERIA PRIMA"} <= set(nomes)
+        assert "INEXISTENTE" not in nomes
+        assert len(nomes) <= 2 * 2 + 1
+
+    def test_select_orders_by_relevance(self, seletor):
+        """O grupo e a categoria mais relevantes vêm primeiro; as fixas por último."""
+        selecao = seletor.select(["Cervejas especiais"])
+
+        assert list(selecao) == ["( - ) CUSTOS VARIÁVEIS"]
+        assert selecao["( - ) CUSTOS VARIÁVEIS"][0] == "CERVEJAS ESPECIAIS"
+        assert selecao["( - ) CUSTOS VARIÁVEIS"][-1] == "MATERIA PRIMA"
+
+    def test_top_k_from_config(self, indice, monkeypatch):
+        """Sem top_k no construtor vale config.RAG_TOP_K."""
+        monkeypatch.setattr(config, "RAG_TOP_K", 1)
+        monkeypatch.setattr(config, "RAG_FALLBACK_CATEGORIES", [])
+
+        assert ContextRetriever(indice).select(["Energia"]) == {
+            "( - ) UTILIDADES E SERVIÇOS": ["ENERGIA"]
+        }
+
+    def test_recall(self, seletor):
+        """Fração dos rótulos que sobrevive à poda: "Picanha" não lembra BOVINOS."""
+        descricoes = ["Conta de energia elétrica", "Picanha"]
+
+        assert seletor.recall(descricoes, ["ENERGIA", "BOVINOS"]) == 0.5
+        assert seletor.recall(["Bovinos", "Picanha"], ["BOVINOS", "BOVINOS"], batch_size=2) == 1.0
+        assert seletor.recall([], []) == 0.0
+
+    def test_empty_index(self):
+        """Sem categorias não há seleção."""
+        seletor = ContextRetriever(CategoryIndex({}), top_k=3)
+
+        assert len(seletor) == 0
+        assert seletor.select(["Energia"]) == {}
+
+    def test_shared_retriever(self, indice):
+        """Um seletor por índice."""
+        assert get_context_retriever(indice) is get_context_retriever(indice)
+
+
+# =============================================================================
+# Testes dos Prompts
+# =============================================================================
+
+class TestContextoReduzido:
+    """O contexto RAG dos prompts leva só as categorias candidatas."""
+
+    @pytest.fixture(autouse=True)
+    def contexto_reduzido(self, monkeypatch, indice):
+        """Poda ativa (top-k 2) sobre o índice de teste."""
+        import src.ai_classifier
+
+        monkeypatch.setattr(config, "PRE_CLASSIFIER_ENABLED", False)
+        monkeypatch.setattr(config, "RAG_TOP_K", 2)
+        monkeypatch.setattr(config, "RAG_FALLBACK_CATEGORIES", ["MATERIA PRIMA"])
+        monkeypatch.setattr(src.ai_classifier, "get_category_index", lambda: indice)
+
+    @patch('src.ai_classifier.get_model')
+    def test_prompt_do_lote(self, mock_get_model, indice):
+        """O prompt do lote tem os candidatos do lote, não a hierarquia inteira."""
+        mock_model = MagicMock()
+        mock_model.generate_content.return_value = MagicMock(text='{"1": "ENERGIA"}')
+        mock_get_model.return_value = mock_model
+
+        from src.ai_classifier import formatar_contexto_rag, processar_classificacao
+
+        resultado = processar_classificacao(
+            pd.DataFrame({'cc_nome': ['ENERGIA']}),
+            pd.DataFrame({'Descricao': ['Conta de energia']}),
+            formatar_contexto_rag(indice.hierarchy),
+            batch_size=10,
+        )
+
+        prompt = mock_model.generate_content.call_args[0][0]
+        assert resultado['cc_nome'].tolist() == ['ENERGIA']
+        assert "ENERGIA" in prompt and "MATERIA PRIMA" in prompt
+        assert "CERVEJAS ESPECIAIS" not in prompt
+
+    @patch('src.ai_classifier.get_model')
+    def test_prefixo_estatico_com_poda(self, mock_get_model, indice):
+        """Lotes com candidatos diferentes começam pelo mesmo prefixo; os candidatos vêm depois."""
+        mock_model = MagicMock()
+        mock_model.generate_content.return_value = MagicMock(text='{"1": "ENERGIA"}')
+        mock_get_model.return_value = mock_model
+
+        from src.ai_classifier import _prefixo_prompt, formatar_contexto_rag, processar_classificacao
+
+        processar_classificacao(
+            pd.DataFrame({'cc_nome': ['ENERGIA']}),
+            pd.DataFrame({'Descricao': ['Conta de energia', 'Juros de boleto']}),
+            formatar_contexto_rag(indice.hierarchy),
+            batch_size=1,
+        )
+
+        prompts = [chamada[0][0] for chamada in mock_model.generate_content.call_args_list]
+        assert len(prompts) == 2
+        assert all(prompt.startswith(_prefixo_prompt("")) for prompt in prompts)
+        assert "ENERGIA" in prompts[0] and "JUROS/MULTAS" in prompts[1]
+        assert "JUROS/MULTAS" not in prompts[0]
+
+    @patch('src.ai_classifier.get_model')
+    def test_contexto_completo_com_top_k_zero(self, mock_get_model, indice, monkeypatch):
+        """Com RAG_TOP_K = 0 o prompt leva a hierarquia completa."""
+        monkeypatch.setattr(config, "RAG_TOP_K", 0)
+        mock_model = MagicMock()
+        mock_model.generate_content.return_value = MagicMock(text="ENERGIA")
+        mock_get_model.return_value = mock_model
+
+        from src.ai_classifier import classificar_gasto, formatar_contexto_rag
+
+        contexto = formatar_contexto_rag(indice.hierarchy)
+        resultado = classificar_gasto("Conta de energia", contexto_rag=contexto, indice=indice)
+
+        assert resultado == "ENERGIA"
+        assert contexto in mock_model.generate_content.call_args[0][0]
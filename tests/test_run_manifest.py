@@ -0,0 +1,174 @@
+"""
+Testes unitários para o módulo run_manifest.
+
+Cobertura de testes:
+- Hash de arquivos e de parâmetros do config
+- Fingerprint de etapas
+- Reutilização de etapas inalteradas e invalidação por mudança
+- Opção force e persistência do manifesto
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+import config
+from src.run_manifest import RunManifest, config_sha256, file_sha256, path_sha256
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+
+@pytest.fixture
+def stage_files(tmp_path: Path) -> dict[str, Path]:
+    """Cria entrada, código e artefato de uma etapa fictícia."""
+    files = {
+        "input": tmp_path / "entrada.csv",
+        "code": tmp_path / "etapa.py",
+        "artifact": tmp_path / "saida.json",
+    }
+    files["input"].write_text("a;b\n1;2\n", encoding="utf-8")
+    files["code"].write_text("def etapa(): pass\n", encoding="utf-8")
+    files["artifact"].write_text("{}", encoding="utf-8")
+    return files
+
+
+def _fingerprint(manifest: RunManifest, files: dict[str, Path]) -> str:
+    return manifest.fingerprint(
+        "etapa",
+        inputs=[files["input"]],
+        config_keys=["REFERENCE_YEAR"],
+        code_files=[files["code"]],
+    )
+
+
+def _run_once(path: Path, files: dict[str, Path], force: bool = False) -> RunManifest:
+    """Simula uma execução do pipeline com uma única etapa."""
+    manifest = RunManifest(path, force=force)
+    fingerprint = _fingerprint(manifest, files)
+    if not manifest.is_current("etapa", fingerprint, [files["artifact"]]):
+        manifest.record("etapa", fingerprint, [files["artifact"]], summary={"linhas": 1})
+    manifest.save()
+    return manifest
+
+
+# =============================================================================
+# Testes de Hash
+# =============================================================================
+
+class TestHashes:
+    """Testes para as funções de hash."""
+
+    def test_file_sha256_depends_on_content(self, tmp_path: Path):
+        """Arquivos com o mesmo conteúdo têm o mesmo hash."""
+        a = tmp_path / "a.txt"
+        b = tmp_path / "b.txt"
+        a.write_bytes(b"conteudo")
+        b.write_bytes(b"conteudo")
+
+        assert file_sha256(a) == file_sha256(b)
+
+        b.write_bytes(b"outro")
+        assert file_sha256(a) != file_sha256(b)
+
+    def test_path_sha256_hashes_directories(self, tmp_path: Path):
+        """Diretórios são hasheados pelos nomes e conteúdos dos arquivos."""
+        directory = tmp_path / "dataset"
+        (directory / "Ano=2025").mkdir(parents=True)
+        part = directory / "Ano=2025" / "a.parquet"
+        part.write_bytes(b"dados")
+        before = path_sha256(directory)
+
+        assert path_sha256(part) == file_sha256(part)
+        assert path_sha256(directory) == before
+
+        part.rename(directory / "Ano=2025" / "b.parquet")
+        assert path_sha256(directory) != before
+
+    def test_config_sha256_tracks_values(self, monkeypatch):
+        """Mudança em um parâmetro altera o hash."""
+        before = config_sha256(["REFERENCE_YEAR", "CSV_ENGINE"])
+        assert before == config_sha256(["CSV_ENGINE", "REFERENCE_YEAR"])
+
+        monkeypatch.setattr(config, "REFERENCE_YEAR", 1999)
+        assert config_sha256(["REFERENCE_YEAR", "CSV_ENGINE"]) != before
+
+
+# =============================================================================
+# Testes do Manifesto
+# =============================================================================
+
+class TestRunManifest:
+    """Testes para a classe RunManifest."""
+
+    def test_first_run_executes_stage(self, tmp_path: Path, stage_files):
+        """Sem manifesto anterior, a etapa é executada e registrada."""
+        manifest = _run_once(tmp_path / "manifest.json", stage_files)
+
+        assert manifest.executed == ["etapa"]
+        assert manifest.reused == []
+        assert (tmp_path / "manifest.json").exists()
+
+    def test_unchanged_stage_is_reused(self, tmp_path: Path, stage_files):
+        """Segunda execução sem mudanças reutiliza a etapa."""
+        path = tmp_path / "manifest.json"
+        _run_once(path, stage_files)
+        manifest = _run_once(path, stage_files)
+
+        assert manifest.executed == []
+        assert manifest.reused == ["etapa"]
+        assert manifest.summary("etapa") == {"linhas": 1}
+
+    @pytest.mark.parametrize("changed", ["input", "code", "artifact"])
+    def test_changed_file_invalidates_stage(self, tmp_path: Path, stage_files, changed):
+        """Mudança na entrada, no código ou no artefato força a execução."""
+        path = tmp_path / "manifest.json"
+        _run_once(path, stage_files)
+
+        stage_files[changed].write_text("alterado", encoding="utf-8")
+        manifest = _run_once(path, stage_files)
+
+        assert manifest.executed == ["etapa"]
+
+    def test_missing_artifact_invalidates_stage(self, tmp_path: Path, stage_files):
+        """Artefato removido força a execução."""
+        path = tmp_path / "manifest.json"
+        _run_once(path, stage_files)
+
+        stage_files["artifact"].unlink()
+        manifest = RunManifest(path)
+        fingerprint = _fingerprint(manifest, stage_files)
+
+        assert not manifest.is_current("etapa", fingerprint, [stage_files["artifact"]])
+
+    def test_config_change_invalidates_stage(self, tmp_path: Path, stage_files, monkeypatch):
+        """Mudança em parâmetro do config força a execução."""
+        path = tmp_path / "manifest.json"
+        _run_once(path, stage_files)
+
+        monkeypatch.setattr(config, "REFERENCE_YEAR", 1999)
+        manifest = _run_once(path, stage_files)
+
+        assert manifest.executed == ["etapa"]
+
+    def test_force_ignores_manifest(self, tmp_path: Path, stage_files):
+        """Com force=True a etapa sempre é executada."""
+        path = tmp_path / "manifest.json"
+        _run_once(path, stage_files)
+        manifest = _run_once(path, stage_files, force=True)
+
+        assert manifest.executed == ["etapa"]
+        assert manifest.reused == []
+
+    def test_invalid_manifest_is_ignored(self, tmp_path: Path, stage_files):
+        """Manifesto corrompido não impede a execução."""
+        path = tmp_path / "manifest.json"
+        path.write_text("{ invalido", encoding="utf-8")
+
+        manifest = _run_once(path, stage_files)
+
+        assert manifest.executed == ["etapa"]
+        with open(path, "r", encoding="utf-8") as f:
+            assert "etapa" in json.load(f)["stages"]
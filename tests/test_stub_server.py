@@ -0,0 +1,92 @@
+"""
+Testes unitários para o módulo stub_server.
+
+Cobertura de testes:
+- Rota generateContent e formato da resposta
+- Erros simulados (429) e novas tentativas do driver
+- Classificação completa pelo backend "http"
+"""
+
+import urllib.error
+
+import pandas as pd
+import pytest
+
+import config
+from src.classification_driver import ClassificationDriver, StubAPIError, StubModel
+from src.http_model import HttpModel
+from src.stub_server import StubServer
+
+
+@pytest.fixture
+def server():
+    with StubServer(StubModel(latency=0.0)) as server:
+        yield server
+
+
+class TestStubServer:
+    """Testes do servidor local com o cliente HttpModel."""
+
+    def test_generate_content(self, server):
+        """Prompt simples responde OUTROS; prompt em lote responde JSON."""
+        model = HttpModel(server.url, timeout=5)
+
+        assert model.generate_content("Classifique: picanha").text == "OUTROS"
+        assert model.generate_content('GASTOS:\n1. "Picanha"\n2. "Coca"').text == (
+            '{"1": "OUTROS", "2": "OUTROS"}'
+        )
+        assert server.model.stats["calls"] == 2
+
+    def test_unknown_route(self, server):
+        """Rotas fora de generateContent respondem 404."""
+        model = HttpModel(server.url, timeout=5)
+        model.url = f"{server.url}/v1beta/models/x:countTokens"
+
+        with pytest.raises(urllib.error.HTTPError) as exc_info:
+            model.generate_content("x")
+
+        assert exc_info.value.code == 404
+
+    def test_rate_limit_is_retried(self):
+        """O 429 do servidor chega como HTTPError e o driver tenta de novo."""
+        prompts = []
+
+        def responder(prompt: str) -> str:
+            prompts.append(prompt)
+            if len(prompts) == 1:
+                raise StubAPIError(429, "Resource has been exhausted (e.g. check quota).")
+            return "BOVINOS"
+
+        with StubServer(StubModel(latency=0.0, responder=responder)) as server:
+            driver = ClassificationDriver(
+                HttpModel(server.url, timeout=5),
+                requests_per_minute=0,
+                backoff_base=0.01,
+                backoff_max=0.01,
+            )
+            assert driver.run(["Picanha"]) == ["BOVINOS"]
+
+        assert len(prompts) == 2
+
+    def test_backend_http(self, server, monkeypatch, tmp_path):
+        """processar_classificacao com AI_BACKEND "http" usa o servidor local."""
+        import src.ai_classifier
+
+        monkeypatch.setattr(config, "AI_BACKEND", "http")
+        monkeypatch.setattr(config, "AI_HTTP_URL", server.url)
+        monkeypatch.setattr(config, "AI_REQUESTS_PER_MINUTE", 0)
+        monkeypatch.setattr(config, "AI_CACHE_PATH", tmp_path / "classificacoes.sqlite")
+        monkeypatch.setattr(config, "PRE_CLASSIFIER_ENABLED", False)
+        monkeypatch.setattr(src.ai_classifier, "_driver", None)
+
+        resultado = src.ai_classifier.processar_classificacao(
+            pd.DataFrame({'cc_nome': ['BOVINOS']}),
+            pd.DataFrame({'Descricao': ['Picanha', 'Coca', 'Energia']}),
+            "",
+            batch_size=2,
+        )
+
+        assert resultado['cc_nome'].tolist() == ['OUTROS', 'OUTROS', 'OUTROS']
+        assert resultado.attrs["classificacao"]["backend"] == "http"
+        assert resultado.attrs["classificacao"]["chamadas_ia"] == 2
+        assert server.model.stats["calls"] == 2
@@ -0,0 +1,147 @@
+"""
+Testes unitários para o módulo text_repair.
+
+Cobertura de testes:
+- Equivalência com as substituições sequenciais (str.replace em laço)
+- Remoção de caracteres, espaços e valores que não são texto
+- Correção de colunas por valor distinto (object e categórica)
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import config
+from src.category_engine import clean_encoding
+from src.text_repair import TextRepairer, get_text_repairer
+
+
+def _sequential_replace(text: str) -> str:
+    """Implementação anterior: um str.replace por substituição."""
+    for error, fix in config.TEXT_REPLACEMENTS.items():
+        text = text.replace(error, fix)
+    return text.strip()
+
+
+# =============================================================================
+# Testes de Texto
+# =============================================================================
+
+class TestTextRepairer:
+    """Testes para TextRepairer.repair."""
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "CUSTOS VARIï¿½VEIS",
+            "DEDUï¿½ï¿½ES SOBRE RECEITA",
+            "Vrios itens no Ms",
+            "AÃ§OUGUE E CARVÃ£O",
+            "SERVIï¿½OS ï¿½ DE TERCEIROS ",
+            "texto normal",
+        ],
+    )
+    def test_matches_sequential_replacements(self, text):
+        """Uma passada dá o mesmo resultado que os str.replace em sequência."""
+        assert get_text_repairer().repair(text) == _sequential_replace(text)
+
+    def test_longest_key_wins(self):
+        """Em chaves sobrepostas vence a mais longa."""
+        repairer = TextRepairer({"AB": "1", "ABC": "2", "C": "3"})
+
+        assert repairer.repair("ABCAB C") == "21 3"
+
+    def test_replacement_output_is_not_rescanned(self):
+        """O texto substituído não é corrigido de novo."""
+        repairer = TextRepairer({"A": "B", "B": "C"})
+
+        assert repairer.repair("AB") == "BC"
+
+    def test_remove_chars_and_collapse_whitespace(self):
+        """Caracteres removidos antes das substituições e espaços colapsados."""
+        repairer = TextRepairer(
+            {"VARIVEIS": "VARIÁVEIS"}, remove_chars="�", collapse_whitespace=True
+        )
+
+        assert repairer.repair("  CUSTOS   VARI��VEIS ") == "CUSTOS VARIÁVEIS"
+
+    def test_non_string_passes_through(self):
+        """Valores que não são texto não são alterados."""
+        repairer = get_text_repairer()
+
+        assert repairer.repair(None) is None
+        assert repairer.repair(12.5) == 12.5
+
+    def test_empty_replacements(self):
+        """Sem substituições, apenas o strip é aplicado."""
+        assert TextRepairer({}, strip=True).repair(" x ") == "x"
+
+    def test_follows_config_changes(self, monkeypatch):
+        """A instância compartilhada acompanha mudanças em TEXT_REPLACEMENTS."""
+        monkeypatch.setattr(config, "TEXT_REPLACEMENTS", {"foo": "bar"})
+
+        assert get_text_repairer().repair("foo") == "bar"
+
+    def test_category_engine_clean_encoding(self):
+        """clean_encoding usa o mesmo motor com as correções de categorias."""
+        assert clean_encoding("CUSTOS VARIï¿½VEIS") == "CUSTOS VARIÁVEIS"
+        assert clean_encoding("FLUXO DE CAIXA LIVRE PARA S�CIOS") == (
+            "FLUXO DE CAIXA LIVRE PARA SÓCIOS"
+        )
+        assert clean_encoding(10) == "10"
+
+
+# =============================================================================
+# Testes de Colunas
+# =============================================================================
+
+class TestRepairSeries:
+    """Testes para TextRepairer.repair_series."""
+
+    def test_object_series_matches_elementwise(self):
+        """Resultado igual ao apply elemento a elemento, com NaN e não-texto preservados."""
+        series = pd.Series(
+            ["Vrios", None, "Ms", 3, "Vrios", np.nan], index=list("abcdef"), name="col"
+        )
+
+        result = get_text_repairer().repair_series(series)
+
+        expected = series.apply(lambda x: _sequential_replace(x) if isinstance(x, str) else x)
+        pd.testing.assert_series_equal(result, expected)
+
+    def test_repairs_each_distinct_value_once(self, monkeypatch):
+        """O custo depende da cardinalidade, não do número de linhas."""
+        repairer = TextRepairer({"Vrios": "Vários"})
+        calls = []
+        original = repairer.repair
+
+        def counting(text):
+            calls.append(text)
+            return original(text)
+
+        monkeypatch.setattr(repairer, "repair", counting)
+        repairer.repair_series(pd.Series(["Vrios", "X"] * 1000))
+
+        assert sorted(calls) == ["Vrios", "X"]
+
+    def test_categorical_repairs_categories(self):
+        """Colunas categóricas continuam categóricas, na mesma ordem."""
+        series = pd.Series(pd.Categorical(["Vrios", "B", None], categories=["Vrios", "B"]))
+
+        result = get_text_repairer().repair_series(series)
+
+        assert isinstance(result.dtype, pd.CategoricalDtype)
+        assert list(result.cat.categories) == ["Vários", "B"]
+        assert result.tolist()[:2] == ["Vários", "B"]
+        assert pd.isna(result.iloc[2])
+
+    def test_categorical_merges_equal_categories(self):
+        """Categorias que ficam iguais após a correção são unificadas."""
+        series = pd.Series(
+            pd.Categorical(["Vários", "Vrios", "B"], categories=["B", "Vrios", "Vários"])
+        )
+
+        result = get_text_repairer().repair_series(series)
+
+        assert list(result.cat.categories) == ["B", "Vários"]
+        assert result.tolist() == ["Vários", "Vários", "B"]